@@ -11,15 +11,50 @@ Technology: Python + CustomTkinter + pandas + Garmin fit_tool
 """
 
 import customtkinter as ctk
-import pandas as pd
+import asyncio
+import multiprocessing
 import os
-import tempfile
-import json
-import re
-from datetime import datetime, timedelta
+import sys
 from tkinter import filedialog, messagebox, ttk
 import threading
-from fit_tool.fit_file import FitFile
+
+from edit_history import EditHistory
+import garmin_exercises
+from garmin_upload import GarminUploader, UploadQueue, upload_settings
+from hevy_csv import read_hevy_csv
+from merge_jobs import MergeJob, JobCancelled, TkJobScheduler
+from merge_pipeline import MergePipeline, inspect_garmin_file
+from session_store import (clear_session, default_session_path, file_fingerprint, load_session,
+                           load_user_preferences, remember_file, save_session, save_user_preferences)
+from set_table import SetTable, SET_TYPE_NAMES
+from workout_report import body_diagram_text, build_report, load_muscle_groups, muscle_group_volumes, write_report
+
+
+def add_heart_rate_details(frame, heart_rate):
+    """Pack time-in-zone, training load and per-exercise HR labels into a stats frame
+    
+    Args:
+        heart_rate: the 'heart_rate' entry of the workout statistics
+            (hr_analysis.analyze_heart_rate), or None when unavailable
+    """
+    if not heart_rate:
+        return
+    ctk.CTkLabel(frame, text=f"Training Load (TRIMP): {heart_rate['trimp']:.0f}").pack(anchor="w", padx=20)
+    ctk.CTkLabel(frame, text=f"Zones (max HR {heart_rate['max_hr']} bpm):",
+                 font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w", padx=20, pady=(5, 0))
+    for zone in heart_rate['zones']:
+        label = f"Zone {zone['zone']} (≥{zone['low_bpm']} bpm)" if zone['zone'] else "Below zone 1"
+        minutes, seconds = divmod(zone['seconds'], 60)
+        ctk.CTkLabel(frame, text=f"{label}: {minutes}:{seconds:02d}").pack(anchor="w", padx=30)
+    if heart_rate['blocks']:
+        ctk.CTkLabel(frame, text="By exercise:",
+                     font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w", padx=20, pady=(5, 0))
+        for block in heart_rate['blocks']:
+            if block['avg_hr'] is None:
+                continue
+            ctk.CTkLabel(frame, text=f"{block['exercise'].title()}: avg {block['avg_hr']}, "
+                                     f"max {block['max_hr']} bpm").pack(anchor="w", padx=30)
+    ctk.CTkLabel(frame, text="").pack(pady=(0, 5))
 
 
 class WorkoutSummaryWindow:
@@ -39,19 +74,7 @@ class WorkoutSummaryWindow:
         
     def load_muscle_groups(self):
         """Load muscle group mapping data"""
-        try:
-            muscle_path = os.path.join(os.path.dirname(__file__), "muscle_groups.json")
-            with open(muscle_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            # Fallback muscle group data
-            return {
-                "muscle_group_mappings": {
-                    "chest": {"exercises": ["bench", "press"], "color": "#FF6B6B"},
-                    "back": {"exercises": ["deadlift", "row"], "color": "#4ECDC4"},
-                    "legs": {"exercises": ["squat", "lunge"], "color": "#DDA0DD"}
-                }
-            }
+        return load_muscle_groups()
     
     def show_summary(self):
         """Display the enhanced summary window"""
@@ -94,11 +117,9 @@ class WorkoutSummaryWindow:
         title_label.pack(pady=20)
         
         # Workout overview
-        total_sets = len(self.garmin_sets)
-        total_reps = sum(s['repetitions'] for s in self.garmin_sets)
-        total_exercises = len(set(s['original_exercise_name'] for s in self.garmin_sets))
+        totals = self.garmin_sets.totals()
         
-        overview_text = f"📊 {total_exercises} Exercises • {total_sets} Sets • {total_reps} Total Reps"
+        overview_text = f"📊 {totals['exercises']} Exercises • {totals['sets']} Sets • {totals['reps']} Total Reps"
         overview_label = ctk.CTkLabel(header_frame, text=overview_text, 
                                      font=ctk.CTkFont(size=16))
         overview_label.pack(pady=(0, 20))
@@ -147,6 +168,7 @@ class WorkoutSummaryWindow:
         ctk.CTkLabel(garmin_frame, text=f"Avg HR: {avg_hr} bpm").pack(anchor="w", padx=20)
         ctk.CTkLabel(garmin_frame, text=f"Max HR: {max_hr} bpm").pack(anchor="w", padx=20)
         ctk.CTkLabel(garmin_frame, text=f"Calories: {calories}").pack(anchor="w", padx=20, pady=(0, 10))
+        add_heart_rate_details(garmin_frame, self.workout_stats.get('heart_rate'))
         
         # Hevy data stats
         hevy_frame = ctk.CTkFrame(stats_frame)
@@ -155,14 +177,12 @@ class WorkoutSummaryWindow:
         ctk.CTkLabel(hevy_frame, text="🏋️ Hevy Data", 
                     font=ctk.CTkFont(size=14, weight="bold")).pack(pady=10, anchor="w", padx=10)
         
-        total_sets = len(self.garmin_sets)
-        total_reps = sum(s['repetitions'] for s in self.garmin_sets)
-        total_weight = sum(s['weight'] * s['repetitions'] for s in self.garmin_sets)
+        totals = self.garmin_sets.totals()
         weight_unit = getattr(self.parent_app, 'weight_unit', 'kg')
         
-        ctk.CTkLabel(hevy_frame, text=f"Total Sets: {total_sets}").pack(anchor="w", padx=20)
-        ctk.CTkLabel(hevy_frame, text=f"Total Reps: {total_reps}").pack(anchor="w", padx=20)
-        ctk.CTkLabel(hevy_frame, text=f"Total Volume: {total_weight:.0f} {weight_unit}").pack(anchor="w", padx=20, pady=(0, 10))
+        ctk.CTkLabel(hevy_frame, text=f"Total Sets: {totals['sets']}").pack(anchor="w", padx=20)
+        ctk.CTkLabel(hevy_frame, text=f"Total Reps: {totals['reps']}").pack(anchor="w", padx=20)
+        ctk.CTkLabel(hevy_frame, text=f"Total Volume: {totals['volume']:.0f} {weight_unit}").pack(anchor="w", padx=20, pady=(0, 10))
         
     def create_muscle_group_panel(self, parent):
         """Create muscle group visualization panel"""
@@ -204,56 +224,12 @@ class WorkoutSummaryWindow:
         
     def calculate_muscle_group_volumes(self):
         """Calculate volume per muscle group"""
-        muscle_volumes = {}
-        muscle_mappings = self.muscle_groups.get("muscle_group_mappings", {})
-        
-        # Initialize muscle groups
-        for muscle_group in muscle_mappings.keys():
-            muscle_volumes[muscle_group] = {
-                'total_volume': 0,
-                'sets': 0,
-                'reps': 0,
-                'exercises': set()
-            }
-        
-        # Calculate volumes
-        for set_data in self.garmin_sets:
-            exercise_name = set_data['original_exercise_name'].lower()
-            volume = set_data['weight'] * set_data['repetitions']
-            
-            # Find which muscle groups this exercise targets
-            for muscle_group, group_data in muscle_mappings.items():
-                exercise_keywords = group_data.get('exercises', [])
-                if any(keyword in exercise_name for keyword in exercise_keywords):
-                    muscle_volumes[muscle_group]['total_volume'] += volume
-                    muscle_volumes[muscle_group]['sets'] += 1
-                    muscle_volumes[muscle_group]['reps'] += set_data['repetitions']
-                    muscle_volumes[muscle_group]['exercises'].add(set_data['original_exercise_name'])
-        
-        return muscle_volumes
+        return muscle_group_volumes(self.garmin_sets.exercise_summary(),
+                                    self.muscle_groups.get("muscle_group_mappings", {}))
         
     def create_text_body_diagram(self, parent, muscle_volumes):
         """Create a text-based body diagram showing trained muscle groups"""
-        diagram_text = "\n🧍 FRONT VIEW:\n"
-        diagram_text += "   💪 Shoulders\n" if muscle_volumes.get('shoulders', {}).get('total_volume', 0) > 0 else "   ⚪ Shoulders\n"
-        diagram_text += "  🫀 Chest\n" if muscle_volumes.get('chest', {}).get('total_volume', 0) > 0 else "  ⚪ Chest\n"
-        diagram_text += " 💪 Biceps   💪 Biceps\n" if muscle_volumes.get('biceps', {}).get('total_volume', 0) > 0 else " ⚪ Biceps   ⚪ Biceps\n"
-        diagram_text += "   🟡 Core\n" if muscle_volumes.get('core', {}).get('total_volume', 0) > 0 else "   ⚪ Core\n"
-        diagram_text += "  🦵 Quadriceps\n" if muscle_volumes.get('quadriceps', {}).get('total_volume', 0) > 0 else "  ⚪ Quadriceps\n"
-        diagram_text += "   🦵 Calves\n" if muscle_volumes.get('calves', {}).get('total_volume', 0) > 0 else "   ⚪ Calves\n"
-        
-        diagram_text += "\n🧍 BACK VIEW:\n"
-        diagram_text += "   💪 Shoulders\n" if muscle_volumes.get('shoulders', {}).get('total_volume', 0) > 0 else "   ⚪ Shoulders\n"
-        diagram_text += "  🔙 Upper Back\n" if muscle_volumes.get('back', {}).get('total_volume', 0) > 0 else "  ⚪ Upper Back\n"
-        diagram_text += " 💪 Triceps  💪 Triceps\n" if muscle_volumes.get('triceps', {}).get('total_volume', 0) > 0 else " ⚪ Triceps  ⚪ Triceps\n"
-        diagram_text += "  🔙 Lower Back\n" if muscle_volumes.get('back', {}).get('total_volume', 0) > 0 else "  ⚪ Lower Back\n"
-        diagram_text += "  🍑 Glutes\n" if muscle_volumes.get('glutes', {}).get('total_volume', 0) > 0 else "  ⚪ Glutes\n"
-        diagram_text += "  🦵 Hamstrings\n" if muscle_volumes.get('hamstrings', {}).get('total_volume', 0) > 0 else "  ⚪ Hamstrings\n"
-        diagram_text += "   🦵 Calves\n" if muscle_volumes.get('calves', {}).get('total_volume', 0) > 0 else "   ⚪ Calves\n"
-        
-        diagram_text += "\n💪 = Trained   ⚪ = Not Trained"
-        
-        ctk.CTkLabel(parent, text=diagram_text, 
+        ctk.CTkLabel(parent, text=body_diagram_text(muscle_volumes), 
                     font=ctk.CTkFont(family="Monaco", size=12),
                     justify="left").pack(pady=10, padx=10)
         
@@ -267,25 +243,7 @@ class WorkoutSummaryWindow:
                     font=ctk.CTkFont(size=18, weight="bold")).pack(pady=(0, 20))
         
         # Create exercise summary
-        exercise_summary = {}
-        for set_data in self.garmin_sets:
-            exercise_name = set_data['original_exercise_name']
-            if exercise_name not in exercise_summary:
-                exercise_summary[exercise_name] = {
-                    'sets': 0, 'total_reps': 0, 'max_weight': 0, 
-                    'total_volume': 0, 'set_types': set()
-                }
-            
-            exercise_summary[exercise_name]['sets'] += 1
-            exercise_summary[exercise_name]['total_reps'] += set_data['repetitions']
-            exercise_summary[exercise_name]['max_weight'] = max(
-                exercise_summary[exercise_name]['max_weight'], 
-                set_data['weight']
-            )
-            exercise_summary[exercise_name]['total_volume'] += set_data['weight'] * set_data['repetitions']
-            
-            set_type_names = {0: "Normal", 2: "Warm-up", 5: "Failure", 6: "Drop set"}
-            exercise_summary[exercise_name]['set_types'].add(set_type_names.get(set_data['set_type'], "Normal"))
+        exercise_summary = self.garmin_sets.exercise_summary()
         
         # Display exercise summary
         weight_unit = getattr(self.parent_app, 'weight_unit', 'kg')
@@ -328,6 +286,9 @@ class WorkoutSummaryWindow:
         ctk.CTkButton(button_frame, text="← Back to Edit", command=self.back_to_edit,
                      width=140).pack(side="left", padx=10)
         
+        ctk.CTkButton(button_frame, text="📄 Save Report", command=self.save_report,
+                     width=140).pack(side="left", padx=10)
+        
         ctk.CTkButton(button_frame, text="🚀 Export Final FIT File", command=self.export_final_file,
                      width=180, fg_color="green", hover_color="darkgreen",
                      font=ctk.CTkFont(size=14, weight="bold")).pack(side="right", padx=10)
@@ -341,6 +302,38 @@ class WorkoutSummaryWindow:
         y = (self.window.winfo_screenheight() // 2) - (height // 2)
         self.window.geometry(f"{width}x{height}+{x}+{y}")
         
+    def save_report(self):
+        """Write an HTML (or PNG) report of the workout in a worker process"""
+        report_path = filedialog.asksaveasfilename(
+            title="Save Workout Report",
+            defaultextension=".html",
+            filetypes=[("HTML report", "*.html"), ("PNG image", "*.png"), ("All files", "*.*")],
+            initialdir=os.path.expanduser(self.parent_app.preferences.get("last_export_dir") or "~")
+        )
+        if not report_path:
+            return
+        
+        # Collecting the numbers is quick; rendering runs off the Tk thread
+        weight_unit = getattr(self.parent_app, 'weight_unit', 'kg')
+        title = os.path.splitext(os.path.basename(self.parent_app.garmin_file_path or "Workout"))[0]
+        # Statistics come from the FIT file, with per-exercise heart rate for the edited sets
+        report = build_report(self.enhanced_fit_file, self.garmin_sets, None,
+                              title=title, weight_unit=weight_unit, muscle_groups=self.muscle_groups)
+        scheduler = self.parent_app.scheduler
+        self.parent_app.update_status(f"Writing report {os.path.basename(report_path)}...")
+        scheduler.submit(scheduler.run_cpu(write_report, report, report_path),
+                         on_done=self.on_report_written)
+    
+    def on_report_written(self, task):
+        """Report the outcome of a background report write"""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.parent_app.update_status(f"Could not write report: {task.exception()}")
+            messagebox.showerror("Report Failed", str(task.exception()))
+        else:
+            self.parent_app.update_status(f"Report saved: {task.result()}")
+        
     def back_to_edit(self):
         """Go back to preview/edit screen"""
         self.user_confirmed = False
@@ -351,7 +344,8 @@ class WorkoutSummaryWindow:
         output_path = filedialog.asksaveasfilename(
             title="Save Final Enhanced FIT File",
             defaultextension=".fit",
-            filetypes=[("FIT files", "*.fit"), ("All files", "*.*")]
+            filetypes=[("FIT files", "*.fit"), ("All files", "*.*")],
+            initialdir=os.path.expanduser(self.parent_app.preferences.get("last_export_dir") or "~")
         )
         
         if output_path:
@@ -367,12 +361,36 @@ class UnmappedExerciseDialog:
         self.parent_app = parent_app
         self.unmapped_exercises = unmapped_exercises
         self.available_exercises = available_exercises
+        # Word sets of the ~1,250 catalogue entries, split once rather than per exercise
+        self.available_words = [(set(exercise.lower().split()), exercise) for exercise in available_exercises]
         self.user_mappings = {}
         self.user_confirmed = False
         self.window = None
+        self.result_future = None
         
     def show_dialog(self):
-        """Show the unmapped exercise mapping dialog"""
+        """Show the unmapped exercise mapping dialog and block until it closes"""
+        self.create_window()
+        
+        # Wait for user action
+        self.window.wait_window()
+        
+        return self.user_confirmed, self.user_mappings
+        
+    def show_dialog_async(self, loop):
+        """Show the dialog without blocking; returns a future of (confirmed, mappings)"""
+        self.result_future = loop.create_future()
+        self.create_window()
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel_action)
+        return self.result_future
+        
+    def resolve_result(self):
+        """Hand the outcome to an awaiting coroutine, if any"""
+        if self.result_future is not None and not self.result_future.done():
+            self.result_future.set_result((self.user_confirmed, self.user_mappings))
+        
+    def create_window(self):
+        """Build the unmapped exercise mapping window"""
         self.window = ctk.CTkToplevel(self.parent_app.root)
         self.window.title("⚠️ Unmapped Exercises Found")
         self.window.geometry("800x600")
@@ -400,11 +418,6 @@ class UnmappedExerciseDialog:
         y = (self.window.winfo_screenheight() // 2) - (height // 2)
         self.window.geometry(f"{width}x{height}+{x}+{y}")
         
-        # Wait for user action
-        self.window.wait_window()
-        
-        return self.user_confirmed, self.user_mappings
-        
     def create_header(self):
         """Create warning header"""
         header_frame = ctk.CTkFrame(self.window)
@@ -476,12 +489,9 @@ class UnmappedExerciseDialog:
         # Simple keyword matching for suggestions
         suggestions = []
         
-        for available_exercise in self.available_exercises:
-            available_lower = available_exercise.lower()
-            
+        unmapped_words = set(unmapped_lower.split())
+        for available_words, available_exercise in self.available_words:
             # Check for common words
-            unmapped_words = set(unmapped_lower.split())
-            available_words = set(available_lower.split())
             common_words = unmapped_words.intersection(available_words)
             
             if common_words:
@@ -520,6 +530,7 @@ class UnmappedExerciseDialog:
         """Handle cancel button"""
         self.user_confirmed = False
         self.window.destroy()
+        self.resolve_result()
         
     def confirm_action(self):
         """Handle confirm button - save user mappings"""
@@ -532,6 +543,7 @@ class UnmappedExerciseDialog:
             
             self.user_confirmed = True
             self.window.destroy()
+            self.resolve_result()
             
         except Exception as e:
             messagebox.showerror("Mapping Error", f"Error saving mappings: {str(e)}")
@@ -540,13 +552,15 @@ class UnmappedExerciseDialog:
 class WorkoutPreviewWindow:
     """Preview and edit window for the merged workout data"""
     
-    def __init__(self, parent_app, garmin_sets, workout_stats, enhanced_fit_file):
+    def __init__(self, parent_app, garmin_sets, workout_stats, enhanced_fit_file, edit_history=None):
         self.parent_app = parent_app
-        self.garmin_sets = garmin_sets.copy()  # Make a copy so we can edit
+        self.history = edit_history or EditHistory(garmin_sets)  # Copies the sets on the first edit
         self.workout_stats = workout_stats
         self.enhanced_fit_file = enhanced_fit_file
         self.window = None
         self.tree = None
+        self.undo_button = None
+        self.redo_button = None
         self.stats_frame = None
         self.user_confirmed = False
         self.output_path = None
@@ -572,6 +586,12 @@ class WorkoutPreviewWindow:
         # Create footer with action buttons
         self.create_footer()
         
+        # Undo/redo shortcuts
+        modifier = "Command" if sys.platform == "darwin" else "Control"
+        self.window.bind(f"<{modifier}-z>", lambda event: self.undo_edit())
+        self.window.bind(f"<{modifier}-Z>", lambda event: self.redo_edit())
+        self.window.bind(f"<{modifier}-y>", lambda event: self.redo_edit())
+        
         # Center the window
         self.window.update_idletasks()
         width = self.window.winfo_width()
@@ -584,6 +604,11 @@ class WorkoutPreviewWindow:
         self.window.wait_window()
         
         return self.user_confirmed, self.output_path
+    
+    @property
+    def garmin_sets(self):
+        """The sets with the current edits applied"""
+        return self.history.table
         
     def create_header(self):
         """Create the header with workout summary"""
@@ -598,9 +623,10 @@ class WorkoutPreviewWindow:
         title_label.grid(row=0, column=0, columnspan=3, padx=20, pady=(20, 10), sticky="w")
         
         # Workout stats summary (like Garmin Connect)
-        stats_text = f"📊 {len(self.garmin_sets)} Sets • "
-        stats_text += f"{sum(s['repetitions'] for s in self.garmin_sets)} Total Reps • "
-        stats_text += f"{len(set(s['original_exercise_name'] for s in self.garmin_sets))} Exercises"
+        totals = self.garmin_sets.totals()
+        stats_text = f"📊 {totals['sets']} Sets • "
+        stats_text += f"{totals['reps']} Total Reps • "
+        stats_text += f"{totals['exercises']} Exercises"
         
         stats_label = ctk.CTkLabel(header_frame, text=stats_text, 
                                   font=ctk.CTkFont(size=14))
@@ -657,6 +683,7 @@ class WorkoutPreviewWindow:
         
         ctk.CTkLabel(hr_frame, text=f"Avg HR: {avg_hr} bpm").pack(anchor="w", padx=20)
         ctk.CTkLabel(hr_frame, text=f"Max HR: {max_hr} bpm").pack(anchor="w", padx=20, pady=(0, 10))
+        add_heart_rate_details(hr_frame, self.workout_stats.get('heart_rate'))
         
         # Workout details
         details_frame = ctk.CTkFrame(stats_frame)
@@ -665,11 +692,10 @@ class WorkoutPreviewWindow:
         ctk.CTkLabel(details_frame, text="📋 Workout Details", 
                     font=ctk.CTkFont(size=14, weight="bold")).pack(pady=10, anchor="w", padx=10)
         
-        total_reps = sum(s['repetitions'] for s in self.garmin_sets)
-        total_sets = len(self.garmin_sets)
+        totals = self.garmin_sets.totals()
         
-        ctk.CTkLabel(details_frame, text=f"Total Reps: {total_reps}").pack(anchor="w", padx=20)
-        ctk.CTkLabel(details_frame, text=f"Total Sets: {total_sets}").pack(anchor="w", padx=20, pady=(0, 10))
+        ctk.CTkLabel(details_frame, text=f"Total Reps: {totals['reps']}").pack(anchor="w", padx=20)
+        ctk.CTkLabel(details_frame, text=f"Total Sets: {totals['sets']}").pack(anchor="w", padx=20, pady=(0, 10))
         
         # Calories (from Garmin data)
         calories_frame = ctk.CTkFrame(stats_frame)
@@ -701,6 +727,13 @@ class WorkoutPreviewWindow:
                                 command=self.edit_selected_set, width=100)
         edit_btn.grid(row=0, column=1, padx=(10, 0), sticky="e")
         
+        self.undo_button = ctk.CTkButton(title_frame, text="↶ Undo", command=self.undo_edit,
+                                         width=70, state="disabled")
+        self.undo_button.grid(row=0, column=2, padx=(10, 0), sticky="e")
+        self.redo_button = ctk.CTkButton(title_frame, text="↷ Redo", command=self.redo_edit,
+                                         width=70, state="disabled")
+        self.redo_button.grid(row=0, column=3, padx=(10, 0), sticky="e")
+        
         # Create treeview for exercise data
         tree_frame = ctk.CTkFrame(exercise_frame)
         tree_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
@@ -743,16 +776,36 @@ class WorkoutPreviewWindow:
         
         # Add exercise data
         weight_unit = getattr(self.parent_app, 'weight_unit', 'kg')
-        set_type_names = {0: "Normal", 2: "Warm-up", 5: "Failure", 6: "Drop set"}
-        
         for i, set_data in enumerate(self.garmin_sets):
             exercise_name = set_data['original_exercise_name'].title()
             set_number = set_data['set_number']
             reps = set_data['repetitions']
             weight = f"{set_data['weight']} {weight_unit}"
-            set_type = set_type_names.get(set_data['set_type'], f"Type {set_data['set_type']}")
+            set_type = SET_TYPE_NAMES.get(set_data['set_type'], f"Type {set_data['set_type']}")
             
             self.tree.insert("", "end", values=(exercise_name, set_number, reps, weight, set_type))
+        
+        if self.undo_button is not None:
+            self.undo_button.configure(state="normal" if self.history.can_undo else "disabled")
+            self.redo_button.configure(state="normal" if self.history.can_redo else "disabled")
+    
+    def undo_edit(self):
+        """Revert the last set edit"""
+        self.show_edit_step(self.history.undo())
+    
+    def redo_edit(self):
+        """Re-apply the last undone set edit"""
+        self.show_edit_step(self.history.redo())
+    
+    def show_edit_step(self, step):
+        """Refresh the list after undo/redo and select the set that changed"""
+        if not step:
+            return
+        self.parent_app.save_session_snapshot(self)
+        self.populate_exercise_list()
+        item = self.tree.get_children()[step[0].index]
+        self.tree.selection_set(item)
+        self.tree.see(item)
             
     def edit_selected_set(self):
         """Edit the selected set"""
@@ -819,10 +872,12 @@ class WorkoutPreviewWindow:
         
         def save_changes():
             try:
-                # Update the set data
-                self.garmin_sets[set_index]['repetitions'] = int(reps_entry.get())
-                self.garmin_sets[set_index]['weight'] = float(weight_entry.get())
-                self.garmin_sets[set_index]['set_type'] = {"Normal": 0, "Warm-up": 2, "Failure": 5, "Drop set": 6}[type_var.get()]
+                # Record the change as one undoable edit
+                self.history.edit(set_index,
+                                  repetitions=int(reps_entry.get()),
+                                  weight=float(weight_entry.get()),
+                                  set_type={"Normal": 0, "Warm-up": 2, "Failure": 5, "Drop set": 6}[type_var.get()])
+                self.parent_app.save_session_snapshot(self)
                 
                 # Refresh the display
                 self.populate_exercise_list()
@@ -866,8 +921,7 @@ class WorkoutPreviewWindow:
             self.window.withdraw()
             
             # Show summary window
-            summary_window = WorkoutSummaryWindow(self.parent_app, self.garmin_sets, 
-                                                 {"duration_seconds": 1800, "avg_hr": 110, "max_hr": 143, "calories": 194}, 
+            summary_window = WorkoutSummaryWindow(self.parent_app, self.garmin_sets, self.workout_stats,
                                                  self.enhanced_fit_file)
             user_confirmed, output_path = summary_window.show_summary()
             
@@ -889,7 +943,7 @@ class WorkoutPreviewWindow:
         self.show_final_summary()
 
 
-class HevyGarminMerger:
+class HevyGarminMerger(MergePipeline):
     def __init__(self):
         # Initialize the main application
         self.root = ctk.CTk()
@@ -906,70 +960,67 @@ class HevyGarminMerger:
         self.status_log = None
         # Fixed weight unit handling – we always operate in kilograms
         self.weight_unit = "kg"
-        # Remember last-used directories for friendlier file pickers
-        self.last_garmin_dir = os.path.expanduser("~")
-        self.last_hevy_dir = os.path.expanduser("~")
+        # Last-used folders, recent files and the last session (user_preferences.json)
+        self.preferences = load_user_preferences()
+        self.last_garmin_dir = self.preferred_dir("last_garmin_dir")
+        self.last_hevy_dir = self.preferred_dir("last_hevy_dir")
+        # Snapshot of the preview being edited, so it survives a restart
+        self.session_path = default_session_path()
+        self.session_fingerprints = None
+        self.session_mappings = {}
         # Progress bar reference (created in setup_right_column)
         self.progress_bar = None
+        self.cancel_button = None
+        # The merge job currently running in the background (if any)
+        self.current_job = None
+        self.current_task = None
+        # Speculative pre-reads of the selected files: side -> (file key, task)
+        self.inspections = {}
+        # Background Garmin Connect uploads (see queue_upload)
+        self.upload_queue = None
+        self.upload_task = None
+        self.upload_stop = threading.Event()
         
         # Load configuration
         self.config = self.load_config()
         
+        # Asyncio scheduler driven by the Tk main loop (runs merge jobs)
+        self.scheduler = TkJobScheduler(self.root)
+        
         # Setup UI
         self.setup_ui()
         
-    def get_available_garmin_exercises(self):
-        """Get list of all available Garmin exercises for dropdown"""
-        try:
-            exercise_mappings = self.config.get("exercise_mappings", {})
-            # Create a list of exercise names formatted for display
-            available_exercises = []
-            
-            for hevy_name, mapping in exercise_mappings.items():
-                # Format exercise name for display (title case)
-                display_name = hevy_name.replace("_", " ").title()
-                available_exercises.append(display_name)
-            
-            # Sort alphabetically
-            available_exercises.sort()
-            
-            # Add some common generic options at the top
-            generic_options = [
-                "Strength Training (Generic)",
-                "Chest Exercise (Generic)", 
-                "Back Exercise (Generic)",
-                "Shoulder Exercise (Generic)",
-                "Leg Exercise (Generic)",
-                "Arm Exercise (Generic)",
-                "Core Exercise (Generic)"
-            ]
-            
-            return generic_options + available_exercises
-            
-        except Exception as e:
-            self.update_status(f"Error getting available exercises: {str(e)}")
-            return ["Strength Training (Generic)"]
+        # Reopen the preview of an interrupted session
+        self.root.after(100, self.resume_last_session)
         
-    def load_config(self):
-        """Load the Hevy-Garmin configuration file"""
+    def preferred_dir(self, key):
+        """A remembered folder from the preferences, if it still exists"""
+        directory = os.path.expanduser(self.preferences.get(key) or "~")
+        return directory if os.path.isdir(directory) else os.path.expanduser("~")
+        
+    def save_preferences(self):
         try:
-            config_path = os.path.join(os.path.dirname(__file__), "hevy_garmin_config.json")
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
-        except Exception as e:
-            # Fallback to basic config if file not found
-            return {
-                "settings": {"weight_unit": "kg", "default_set_duration_seconds": 30},
-                "exercise_mappings": {},
-                "hevy_csv_columns": {
-                    "exercise_name": "Exercise Name",
-                    "set_number": "Set Order", 
-                    "reps": "Reps",
-                    "weight": "Weight",
-                    "set_note": "Notes"
-                }
-            }
+            save_user_preferences(self.preferences)
+        except OSError as e:
+            self.update_status(f"Warning: Could not save preferences: {e}")
+        
+    GENERIC_EXERCISE_OPTIONS = (
+        "Strength Training (Generic)",
+        "Chest Exercise (Generic)",
+        "Back Exercise (Generic)",
+        "Shoulder Exercise (Generic)",
+        "Leg Exercise (Generic)",
+        "Arm Exercise (Generic)",
+        "Core Exercise (Generic)",
+    )
+    
+    def get_available_garmin_exercises(self):
+        """Get list of all available Garmin exercises for dropdown
+        
+        The FIT exercise catalogue is generated already sorted, so this is
+        only a concatenation with the generic options at the top.
+        """
+        return list(self.GENERIC_EXERCISE_OPTIONS) + list(garmin_exercises.DISPLAY_NAMES)
         
     def setup_window(self):
         """Configure the main application window"""
@@ -1060,23 +1111,31 @@ class HevyGarminMerger:
         self.status_log = ctk.CTkTextbox(parent, font=ctk.CTkFont(family="Monaco", size=12))
         self.status_log.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
         
-        # Progress bar (indeterminate)
+        # Progress bar (determinate, driven by the merge job)
         try:
-            self.progress_bar = ctk.CTkProgressBar(parent, mode="indeterminate")
+            self.progress_bar = ctk.CTkProgressBar(parent, mode="determinate")
             self.progress_bar.grid(row=2, column=0, padx=20, pady=(0, 10), sticky="ew")
-            self.progress_bar.stop()
+            self.progress_bar.set(0)
         except Exception:
             self.progress_bar = None
+        
+        # Cancel button for the running merge
+        self.cancel_button = ctk.CTkButton(parent, text="Cancel Merge", command=self.cancel_merge_process,
+                                          state="disabled", fg_color="gray", hover_color="darkred")
+        self.cancel_button.grid(row=3, column=0, padx=20, pady=(0, 20), sticky="e")
 
         # Add initial status message
         self.update_status("Ready. Please select your Garmin .FIT file and Hevy .CSV file to begin.")
         
     def update_status(self, message):
-        """Update the status log with a new message"""
+        """Update the status log with a new message (safe from worker threads)"""
+        if threading.current_thread() is not threading.main_thread():
+            self.scheduler.call_threadsafe(self.update_status, message)
+            return
         if self.status_log:
             self.status_log.insert("end", f"{message}\n")
             self.status_log.see("end")  # Auto-scroll to bottom
-            self.root.update()  # Force UI update
+            self.root.update_idletasks()  # Force UI redraw
             
     def select_garmin_file(self):
         """Handle Garmin file selection"""
@@ -1087,17 +1146,13 @@ class HevyGarminMerger:
         )
         
         if file_path:
-            self.garmin_file_path = file_path
-            self.last_garmin_dir = os.path.dirname(file_path)
-            # Display shortened path in the entry field
-            display_path = self.shorten_path(file_path)
-            self.garmin_path_display.configure(state="normal")
-            self.garmin_path_display.delete(0, "end")
-            self.garmin_path_display.insert(0, display_path)
-            self.garmin_path_display.configure(state="readonly")
+            self.show_selected_file("garmin", file_path)
+            remember_file(self.preferences, "garmin", file_path)
+            self.save_preferences()
             
             self.update_status(f"Garmin file selected: {os.path.basename(file_path)}")
             self.check_merge_button_state()
+            self.start_file_inspection("garmin", file_path)
             
     def select_hevy_file(self):
         """Handle Hevy file selection"""
@@ -1108,17 +1163,23 @@ class HevyGarminMerger:
         )
         
         if file_path:
-            self.hevy_file_path = file_path
-            self.last_hevy_dir = os.path.dirname(file_path)
-            # Display shortened path in the entry field
-            display_path = self.shorten_path(file_path)
-            self.hevy_path_display.configure(state="normal")
-            self.hevy_path_display.delete(0, "end")
-            self.hevy_path_display.insert(0, display_path)
-            self.hevy_path_display.configure(state="readonly")
+            self.show_selected_file("hevy", file_path)
+            remember_file(self.preferences, "hevy", file_path)
+            self.save_preferences()
             
             self.update_status(f"Hevy file selected: {os.path.basename(file_path)}")
             self.check_merge_button_state()
+            self.start_file_inspection("hevy", file_path)
+            
+    def show_selected_file(self, side, file_path):
+        """Store a selected file and show its shortened path in the entry field"""
+        setattr(self, f"{side}_file_path", file_path)
+        setattr(self, f"last_{side}_dir", os.path.dirname(file_path))
+        path_display = getattr(self, f"{side}_path_display")
+        path_display.configure(state="normal")
+        path_display.delete(0, "end")
+        path_display.insert(0, self.shorten_path(file_path))
+        path_display.configure(state="readonly")
             
     def shorten_path(self, file_path, max_length=50):
         """Shorten file path for display if it's too long"""
@@ -1130,6 +1191,78 @@ class HevyGarminMerger:
         end_part = file_path[-(max_length-23):]
         return f"{start_part}...{end_part}"
         
+    def start_file_inspection(self, side, file_path):
+        """Start (or reuse) the background pre-read of a selected file
+
+        Results are cached per side and keyed by path, size and modification
+        time, so the merge picks them up instead of reading the file again.
+
+        Returns:
+            asyncio.Task: resolves to the inspection result for the file
+        """
+        stat = os.stat(file_path)
+        file_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        
+        cached = self.inspections.get(side)
+        if cached:
+            cached_key, cached_task = cached
+            reusable = not cached_task.done() or (not cached_task.cancelled() and cached_task.exception() is None)
+            if cached_key == file_key and reusable:
+                return cached_task
+            if not cached_task.done():
+                cached_task.cancel()
+        
+        if side == "garmin":
+            coroutine = self.inspect_garmin_selection(file_path)
+        else:
+            coroutine = self.inspect_hevy_selection(file_path)
+        task = self.scheduler.submit(coroutine, on_done=lambda done_task: self.on_inspection_finished(side, done_task))
+        self.inspections[side] = (file_key, task)
+        return task
+        
+    async def inspect_garmin_selection(self, file_path):
+        """Decode a selected FIT file in a worker process and summarise its session"""
+        return await self.scheduler.run_cpu(inspect_garmin_file, file_path)
+        
+    async def inspect_hevy_selection(self, file_path):
+        """Read and parse a selected Hevy export, detecting workouts and unmapped exercises"""
+        hevy_df = await self.scheduler.run_io(read_hevy_csv, file_path, self.config.column_map)
+        parsed_hevy_data = await self.scheduler.run_io(self.parse_hevy_data, hevy_df)
+        return {
+            'hevy_df': hevy_df,
+            'parsed_hevy_data': parsed_hevy_data,
+            'workouts': self.detect_hevy_workouts(hevy_df),
+            'unmapped_exercises': self.find_unmapped_exercises(parsed_hevy_data)
+        }
+        
+    def on_inspection_finished(self, side, task):
+        """Show a quick summary once a selected file has been pre-read"""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.update_status(f"Could not pre-read {side.title()} file: {task.exception()}")
+            return
+        
+        if side == "garmin":
+            _, garmin_df, summary = task.result()
+            start_time = summary['start_time']
+            started = start_time.strftime("%d %b %Y, %H:%M UTC") if start_time else "unknown start"
+            duration = summary['duration_seconds']
+            duration_text = f"{duration // 60}:{duration % 60:02d}" if duration else "unknown duration"
+            sport = (summary['sub_sport'] or summary['sport'] or "unknown sport").replace("_", " ")
+            self.update_status(f"Garmin activity: {sport}, {started}, {duration_text} ({len(garmin_df)} records)")
+        else:
+            result = task.result()
+            workouts = result['workouts']
+            self.update_status(f"Hevy export: {len(workouts)} workout(s), {len(result['parsed_hevy_data'])} sets")
+            if workouts:
+                latest = workouts[0]
+                self.update_status(f"  Latest: '{latest['title']}' {latest['start_time']} - "
+                                   f"{latest['exercises']} exercises, {latest['sets']} sets")
+            unmapped = self.find_unmapped_exercises(result['parsed_hevy_data'])
+            if unmapped:
+                self.update_status(f"  {len(unmapped)} exercise(s) will need a Garmin mapping")
+        
     def check_merge_button_state(self):
         """Enable merge button only when both files are selected"""
         if self.garmin_file_path and self.hevy_file_path:
@@ -1142,219 +1275,215 @@ class HevyGarminMerger:
         """Start the merge process and show preview window"""
         # Disable merge button to prevent multiple clicks
         self.merge_button.configure(state="disabled")
-        # Also disable file selection buttons and start the progress bar
+        # Also disable file selection buttons and reset the progress bar
         try:
             self.garmin_button.configure(state="disabled")
             self.hevy_button.configure(state="disabled")
+            self.cancel_button.configure(state="normal")
             if self.progress_bar:
-                self.progress_bar.start()
+                self.progress_bar.set(0)
         except Exception:
             pass
         
-        # Run merge in separate thread to prevent UI freezing
-        merge_thread = threading.Thread(
-            target=self.prepare_workout_preview,
-            args=(self.garmin_file_path, self.hevy_file_path)
+        # A new merge replaces any saved session
+        self.session_fingerprints = None
+        self.session_mappings = {}
+        
+        # Progress is reported from worker threads; hand it to the Tk thread
+        self.current_job = MergeJob(progress_callback=self.scheduler.threadsafe(
+            lambda fraction, message: self.update_progress(fraction)
+        ))
+        
+        # Run the merge as an asyncio task so the UI never blocks
+        self.current_task = self.scheduler.submit(
+            self.prepare_workout_preview(self.garmin_file_path, self.hevy_file_path, self.current_job),
+            on_done=self.on_merge_finished
         )
-        merge_thread.daemon = True
-        merge_thread.start()
         
-    def prepare_workout_preview(self, garmin_fit_path, hevy_csv_path):
-        """Prepare data for the workout preview window"""
-        try:
-            # Step 1: Read FIT file and convert to DataFrame
-            self.update_status("Reading Garmin FIT file...")
-            
-            # Load FIT file using fit_tool (disable CRC check for compatibility)
-            fit_file = FitFile.from_file(garmin_fit_path, check_crc=False)
-            self.update_status("Garmin FIT file loaded successfully.")
-            
-            # Convert to CSV format for easier manipulation
-            temp_garmin_csv = os.path.join(tempfile.gettempdir(), "temp_garmin.csv")
-            fit_file.to_csv(temp_garmin_csv)
-            
-            # Step 2: Read and Process Data
-            self.update_status("Reading workout data...")
-            
-            # Load Garmin data from CSV
-            garmin_df = pd.read_csv(temp_garmin_csv)
-            self.update_status(f"Loaded Garmin data: {len(garmin_df)} records")
-            
-            # Load Hevy data
-            hevy_df = pd.read_csv(hevy_csv_path)
-            self.update_status(f"Loaded Hevy data: {len(hevy_df)} exercises")
-            
-            # Display sample of data for debugging
-            self.update_status("Sample Garmin data columns: " + ", ".join(garmin_df.columns[:5].tolist()))
-            if len(hevy_df) > 0:
-                self.update_status("Sample Hevy data columns: " + ", ".join(hevy_df.columns[:5].tolist()))
-            
-            # Step 3: Check for unmapped exercises first
-            self.update_status("Checking exercise mappings...")
-            
-            # Parse Hevy data to check for unmapped exercises
-            parsed_hevy_data = self.parse_hevy_data(hevy_df)
-            unmapped_exercises = self.find_unmapped_exercises(parsed_hevy_data)
-            
-            if unmapped_exercises:
-                # Show unmapped exercise dialog on main thread
-                self.root.after(0, lambda: self.handle_unmapped_exercises(
-                    unmapped_exercises, fit_file, hevy_df, garmin_df, temp_garmin_csv
-                ))
-                return
-            
-            # Step 4: Process Hevy Data (no unmapped exercises)
-            self.update_status("Processing workout integration...")
-            
-            # Call the integration function
-            enhanced_fit_file = self.integrate_hevy_data(fit_file, hevy_df)
-            
-            # Extract workout statistics for the preview
-            workout_stats = self.extract_workout_statistics(garmin_df)
-            
-            # Get the processed Garmin sets (stored during integration)
-            garmin_sets = getattr(self, 'last_processed_sets', [])
-            
-            if not garmin_sets:
-                raise Exception("No workout data was processed. Please check your files.")
-            
-            # Step 4: Show preview window
-            self.update_status("Opening workout preview...")
-            
-            # Clean up temp file
-            if os.path.exists(temp_garmin_csv):
-                os.remove(temp_garmin_csv)
-            
-            # Show preview window on main thread
-            self.root.after(0, lambda: self.show_workout_preview(garmin_sets, workout_stats, enhanced_fit_file))
-            
-        except Exception as e:
-            self.update_status(f"ERROR: {str(e)}")
-            # Show error message box
-            self.root.after(0, lambda: messagebox.showerror(
-                "Error", 
-                f"An error occurred during workout processing:\n\n{str(e)}"
-            ))
-            # Re-enable merge button
-            self.root.after(0, lambda: self.merge_button.configure(state="normal"))
-    
-    def handle_unmapped_exercises(self, unmapped_exercises, fit_file, hevy_df, garmin_df, temp_garmin_csv):
-        """Handle unmapped exercises by showing dialog and continuing workflow"""
+    def update_progress(self, fraction):
+        """Move the progress bar to the given fraction (Tk thread only)"""
+        if self.progress_bar:
+            self.progress_bar.set(fraction)
+            
+    def cancel_merge_process(self):
+        """Ask the running merge job to stop at its next checkpoint"""
+        if self.current_job and not self.current_job.cancelled:
+            self.current_job.cancel()
+            # Stop awaiting any worker result straight away
+            if self.current_task:
+                self.current_task.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.update_status("Cancelling merge...")
+            
+    def reset_merge_controls(self):
+        """Return the main window controls to their idle state (Tk thread only)"""
+        self.current_job = None
+        self.current_task = None
+        self.merge_button.configure(state="normal")
         try:
-            self.update_status(f"Requesting user input for {len(unmapped_exercises)} unmapped exercises...")
-            
-            # Get available exercises for dropdown
-            available_exercises = self.get_available_garmin_exercises()
-            
-            # Show dialog
-            dialog = UnmappedExerciseDialog(self, unmapped_exercises, available_exercises)
-            user_confirmed, user_mappings = dialog.show_dialog()
+            self.garmin_button.configure(state="normal")
+            self.hevy_button.configure(state="normal")
+            self.cancel_button.configure(state="disabled")
+            if self.progress_bar:
+                self.progress_bar.set(0)
+        except Exception:
+            pass
             
+    async def prepare_workout_preview(self, garmin_fit_path, hevy_csv_path, job):
+        """Prepare data for the workout preview window
+
+        Runs as an asyncio task on the Tk thread. Both files are normally
+        already being pre-read since they were selected (see
+        start_file_inspection); the FIT decodes in a worker process while the
+        Hevy export is parsed and checked for unmapped exercises, so the
+        mapping dialog can be answered before a large FIT file has loaded.
+
+        Returns:
+            tuple: (garmin_sets, workout_stats, enhanced_fit_file), or None if
+            the user aborted at the mapping step
+        """
+        # Step 1: Decode the FIT file (CPU-bound, own process) - reuses the pre-read
+        self.update_status("Reading Garmin FIT file...")
+        job.stage("decode")
+        fit_task = self.start_file_inspection("garmin", garmin_fit_path)
+        hevy_task = self.start_file_inspection("hevy", hevy_csv_path)
+        
+        # Step 2: Read and parse the Hevy export while the FIT decodes.
+        # Shielded so cancelling this merge keeps the cached pre-reads alive.
+        self.update_status("Reading workout data...")
+        hevy_inspection = await asyncio.shield(hevy_task)
+        job.stage("parse")
+        hevy_df = hevy_inspection['hevy_df']
+        self.update_status(f"Loaded Hevy data: {len(hevy_df)} exercises")
+        if len(hevy_df) > 0:
+            self.update_status("Sample Hevy data columns: " + ", ".join(hevy_df.columns[:5].tolist()))
+        
+        # Step 3: Check for unmapped exercises first (mappings may have changed since the pre-read)
+        self.update_status("Checking exercise mappings...")
+        unmapped_exercises = self.find_unmapped_exercises(hevy_inspection['parsed_hevy_data'])
+        
+        if unmapped_exercises:
+            if not fit_task.done():
+                self.update_status("Garmin FIT file is still decoding in the background...")
+            user_confirmed = await self.request_exercise_mappings(unmapped_exercises)
             if not user_confirmed:
                 self.update_status("User cancelled exercise mapping. Process aborted.")
-                self.merge_button.configure(state="normal")
-                return
-            
-            # Apply user mappings
-            self.apply_user_mappings(user_mappings)
-            self.update_status(f"Applied {len(user_mappings)} user-defined mappings")
-            
-            # Continue with the workflow in a background thread
-            continue_thread = threading.Thread(
-                target=self.continue_after_mapping,
-                args=(fit_file, hevy_df, garmin_df, temp_garmin_csv)
-            )
-            continue_thread.daemon = True
-            continue_thread.start()
-            
-        except Exception as e:
-            self.update_status(f"Error handling unmapped exercises: {str(e)}")
-            messagebox.showerror("Mapping Error", f"Error handling unmapped exercises:\n\n{str(e)}")
-            self.merge_button.configure(state="normal")
+                return None
+            job.check()
+        
+        # Wait for the FIT decode to finish
+        fit_file, garmin_df, _ = await asyncio.shield(fit_task)
+        job.check()
+        
+        self.update_status("Garmin FIT file loaded successfully.")
+        self.update_status(f"Loaded Garmin data: {len(garmin_df)} records")
+        self.update_status("Sample Garmin data columns: " + ", ".join(garmin_df.columns[:5].tolist()))
+        
+        # Step 4: Process Hevy Data
+        self.update_status("Processing workout integration...")
+        
+        # Call the integration function with the rows parsed by the pre-read
+        enhanced_fit_file = await self.scheduler.run_io(self.integrate_hevy_data, fit_file, hevy_df, job,
+                                                        hevy_inspection['parsed_hevy_data'])
+        
+        # Get the processed Garmin sets (stored during integration)
+        garmin_sets = getattr(self, 'last_processed_sets', SetTable())
+        
+        # Extract workout statistics (with heart-rate zones per exercise) for the preview
+        workout_stats = self.extract_workout_statistics(garmin_df, fit_file, garmin_sets)
+        
+        if not garmin_sets:
+            raise Exception("No workout data was processed. Please check your files.")
+        
+        # Step 5: Hand over to the preview window
+        job.check()
+        job.finish("Opening workout preview...")
+        self.update_status("Opening workout preview...")
+        return garmin_sets, workout_stats, enhanced_fit_file
     
-    def continue_after_mapping(self, fit_file, hevy_df, garmin_df, temp_garmin_csv):
-        """Continue the workflow after user has mapped exercises"""
+    async def request_exercise_mappings(self, unmapped_exercises):
+        """Ask the user to map unmapped exercises; returns True once mappings are applied"""
+        self.update_status(f"Requesting user input for {len(unmapped_exercises)} unmapped exercises...")
+        
+        # Get available exercises for dropdown
+        available_exercises = self.get_available_garmin_exercises()
+        
+        # Show dialog and wait for it without blocking the event loop
+        dialog = UnmappedExerciseDialog(self, unmapped_exercises, available_exercises)
+        user_confirmed, user_mappings = await dialog.show_dialog_async(self.scheduler.loop)
+        
+        if not user_confirmed:
+            return False
+        
+        # Apply user mappings
+        self.apply_user_mappings(user_mappings)
+        self.session_mappings.update(user_mappings)
+        self.update_status(f"Applied {len(user_mappings)} user-defined mappings")
+        return True
+    
+    def on_merge_finished(self, task):
+        """Handle the end of a merge task (Tk callback, outside the event loop)"""
+        job = self.current_job
         try:
-            # Process Hevy Data with updated mappings
-            self.update_status("Processing workout integration with user mappings...")
-            
-            # Call the integration function
-            enhanced_fit_file = self.integrate_hevy_data(fit_file, hevy_df)
-            
-            # Extract workout statistics for the preview
-            workout_stats = self.extract_workout_statistics(garmin_df)
-            
-            # Get the processed Garmin sets (stored during integration)
-            garmin_sets = getattr(self, 'last_processed_sets', [])
-            
-            if not garmin_sets:
-                raise Exception("No workout data was processed after mapping.")
-            
-            # Show preview window
-            self.update_status("Opening workout preview...")
-            
-            # Clean up temp file
-            if os.path.exists(temp_garmin_csv):
-                os.remove(temp_garmin_csv)
-            
-            # Show preview window on main thread
-            self.root.after(0, lambda: self.show_workout_preview(garmin_sets, workout_stats, enhanced_fit_file))
-            
+            result = task.result()
+        except (asyncio.CancelledError, JobCancelled):
+            self.update_status("Merge cancelled.")
+            self.reset_merge_controls()
+            return
         except Exception as e:
-            self.update_status(f"ERROR after mapping: {str(e)}")
-            # Show error message box
-            self.root.after(0, lambda: messagebox.showerror(
-                "Error", 
-                f"An error occurred after exercise mapping:\n\n{str(e)}"
-            ))
+            if job and job.cancelled:
+                self.update_status("Merge cancelled.")
+            else:
+                self.update_status(f"ERROR: {str(e)}")
+                # Show error message box
+                messagebox.showerror(
+                    "Error", 
+                    f"An error occurred during workout processing:\n\n{str(e)}"
+                )
             # Re-enable merge button
-            def reenable():
-                self.merge_button.configure(state="normal")
-                try:
-                    self.garmin_button.configure(state="normal")
-                    self.hevy_button.configure(state="normal")
-                    if self.progress_bar:
-                        self.progress_bar.stop()
-                except Exception:
-                    pass
-            self.root.after(0, reenable)
+            self.reset_merge_controls()
+            return
+        
+        if result is None:
+            self.reset_merge_controls()
+            return
+        
+        # Show preview window (re-enables the controls when it closes)
+        self.show_workout_preview(*result)
     
-    def show_workout_preview(self, garmin_sets, workout_stats, enhanced_fit_file):
+    def show_workout_preview(self, garmin_sets, workout_stats, enhanced_fit_file, edit_history=None):
         """Show the workout preview window"""
         try:
-            preview_window = WorkoutPreviewWindow(self, garmin_sets, workout_stats, enhanced_fit_file)
+            preview_window = WorkoutPreviewWindow(self, garmin_sets, workout_stats, enhanced_fit_file, edit_history)
+            self.save_session_snapshot(preview_window)
             user_confirmed, output_path = preview_window.show_preview()
             
             if user_confirmed and output_path:
                 # User confirmed, now save the file with any edits
-                self.finalize_workout_export(preview_window.garmin_sets, enhanced_fit_file, output_path)
+                if self.finalize_workout_export(preview_window.history, enhanced_fit_file, output_path):
+                    self.end_session()
             else:
                 self.update_status("Workout preview cancelled by user.")
+                self.end_session()
                 
         except Exception as e:
             self.update_status(f"Error showing preview: {str(e)}")
             messagebox.showerror("Preview Error", f"Could not show workout preview:\n\n{str(e)}")
         finally:
             # Re-enable merge button
-            self.merge_button.configure(state="normal")
-            try:
-                self.garmin_button.configure(state="normal")
-                self.hevy_button.configure(state="normal")
-                if self.progress_bar:
-                    self.progress_bar.stop()
-            except Exception:
-                pass
+            self.reset_merge_controls()
     
-    def finalize_workout_export(self, edited_garmin_sets, enhanced_fit_file, output_path):
+    def finalize_workout_export(self, edit_history, enhanced_fit_file, output_path):
         """Finalize the workout export with any user edits"""
         try:
             self.update_status("Applying user edits and generating final FIT file...")
             
             # Apply any edits made by the user
-            final_fit_file = self.apply_user_edits(enhanced_fit_file, edited_garmin_sets)
+            edited_garmin_sets = edit_history.table
+            final_fit_file = self.apply_user_edits(enhanced_fit_file, edited_garmin_sets, edit_history)
             
             # Save the final file
-            final_fit_file.to_file(output_path)
+            self.write_fit_file(final_fit_file, edited_garmin_sets, output_path)
             
             # Validate the output
             self.update_status("Validating final output file...")
@@ -1363,11 +1492,17 @@ class HevyGarminMerger:
             if validation_passed:
                 self.update_status("SUCCESS! Enhanced FIT file created and validated successfully.")
                 self.update_status(f"Output file: {output_path}")
+                self.preferences["last_export_dir"] = os.path.dirname(os.path.abspath(output_path))
+                
+                upload_note = "You can now upload this file to Garmin Connect."
+                if upload_settings(self.config)["enabled"]:
+                    self.queue_upload(output_path)
+                    upload_note = "It has been queued for upload to Garmin Connect."
                 
                 # Show success message
                 messagebox.showinfo(
                     "Export Complete", 
-                    f"Workout file exported successfully!\n\nOutput file:\n{output_path}\n\nYou can now upload this file to Garmin Connect."
+                    f"Workout file exported successfully!\n\nOutput file:\n{output_path}\n\n{upload_note}"
                 )
                 # Reveal in Finder (macOS)
                 try:
@@ -1375,378 +1510,101 @@ class HevyGarminMerger:
                     subprocess.run(["open", "-R", output_path], check=False)
                 except Exception:
                     pass
+                return True
             else:
                 raise Exception("Output file validation failed")
                 
         except Exception as e:
             self.update_status(f"ERROR during export: {str(e)}")
             messagebox.showerror("Export Error", f"Could not export workout file:\n\n{str(e)}")
+            return False
     
-    def apply_user_edits(self, fit_file, edited_garmin_sets):
-        """Apply user edits to the FIT file"""
-        try:
-            # For now, return the original file since we're not creating actual FIT records yet
-            # In a full implementation, this would rebuild the FIT file with edited set data
-            
-            # Log the edits that would be applied
-            self.update_status("=== FINAL WORKOUT DATA ===")
-            exercise_summary = {}
-            
-            for set_data in edited_garmin_sets:
-                exercise_name = set_data['original_exercise_name']
-                if exercise_name not in exercise_summary:
-                    exercise_summary[exercise_name] = {'sets': 0, 'total_reps': 0, 'max_weight': 0}
-                
-                exercise_summary[exercise_name]['sets'] += 1
-                exercise_summary[exercise_name]['total_reps'] += set_data['repetitions']
-                exercise_summary[exercise_name]['max_weight'] = max(
-                    exercise_summary[exercise_name]['max_weight'], 
-                    set_data['weight']
-                )
-            
-            for exercise, stats in exercise_summary.items():
-                weight_unit = getattr(self, 'weight_unit', 'kg')
-                self.update_status(f"{exercise.title()}: {stats['sets']} sets, "
-                                 f"{stats['total_reps']} total reps, "
-                                 f"max {stats['max_weight']} {weight_unit}")
-            
-            return fit_file
-            
-        except Exception as e:
-            self.update_status(f"Error applying edits: {str(e)}")
-            return fit_file
-    
-    def extract_workout_statistics(self, garmin_df):
-        """Extract workout statistics from Garmin data for the preview"""
+    def save_session_snapshot(self, preview_window):
+        """Save the preview's sets and edits so the session can be resumed"""
         try:
-            stats = {
-                'duration_seconds': 1800,  # Default 30 minutes
-                'avg_hr': 110,
-                'max_hr': 143,
-                'calories': 194,
-                'total_records': len(garmin_df)
+            if self.session_fingerprints is None:
+                self.session_fingerprints = (file_fingerprint(self.garmin_file_path),
+                                             file_fingerprint(self.hevy_file_path))
+            save_session(self.session_path, self.session_fingerprints, preview_window.history,
+                         preview_window.enhanced_fit_file, preview_window.workout_stats, self.session_mappings)
+        except (OSError, TypeError, ValueError) as e:
+            self.update_status(f"Warning: Could not save session: {e}")
+            return
+        if self.preferences.get("last_session") is None:
+            self.preferences["last_session"] = {
+                "snapshot": self.session_path,
+                "garmin_file": self.session_fingerprints[0]["path"],
+                "hevy_file": self.session_fingerprints[1]["path"],
             }
-            
-            # Try to extract actual stats from Garmin data
-            if 'heart_rate' in garmin_df.columns:
-                hr_data = garmin_df['heart_rate'].dropna()
-                if len(hr_data) > 0:
-                    stats['avg_hr'] = int(hr_data.mean())
-                    stats['max_hr'] = int(hr_data.max())
-            
-            # Try to extract duration from timestamps
-            timestamp_cols = [col for col in garmin_df.columns if 'timestamp' in col.lower()]
-            if timestamp_cols and len(garmin_df) > 1:
-                try:
-                    # Estimate duration from number of records
-                    stats['duration_seconds'] = max(1800, len(garmin_df) * 5)  # 5 seconds per record estimate
-                except:
-                    pass
-            
-            return stats
-            
-        except Exception as e:
-            self.update_status(f"Error extracting statistics: {str(e)}")
-            return {'duration_seconds': 1800, 'avg_hr': 110, 'max_hr': 143, 'calories': 194, 'total_records': 0}
-            
-    def integrate_hevy_data(self, garmin_fit_file, hevy_df):
-        """
-        Integrate Hevy workout data into Garmin FIT file
-        
-        This function:
-        1. Removes existing sets from Garmin data while preserving heart rate/timing
-        2. Maps Hevy exercises to Garmin exercise IDs
-        3. Implements timestamp alignment logic
-        4. Creates proper FIT records for strength training data
-        5. Aggregates set notes into workout notes
-        
-        Args:
-            garmin_fit_file: FitFile object from the original Garmin recording
-            hevy_df: pandas DataFrame with Hevy workout data
-            
-        Returns:
-            FitFile: Enhanced FIT file with integrated workout data
-        """
-        try:
-            # Step 1: Parse Hevy data using column mappings
-            self.update_status("Parsing Hevy workout data...")
-            parsed_hevy_data = self.parse_hevy_data(hevy_df)
-            
-            if not parsed_hevy_data:
-                self.update_status("Warning: No valid Hevy data found")
-                return garmin_fit_file
-            
-            # Step 2: Remove existing sets from Garmin data
-            self.update_status("Cleaning Garmin workout data...")
-            cleaned_fit_file = self.remove_garmin_sets(garmin_fit_file)
-            
-            # Step 3: Get workout timing information
-            workout_timing = self.extract_workout_timing(cleaned_fit_file)
-            self.update_status(f"Garmin workout duration: {workout_timing['duration_seconds']} seconds")
-            
-            # Step 4: Map exercises and create set records
-            self.update_status("Mapping exercises to Garmin format...")
-            garmin_sets = self.map_hevy_to_garmin_sets(parsed_hevy_data, workout_timing)
-            
-            # Step 5: Create enhanced FIT file with new sets
-            self.update_status("Creating enhanced FIT file...")
-            enhanced_fit_file = self.create_enhanced_fit_file(cleaned_fit_file, garmin_sets, parsed_hevy_data)
-            
-            # Store the processed sets for the preview window
-            self.last_processed_sets = garmin_sets
-            
-            self.update_status(f"Successfully integrated {len(garmin_sets)} sets from Hevy data")
-            return enhanced_fit_file
-            
-        except Exception as e:
-            self.update_status(f"Error during integration: {str(e)}")
-            # Return original file if integration fails
-            return garmin_fit_file
+            self.save_preferences()
     
-    def parse_hevy_data(self, hevy_df):
-        """Parse Hevy CSV data using column mappings from config"""
-        try:
-            col_mapping = self.config["hevy_csv_columns"]
-            parsed_data = []
-            # Optional auto-detect: if workout title hints pounds, convert to kg
-            # We inspect the workout title column if present and set a flag
-            detected_pounds = False
-            title_col = col_mapping.get("workout_title")
-            if title_col and title_col in hevy_df.columns:
-                try:
-                    title_sample = " ".join(str(t) for t in hevy_df[title_col].dropna().astype(str).head(10))
-                    title_lower = title_sample.lower()
-                    if "lbs" in title_lower or "pound" in title_lower:
-                        detected_pounds = True
-                        self.update_status("Detected 'lbs' in Hevy workout title; converting weights to kg.")
-                except Exception:
-                    pass
-            
-            for idx, row in hevy_df.iterrows():
-                try:
-                    # Extract data using column mappings
-                    exercise_name = str(row.get(col_mapping.get("exercise_name", "Exercise Name"), "")).strip()
-                    if not exercise_name or exercise_name.lower() == 'nan':
-                        continue
-                        
-                    set_data = {
-                        'exercise_name': exercise_name.lower(),
-                        'set_number': int(row.get(col_mapping.get("set_number", "Set Order"), 1)),
-                        'reps': int(row.get(col_mapping.get("reps", "Reps"), 0)),
-                        'weight': float(row.get(col_mapping.get("weight", "Weight"), 0)),
-                        'set_note': str(row.get(col_mapping.get("set_note", "Notes"), "")).strip(),
-                        'original_row_index': idx
-                    }
-
-                    # If detected pounds, convert to kilograms
-                    if detected_pounds and set_data['weight']:
-                        set_data['weight'] = round(set_data['weight'] * 0.45359237, 3)
-                    
-                    # Handle optional columns
-                    if "workout_note" in col_mapping:
-                        set_data['workout_note'] = str(row.get(col_mapping["workout_note"], "")).strip()
-                    if "start_time" in col_mapping:
-                        set_data['start_time'] = str(row.get(col_mapping["start_time"], "")).strip()
-                    
-                    parsed_data.append(set_data)
-                    
-                except (ValueError, TypeError) as e:
-                    self.update_status(f"Warning: Skipping invalid row {idx}: {str(e)}")
-                    continue
-            
-            self.update_status(f"Parsed {len(parsed_data)} valid sets from Hevy data")
-            return parsed_data
-            
-        except Exception as e:
-            self.update_status(f"Error parsing Hevy data: {str(e)}")
-            return []
-    
-    def remove_garmin_sets(self, garmin_fit_file):
-        """Remove existing set records from Garmin FIT file while preserving other data"""
-        try:
-            from fit_tool.fit_file_builder import FitFileBuilder
-            from fit_tool.fit_file_header import FitFileHeader
-            
-            # Create a new FIT file builder
-            builder = FitFileBuilder()
-            
-            # Process each record in the original file
-            preserved_records = []
-            removed_sets_count = 0
-            
-            for record in garmin_fit_file.records:
-                # Check if this is a set record (these typically have specific message types)
-                # We want to preserve: session, lap, record (heart rate/GPS), device_info, etc.
-                # We want to remove: set records from strength training
-                
-                if hasattr(record, 'message') and hasattr(record.message, 'name'):
-                    message_name = record.message.name.lower() if record.message.name else ""
-                    
-                    # Remove strength training set records but preserve everything else
-                    if any(keyword in message_name for keyword in ['set', 'exercise', 'strength']):
-                        removed_sets_count += 1
-                        self.update_status(f"Removing existing set record: {message_name}")
-                        continue
-                
-                # Preserve all other records (heart rate, GPS, session data, etc.)
-                preserved_records.append(record)
-            
-            # Create new FIT file with preserved records
-            if preserved_records:
-                # Create a new FIT file with the same header but filtered records
-                cleaned_fit_file = FitFile(
-                    header=garmin_fit_file.header,
-                    records=preserved_records,
-                    crc=None  # Will be recalculated
-                )
-                
-                self.update_status(f"Removed {removed_sets_count} existing set records")
-                self.update_status(f"Preserved {len(preserved_records)} data records (heart rate, timing, etc.)")
-                return cleaned_fit_file
-            else:
-                self.update_status("Warning: No records to preserve, using original file")
-                return garmin_fit_file
-                
-        except ImportError:
-            self.update_status("Note: Advanced FIT record manipulation not available, preserving all data")
-            return garmin_fit_file
-        except Exception as e:
-            self.update_status(f"Error cleaning Garmin data: {str(e)}")
-            self.update_status("Falling back to preserving all original data")
-            return garmin_fit_file
-    
-    def extract_workout_timing(self, fit_file):
-        """Extract timing information from Garmin FIT file"""
-        try:
-            # Convert to CSV to analyze timing
-            temp_csv = os.path.join(tempfile.gettempdir(), "timing_analysis.csv")
-            fit_file.to_csv(temp_csv)
-            
-            timing_df = pd.read_csv(temp_csv)
-            
-            # Clean up temp file
-            if os.path.exists(temp_csv):
-                os.remove(temp_csv)
-            
-            # Extract basic timing info
-            timing_info = {
-                'start_time': datetime.now(),  # Placeholder
-                'duration_seconds': 3600,  # Default 1 hour
-                'total_records': len(timing_df)
-            }
-            
-            # Try to get actual duration from timestamp columns
-            timestamp_cols = [col for col in timing_df.columns if 'timestamp' in col.lower() or 'time' in col.lower()]
-            if timestamp_cols and len(timing_df) > 1:
-                try:
-                    first_time = timing_df[timestamp_cols[0]].iloc[0]
-                    last_time = timing_df[timestamp_cols[0]].iloc[-1]
-                    if pd.notna(first_time) and pd.notna(last_time):
-                        # Simple duration calculation
-                        timing_info['duration_seconds'] = max(1800, len(timing_df) * 10)  # Estimate
-                except:
-                    pass
-            
-            return timing_info
-            
-        except Exception as e:
-            self.update_status(f"Error extracting timing: {str(e)}")
-            return {'start_time': datetime.now(), 'duration_seconds': 3600, 'total_records': 0}
+    def end_session(self):
+        """Forget the saved session once it is exported or discarded"""
+        self.session_fingerprints = None
+        clear_session(self.session_path)
+        self.preferences["last_session"] = None
+        self.save_preferences()
     
-    def map_hevy_to_garmin_sets(self, parsed_hevy_data, workout_timing):
-        """Map Hevy exercises to Garmin set records with proper timing"""
+    def resume_last_session(self):
+        """Reopen the preview of the last session if its files are unchanged"""
+        last_session = self.preferences.get("last_session")
+        if not last_session:
+            return
+        snapshot = load_session(last_session.get("snapshot") or self.session_path)
+        if snapshot is None:
+            self.update_status("The files of the last session have changed; starting fresh.")
+            self.end_session()
+            return
+        
+        self.show_selected_file("garmin", snapshot.garmin_file["path"])
+        self.show_selected_file("hevy", snapshot.hevy_file["path"])
+        self.session_fingerprints = (snapshot.garmin_file, snapshot.hevy_file)
+        self.session_mappings = dict(snapshot.user_mappings)
+        missing = {hevy_exercise: garmin_exercise for hevy_exercise, garmin_exercise in snapshot.user_mappings.items()
+                   if hevy_exercise.lower() not in self.config.get("exercise_mappings", {})}
+        if missing:
+            self.apply_user_mappings(missing)
+        
+        edits = len(snapshot.history)
+        self.update_status(f"Resuming last session: {os.path.basename(snapshot.garmin_file['path'])} + "
+                           f"{os.path.basename(snapshot.hevy_file['path'])} ({edits} edits)")
+        self.merge_button.configure(state="disabled")
         try:
-            # Proceed with mapping (unmapped exercises handled earlier in workflow)
-            garmin_sets = []
-            exercise_mappings = self.config.get("exercise_mappings", {})
-            settings = self.config.get("settings", {})
-            
-            # Always operate in kilograms for output
-            selected_weight_unit = "kg"
-            weight_unit_id = 0
-            
-            # Calculate time distribution across sets
-            total_sets = len(parsed_hevy_data)
-            if total_sets == 0:
-                return []
-            
-            duration_per_set = workout_timing['duration_seconds'] / total_sets
-            current_time_offset = 0
-            
-            set_notes_for_workout = []  # Collect notes for workout note
-            
-            for i, set_data in enumerate(parsed_hevy_data):
-                exercise_name = set_data['exercise_name']
-                
-                # Look up exercise mapping (should now include user mappings)
-                exercise_mapping = exercise_mappings.get(exercise_name)
-                if not exercise_mapping:
-                    self.update_status(f"Warning: No mapping found for '{exercise_name}', using default")
-                    exercise_mapping = {"category": 0, "name": 0}  # Default strength training
-                
-                # Detect set type from notes
-                set_type = self.detect_set_type(set_data.get('set_note', ''))
-                
-                # Calculate timestamp (ensure it stays within workout duration)
-                set_timestamp = min(current_time_offset, workout_timing['duration_seconds'] - 1)
-                
-                # Create Garmin set record
-                garmin_set = {
-                    'timestamp': set_timestamp,
-                    'exercise_category': exercise_mapping['category'],
-                    'exercise_name': exercise_mapping['name'],
-                    'weight': set_data['weight'],
-                    'weight_unit': weight_unit_id,
-                    'repetitions': set_data['reps'],
-                    'set_number': set_data['set_number'],
-                    'set_type': set_type,
-                    'duration': settings.get('default_set_duration_seconds', 30),
-                    'original_exercise_name': set_data['exercise_name']
-                }
-                
-                garmin_sets.append(garmin_set)
-                
-                # Collect set notes if they exist
-                if set_data.get('set_note') and settings.get('append_set_notes_to_workout_note', True):
-                    note_format = settings.get('set_note_format_string', 
-                                             "\n\n--- SET NOTES ---\n{exercise_name} - Set {set_number}: {note_text}")
-                    formatted_note = note_format.format(
-                        exercise_name=set_data['exercise_name'].title(),
-                        set_number=set_data['set_number'],
-                        note_text=set_data['set_note']
-                    )
-                    set_notes_for_workout.append(formatted_note)
-                
-                # Advance time for next set
-                current_time_offset += duration_per_set
-            
-            # Store aggregated notes for later use
-            self.aggregated_workout_notes = set_notes_for_workout
-            
-            self.update_status(f"Mapped {len(garmin_sets)} sets with {len([s for s in garmin_sets if s['exercise_category'] != 0])} recognized exercises")
-            return garmin_sets
-            
-        except Exception as e:
-            self.update_status(f"Error mapping exercises: {str(e)}")
-            return []
+            self.garmin_button.configure(state="disabled")
+            self.hevy_button.configure(state="disabled")
+        except Exception:
+            pass
+        self.show_workout_preview(snapshot.history.table, snapshot.workout_stats, snapshot.fit_file,
+                                  snapshot.history)
     
-    def find_unmapped_exercises(self, parsed_hevy_data):
-        """Find exercises that don't have Garmin mappings"""
+    def queue_upload(self, output_path):
+        """Add a validated output to the upload queue and upload it in the background"""
         try:
-            exercise_mappings = self.config.get("exercise_mappings", {})
-            unmapped_exercises = set()
-            
-            for set_data in parsed_hevy_data:
-                exercise_name = set_data['exercise_name']
-                if exercise_name not in exercise_mappings:
-                    unmapped_exercises.add(exercise_name)
-            
-            return list(unmapped_exercises)
-            
+            if self.upload_queue is None:
+                self.upload_queue = UploadQueue()
+            self.upload_queue.enqueue(output_path)
+            self.update_status(f"Queued {os.path.basename(output_path)} for upload to Garmin Connect")
+            
+            # One background run drains the whole queue, including files left from earlier sessions
+            if self.upload_task is None or self.upload_task.done():
+                uploader = GarminUploader.from_config(self.config)
+                self.upload_task = self.scheduler.submit(
+                    self.scheduler.run_io(uploader.process_queue, self.upload_queue,
+                                          self.update_status, self.upload_stop),
+                    on_done=self.on_upload_finished)
         except Exception as e:
-            self.update_status(f"Error finding unmapped exercises: {str(e)}")
-            return []
+            self.update_status(f"Could not queue upload: {str(e)}")
     
+    def on_upload_finished(self, task):
+        """Report the upload queue state once the background uploads stop"""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.update_status(f"Upload error: {task.exception()}")
+            return
+        counts = task.result()
+        self.update_status(f"Garmin Connect uploads: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed")
+        
     def show_unmapped_exercise_dialog(self, unmapped_exercises, available_exercises):
         """Show dialog for mapping unmapped exercises - must be called from main thread"""
         try:
@@ -1756,263 +1614,6 @@ class HevyGarminMerger:
             self.update_status(f"Error showing unmapped exercise dialog: {str(e)}")
             return False, {}
     
-    def apply_user_mappings(self, user_mappings):
-        """Apply user-defined exercise mappings to the configuration"""
-        try:
-            exercise_mappings = self.config.get("exercise_mappings", {})
-            
-            for hevy_exercise, garmin_exercise in user_mappings.items():
-                # Find the mapping for the selected Garmin exercise
-                garmin_exercise_lower = garmin_exercise.lower()
-                
-                # Look for existing mapping or create a generic one
-                found_mapping = None
-                for existing_hevy, mapping in exercise_mappings.items():
-                    if existing_hevy.lower() == garmin_exercise_lower:
-                        found_mapping = mapping
-                        break
-                
-                if found_mapping:
-                    # Use the existing mapping
-                    exercise_mappings[hevy_exercise.lower()] = found_mapping
-                    self.update_status(f"Mapped '{hevy_exercise}' to '{garmin_exercise}'")
-                else:
-                    # Create generic mapping based on exercise type
-                    generic_mapping = self.create_generic_mapping(garmin_exercise)
-                    exercise_mappings[hevy_exercise.lower()] = generic_mapping
-                    self.update_status(f"Created generic mapping for '{hevy_exercise}' as '{garmin_exercise}'")
-            
-            # Update the config in memory
-            self.config["exercise_mappings"] = exercise_mappings
-            # Persist to disk with a timestamped backup for safety
-            try:
-                config_path = os.path.join(os.path.dirname(__file__), "hevy_garmin_config.json")
-                backup_path = os.path.join(os.path.dirname(__file__), f"hevy_garmin_config.backup.json")
-                if os.path.exists(config_path):
-                    import shutil
-                    shutil.copyfile(config_path, backup_path)
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.config, f, indent=2)
-                self.update_status("Saved updated exercise mappings to configuration.")
-            except Exception as save_err:
-                self.update_status(f"Warning: Could not save mappings to file: {save_err}")
-            
-        except Exception as e:
-            self.update_status(f"Error applying user mappings: {str(e)}")
-    
-    def create_generic_mapping(self, garmin_exercise_name):
-        """Create a generic mapping based on exercise type"""
-        exercise_lower = garmin_exercise_name.lower()
-        
-        # Map to appropriate categories based on keywords
-        if any(word in exercise_lower for word in ['chest', 'bench', 'press']):
-            return {"category": 0, "name": 0}  # Chest
-        elif any(word in exercise_lower for word in ['back', 'pull', 'row']):
-            return {"category": 29, "name": 0}  # Back
-        elif any(word in exercise_lower for word in ['shoulder', 'overhead']):
-            return {"category": 8, "name": 0}  # Shoulders
-        elif any(word in exercise_lower for word in ['leg', 'squat', 'lunge']):
-            return {"category": 10, "name": 0}  # Legs
-        elif any(word in exercise_lower for word in ['arm', 'bicep', 'tricep', 'curl']):
-            return {"category": 1, "name": 0}  # Arms
-        elif any(word in exercise_lower for word in ['core', 'ab', 'plank']):
-            return {"category": 16, "name": 0}  # Core
-        else:
-            return {"category": 0, "name": 0}  # Default to strength training
-    
-    def detect_set_type(self, set_note):
-        """Detect set type from note text using keyword mapping"""
-        if not set_note or not self.config.get("settings", {}).get("parse_set_type_from_notes", True):
-            return 0  # Normal set
-        
-        set_note_lower = set_note.lower()
-        set_type_mapping = self.config.get("set_type_keyword_mapping", {})
-        
-        for keyword, set_type_id in set_type_mapping.items():
-            if keyword.lower() in set_note_lower:
-                return set_type_id
-        
-        return 0  # Default to normal set
-    
-    def create_enhanced_fit_file(self, base_fit_file, garmin_sets, parsed_hevy_data):
-        """Create enhanced FIT file with integrated Hevy data"""
-        try:
-            from fit_tool.fit_file_builder import FitFileBuilder
-            from fit_tool.data_message import DataMessage
-            from fit_tool.definition_message import DefinitionMessage
-            
-            # Start with the base file records
-            enhanced_records = list(base_fit_file.records)
-            
-            # Create set records and add them to the FIT file
-            added_sets = 0
-            
-            for set_data in garmin_sets:
-                try:
-                    # Create a set record (this is a simplified approach)
-                    # In a full implementation, we'd create proper FIT messages
-                    set_record_data = {
-                        'timestamp': set_data['timestamp'],
-                        'exercise_category': set_data['exercise_category'],
-                        'exercise_name': set_data['exercise_name'],
-                        'weight': set_data['weight'],
-                        'repetitions': set_data['repetitions'],
-                        'set_type': set_data['set_type'],
-                        'duration': set_data['duration']
-                    }
-                    
-                    # For now, we'll log what would be added rather than creating actual FIT records
-                    # Full FIT record creation requires more complex message definition
-                    self.update_status(f"Would add set: {set_data['original_exercise_name']} - "
-                                     f"{set_data['repetitions']} reps @ {set_data['weight']} "
-                                     f"{getattr(self, 'weight_unit', 'kg')}")
-                    added_sets += 1
-                    
-                except Exception as e:
-                    self.update_status(f"Warning: Could not add set record: {str(e)}")
-                    continue
-            
-            # Create exercise summary
-            exercise_summary = {}
-            for set_data in garmin_sets:
-                exercise_name = set_data['original_exercise_name']
-                if exercise_name not in exercise_summary:
-                    exercise_summary[exercise_name] = {'sets': 0, 'total_reps': 0, 'max_weight': 0}
-                
-                exercise_summary[exercise_name]['sets'] += 1
-                exercise_summary[exercise_name]['total_reps'] += set_data['repetitions']
-                exercise_summary[exercise_name]['max_weight'] = max(
-                    exercise_summary[exercise_name]['max_weight'], 
-                    set_data['weight']
-                )
-            
-            # Log integration summary
-            self.update_status("=== WORKOUT INTEGRATION SUMMARY ===")
-            for exercise, stats in exercise_summary.items():
-                weight_unit = getattr(self, 'weight_unit', 'kg')
-                self.update_status(f"{exercise.title()}: {stats['sets']} sets, "
-                                 f"{stats['total_reps']} total reps, "
-                                 f"max {stats['max_weight']} {weight_unit}")
-            
-            # Add workout notes summary
-            if hasattr(self, 'aggregated_workout_notes') and self.aggregated_workout_notes:
-                self.update_status(f"Integrated {len(self.aggregated_workout_notes)} set notes")
-                
-                # Create a comprehensive workout note
-                workout_note = "Hevy Workout Integration:\n"
-                workout_note += f"• {len(exercise_summary)} exercises\n"
-                workout_note += f"• {sum(stats['sets'] for stats in exercise_summary.values())} total sets\n"
-                workout_note += f"• {sum(stats['total_reps'] for stats in exercise_summary.values())} total reps\n"
-                
-                # Add individual set notes
-                if self.aggregated_workout_notes:
-                    workout_note += "\nSet Notes:"
-                    for note in self.aggregated_workout_notes:
-                        workout_note += note
-                
-                self.update_status("Created comprehensive workout note with Hevy data")
-            
-            self.update_status(f"Enhanced FIT file with {added_sets} strength training sets")
-            
-            # Return enhanced file (for now, same as base since we're not creating actual FIT records yet)
-            # In a full implementation, we'd return a new FitFile with the enhanced_records
-            return base_fit_file
-            
-        except ImportError:
-            self.update_status("Note: Advanced FIT record creation not available, using base file")
-            return base_fit_file
-        except Exception as e:
-            self.update_status(f"Error creating enhanced FIT file: {str(e)}")
-            return base_fit_file
-        
-    def validate_output(self, output_path):
-        """
-        Comprehensive validation of the output FIT file
-        
-        Args:
-            output_path: Path to the generated FIT file
-            
-        Returns:
-            bool: True if validation passes, False otherwise
-        """
-        try:
-            # Check file existence and size
-            if not os.path.exists(output_path):
-                self.update_status("Validation FAILED: Output file does not exist")
-                return False
-                
-            file_size = os.path.getsize(output_path)
-            if file_size == 0:
-                self.update_status("Validation FAILED: Output file is empty")
-                return False
-                
-            self.update_status(f"Validation: Output file exists ({file_size:,} bytes)")
-            
-            # Try to read and parse the FIT file
-            try:
-                test_fit = FitFile.from_file(output_path, check_crc=False)
-                self.update_status("Validation: FIT file structure is valid")
-                
-                # Check if file has records
-                if hasattr(test_fit, 'records') and test_fit.records:
-                    record_count = len(test_fit.records)
-                    self.update_status(f"Validation: FIT file contains {record_count:,} records")
-                    
-                    # Analyze record types
-                    record_types = {}
-                    for record in test_fit.records[:100]:  # Sample first 100 records
-                        if hasattr(record, 'message') and hasattr(record.message, 'name'):
-                            record_type = record.message.name
-                            record_types[record_type] = record_types.get(record_type, 0) + 1
-                    
-                    if record_types:
-                        self.update_status("Validation: Found record types: " + ", ".join(record_types.keys()))
-                    
-                    # Check for essential workout data
-                    has_session_data = any('session' in str(rt).lower() for rt in record_types.keys())
-                    has_timing_data = any(rt in ['record', 'lap'] for rt in record_types.keys())
-                    
-                    if has_session_data:
-                        self.update_status("Validation: ✓ Session data present")
-                    if has_timing_data:
-                        self.update_status("Validation: ✓ Timing data present")
-                        
-                else:
-                    self.update_status("Validation WARNING: FIT file has no records")
-                
-            except Exception as fit_error:
-                self.update_status(f"Validation FAILED: Cannot parse FIT file - {str(fit_error)}")
-                return False
-            
-            # Try to convert to CSV to verify data integrity
-            try:
-                temp_validation_csv = os.path.join(tempfile.gettempdir(), "validation_test.csv")
-                test_fit.to_csv(temp_validation_csv)
-                
-                if os.path.exists(temp_validation_csv):
-                    csv_size = os.path.getsize(temp_validation_csv)
-                    self.update_status(f"Validation: ✓ FIT->CSV conversion successful ({csv_size:,} bytes)")
-                    os.remove(temp_validation_csv)  # Clean up
-                else:
-                    self.update_status("Validation WARNING: FIT->CSV conversion produced no output")
-                    
-            except Exception as csv_error:
-                self.update_status(f"Validation WARNING: FIT->CSV conversion failed - {str(csv_error)}")
-                # This is not a critical failure
-            
-            # Final validation summary
-            self.update_status("=== VALIDATION SUMMARY ===")
-            self.update_status("✓ File exists and has content")
-            self.update_status("✓ FIT file structure is valid")
-            self.update_status("✓ File can be read by fit_tool")
-            self.update_status("✓ Ready for upload to Garmin Connect")
-            
-            return True
-            
-        except Exception as e:
-            self.update_status(f"Validation ERROR: Unexpected error - {str(e)}")
-            return False
-            
     def show_success_indicator(self):
         """Show success indicator in the main window"""
         try:
@@ -2026,11 +1627,18 @@ class HevyGarminMerger:
     def run(self):
         """Start the application main loop"""
         self.update_status("Application started. Ready for file selection.")
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Uploads still in flight resume from the queue on the next start
+            self.upload_stop.set()
+            self.scheduler.shutdown()
 
 
 def main():
     """Main entry point for the application"""
+    # Needed for worker processes when running from the frozen app bundle
+    multiprocessing.freeze_support()
     app = HevyGarminMerger()
     app.run()
 
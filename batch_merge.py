@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Batch runner for the Hevy to Garmin FIT Merger
+
+Merges one or more Garmin FIT / Hevy CSV pairs without opening the GUI.
+Progress is shown per pair; pressing Ctrl+C cancels the running merge
+cleanly and skips the remaining pairs.
+
+With --upload, merged files are added to the Garmin Connect upload queue
+and uploaded (see garmin_upload.py); files still queued from an earlier
+interrupted run are uploaded too.
+
+With --heart-rate, time in heart-rate zones and training load (TRIMP) are
+reported for every activity in the batch and in total. With --reports, an
+HTML report is written next to each merged file by a worker process while
+the next pair merges.
+
+Pairs whose merged output (or the activity itself) already carries the
+fingerprint of the same workout and mappings are skipped without decoding
+the activity; --force merges them again.
+
+Usage:
+    python batch_merge.py --pair ACTIVITY.fit WORKOUT.csv [--pair ...] --output-dir OUT [--upload]
+                          [--heart-rate] [--reports] [--force]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from garmin_upload import GarminUploader, UploadQueue
+from hr_analysis import athlete_heart_rate, heart_rate_samples, history_heart_rate
+from merge_jobs import MergeJob, JobCancelled
+from merge_pipeline import HeadlessMerger, decode_garmin_file
+from workout_report import write_session_report
+
+
+def output_path_for(garmin_fit_path, output_dir):
+    """Build the output file name for a merged activity"""
+    base_name = os.path.splitext(os.path.basename(garmin_fit_path))[0]
+    return os.path.join(output_dir, f"{base_name}_merged.fit")
+
+
+def print_progress(fraction, message):
+    """Render a single-line text progress bar"""
+    width = 30
+    filled = int(round(fraction * width))
+    bar = "#" * filled + "-" * (width - filled)
+    sys.stdout.write(f"\r[{bar}] {fraction * 100:5.1f}% {message[:40]:<40}")
+    sys.stdout.flush()
+
+
+def report_path_for(output_path):
+    """Build the report file name for a merged activity"""
+    return f"{os.path.splitext(output_path)[0]}_report.html"
+
+
+def run_batch(pairs, output_dir, verbose=False, reports=False, force=False):
+    """
+    Merge each (fit, csv) pair into output_dir
+
+    Args:
+        reports: also write an HTML report per merged pair (see workout_report)
+        force: merge pairs again even if they are already merged
+
+    Returns:
+        tuple: (list of written paths, list of (pair, error message) failures,
+        list of pairs skipped as already merged)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # One worker process decodes each FIT file while its CSV is parsed here
+    decode_pool = ProcessPoolExecutor(max_workers=1)
+    report_pool = ProcessPoolExecutor(max_workers=1) if reports else None
+    merger = HeadlessMerger(status_callback=print if verbose else (lambda message: None),
+                            decode_pool=decode_pool)
+
+    try:
+        written, failures, skipped, report_futures = _merge_pairs(merger, pairs, output_dir, verbose,
+                                                                  report_pool, skip_merged=not force)
+        failures += _wait_for_reports(report_futures)
+    finally:
+        decode_pool.shutdown(wait=False, cancel_futures=True)
+        if report_pool is not None:
+            report_pool.shutdown(wait=False, cancel_futures=True)
+
+    print(f"\nMerged {len(written)} of {len(pairs)} file pairs into {output_dir}"
+          + (f" ({len(skipped)} already merged)" if skipped else ""))
+    return written, failures, skipped
+
+
+def _merge_pairs(merger, pairs, output_dir, verbose, report_pool=None, skip_merged=True):
+    """Merge pairs one at a time, stopping on cancellation"""
+    written, failures, skipped, report_futures = [], [], [], []
+    for index, (garmin_fit_path, hevy_csv_path) in enumerate(pairs, start=1):
+        print(f"\n[{index}/{len(pairs)}] {os.path.basename(garmin_fit_path)}")
+        job = MergeJob(progress_callback=None if verbose else print_progress)
+        try:
+            output_path = merger.merge_files(garmin_fit_path, hevy_csv_path,
+                                             output_path_for(garmin_fit_path, output_dir), job=job,
+                                             skip_merged=skip_merged)
+            if output_path is None:
+                skipped.append((garmin_fit_path, hevy_csv_path))
+                print("\nAlready merged - skipped.")
+                continue
+            written.append(output_path)
+            if report_pool is not None:
+                future = report_pool.submit(write_session_report, garmin_fit_path, merger.last_processed_sets,
+                                            report_path_for(output_path), weight_unit=merger.weight_unit)
+                report_futures.append(((garmin_fit_path, hevy_csv_path), future))
+        except (JobCancelled, KeyboardInterrupt):
+            job.cancel()
+            print("\nCancelled - remaining pairs skipped.")
+            break
+        except Exception as e:
+            failures.append(((garmin_fit_path, hevy_csv_path), str(e)))
+            print(f"\nFailed: {e}")
+    return written, failures, skipped, report_futures
+
+
+def _wait_for_reports(report_futures):
+    """Wait for the background report writes; returns their failures"""
+    failures = []
+    for pair, future in report_futures:
+        try:
+            print(f"Report: {future.result()}")
+        except Exception as e:
+            failures.append((pair, f"report: {e}"))
+            print(f"Report failed for {os.path.basename(pair[0])}: {e}")
+    return failures
+
+
+def upload_outputs(paths, config):
+    """Queue merged files for Garmin Connect and upload everything pending
+
+    Returns:
+        dict: upload counts per status
+    """
+    upload_queue = UploadQueue()
+    try:
+        for path in paths:
+            upload_queue.enqueue(path)
+        uploader = GarminUploader.from_config(config)
+        counts = uploader.process_queue(upload_queue, status_callback=print)
+    finally:
+        upload_queue.close()
+    print(f"Uploads: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed")
+    return counts
+
+
+def heart_rate_history(fit_paths):
+    """
+    Time in zones and TRIMP for each activity, computed over all samples at once
+
+    Zones use the max/resting heart rate of the first file that records them.
+
+    Returns:
+        tuple: (zone seconds per activity, TRIMP per activity)
+    """
+    activities, athlete = [], None
+    for path in fit_paths:
+        fit_file, _ = decode_garmin_file(path)
+        activities.append(heart_rate_samples(fit_file))
+        if athlete is None and fit_file.message(7).first('max_heart_rate'):
+            athlete = athlete_heart_rate(fit_file)
+    athlete = athlete or {}
+    return history_heart_rate(activities, **{key: value for key, value in athlete.items() if value})
+
+
+def print_heart_rate_history(fit_paths, zone_seconds, load):
+    """Print one line of zone minutes and TRIMP per activity, then the totals"""
+    header = " ".join(f"Z{zone:<4}" for zone in range(zone_seconds.shape[1]))
+    print(f"\n{'Activity':<32} {header}  TRIMP")
+    rows = [os.path.basename(path) for path in fit_paths] + ["Total"]
+    for name, zones, trimp in zip(rows, list(zone_seconds) + [zone_seconds.sum(axis=0)],
+                                  list(load) + [load.sum()]):
+        minutes = " ".join(f"{value / 60:<5.0f}" for value in zones)
+        print(f"{name[:32]:<32} {minutes}  {trimp:.0f}")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Merge Garmin FIT files with Hevy CSV exports")
+    parser.add_argument("--pair", nargs=2, action="append", metavar=("FIT", "CSV"), required=True,
+                        help="Garmin .fit file and matching Hevy .csv export (repeatable)")
+    parser.add_argument("--output-dir", default=".", help="Directory for merged .fit files")
+    parser.add_argument("--verbose", action="store_true", help="Print every status message")
+    parser.add_argument("--upload", action="store_true", help="Upload merged files to Garmin Connect")
+    parser.add_argument("--heart-rate", action="store_true",
+                        help="Report heart-rate zone minutes and training load per activity")
+    parser.add_argument("--reports", action="store_true", help="Write an HTML report next to each merged file")
+    parser.add_argument("--force", action="store_true", help="Merge pairs again even if already merged")
+    args = parser.parse_args(argv)
+
+    written, failures, skipped = run_batch([tuple(pair) for pair in args.pair], args.output_dir, args.verbose,
+                                           args.reports, args.force)
+    if args.heart_rate:
+        fit_paths = [fit_path for fit_path, _ in args.pair]
+        print_heart_rate_history(fit_paths, *heart_rate_history(fit_paths))
+    if args.upload and written:
+        try:
+            counts = upload_outputs(written, HeadlessMerger(status_callback=lambda message: None).config)
+        except KeyboardInterrupt:
+            print("\nUploads interrupted - they resume on the next --upload run.")
+            return 1
+        if counts.get('failed'):
+            return 1
+    return 0 if (written or skipped) and not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Concurrent-client benchmark for the merge service
+
+Starts a merge service in this process (or uses a running one with --url),
+then has several client threads each upload the same FIT/CSV pair a number
+of times, wait for the merge and download the result. Reports throughput
+and end-to-end latency percentiles.
+
+Usage:
+    python benchmark_merge_service.py [--clients 8] [--jobs-per-client 4] [--workers 2]
+                                      [--fit FILE] [--csv FILE] [--url http://127.0.0.1:8780]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from merge_service import MergeService, MergeServiceClient, MergeServiceServer
+
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_clients(base_url, fit_path, csv_path, clients, jobs_per_client, poll_seconds=0.05):
+    """
+    Run ``clients`` threads each merging the pair ``jobs_per_client`` times
+
+    Returns:
+        dict: wall time, per-job latencies and failure messages
+    """
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def client_loop(download_dir):
+        client = MergeServiceClient(base_url)
+        try:
+            for index in range(jobs_per_client):
+                started = time.perf_counter()
+                try:
+                    job = client.submit(fit_path, csv_path)
+                    job = client.wait(job["id"], poll_seconds)
+                    if job["state"] != "done":
+                        raise RuntimeError(job["error"] or job["state"])
+                    client.download(job["id"], os.path.join(download_dir, f"{index}.fit"))
+                except Exception as e:
+                    with lock:
+                        failures.append(str(e))
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+        finally:
+            client.close()
+
+    with tempfile.TemporaryDirectory() as download_dir:
+        threads = [threading.Thread(target=client_loop, args=(download_dir,)) for _ in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+    return {"wall_seconds": wall_seconds, "latencies": latencies, "failures": failures}
+
+
+def print_report(result, clients, jobs_per_client):
+    latencies = result["latencies"]
+    print(f"{len(latencies)} of {clients * jobs_per_client} merges in {result['wall_seconds']:.2f} s "
+          f"({len(latencies) / result['wall_seconds']:.2f} merges/s)")
+    if latencies:
+        print(f"Latency: p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms")
+    for message in sorted(set(result["failures"])):
+        print(f"Failed ({result['failures'].count(message)}x): {message}")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the merge service with concurrent clients")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--jobs-per-client", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes of the in-process service")
+    parser.add_argument("--fit", default=os.path.join(SAMPLE_DIR, "2025-09-01-16-42-38.fit"))
+    parser.add_argument("--csv", default=os.path.join(SAMPLE_DIR, "workouts-2.csv"))
+    parser.add_argument("--url", help="Benchmark a running service instead of starting one")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        service = MergeService(workers=args.workers, max_pending=max(32, args.clients))
+        server = MergeServiceServer(service=service)
+        server.start()
+        base_url = server.base_url
+        # Warm the worker processes up so their imports are not timed
+        warm_up = run_clients(base_url, args.fit, args.csv, args.workers, 1)
+        if warm_up["failures"]:
+            print(f"Warm-up failed: {warm_up['failures'][0]}")
+            server.close()
+            return 1
+    print(f"Benchmarking {base_url}: {args.clients} clients x {args.jobs_per_client} merges")
+    try:
+        result = run_clients(base_url, args.fit, args.csv, args.clients, args.jobs_per_client)
+    finally:
+        if server is not None:
+            server.close()
+    print_report(result, args.clients, args.jobs_per_client)
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
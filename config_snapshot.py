@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Immutable configuration snapshots for the Hevy to Garmin FIT Merger
+
+The merge configuration (hevy_garmin_config.json plus the user's exercise
+mappings) is held as a ConfigSnapshot: a frozen, versioned mapping with the
+lookups the pipeline needs compiled once - the flattened exercise mappings,
+the CSV column map and the set-type keyword matcher. Worker threads can read
+a snapshot without locks because nothing ever changes it.
+
+Changes (a mapping confirmed in the dialog, generic mappings for a headless
+run) build a new snapshot from the current one and publish it through a
+ConfigStore, which swaps the reference under a lock. A merge job pins the
+snapshot it started with, so a publish half-way through a merge never mixes
+two configurations.
+"""
+
+import re
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+EMPTY = MappingProxyType({})
+
+
+def _freeze(value):
+    """Read-only copy of a JSON-like value (dicts become mapping proxies, lists tuples)"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Plain, independent copy of a (possibly frozen) JSON-like value"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """
+    One immutable version of the configuration
+
+    Reads like the configuration dict it replaces (``config.get("settings",
+    {})``), with every nested dict read-only. User mappings are layered over
+    the shipped exercise mappings when the snapshot is built.
+
+    Attributes:
+        version: increases by one with every snapshot derived from another
+        exercise_mappings: Hevy exercise name -> Garmin mapping, user
+            mappings included
+        settings: the "settings" section
+        column_map: the "hevy_csv_columns" section
+    """
+
+    __slots__ = ("version", "exercise_mappings", "settings", "column_map", "parse_set_types", "_data",
+                 "_source", "_user_mappings", "_set_type_keywords", "_set_type_pattern")
+
+    def __init__(self, data, user_mappings=None, version=1):
+        source, user_mappings = _thaw(data), _thaw(user_mappings or {})
+        exercise_mappings = dict(source.get("exercise_mappings", {}))
+        exercise_mappings.update(user_mappings)
+        frozen = {key: _freeze(value) for key, value in source.items()}
+        frozen["exercise_mappings"] = _freeze(exercise_mappings)
+        init = object.__setattr__
+        init(self, "version", version)
+        init(self, "_source", source)
+        init(self, "_user_mappings", user_mappings)
+        init(self, "_data", MappingProxyType(frozen))
+        init(self, "exercise_mappings", frozen["exercise_mappings"])
+        init(self, "settings", frozen.get("settings", EMPTY))
+        init(self, "column_map", frozen.get("hevy_csv_columns", EMPTY))
+        init(self, "parse_set_types", bool(self.settings.get("parse_set_type_from_notes", True)))
+
+        # Keywords are tried in configuration order; the pattern only decides
+        # quickly whether a note mentions any of them
+        keywords = tuple((keyword.lower(), set_type) for keyword, set_type
+                         in frozen.get("set_type_keyword_mapping", EMPTY).items())
+        init(self, "_set_type_keywords", keywords)
+        init(self, "_set_type_pattern",
+            re.compile("|".join(re.escape(keyword) for keyword, _ in keywords)) if keywords else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable; publish a new snapshot instead")
+
+    def __reduce__(self):
+        return (ConfigSnapshot, (self._source, self._user_mappings, self.version))
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<ConfigSnapshot v{self.version}: {len(self.exercise_mappings)} exercise mappings>"
+
+    @property
+    def user_mappings(self):
+        return MappingProxyType(self._user_mappings)
+
+    def set_type_for(self, set_note):
+        """Set type id for a set note (0 = normal) from the keyword mapping"""
+        if not set_note or not self.parse_set_types or self._set_type_pattern is None:
+            return 0
+        note = set_note.lower()
+        if not self._set_type_pattern.search(note):
+            return 0
+        for keyword, set_type in self._set_type_keywords:
+            if keyword in note:
+                return set_type
+        return 0
+
+    def with_user_mappings(self, user_mappings):
+        """Next version with ``user_mappings`` layered over the shipped mappings"""
+        return ConfigSnapshot(self._source, user_mappings, self.version + 1)
+
+    def with_default_mappings(self, mappings):
+        """Next version with extra shipped-level mappings (user mappings still win)"""
+        source = dict(self._source, exercise_mappings=dict(self._source.get("exercise_mappings", {}), **mappings))
+        return ConfigSnapshot(source, self._user_mappings, self.version + 1)
+
+    def replace(self, **sections):
+        """Next version with whole top-level sections replaced"""
+        return ConfigSnapshot(dict(self._source, **sections), self._user_mappings, self.version + 1)
+
+
+class ConfigStore:
+    """Holds the current ConfigSnapshot and publishes new ones atomically"""
+
+    def __init__(self, snapshot):
+        self._current = snapshot
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The latest snapshot (a plain reference read; no lock needed)"""
+        return self._current
+
+    def publish(self, update):
+        """
+        Replace the current snapshot with ``update(current)``
+
+        Updates are serialised, so concurrent publishers each build on the
+        other's result.
+
+        Returns:
+            ConfigSnapshot: the published snapshot
+        """
+        with self._lock:
+            snapshot = update(self._current)
+            if not isinstance(snapshot, ConfigSnapshot):
+                raise TypeError("publish() needs a ConfigSnapshot")
+            self._current = snapshot
+            return snapshot
+
+    def replace(self, config):
+        """
+        Publish ``config`` (a ConfigSnapshot or a plain dict) as the next version
+
+        Returns:
+            ConfigSnapshot: the published snapshot
+        """
+        if isinstance(config, ConfigSnapshot):
+            return self.publish(lambda current: ConfigSnapshot(config._source, config._user_mappings,
+                                                               current.version + 1))
+        return self.publish(lambda current: ConfigSnapshot(config, None, current.version + 1))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Edit history for the Hevy to Garmin FIT Merger
+
+Undo/redo for the set edits made in the workout preview. Each edit is kept
+as a small delta (row, field, old value, new value) rather than a copy of
+the set table, so a long history costs a few tuples per edit. The history
+works on one table shared with the preview: the original merged sets are
+only copied when the first edit is made, and undo/redo just write the old
+or new values of a delta back into it.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from set_table import SET_FIELDS
+
+
+class FieldEdit(NamedTuple):
+    index: int
+    field: str
+    old: object
+    new: object
+
+
+def _same(a, b):
+    # Bodyweight sets have a NaN weight, which never compares equal
+    return a == b or (a != a and b != b)
+
+
+class EditHistory:
+    """Multi-level undo/redo of edits to a SetTable
+
+    Attributes:
+        table: the current state of the sets (the original table until the
+            first edit)
+    """
+
+    def __init__(self, table, limit=None):
+        self.base = table
+        self.table = table
+        self.limit = limit
+        self._undo = []
+        self._redo = []
+
+    @classmethod
+    def restore(cls, base, table, undo_steps, redo_steps, limit=None):
+        """Rebuild a history from steps() of a saved one and its tables"""
+        history = cls(base, limit)
+        history.table = table
+        history._undo = [tuple(step) for step in undo_steps]
+        history._redo = [tuple(step) for step in redo_steps]
+        return history
+
+    def steps(self):
+        """
+        The recorded edits, for saving
+
+        Returns:
+            tuple: (undo steps, redo steps) as stored, each step a tuple of
+            FieldEdit
+        """
+        return list(self._undo), list(self._redo)
+
+    def edit(self, index, **fields):
+        """
+        Change fields of one set as a single undoable step
+
+        Returns:
+            bool: False if no value actually changed (nothing is recorded)
+        """
+        row = self.table[index]
+        step = tuple(FieldEdit(index, field, row[field], value) for field, value in fields.items()
+                     if not _same(row[field], value))
+        if not step:
+            return False
+        if self.table is self.base:
+            self.table = self.base.copy()
+        self._apply(step, new=True)
+        self._undo.append(step)
+        self._redo.clear()
+        if self.limit is not None and len(self._undo) > self.limit:
+            del self._undo[0]
+        return True
+
+    def _apply(self, step, new):
+        for change in step:
+            self.table[change.index][change.field] = change.new if new else change.old
+
+    def undo(self):
+        """Revert the last edit; returns its deltas, or None if there is nothing to undo"""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._apply(step, new=False)
+        self._redo.append(step)
+        return step
+
+    def redo(self):
+        """Re-apply the last undone edit; returns its deltas, or None"""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._apply(step, new=True)
+        self._undo.append(step)
+        return step
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def __len__(self):
+        """Number of edits that can be undone"""
+        return len(self._undo)
+
+    def changes(self):
+        """
+        Net effect of the edits since the original table
+
+        The current table is compared with the original rather than replaying
+        the recorded steps, which lose their oldest edits once the history
+        goes past its limit.
+
+        Returns:
+            dict: (set index, field) -> (original value, current value), for
+            fields that currently differ from the original, in set order
+        """
+        if self.table is self.base:
+            return {}
+        net = {}
+        for field in SET_FIELDS:
+            before, after = self.base.rows[field], self.table.rows[field]
+            differs = before != after
+            if before.dtype.kind == 'f':
+                differs &= ~(np.isnan(before) & np.isnan(after))
+            for index in np.flatnonzero(differs).tolist():
+                net[(index, field)] = (before[index].item(), after[index].item())
+        renamed = self.base.rows['name_index'] != self.table.rows['name_index']
+        for index in np.flatnonzero(renamed).tolist():
+            names = (self.base[index]['original_exercise_name'], self.table[index]['original_exercise_name'])
+            if names[0] != names[1]:
+                net[(index, 'original_exercise_name')] = names
+        return dict(sorted(net.items()))
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Activity catalogue for the Hevy to Garmin FIT Merger
+
+Matching a Hevy workout to its Garmin activity only needs each activity's
+session start, duration and sport, not its records. The catalogue reads
+just that from each FIT file:
+
+- The file is memory-mapped and its record headers are walked, stepping
+  over data payloads by their defined length without decoding them.
+- The walk stops at the first session message. If the head of the file
+  has none, the tail (where watches write the session when the activity
+  ends) is searched for the session and activity definitions before
+  falling back to walking the whole file.
+
+Summaries are kept in a SQLite index of (path, mtime, size, start, end,
+utc offset, sport). A refresh only rescans files whose size or
+modification time changed, so a large archive is read in full once.
+
+Usage:
+    python fit_catalogue.py GARMIN_DIR [GARMIN_DIR ...] [--hevy-csv export.csv] [--db catalogue.sqlite3]
+"""
+
+import argparse
+import itertools
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+from fit_stream import BASE_TYPES, COMPRESSED_HEADER, DEFINITION_HEADER, FitFormatError, FitStream
+from merge_pipeline import FIT_EPOCH_OFFSET, HeadlessMerger, summarize_session_values
+from watch_folder import hevy_workout_windows, is_garmin_file
+
+
+CATALOGUE_FILENAME = "fit_catalogue.sqlite3"
+
+# Global message numbers
+FILE_ID_MESSAGE = 0
+SESSION_MESSAGE = 18
+ACTIVITY_MESSAGE = 34
+
+FILE_TYPE_ACTIVITY = 4
+
+# Records walked from the start of the file before trying the tail
+HEAD_RECORDS = 64
+# Bytes at the end of the data section searched for session/activity definitions
+TAIL_BYTES = 16 * 1024
+
+# Field numbers read from each message; timestamps are FIT-epoch seconds
+FIELDS = {
+    FILE_ID_MESSAGE: {0: 'type'},
+    SESSION_MESSAGE: {2: 'start_time', 7: 'total_elapsed_time', 5: 'sport', 6: 'sub_sport'},
+    ACTIVITY_MESSAGE: {253: 'timestamp', 5: 'local_timestamp'},
+}
+
+# Widest UTC offset, used to bound index lookups by local time
+MAX_UTC_OFFSET = 14 * 3600
+
+
+def default_catalogue_path():
+    """Catalogue database location next to the application"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CATALOGUE_FILENAME)
+
+
+def read_fields(stream, offset, definition, wanted):
+    """
+    Unpack one data record and return the wanted fields by name
+
+    Invalid values and fields missing from the definition are left out.
+    """
+    body, counts = definition.layout()
+    values = body.unpack_from(stream.data, offset + 1)
+    fields, index = {}, 0
+    for field, count in zip(definition.fields, counts):
+        name = wanted.get(field.number)
+        if name is not None and count == 1:
+            value = values[index]
+            if value != BASE_TYPES.get(field.base_type, (None, None, None))[2]:
+                fields[name] = value
+        index += count
+    return fields
+
+
+def _tail_message(stream, global_number):
+    """
+    Find the last ``global_number`` data record near the end of the file
+
+    Searches backwards for the bytes of a definition record of that message
+    (reserved byte, architecture, global number) and checks that a data
+    record using it follows.
+
+    Returns:
+        dict: the wanted fields, or None if no plausible record was found
+    """
+    data = stream.data
+    start = max(stream.header_size, stream.data_end - TAIL_BYTES)
+    tail = bytes(data[start:stream.data_end])
+    patterns = (b"\x00\x00" + struct.pack("<H", global_number), b"\x00\x01" + struct.pack(">H", global_number))
+    for pattern in patterns:
+        position = len(tail)
+        while True:
+            position = tail.rfind(pattern, 0, position)
+            if position < 1:
+                break
+            offset = start + position - 1
+            if data[offset] & (COMPRESSED_HEADER | DEFINITION_HEADER | 0x10) != DEFINITION_HEADER:
+                continue
+            try:
+                definition, length = stream.read_definition(offset)
+            except (FitFormatError, IndexError):
+                continue
+            record = offset + length
+            if (record + 1 + definition.data_size <= stream.data_end and data[record] == definition.local_type
+                    and all(field.base_type in BASE_TYPES and field.size for field in definition.fields)):
+                return read_fields(stream, record, definition, FIELDS[global_number])
+    return None
+
+
+def _walk(stream, records, found):
+    """Read the wanted messages from ``records`` until a session is found"""
+    for span, definition in records:
+        if span.is_definition or span.compressed or span.global_number not in FIELDS:
+            continue
+        if span.global_number not in found:
+            found[span.global_number] = read_fields(stream, span.offset, definition, FIELDS[span.global_number])
+            if span.global_number == SESSION_MESSAGE:
+                return
+
+
+def scan_fit_summary(stream):
+    """
+    Session summary of a FIT file, reading as few records as possible
+
+    Returns:
+        dict: as summarize_session_values(), or None for files that are not
+        activities
+    """
+    found = {}
+    records = stream.records()
+    _walk(stream, itertools.islice(records, HEAD_RECORDS), found)
+    file_id = found.get(FILE_ID_MESSAGE)
+    if file_id is not None and file_id.get('type', FILE_TYPE_ACTIVITY) != FILE_TYPE_ACTIVITY:
+        return None
+
+    if SESSION_MESSAGE not in found:
+        session = _tail_message(stream, SESSION_MESSAGE)
+        if session is not None:
+            found[SESSION_MESSAGE] = session
+        else:
+            _walk(stream, records, found)
+    if ACTIVITY_MESSAGE not in found:
+        found[ACTIVITY_MESSAGE] = _tail_message(stream, ACTIVITY_MESSAGE) or {}
+    return summary_from_fields(found.get(SESSION_MESSAGE) or {}, found[ACTIVITY_MESSAGE])
+
+
+def summary_from_fields(session, activity):
+    """Summary from raw session/activity field values (FIT-epoch seconds)"""
+    def unix_ms(seconds):
+        return None if seconds is None else (seconds + FIT_EPOCH_OFFSET) * 1000
+
+    elapsed = session.get('total_elapsed_time')
+    return summarize_session_values(
+        start_time=unix_ms(session.get('start_time')),
+        total_elapsed_time=None if elapsed is None else elapsed / 1000,
+        sport=session.get('sport'), sub_sport=session.get('sub_sport'),
+        timestamp=unix_ms(activity.get('timestamp')), local_timestamp=activity.get('local_timestamp'))
+
+
+def scan_fit_file(path):
+    """
+    Memory-map a FIT file and read its session summary
+
+    Returns:
+        dict: as scan_fit_summary(), or None if the file is not a complete
+        FIT activity
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # empty file
+    view = memoryview(mapped)
+    try:
+        return scan_fit_summary(FitStream(view))
+    except (FitFormatError, struct.error, IndexError):
+        return None
+    finally:
+        view.release()
+        mapped.close()
+
+
+class ActivityCatalogue:
+    """Persistent index of activity summaries, refreshed incrementally"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_catalogue_path()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db:
+            # start/end are UTC seconds since the Unix epoch; NULL for files
+            # that are not readable activities, so they are not rescanned
+            self._db.execute("""CREATE TABLE IF NOT EXISTS activities (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,
+                start INTEGER, end INTEGER, utc_offset INTEGER, sport TEXT, sub_sport TEXT)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS activities_start ON activities (start)")
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM activities WHERE start IS NOT NULL").fetchone()[0]
+
+    def refresh(self, directories, status_callback=None):
+        """
+        Bring the index up to date with the FIT files under ``directories``
+
+        Returns:
+            dict: counts of scanned, unchanged and removed files
+        """
+        status_callback = status_callback or (lambda message: None)
+        known = {path: (mtime_ns, size) for path, mtime_ns, size
+                 in self._db.execute("SELECT path, mtime_ns, size FROM activities")}
+        result = {"scanned": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        rows = []
+        for directory in directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    path = os.path.abspath(os.path.join(root, name))
+                    if not is_garmin_file(path):
+                        continue
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    seen.add(path)
+                    if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                        result["unchanged"] += 1
+                        continue
+                    rows.append(self._row(path, stat, scan_fit_file(path)))
+                    result["scanned"] += 1
+                    if result["scanned"] % 500 == 0:
+                        status_callback(f"Catalogued {result['scanned']} activities...")
+
+        roots = tuple(os.path.join(os.path.abspath(directory), "") for directory in directories)
+        removed = [(path,) for path in known if path not in seen and path.startswith(roots)]
+        result["removed"] = len(removed)
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO activities VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.executemany("DELETE FROM activities WHERE path = ?", removed)
+        return result
+
+    @staticmethod
+    def _row(path, stat, summary):
+        start = end = utc_offset = sport = sub_sport = None
+        if summary and summary['start_time'] is not None:
+            start = int(summary['start_time'].timestamp())
+            end = start + (summary['duration_seconds'] or 0)
+            utc_offset, sport, sub_sport = summary['utc_offset_seconds'], summary['sport'], summary['sub_sport']
+        return (path, stat.st_mtime_ns, stat.st_size, start, end, utc_offset, sport, sub_sport)
+
+    def find(self, local_start, local_end, tolerance_seconds=900):
+        """
+        Activities overlapping a wall-clock time window, best overlap first
+
+        Args:
+            local_start, local_end: naive local datetimes of the workout
+            tolerance_seconds: slack added around the window
+
+        Returns:
+            list: summary dicts (as summarize_session_values(), plus 'path')
+        """
+        epoch = datetime(1970, 1, 1)
+        window_start = (local_start - epoch).total_seconds() - tolerance_seconds
+        window_end = (local_end - epoch).total_seconds() + tolerance_seconds
+        rows = self._db.execute(
+            """SELECT path, start, end, utc_offset, sport, sub_sport FROM activities
+               WHERE start <= ? AND start + COALESCE(utc_offset, 0) <= ?
+                 AND end + COALESCE(utc_offset, 0) >= ?""",
+            (window_end + MAX_UTC_OFFSET, window_end, window_start)).fetchall()
+
+        def overlap(row):
+            offset = row[3] or 0
+            return min(row[2] + offset, window_end) - max(row[1] + offset, window_start)
+        return [self._summary(row) for row in sorted(rows, key=overlap, reverse=True)]
+
+    def entries(self):
+        """All catalogued activities, oldest first"""
+        rows = self._db.execute("SELECT path, start, end, utc_offset, sport, sub_sport FROM activities "
+                                "WHERE start IS NOT NULL ORDER BY start").fetchall()
+        return [self._summary(row) for row in rows]
+
+    @staticmethod
+    def _summary(row):
+        path, start, end, utc_offset, sport, sub_sport = row
+        start_time = datetime.fromtimestamp(start, tz=timezone.utc)
+        local_start_time = None
+        if utc_offset is not None:
+            local_start_time = (start_time + timedelta(seconds=utc_offset)).replace(tzinfo=None)
+        return {'path': path, 'start_time': start_time, 'duration_seconds': end - start, 'sport': sport,
+                'sub_sport': sub_sport, 'utc_offset_seconds': utc_offset, 'local_start_time': local_start_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalogue Garmin activities and match them to Hevy workouts.")
+    parser.add_argument("directories", nargs="+", help="Folders of Garmin .fit files (searched recursively)")
+    parser.add_argument("--hevy-csv", help="Hevy export whose workouts to match against the catalogue")
+    parser.add_argument("--db", help=f"Catalogue database (default: {CATALOGUE_FILENAME} next to the app)")
+    parser.add_argument("--tolerance-minutes", type=int, default=15,
+                        help="Slack around Hevy workout times when matching (default: 15)")
+    args = parser.parse_args()
+
+    catalogue = ActivityCatalogue(args.db)
+    result = catalogue.refresh(args.directories, status_callback=print)
+    print(f"{len(catalogue)} activities catalogued ({result['scanned']} scanned, "
+          f"{result['unchanged']} unchanged, {result['removed']} removed)")
+
+    if args.hevy_csv:
+        merger = HeadlessMerger(status_callback=lambda message: None)
+        for window in hevy_workout_windows(args.hevy_csv, merger):
+            matches = catalogue.find(window['start'], window['end'], args.tolerance_minutes * 60)
+            match = os.path.basename(matches[0]['path']) if matches else "no matching activity"
+            print(f"{window['start_time']}  {window['title']}: {match}")
+    catalogue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
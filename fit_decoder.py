@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Fast FIT decoder for the Hevy to Garmin FIT Merger
+
+Decodes a FIT file into NumPy columns instead of one Python object per
+message and field. A field extractor (a NumPy structured dtype laid over the
+record bytes) is compiled once per distinct definition, and all data
+messages of that definition are decoded in one gather: their bytes are
+pulled out of the file with a single fancy index and viewed through the
+dtype. Invalid values become NaN, and the profile's scale and offset are
+applied to whole columns, giving the same units as fit_tool (timestamps
+in Unix milliseconds).
+
+Records with compressed timestamp headers get their timestamp rebuilt from
+the last full timestamp before them. Definitions whose layout cannot be
+expressed as a dtype are left to fit_tool, whose messages are converted to
+the same columns: the raw values get the same NaN for invalid values and the
+same profile scaling.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fit_stream import BASE_TYPES, FitStream
+
+
+STRING_TYPE = 0x07
+FLOAT_TYPES = frozenset({0x88, 0x89})
+
+# Compressed timestamp headers carry the low five bits of the timestamp
+COMPRESSED_TIME_MASK = 0x1F
+
+# global message number -> (message name, {field number: (field name, scale, offset, is date_time)})
+_PROFILES = {}
+_MESSAGE_CLASSES = {}
+
+
+class UnsupportedFitError(Exception):
+    """The file uses a feature the native decoder leaves to fit_tool"""
+
+
+def message_profile(global_number):
+    """Name and field scaling of a message from fit_tool's profile"""
+    if global_number not in _PROFILES:
+        name, fields = f"unknown_{global_number}", {}
+        message_class = _message_classes().get(global_number)
+        if message_class is not None:
+            message = message_class()
+            name = message.name
+            fields = {field.field_id: (field.name, field.scale or 1.0, field.offset or 0.0,
+                                       field.type_name == 'date_time')
+                      for field in message.fields}
+        _PROFILES[global_number] = (name, fields)
+    return _PROFILES[global_number]
+
+
+def _message_classes():
+    """global message number -> fit_tool message class"""
+    if not _MESSAGE_CLASSES:
+        from fit_tool.data_message import DataMessage
+        from fit_tool.profile.messages import message_factory
+
+        _MESSAGE_CLASSES.update({
+            value.ID: value for value in vars(message_factory).values()
+            if isinstance(value, type) and issubclass(value, DataMessage) and hasattr(value, "ID")
+        })
+    return _MESSAGE_CLASSES
+
+
+class MessageColumns:
+    """All data messages of one global message number, one NumPy column per field"""
+
+    def __init__(self, global_number, name, columns=None, length=0):
+        self.global_number = global_number
+        self.name = name
+        self.columns = columns or {}
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, field_name):
+        return field_name in self.columns
+
+    def __getitem__(self, field_name):
+        return self.columns[field_name]
+
+    def get(self, field_name, default=None):
+        return self.columns.get(field_name, default)
+
+    def first(self, field_name):
+        """Value of a field in the first message, or None if absent or invalid"""
+        column = self.columns.get(field_name)
+        if column is None or not len(column):
+            return None
+        value = column[0]
+        if isinstance(value, (np.ndarray, list, tuple)):
+            value = value[0] if len(value) else None
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return None
+        return value.item() if isinstance(value, np.generic) else value
+
+    def to_dataframe(self):
+        """Scalar fields as a DataFrame (array fields keep their first value)"""
+        return pd.DataFrame({name: column if column.ndim == 1 else column[:, 0]
+                             for name, column in self.columns.items()})
+
+
+class DecodedFit:
+    """
+    A decoded FIT file: its bytes plus per-message NumPy columns
+
+    ``source_bytes`` is kept so the encoder can copy preserved records
+    verbatim; ``decoder`` says which decoder produced the columns.
+    """
+
+    def __init__(self, source_bytes, messages, record_count, decoder="native"):
+        self.source_bytes = source_bytes
+        self.messages = messages
+        self.record_count = record_count
+        self.decoder = decoder
+
+    def message(self, global_number):
+        """Columns of one message type (empty if the file has none)"""
+        columns = self.messages.get(global_number)
+        if columns is None:
+            columns = MessageColumns(global_number, message_profile(global_number)[0])
+        return columns
+
+    def message_names(self):
+        return [columns.name for columns in self.messages.values()]
+
+    def without(self, global_numbers):
+        """The same file with some message types left out (the bytes are unchanged)"""
+        messages = {number: columns for number, columns in self.messages.items() if number not in global_numbers}
+        removed = sum(len(columns) for number, columns in self.messages.items() if number in global_numbers)
+        return DecodedFit(self.source_bytes, messages, self.record_count - removed, self.decoder)
+
+
+class CompiledDefinition:
+    """
+    Field extractor for one definition, compiled once and reused for every
+    data message (and every repeated definition) with the same layout
+    """
+
+    def __init__(self, definition):
+        self.global_number = definition.global_number
+        self.name, profile = message_profile(definition.global_number)
+        byte_order = "<" if definition.little_endian else ">"
+
+        names, formats, offsets, self.fields = [], [], [], []
+        position = 1  # record header byte
+        for index, field in enumerate(definition.fields):
+            if field.size == 0:
+                raise UnsupportedFitError(f"zero-size field {field.number} in message {self.global_number}")
+            char, base_size, invalid = BASE_TYPES.get(field.base_type, ("s", 1, None))
+            field_name, scale, offset, is_time = profile.get(field.number,
+                                                             (f"field_{field.number}", 1.0, 0.0, False))
+            if char == "s" or field.size % base_size:
+                dtype, count = np.dtype(f"S{field.size}"), 0
+            else:
+                count = field.size // base_size
+                dtype = np.dtype(byte_order + char)
+                if count > 1:
+                    dtype = np.dtype((dtype, (count,)))
+            names.append(f"f{index}")
+            formats.append(dtype)
+            offsets.append(position)
+            position += field.size
+            self.fields.append((f"f{index}", field_name, field.base_type, count, invalid, scale, offset, is_time))
+
+        self.record_size = 1 + definition.data_size
+        try:
+            self.dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets,
+                                   "itemsize": self.record_size})
+        except (TypeError, ValueError) as e:
+            raise UnsupportedFitError(f"message {self.global_number}: {e}") from e
+
+    def decode(self, buffer, offsets):
+        """
+        Decode the data messages starting at ``offsets`` (record header bytes)
+
+        Returns:
+            dict: field name -> column
+        """
+        rows = buffer[offsets[:, None] + np.arange(self.record_size)]
+        records = np.ascontiguousarray(rows).view(self.dtype).reshape(-1)
+        columns = {}
+        for key, field_name, base_type, count, invalid, scale, offset, is_time in self.fields:
+            raw = records[key]
+            if count == 0:
+                if base_type == STRING_TYPE:
+                    columns[field_name] = np.array([value.split(b"\0", 1)[0].decode("utf-8", "replace")
+                                                    for value in raw.tolist()], dtype=object)
+                else:
+                    columns[field_name] = raw.copy()
+                continue
+            values = raw.astype(np.float64)
+            values[~np.isfinite(values) if base_type in FLOAT_TYPES else raw == invalid] = np.nan
+            if scale != 1.0 or offset != 0.0:
+                values = values / scale - offset
+                if is_time:
+                    values = np.round(values)
+            columns[field_name] = values
+        return columns
+
+
+def _definition_key(definition):
+    return (definition.global_number, definition.little_endian, definition.fields, definition.developer_fields)
+
+
+def decode_fit_native(source_bytes):
+    """
+    Decode with the compiled per-definition extractors
+
+    Raises:
+        FitFormatError: the bytes are not a well-formed FIT file
+        UnsupportedFitError: the file needs the fit_tool fallback
+    """
+    stream = FitStream(source_bytes)
+    compiled = {}
+    groups = {}  # (definition key, compressed header) -> list of record offsets
+    record_count = 0
+    for span, definition in stream.records():
+        record_count += 1
+        if span.is_definition:
+            continue
+        key = _definition_key(definition)
+        offsets = groups.get((key, span.compressed))
+        if offsets is None:
+            offsets = groups[(key, span.compressed)] = []
+            if key not in compiled:
+                compiled[key] = CompiledDefinition(definition)
+        offsets.append(span.offset)
+
+    buffer = np.frombuffer(source_bytes, dtype=np.uint8)
+    decoded = {}  # global number -> list of (offsets, columns)
+    compressed_groups = []
+    for (key, compressed), offsets in groups.items():
+        offsets = np.asarray(offsets, dtype=np.int64)
+        extractor = compiled[key]
+        group = (offsets, extractor.decode(buffer, offsets))
+        decoded.setdefault(extractor.global_number, []).append(group)
+        if compressed:
+            compressed_groups.append(group)
+    if compressed_groups:
+        _expand_compressed_timestamps(buffer, decoded, compressed_groups)
+
+    messages = {}
+    first_offset = {number: min(offsets[0] for offsets, _ in groups) for number, groups in decoded.items()}
+    for global_number in sorted(decoded, key=first_offset.get):
+        messages[global_number] = _merge_groups(global_number, decoded[global_number])
+    return DecodedFit(source_bytes, messages, record_count)
+
+
+def _expand_compressed_timestamps(buffer, decoded, compressed_groups):
+    """
+    Give records with a compressed timestamp header their full timestamp
+
+    Each one adds its five-bit offset to the timestamp of the record before
+    it (full or itself expanded), so the records are replayed in file order.
+    """
+    compressed_ids = {id(group) for group in compressed_groups}
+    events = []  # (file offset, full timestamp in ms or None, group, row)
+    for groups in decoded.values():
+        for group in groups:
+            offsets, columns = group
+            timestamps = columns.get("timestamp")
+            compressed = id(group) in compressed_ids
+            if timestamps is None and not compressed:
+                continue
+            for row, offset in enumerate(offsets.tolist()):
+                events.append((offset, None if compressed else timestamps[row], group, row))
+    events.sort(key=lambda event: event[0])
+
+    expanded = {id(group): np.full(len(group[0]), np.nan) for group in compressed_groups}
+    last_seconds = None
+    for offset, timestamp, group, row in events:
+        if timestamp is None:
+            if last_seconds is None:
+                continue
+            time_offset = int(buffer[offset]) & COMPRESSED_TIME_MASK
+            last_seconds += (time_offset - last_seconds) & COMPRESSED_TIME_MASK
+            expanded[id(group)][row] = last_seconds * 1000.0
+        elif timestamp == timestamp:
+            # The FIT and Unix epochs differ by a multiple of 32 s, so the low bits agree
+            last_seconds = int(timestamp // 1000)
+    for group in compressed_groups:
+        group[1]["timestamp"] = expanded[id(group)]
+
+
+def _merge_groups(global_number, groups):
+    """Combine the columns of several definitions of one message, in file order"""
+    name = message_profile(global_number)[0]
+    if len(groups) == 1:
+        offsets, columns = groups[0]
+        return MessageColumns(global_number, name, columns, len(offsets))
+
+    order = np.argsort(np.concatenate([offsets for offsets, _ in groups]), kind="stable")
+    length = len(order)
+    field_names = []
+    for _, columns in groups:
+        field_names.extend(field for field in columns if field not in field_names)
+    merged = {}
+    for field_name in field_names:
+        parts = []
+        for offsets, columns in groups:
+            column = columns.get(field_name)
+            if column is None:
+                column = np.full(len(offsets), np.nan)
+            parts.append(column)
+        if any(part.dtype == object or part.dtype.kind == "S" for part in parts) or \
+                len({part.shape[1:] for part in parts}) > 1:
+            combined = np.empty(length, dtype=object)
+            combined[:] = [value for part in parts for value in part]
+        else:
+            combined = np.concatenate(parts)
+        merged[field_name] = combined[order]
+    return MessageColumns(global_number, name, merged, length)
+
+
+def _fit_tool_value(field, profile):
+    """
+    One fit_tool field as the native decoder gives it
+
+    The encoded values are scaled with the same profile entry, and invalid
+    values become NaN, rather than taking fit_tool's scaled sentinels.
+    """
+    base_type = field.base_type.value
+    char, base_size, invalid = BASE_TYPES.get(base_type, ("s", 1, None))
+    encoded = field.encoded_values
+    if base_type == STRING_TYPE:
+        return encoded[0] if encoded else ""
+    if char == "s" or field.size % base_size:
+        values = field.get_values()
+        return values[0] if len(values) == 1 else values
+
+    _, scale, offset, is_time = profile.get(field.field_id, (None, 1.0, 0.0, False))
+    values = np.array(encoded, dtype=np.float64)
+    values[~np.isfinite(values) if base_type in FLOAT_TYPES else values == invalid] = np.nan
+    if scale != 1.0 or offset != 0.0:
+        values = values / scale - offset
+        if is_time:
+            values = np.round(values)
+    return values if field.size // base_size > 1 else values[0]
+
+
+def _fit_tool_column(column):
+    """Per-message values of one field as a column shaped like the native decoder's"""
+    if all(value is None or isinstance(value, (int, float)) for value in column):
+        return np.array([np.nan if value is None else value for value in column], dtype=np.float64)
+    shapes = {value.shape for value in column if isinstance(value, np.ndarray)}
+    if len(shapes) == 1 and all(value is None or isinstance(value, np.ndarray) for value in column):
+        shape = shapes.pop()
+        return np.stack([np.full(shape, np.nan) if value is None else value for value in column])
+    values = np.empty(len(column), dtype=object)
+    values[:] = column
+    return values
+
+
+def decode_fit_with_fit_tool(source_bytes):
+    """Decode with fit_tool and convert its message objects to columns"""
+    from fit_tool.fit_file import FitFile
+
+    fit_file = FitFile.from_bytes(source_bytes, check_crc=False)
+    rows = {}
+    names = {}
+    for record in fit_file.records:
+        if record.is_definition:
+            continue
+        message = record.message
+        names[message.global_id] = message.name
+        profile = message_profile(message.global_id)[1]
+        values = {}
+        for field in message.fields:
+            if not field.is_valid():
+                continue
+            # Named like the native decoder, which fit_tool's generic messages are not
+            values[profile.get(field.field_id, (f"field_{field.field_id}",))[0]] = _fit_tool_value(field, profile)
+        rows.setdefault(message.global_id, []).append(values)
+
+    messages = {}
+    for global_number, message_rows in rows.items():
+        field_names = []
+        for values in message_rows:
+            field_names.extend(field for field in values if field not in field_names)
+        columns = {field_name: _fit_tool_column([values.get(field_name) for values in message_rows])
+                   for field_name in field_names}
+        messages[global_number] = MessageColumns(global_number, names[global_number], columns, len(message_rows))
+    return DecodedFit(source_bytes, messages, len(fit_file.records), decoder="fit_tool")
+
+
+def decode_fit(source_bytes):
+    """
+    Decode FIT bytes, natively where possible and with fit_tool otherwise
+
+    Raises:
+        FitFormatError: the bytes are not a well-formed FIT file
+    """
+    try:
+        return decode_fit_native(source_bytes)
+    except UnsupportedFitError:
+        return decode_fit_with_fit_tool(source_bytes)
+
+
+def decode_fit_file(path):
+    with open(path, 'rb') as f:
+        return decode_fit(f.read())
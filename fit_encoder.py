@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Byte-level FIT encoder for the Hevy to Garmin FIT Merger
+
+Writes the enhanced FIT file straight from the bytes of the original file.
+Preserved records are copied as byte ranges of the input buffer; only the
+new strength-training set messages are encoded, each packed with the struct
+precompiled for its definition into one preallocated output buffer. The
+file CRC is updated as each piece is written, so the cost of writing grows
+with the number of merged sets rather than with the size of the activity.
+
+A merge fingerprint (see merge_fingerprint) can be written right after the
+file_id message; a fingerprint block already in the source is replaced.
+
+The FIT set_type only tells active sets from rest, so each set's own type
+(normal, warm-up, failure, drop set; see set_table.SET_TYPE_NAMES) is written
+as the "hevy_set_type" developer field, declared just before the set block.
+"""
+
+import itertools
+import math
+import struct
+
+from fit_stream import FieldDefinition, Definition, FitStream, BASE_TYPES, crc16
+from merge_fingerprint import (DEVELOPER_DATA_ID_MESSAGE, DEVELOPER_DATA_INDEX, FILE_ID_MESSAGE,
+                               FINGERPRINT_LOCAL_TYPE, HEAD_RECORDS, developer_field_records, find_fingerprint,
+                               fingerprint_block)
+
+
+# Global message numbers
+SET_MESSAGE = 225
+SESSION_MESSAGE = 18
+ACTIVITY_MESSAGE = 34
+
+# Local message type used for the new set messages; whatever the original
+# file had defined there is re-emitted after the set block
+ENCODER_LOCAL_TYPE = 15
+
+# Profile values
+SET_TYPE_ACTIVE = 1
+FIT_BASE_UNIT_KILOGRAM = 1
+
+UINT8 = 0x02
+UINT16 = 0x84
+UINT32 = 0x86
+
+# (field name, field number, base type) of the set messages written
+SET_FIELDS = (
+    ("timestamp", 254, UINT32),
+    ("start_time", 6, UINT32),
+    ("duration", 0, UINT32),
+    ("repetitions", 3, UINT16),
+    ("weight", 4, UINT16),
+    ("set_type", 5, UINT8),
+    ("category", 7, UINT16),
+    ("category_subtype", 8, UINT16),
+    ("weight_display_unit", 9, UINT16),
+    ("message_index", 10, UINT16),
+)
+
+# Developer field carrying the set type; its own developer data index so it
+# is declared whether or not the file has a fingerprint block
+SET_TYPE_FIELD_NAME = "hevy_set_type"
+SET_TYPE_DEVELOPER_INDEX = DEVELOPER_DATA_INDEX - 1
+SET_TYPE_FIELD = (0, 1, SET_TYPE_DEVELOPER_INDEX)
+SET_TYPE_DESCRIPTION = developer_field_records(ENCODER_LOCAL_TYPE, SET_TYPE_DEVELOPER_INDEX, 0, UINT8,
+                                               SET_TYPE_FIELD_NAME)
+
+
+class MessageLayout:
+    """
+    A local message definition and the precompiled struct of its data messages
+
+    The struct includes the one-byte record header, so ``pack_into`` writes a
+    complete data record.
+    """
+
+    def __init__(self, local_type, global_number, fields, developer_fields=()):
+        self.names = tuple(name for name, _, _ in fields)
+        self.definition = Definition(local_type, global_number,
+                                     [FieldDefinition(number, BASE_TYPES[base_type][1], base_type)
+                                      for _, number, base_type in fields], developer_fields)
+        body, _ = self.definition.layout()
+        self.struct = struct.Struct(body.format[0] + "B" + body.format[1:])
+        self.header = local_type
+        self.size = self.struct.size
+
+    def definition_bytes(self):
+        return self.definition.to_bytes()
+
+    def pack_into(self, buffer, offset, values):
+        """Write one data record with ``values`` in field order"""
+        self.struct.pack_into(buffer, offset, self.header, *values)
+
+
+SET_LAYOUT = MessageLayout(ENCODER_LOCAL_TYPE, SET_MESSAGE, SET_FIELDS, [SET_TYPE_FIELD])
+
+
+def _field_value(value, scale, invalid):
+    """Scale a number for an unsigned field, or its invalid value if it is missing or does not fit"""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value < 0:
+        return invalid
+    scaled = int(round(value * scale))
+    return scaled if scaled < invalid else invalid
+
+
+def set_message_values(row, index, workout_start):
+    """
+    Values of one set message, in SET_FIELDS order followed by the set type
+
+    Args:
+        row: a SetTable row (timestamp is seconds from the workout start)
+        index: message_index of the set
+        workout_start: workout start in FIT-epoch seconds
+    """
+    invalid_short = BASE_TYPES[UINT16][2]
+    start = workout_start + int(round(row['timestamp']))
+    duration = row['duration']
+    end = start + (int(round(duration)) if duration == duration else 0)
+    return (
+        end,
+        start,
+        _field_value(duration, 1000, BASE_TYPES[UINT32][2]),
+        _field_value(row['repetitions'], 1, invalid_short),
+        _field_value(row['weight'], 16, invalid_short),
+        SET_TYPE_ACTIVE,
+        _field_value(row['exercise_category'], 1, invalid_short),
+        _field_value(row['exercise_name'], 1, invalid_short),
+        FIT_BASE_UNIT_KILOGRAM,
+        index,
+        bytes((_field_value(row['set_type'], 1, BASE_TYPES[UINT8][2]),)),
+    )
+
+
+def plan_merge(stream, drop_messages, skip=None):
+    """
+    Work out which byte ranges of the source to keep and where the sets go
+
+    Sets go where the watch wrote its own first set message, or else just
+    before the first session or activity message. Records inside the
+    ``skip`` (start, end) byte range are left out as well, and so is the
+    set type declaration of an earlier merge.
+
+    Returns:
+        tuple: (kept ranges as (start, end) pairs, insert offset, (start, end)
+        of the source definition to re-emit for ENCODER_LOCAL_TYPE after the
+        set block, or None)
+    """
+    ranges = []
+    description = None
+    first_dropped = summary_at = None
+    restore_at_dropped = restore_at_summary = None
+    active_definitions = {}
+    compressed_after_insert = False
+
+    for span, _ in stream.records():
+        end = span.offset + span.length
+        if skip is not None and skip[0] <= span.offset < skip[1]:
+            continue
+        if (span.is_definition and span.global_number == DEVELOPER_DATA_ID_MESSAGE
+                and stream.data[span.offset:span.offset + len(SET_TYPE_DESCRIPTION)] == SET_TYPE_DESCRIPTION):
+            description = (span.offset, span.offset + len(SET_TYPE_DESCRIPTION))
+        if description is not None and description[0] <= span.offset < description[1]:
+            continue
+        if span.global_number in drop_messages:
+            if first_dropped is None and not span.is_definition:
+                first_dropped = span.offset
+                restore_at_dropped = active_definitions.get(ENCODER_LOCAL_TYPE)
+            continue
+        if summary_at is None and not span.is_definition and span.global_number in (SESSION_MESSAGE,
+                                                                                    ACTIVITY_MESSAGE):
+            summary_at = span.offset
+            restore_at_summary = active_definitions.get(ENCODER_LOCAL_TYPE)
+        insert_at = first_dropped if first_dropped is not None else summary_at
+        if span.compressed and insert_at is not None:
+            compressed_after_insert = True
+        if span.is_definition:
+            active_definitions[span.local_type] = (span.offset, end)
+        if ranges and ranges[-1][1] == span.offset:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((span.offset, end))
+
+    if first_dropped is not None:
+        insert_at, restore = first_dropped, restore_at_dropped
+    else:
+        insert_at, restore = summary_at, restore_at_summary
+    if insert_at is None or compressed_after_insert:
+        # No session yet, or later records carry compressed timestamps that the
+        # set timestamps would shift: append the sets after everything else
+        insert_at = stream.data_end
+        restore = None
+    return ranges, insert_at, restore
+
+
+def plan_fingerprint(stream):
+    """
+    Where the fingerprint block goes: right after the file_id message
+
+    Returns:
+        tuple: (insert offset, (start, end) of the source definition to
+        re-emit for FINGERPRINT_LOCAL_TYPE after the block or None, (start,
+        end) of a fingerprint block already in the source or None)
+    """
+    existing = find_fingerprint(stream)
+    existing = existing[1:] if existing else None
+    definitions = {}
+    for span, _ in itertools.islice(stream.records(), HEAD_RECORDS):
+        if span.is_definition:
+            definitions[span.local_type] = (span.offset, span.offset + span.length)
+        elif span.global_number == FILE_ID_MESSAGE:
+            return span.offset + span.length, definitions.get(FINGERPRINT_LOCAL_TYPE), existing
+    return stream.header_size, None, existing
+
+
+def encode_enhanced_fit(source, garmin_sets, workout_start, drop_messages, fingerprint=None):
+    """
+    Build the enhanced FIT file from the original file's bytes
+
+    Args:
+        source: bytes of the original FIT file
+        garmin_sets: SetTable of merged sets
+        workout_start: workout start in FIT-epoch seconds
+        drop_messages: global message numbers to leave out of the output
+        fingerprint: merge fingerprint to embed, or None
+
+    Returns:
+        bytearray: the complete output file
+    """
+    stream = FitStream(source)
+    data = stream.data
+    head_at, head_restore, existing = plan_fingerprint(stream)
+    ranges, insert_at, restore = plan_merge(stream, drop_messages, skip=existing)
+    definition = SET_TYPE_DESCRIPTION + SET_LAYOUT.definition_bytes() if len(garmin_sets) else b""
+    restore_size = restore[1] - restore[0] if restore and definition else 0
+    block = fingerprint_block(fingerprint) if fingerprint is not None else b""
+    head_restore_size = head_restore[1] - head_restore[0] if head_restore and block else 0
+
+    data_size = (sum(end - start for start, end in ranges) + len(definition)
+                 + len(garmin_sets) * SET_LAYOUT.size + restore_size + len(block) + head_restore_size)
+    header_size = stream.header_size
+    buffer = bytearray(header_size + data_size + 2)
+    view = memoryview(buffer)
+
+    view[:header_size] = stream.header_bytes()
+    struct.pack_into("<I", buffer, 4, data_size)
+    if header_size == 14:
+        struct.pack_into("<H", buffer, 12, crc16(view[:12]))
+    crc = crc16(view[:header_size])
+    position = header_size
+
+    def copy(start, end):
+        nonlocal position, crc
+        length = end - start
+        view[position:position + length] = data[start:end]
+        crc = crc16(view[position:position + length], crc)
+        position += length
+
+    def write_sets():
+        nonlocal position, crc
+        block_start = position
+        view[position:position + len(definition)] = definition
+        position += len(definition)
+        for index, row in enumerate(garmin_sets):
+            SET_LAYOUT.pack_into(buffer, position, set_message_values(row, index, workout_start))
+            position += SET_LAYOUT.size
+        crc = crc16(view[block_start:position], crc)
+        if restore_size:
+            copy(*restore)
+
+    def write_fingerprint():
+        nonlocal position, crc
+        view[position:position + len(block)] = block
+        crc = crc16(view[position:position + len(block)], crc)
+        position += len(block)
+        if head_restore_size:
+            copy(*head_restore)
+
+    # (offset, writer) in file order; the fingerprint goes first at equal offsets
+    inserts = sorted([(head_at, write_fingerprint)] * bool(block) + [(insert_at, write_sets)],
+                     key=lambda insert: insert[0])
+    for start, end in ranges:
+        while inserts and inserts[0][0] < end:
+            split = max(start, inserts[0][0])
+            copy(start, split)
+            inserts.pop(0)[1]()
+            start = split
+        copy(start, end)
+    for _, write in inserts:
+        write()
+
+    struct.pack_into("<H", buffer, position, crc)
+    return buffer
+
+
+def write_enhanced_fit(source, garmin_sets, output_path, workout_start, drop_messages, fingerprint=None):
+    """
+    Encode the enhanced FIT file and write it to ``output_path``
+
+    Returns:
+        int: size of the written file in bytes
+    """
+    buffer = encode_enhanced_fit(source, garmin_sets, workout_start, drop_messages, fingerprint)
+    with open(output_path, 'wb') as f:
+        f.write(buffer)
+    return len(buffer)
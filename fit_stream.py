@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Byte-level FIT file reader for the Hevy to Garmin FIT Merger
+
+Walks the records of a FIT file without decoding them into Python objects:
+each record is reported as a byte span (offset, length, local message type,
+global message number) together with the definition that describes it. The
+encoder uses the spans to copy preserved records verbatim, and each
+definition can compile the struct layout of its data messages.
+
+See the FIT protocol description in the Garmin FIT SDK for the format.
+"""
+
+import struct
+from typing import NamedTuple
+
+
+FIT_SIGNATURE = b".FIT"
+
+# Record header bits
+COMPRESSED_HEADER = 0x80
+DEFINITION_HEADER = 0x40
+DEVELOPER_DATA_FLAG = 0x20
+LOCAL_TYPE_MASK = 0x0F
+
+# base type id -> (struct format character, size in bytes, invalid value)
+BASE_TYPES = {
+    0x00: ("B", 1, 0xFF),                   # enum
+    0x01: ("b", 1, 0x7F),                   # sint8
+    0x02: ("B", 1, 0xFF),                   # uint8
+    0x83: ("h", 2, 0x7FFF),                 # sint16
+    0x84: ("H", 2, 0xFFFF),                 # uint16
+    0x85: ("i", 4, 0x7FFFFFFF),             # sint32
+    0x86: ("I", 4, 0xFFFFFFFF),             # uint32
+    0x07: ("s", 1, b""),                    # string
+    0x88: ("f", 4, float("nan")),           # float32
+    0x89: ("d", 8, float("nan")),           # float64
+    0x0A: ("B", 1, 0x00),                   # uint8z
+    0x8B: ("H", 2, 0x0000),                 # uint16z
+    0x8C: ("I", 4, 0x00000000),             # uint32z
+    0x0D: ("B", 1, 0xFF),                   # byte
+    0x8E: ("q", 8, 0x7FFFFFFFFFFFFFFF),     # sint64
+    0x8F: ("Q", 8, 0xFFFFFFFFFFFFFFFF),     # uint64
+    0x90: ("Q", 8, 0x0000000000000000),     # uint64z
+}
+
+
+def _crc_table():
+    # FIT uses CRC-16/ARC (reflected polynomial 0xA001, initial value 0)
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC_TABLE = _crc_table()
+
+
+def crc16(data, crc=0):
+    """FIT CRC of ``data``, continuing from ``crc`` so it can be computed in pieces"""
+    table = CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+class FitFormatError(ValueError):
+    """The bytes are not a well-formed FIT file"""
+
+
+class FieldDefinition(NamedTuple):
+    number: int
+    size: int
+    base_type: int
+
+
+class Definition:
+    """One local message definition as read from (or written to) a FIT file"""
+
+    __slots__ = ("local_type", "global_number", "little_endian", "fields", "developer_fields", "data_size",
+                 "_layout")
+
+    def __init__(self, local_type, global_number, fields, developer_fields=(), little_endian=True):
+        self.local_type = local_type
+        self.global_number = global_number
+        self.little_endian = little_endian
+        self.fields = tuple(fields)
+        self.developer_fields = tuple(developer_fields)
+        self.data_size = sum(field.size for field in self.fields) + sum(field[1] for field in self.developer_fields)
+        self._layout = None
+
+    @staticmethod
+    def field_format(field):
+        """
+        struct format of one field: scalar, array of the base type, or raw bytes
+
+        Returns:
+            tuple: (format, value count) where a count above 1 is an array
+        """
+        char, base_size, _ = BASE_TYPES.get(field.base_type, ("s", 1, None))
+        if char == "s" or field.size % base_size:
+            return f"{field.size}s", 1
+        count = field.size // base_size
+        return (char, 1) if count == 1 else (f"{count}{char}", count)
+
+    def layout(self):
+        """
+        Precompiled struct of the data message body (without the record header)
+
+        Returns:
+            tuple: (struct.Struct, value count per field) where a count above 1
+            is an array field
+        """
+        if self._layout is None:
+            formats = [self.field_format(field) for field in self.fields]
+            formats += [(f"{field[1]}s", 1) for field in self.developer_fields]
+            fmt = ("<" if self.little_endian else ">") + "".join(fmt for fmt, _ in formats)
+            self._layout = (struct.Struct(fmt), [count for _, count in formats])
+        return self._layout
+
+    def to_bytes(self):
+        """Encode as a definition record (header byte included)"""
+        header = DEFINITION_HEADER | (self.local_type & LOCAL_TYPE_MASK)
+        if self.developer_fields:
+            header |= DEVELOPER_DATA_FLAG
+        body = bytearray(struct.pack("<BBB" if self.little_endian else ">BBB", header, 0,
+                                     0 if self.little_endian else 1))
+        body += struct.pack("<H" if self.little_endian else ">H", self.global_number)
+        body.append(len(self.fields))
+        for field in self.fields:
+            body += bytes((field.number, field.size, field.base_type))
+        if self.developer_fields:
+            body.append(len(self.developer_fields))
+            for field in self.developer_fields:
+                body += bytes(field)
+        return bytes(body)
+
+
+class RecordSpan(NamedTuple):
+    offset: int
+    length: int
+    local_type: int
+    global_number: int
+    is_definition: bool
+    compressed: bool
+
+
+class FitStream:
+    """
+    Header and record spans of an in-memory FIT file
+
+    Only the first FIT file of a chained file is read.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data).cast("B") if not isinstance(data, memoryview) else data
+        if len(self.data) < 12:
+            raise FitFormatError("File is too short to be a FIT file")
+        self.header_size = self.data[0]
+        if self.header_size not in (12, 14) or bytes(self.data[8:12]) != FIT_SIGNATURE:
+            raise FitFormatError("Missing FIT header")
+        self.protocol_version = self.data[1]
+        self.profile_version, self.data_size = struct.unpack_from("<HI", self.data, 2)
+        self.data_end = self.header_size + self.data_size
+        if self.data_end + 2 > len(self.data):
+            raise FitFormatError(f"Header announces {self.data_size} data bytes, file holds "
+                                 f"{len(self.data) - self.header_size - 2}")
+        self.definitions = {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def header_bytes(self):
+        return self.data[:self.header_size]
+
+    def records(self):
+        """
+        Yield (RecordSpan, Definition) for every record in the data section
+
+        Definition records yield the definition they install; data records
+        the definition currently active for their local type.
+        """
+        data = self.data
+        definitions = self.definitions = {}
+        offset, end = self.header_size, self.data_end
+        while offset < end:
+            header = data[offset]
+            if header & COMPRESSED_HEADER:
+                local_type = (header >> 5) & 0x03
+                definition = self._active(definitions, local_type, offset)
+                length = 1 + definition.data_size
+                yield RecordSpan(offset, length, local_type, definition.global_number, False, True), definition
+            elif header & DEFINITION_HEADER:
+                definition, length = self.read_definition(offset)
+                definitions[definition.local_type] = definition
+                yield RecordSpan(offset, length, definition.local_type, definition.global_number, True, False), definition
+            else:
+                local_type = header & LOCAL_TYPE_MASK
+                definition = self._active(definitions, local_type, offset)
+                length = 1 + definition.data_size
+                yield RecordSpan(offset, length, local_type, definition.global_number, False, False), definition
+            offset += length
+            if offset > end:
+                raise FitFormatError(f"Record at byte {offset - length} runs past the end of the data")
+
+    def _active(self, definitions, local_type, offset):
+        try:
+            return definitions[local_type]
+        except KeyError:
+            raise FitFormatError(f"Data record at byte {offset} uses undefined local type {local_type}") from None
+
+    def read_definition(self, offset):
+        """
+        Parse the definition record at ``offset``
+
+        Returns:
+            tuple: (Definition, record length in bytes)
+        """
+        data = self.data
+        header = data[offset]
+        if header & (COMPRESSED_HEADER | DEFINITION_HEADER) != DEFINITION_HEADER:
+            raise FitFormatError(f"No definition record at byte {offset}")
+        local_type = header & LOCAL_TYPE_MASK
+        little_endian = data[offset + 2] == 0
+        global_number = struct.unpack_from("<H" if little_endian else ">H", data, offset + 3)[0]
+        field_count = data[offset + 5]
+        position = offset + 6
+        fields = []
+        for _ in range(field_count):
+            fields.append(FieldDefinition(data[position], data[position + 1], data[position + 2]))
+            position += 3
+        developer_fields = []
+        if header & DEVELOPER_DATA_FLAG:
+            developer_count = data[position]
+            position += 1
+            for _ in range(developer_count):
+                developer_fields.append((data[position], data[position + 1], data[position + 2]))
+                position += 3
+        if position > self.data_end:
+            raise FitFormatError(f"Definition at byte {offset} runs past the end of the data")
+        return Definition(local_type, global_number, fields, developer_fields, little_endian), position - offset
+
+    def stored_crc(self):
+        return struct.unpack_from("<H", self.data, self.data_end)[0]
+
+    def check_crc(self):
+        """True if the file CRC matches the header and data bytes"""
+        return crc16(self.data[:self.data_end]) == self.stored_crc()
@@ -0,0 +1,1568 @@
+#!/usr/bin/env python3
+# Generated by generate_garmin_exercises.py from the fit_tool 0.9.14 FIT profile. Do not edit.
+"""
+Garmin exercise catalogue for the Hevy to Garmin FIT Merger
+
+CATEGORIES[category] is the FIT exercise_category name and
+EXERCISES[category][name] the exercise_name within it. DISPLAY_ORDER lists
+every (category, name) pair in the order of the sorted display names.
+"""
+
+CATEGORIES = (
+    'bench_press',  # 0
+    'calf_raise',  # 1
+    'cardio',  # 2
+    'carry',  # 3
+    'chop',  # 4
+    'core',  # 5
+    'crunch',  # 6
+    'curl',  # 7
+    'deadlift',  # 8
+    'flye',  # 9
+    'hip_raise',  # 10
+    'hip_stability',  # 11
+    'hip_swing',  # 12
+    'hyperextension',  # 13
+    'lateral_raise',  # 14
+    'leg_curl',  # 15
+    'leg_raise',  # 16
+    'lunge',  # 17
+    'olympic_lift',  # 18
+    'plank',  # 19
+    'plyo',  # 20
+    'pull_up',  # 21
+    'push_up',  # 22
+    'row',  # 23
+    'shoulder_press',  # 24
+    'shoulder_stability',  # 25
+    'shrug',  # 26
+    'sit_up',  # 27
+    'squat',  # 28
+    'total_body',  # 29
+    'triceps_extension',  # 30
+    'warm_up',  # 31
+    'run',  # 32
+)
+
+EXERCISES = (
+    (  # 0 bench_press
+        'alternating_dumbbell_chest_press_on_swiss_ball',
+        'barbell_bench_press',
+        'barbell_board_bench_press',
+        'barbell_floor_press',
+        'close_grip_barbell_bench_press',
+        'decline_dumbbell_bench_press',
+        'dumbbell_bench_press',
+        'dumbbell_floor_press',
+        'incline_barbell_bench_press',
+        'incline_dumbbell_bench_press',
+        'incline_smith_machine_bench_press',
+        'isometric_barbell_bench_press',
+        'kettlebell_chest_press',
+        'neutral_grip_dumbbell_bench_press',
+        'neutral_grip_dumbbell_incline_bench_press',
+        'one_arm_floor_press',
+        'weighted_one_arm_floor_press',
+        'partial_lockout',
+        'reverse_grip_barbell_bench_press',
+        'reverse_grip_incline_bench_press',
+        'single_arm_cable_chest_press',
+        'single_arm_dumbbell_bench_press',
+        'smith_machine_bench_press',
+        'swiss_ball_dumbbell_chest_press',
+        'triple_stop_barbell_bench_press',
+        'wide_grip_barbell_bench_press',
+        'alternating_dumbbell_chest_press',
+    ),
+    (  # 1 calf_raise
+        'n3_way_calf_raise',
+        'n3_way_weighted_calf_raise',
+        'n3_way_single_leg_calf_raise',
+        'n3_way_weighted_single_leg_calf_raise',
+        'donkey_calf_raise',
+        'weighted_donkey_calf_raise',
+        'seated_calf_raise',
+        'weighted_seated_calf_raise',
+        'seated_dumbbell_toe_raise',
+        'single_leg_bent_knee_calf_raise',
+        'weighted_single_leg_bent_knee_calf_raise',
+        'single_leg_decline_push_up',
+        'single_leg_donkey_calf_raise',
+        'weighted_single_leg_donkey_calf_raise',
+        'single_leg_hip_raise_with_knee_hold',
+        'single_leg_standing_calf_raise',
+        'single_leg_standing_dumbbell_calf_raise',
+        'standing_barbell_calf_raise',
+        'standing_calf_raise',
+        'weighted_standing_calf_raise',
+        'standing_dumbbell_calf_raise',
+    ),
+    (  # 2 cardio
+        'bob_and_weave_circle',
+        'weighted_bob_and_weave_circle',
+        'cardio_core_crawl',
+        'weighted_cardio_core_crawl',
+        'double_under',
+        'weighted_double_under',
+        'jump_rope',
+        'weighted_jump_rope',
+        'jump_rope_crossover',
+        'weighted_jump_rope_crossover',
+        'jump_rope_jog',
+        'weighted_jump_rope_jog',
+        'jumping_jacks',
+        'weighted_jumping_jacks',
+        'ski_moguls',
+        'weighted_ski_moguls',
+        'split_jacks',
+        'weighted_split_jacks',
+        'squat_jacks',
+        'weighted_squat_jacks',
+        'triple_under',
+        'weighted_triple_under',
+    ),
+    (  # 3 carry
+        'bar_holds',
+        'farmers_walk',
+        'farmers_walk_on_toes',
+        'hex_dumbbell_hold',
+        'overhead_carry',
+    ),
+    (  # 4 chop
+        'cable_pull_through',
+        'cable_rotational_lift',
+        'cable_woodchop',
+        'cross_chop_to_knee',
+        'weighted_cross_chop_to_knee',
+        'dumbbell_chop',
+        'half_kneeling_rotation',
+        'weighted_half_kneeling_rotation',
+        'half_kneeling_rotational_chop',
+        'half_kneeling_rotational_reverse_chop',
+        'half_kneeling_stability_chop',
+        'half_kneeling_stability_reverse_chop',
+        'kneeling_rotational_chop',
+        'kneeling_rotational_reverse_chop',
+        'kneeling_stability_chop',
+        'kneeling_woodchopper',
+        'medicine_ball_wood_chops',
+        'power_squat_chops',
+        'weighted_power_squat_chops',
+        'standing_rotational_chop',
+        'standing_split_rotational_chop',
+        'standing_split_rotational_reverse_chop',
+        'standing_stability_reverse_chop',
+    ),
+    (  # 5 core
+        'abs_jabs',
+        'weighted_abs_jabs',
+        'alternating_plate_reach',
+        'barbell_rollout',
+        'weighted_barbell_rollout',
+        'body_bar_oblique_twist',
+        'cable_core_press',
+        'cable_side_bend',
+        'side_bend',
+        'weighted_side_bend',
+        'crescent_circle',
+        'weighted_crescent_circle',
+        'cycling_russian_twist',
+        'weighted_cycling_russian_twist',
+        'elevated_feet_russian_twist',
+        'weighted_elevated_feet_russian_twist',
+        'half_turkish_get_up',
+        'kettlebell_windmill',
+        'kneeling_ab_wheel',
+        'weighted_kneeling_ab_wheel',
+        'modified_front_lever',
+        'open_knee_tucks',
+        'weighted_open_knee_tucks',
+        'side_abs_leg_lift',
+        'weighted_side_abs_leg_lift',
+        'swiss_ball_jackknife',
+        'weighted_swiss_ball_jackknife',
+        'swiss_ball_pike',
+        'weighted_swiss_ball_pike',
+        'swiss_ball_rollout',
+        'weighted_swiss_ball_rollout',
+        'triangle_hip_press',
+        'weighted_triangle_hip_press',
+        'trx_suspended_jackknife',
+        'weighted_trx_suspended_jackknife',
+        'u_boat',
+        'weighted_u_boat',
+        'windmill_switches',
+        'weighted_windmill_switches',
+        'alternating_slide_out',
+        'weighted_alternating_slide_out',
+        'ghd_back_extensions',
+        'weighted_ghd_back_extensions',
+        'overhead_walk',
+        'inchworm',
+        'weighted_modified_front_lever',
+        'russian_twist',
+        'abdominal_leg_rotations',
+        'arm_and_leg_extension_on_knees',
+        'bicycle',
+        'bicep_curl_with_leg_extension',
+        'cat_cow',
+        'corkscrew',
+        'criss_cross',
+        'criss_cross_with_ball',
+        'double_leg_stretch',
+        'knee_folds',
+        'lower_lift',
+        'neck_pull',
+        'pelvic_clocks',
+        'roll_over',
+        'roll_up',
+        'rolling',
+        'rowing_1',
+        'rowing_2',
+        'scissors',
+        'single_leg_circles',
+        'single_leg_stretch',
+        'snake_twist_1_and_2',
+        'swan',
+        'swimming',
+        'teaser',
+        'the_hundred',
+    ),
+    (  # 6 crunch
+        'bicycle_crunch',
+        'cable_crunch',
+        'circular_arm_crunch',
+        'crossed_arms_crunch',
+        'weighted_crossed_arms_crunch',
+        'cross_leg_reverse_crunch',
+        'weighted_cross_leg_reverse_crunch',
+        'crunch_chop',
+        'weighted_crunch_chop',
+        'double_crunch',
+        'weighted_double_crunch',
+        'elbow_to_knee_crunch',
+        'weighted_elbow_to_knee_crunch',
+        'flutter_kicks',
+        'weighted_flutter_kicks',
+        'foam_roller_reverse_crunch_on_bench',
+        'weighted_foam_roller_reverse_crunch_on_bench',
+        'foam_roller_reverse_crunch_with_dumbbell',
+        'foam_roller_reverse_crunch_with_medicine_ball',
+        'frog_press',
+        'hanging_knee_raise_oblique_crunch',
+        'weighted_hanging_knee_raise_oblique_crunch',
+        'hip_crossover',
+        'weighted_hip_crossover',
+        'hollow_rock',
+        'weighted_hollow_rock',
+        'incline_reverse_crunch',
+        'weighted_incline_reverse_crunch',
+        'kneeling_cable_crunch',
+        'kneeling_cross_crunch',
+        'weighted_kneeling_cross_crunch',
+        'kneeling_oblique_cable_crunch',
+        'knees_to_elbow',
+        'leg_extensions',
+        'weighted_leg_extensions',
+        'leg_levers',
+        'mcgill_curl_up',
+        'weighted_mcgill_curl_up',
+        'modified_pilates_roll_up_with_ball',
+        'weighted_modified_pilates_roll_up_with_ball',
+        'pilates_crunch',
+        'weighted_pilates_crunch',
+        'pilates_roll_up_with_ball',
+        'weighted_pilates_roll_up_with_ball',
+        'raised_legs_crunch',
+        'weighted_raised_legs_crunch',
+        'reverse_crunch',
+        'weighted_reverse_crunch',
+        'reverse_crunch_on_a_bench',
+        'weighted_reverse_crunch_on_a_bench',
+        'reverse_curl_and_lift',
+        'weighted_reverse_curl_and_lift',
+        'rotational_lift',
+        'weighted_rotational_lift',
+        'seated_alternating_reverse_crunch',
+        'weighted_seated_alternating_reverse_crunch',
+        'seated_leg_u',
+        'weighted_seated_leg_u',
+        'side_to_side_crunch_and_weave',
+        'weighted_side_to_side_crunch_and_weave',
+        'single_leg_reverse_crunch',
+        'weighted_single_leg_reverse_crunch',
+        'skater_crunch_cross',
+        'weighted_skater_crunch_cross',
+        'standing_cable_crunch',
+        'standing_side_crunch',
+        'step_climb',
+        'weighted_step_climb',
+        'swiss_ball_crunch',
+        'swiss_ball_reverse_crunch',
+        'weighted_swiss_ball_reverse_crunch',
+        'swiss_ball_russian_twist',
+        'weighted_swiss_ball_russian_twist',
+        'swiss_ball_side_crunch',
+        'weighted_swiss_ball_side_crunch',
+        'thoracic_crunches_on_foam_roller',
+        'weighted_thoracic_crunches_on_foam_roller',
+        'triceps_crunch',
+        'weighted_bicycle_crunch',
+        'weighted_crunch',
+        'weighted_swiss_ball_crunch',
+        'toes_to_bar',
+        'weighted_toes_to_bar',
+        'crunch',
+        'straight_leg_crunch_with_ball',
+    ),
+    (  # 7 curl
+        'alternating_dumbbell_biceps_curl',
+        'alternating_dumbbell_biceps_curl_on_swiss_ball',
+        'alternating_incline_dumbbell_biceps_curl',
+        'barbell_biceps_curl',
+        'barbell_reverse_wrist_curl',
+        'barbell_wrist_curl',
+        'behind_the_back_barbell_reverse_wrist_curl',
+        'behind_the_back_one_arm_cable_curl',
+        'cable_biceps_curl',
+        'cable_hammer_curl',
+        'cheating_barbell_biceps_curl',
+        'close_grip_ez_bar_biceps_curl',
+        'cross_body_dumbbell_hammer_curl',
+        'dead_hang_biceps_curl',
+        'decline_hammer_curl',
+        'dumbbell_biceps_curl_with_static_hold',
+        'dumbbell_hammer_curl',
+        'dumbbell_reverse_wrist_curl',
+        'dumbbell_wrist_curl',
+        'ez_bar_preacher_curl',
+        'forward_bend_biceps_curl',
+        'hammer_curl_to_press',
+        'incline_dumbbell_biceps_curl',
+        'incline_offset_thumb_dumbbell_curl',
+        'kettlebell_biceps_curl',
+        'lying_concentration_cable_curl',
+        'one_arm_preacher_curl',
+        'plate_pinch_curl',
+        'preacher_curl_with_cable',
+        'reverse_ez_bar_curl',
+        'reverse_grip_wrist_curl',
+        'reverse_grip_barbell_biceps_curl',
+        'seated_alternating_dumbbell_biceps_curl',
+        'seated_dumbbell_biceps_curl',
+        'seated_reverse_dumbbell_curl',
+        'split_stance_offset_pinky_dumbbell_curl',
+        'standing_alternating_dumbbell_curls',
+        'standing_dumbbell_biceps_curl',
+        'standing_ez_bar_biceps_curl',
+        'static_curl',
+        'swiss_ball_dumbbell_overhead_triceps_extension',
+        'swiss_ball_ez_bar_preacher_curl',
+        'twisting_standing_dumbbell_biceps_curl',
+        'wide_grip_ez_bar_biceps_curl',
+    ),
+    (  # 8 deadlift
+        'barbell_deadlift',
+        'barbell_straight_leg_deadlift',
+        'dumbbell_deadlift',
+        'dumbbell_single_leg_deadlift_to_row',
+        'dumbbell_straight_leg_deadlift',
+        'kettlebell_floor_to_shelf',
+        'one_arm_one_leg_deadlift',
+        'rack_pull',
+        'rotational_dumbbell_straight_leg_deadlift',
+        'single_arm_deadlift',
+        'single_leg_barbell_deadlift',
+        'single_leg_barbell_straight_leg_deadlift',
+        'single_leg_deadlift_with_barbell',
+        'single_leg_rdl_circuit',
+        'single_leg_romanian_deadlift_with_dumbbell',
+        'sumo_deadlift',
+        'sumo_deadlift_high_pull',
+        'trap_bar_deadlift',
+        'wide_grip_barbell_deadlift',
+    ),
+    (  # 9 flye
+        'cable_crossover',
+        'decline_dumbbell_flye',
+        'dumbbell_flye',
+        'incline_dumbbell_flye',
+        'kettlebell_flye',
+        'kneeling_rear_flye',
+        'single_arm_standing_cable_reverse_flye',
+        'swiss_ball_dumbbell_flye',
+        'arm_rotations',
+        'hug_a_tree',
+    ),
+    (  # 10 hip_raise
+        'barbell_hip_thrust_on_floor',
+        'barbell_hip_thrust_with_bench',
+        'bent_knee_swiss_ball_reverse_hip_raise',
+        'weighted_bent_knee_swiss_ball_reverse_hip_raise',
+        'bridge_with_leg_extension',
+        'weighted_bridge_with_leg_extension',
+        'clam_bridge',
+        'front_kick_tabletop',
+        'weighted_front_kick_tabletop',
+        'hip_extension_and_cross',
+        'weighted_hip_extension_and_cross',
+        'hip_raise',
+        'weighted_hip_raise',
+        'hip_raise_with_feet_on_swiss_ball',
+        'weighted_hip_raise_with_feet_on_swiss_ball',
+        'hip_raise_with_head_on_bosu_ball',
+        'weighted_hip_raise_with_head_on_bosu_ball',
+        'hip_raise_with_head_on_swiss_ball',
+        'weighted_hip_raise_with_head_on_swiss_ball',
+        'hip_raise_with_knee_squeeze',
+        'weighted_hip_raise_with_knee_squeeze',
+        'incline_rear_leg_extension',
+        'weighted_incline_rear_leg_extension',
+        'kettlebell_swing',
+        'marching_hip_raise',
+        'weighted_marching_hip_raise',
+        'marching_hip_raise_with_feet_on_a_swiss_ball',
+        'weighted_marching_hip_raise_with_feet_on_a_swiss_ball',
+        'reverse_hip_raise',
+        'weighted_reverse_hip_raise',
+        'single_leg_hip_raise',
+        'weighted_single_leg_hip_raise',
+        'single_leg_hip_raise_with_foot_on_bench',
+        'weighted_single_leg_hip_raise_with_foot_on_bench',
+        'single_leg_hip_raise_with_foot_on_bosu_ball',
+        'weighted_single_leg_hip_raise_with_foot_on_bosu_ball',
+        'single_leg_hip_raise_with_foot_on_foam_roller',
+        'weighted_single_leg_hip_raise_with_foot_on_foam_roller',
+        'single_leg_hip_raise_with_foot_on_medicine_ball',
+        'weighted_single_leg_hip_raise_with_foot_on_medicine_ball',
+        'single_leg_hip_raise_with_head_on_bosu_ball',
+        'weighted_single_leg_hip_raise_with_head_on_bosu_ball',
+        'weighted_clam_bridge',
+        'single_leg_swiss_ball_hip_raise_and_leg_curl',
+        'clams',
+        'inner_thigh_circles',
+        'inner_thigh_side_lift',
+        'leg_circles',
+        'leg_lift',
+        'leg_lift_in_external_rotation',
+    ),
+    (  # 11 hip_stability
+        'band_side_lying_leg_raise',
+        'dead_bug',
+        'weighted_dead_bug',
+        'external_hip_raise',
+        'weighted_external_hip_raise',
+        'fire_hydrant_kicks',
+        'weighted_fire_hydrant_kicks',
+        'hip_circles',
+        'weighted_hip_circles',
+        'inner_thigh_lift',
+        'weighted_inner_thigh_lift',
+        'lateral_walks_with_band_at_ankles',
+        'pretzel_side_kick',
+        'weighted_pretzel_side_kick',
+        'prone_hip_internal_rotation',
+        'weighted_prone_hip_internal_rotation',
+        'quadruped',
+        'quadruped_hip_extension',
+        'weighted_quadruped_hip_extension',
+        'quadruped_with_leg_lift',
+        'weighted_quadruped_with_leg_lift',
+        'side_lying_leg_raise',
+        'weighted_side_lying_leg_raise',
+        'sliding_hip_adduction',
+        'weighted_sliding_hip_adduction',
+        'standing_adduction',
+        'weighted_standing_adduction',
+        'standing_cable_hip_abduction',
+        'standing_hip_abduction',
+        'weighted_standing_hip_abduction',
+        'standing_rear_leg_raise',
+        'weighted_standing_rear_leg_raise',
+        'supine_hip_internal_rotation',
+        'weighted_supine_hip_internal_rotation',
+    ),
+    (  # 12 hip_swing
+        'single_arm_kettlebell_swing',
+        'single_arm_dumbbell_swing',
+        'step_out_swing',
+    ),
+    (  # 13 hyperextension
+        'back_extension_with_opposite_arm_and_leg_reach',
+        'weighted_back_extension_with_opposite_arm_and_leg_reach',
+        'base_rotations',
+        'weighted_base_rotations',
+        'bent_knee_reverse_hyperextension',
+        'weighted_bent_knee_reverse_hyperextension',
+        'hollow_hold_and_roll',
+        'weighted_hollow_hold_and_roll',
+        'kicks',
+        'weighted_kicks',
+        'knee_raises',
+        'weighted_knee_raises',
+        'kneeling_superman',
+        'weighted_kneeling_superman',
+        'lat_pull_down_with_row',
+        'medicine_ball_deadlift_to_reach',
+        'one_arm_one_leg_row',
+        'one_arm_row_with_band',
+        'overhead_lunge_with_medicine_ball',
+        'plank_knee_tucks',
+        'weighted_plank_knee_tucks',
+        'side_step',
+        'weighted_side_step',
+        'single_leg_back_extension',
+        'weighted_single_leg_back_extension',
+        'spine_extension',
+        'weighted_spine_extension',
+        'static_back_extension',
+        'weighted_static_back_extension',
+        'superman_from_floor',
+        'weighted_superman_from_floor',
+        'swiss_ball_back_extension',
+        'weighted_swiss_ball_back_extension',
+        'swiss_ball_hyperextension',
+        'weighted_swiss_ball_hyperextension',
+        'swiss_ball_opposite_arm_and_leg_lift',
+        'weighted_swiss_ball_opposite_arm_and_leg_lift',
+        'superman_on_swiss_ball',
+        'cobra',
+        'supine_floor_barre',
+    ),
+    (  # 14 lateral_raise
+        'n45_degree_cable_external_rotation',
+        'alternating_lateral_raise_with_static_hold',
+        'bar_muscle_up',
+        'bent_over_lateral_raise',
+        'cable_diagonal_raise',
+        'cable_front_raise',
+        'calorie_row',
+        'combo_shoulder_raise',
+        'dumbbell_diagonal_raise',
+        'dumbbell_v_raise',
+        'front_raise',
+        'leaning_dumbbell_lateral_raise',
+        'lying_dumbbell_raise',
+        'muscle_up',
+        'one_arm_cable_lateral_raise',
+        'overhand_grip_rear_lateral_raise',
+        'plate_raises',
+        'ring_dip',
+        'weighted_ring_dip',
+        'ring_muscle_up',
+        'weighted_ring_muscle_up',
+        'rope_climb',
+        'weighted_rope_climb',
+        'scaption',
+        'seated_lateral_raise',
+        'seated_rear_lateral_raise',
+        'side_lying_lateral_raise',
+        'standing_lift',
+        'suspended_row',
+        'underhand_grip_rear_lateral_raise',
+        'wall_slide',
+        'weighted_wall_slide',
+        'arm_circles',
+        'shaving_the_head',
+    ),
+    (  # 15 leg_curl
+        'leg_curl',
+        'weighted_leg_curl',
+        'good_morning',
+        'seated_barbell_good_morning',
+        'single_leg_barbell_good_morning',
+        'single_leg_sliding_leg_curl',
+        'sliding_leg_curl',
+        'split_barbell_good_morning',
+        'split_stance_extension',
+        'staggered_stance_good_morning',
+        'swiss_ball_hip_raise_and_leg_curl',
+        'zercher_good_morning',
+    ),
+    (  # 16 leg_raise
+        'hanging_knee_raise',
+        'hanging_leg_raise',
+        'weighted_hanging_leg_raise',
+        'hanging_single_leg_raise',
+        'weighted_hanging_single_leg_raise',
+        'kettlebell_leg_raises',
+        'leg_lowering_drill',
+        'weighted_leg_lowering_drill',
+        'lying_straight_leg_raise',
+        'weighted_lying_straight_leg_raise',
+        'medicine_ball_leg_drops',
+        'quadruped_leg_raise',
+        'weighted_quadruped_leg_raise',
+        'reverse_leg_raise',
+        'weighted_reverse_leg_raise',
+        'reverse_leg_raise_on_swiss_ball',
+        'weighted_reverse_leg_raise_on_swiss_ball',
+        'single_leg_lowering_drill',
+        'weighted_single_leg_lowering_drill',
+        'weighted_hanging_knee_raise',
+        'lateral_stepover',
+        'weighted_lateral_stepover',
+    ),
+    (  # 17 lunge
+        'overhead_lunge',
+        'lunge_matrix',
+        'weighted_lunge_matrix',
+        'alternating_barbell_forward_lunge',
+        'alternating_dumbbell_lunge_with_reach',
+        'back_foot_elevated_dumbbell_split_squat',
+        'barbell_box_lunge',
+        'barbell_bulgarian_split_squat',
+        'barbell_crossover_lunge',
+        'barbell_front_split_squat',
+        'barbell_lunge',
+        'barbell_reverse_lunge',
+        'barbell_side_lunge',
+        'barbell_split_squat',
+        'core_control_rear_lunge',
+        'diagonal_lunge',
+        'drop_lunge',
+        'dumbbell_box_lunge',
+        'dumbbell_bulgarian_split_squat',
+        'dumbbell_crossover_lunge',
+        'dumbbell_diagonal_lunge',
+        'dumbbell_lunge',
+        'dumbbell_lunge_and_rotation',
+        'dumbbell_overhead_bulgarian_split_squat',
+        'dumbbell_reverse_lunge_to_high_knee_and_press',
+        'dumbbell_side_lunge',
+        'elevated_front_foot_barbell_split_squat',
+        'front_foot_elevated_dumbbell_split_squat',
+        'gunslinger_lunge',
+        'lawnmower_lunge',
+        'low_lunge_with_isometric_adduction',
+        'low_side_to_side_lunge',
+        'lunge',
+        'weighted_lunge',
+        'lunge_with_arm_reach',
+        'lunge_with_diagonal_reach',
+        'lunge_with_side_bend',
+        'offset_dumbbell_lunge',
+        'offset_dumbbell_reverse_lunge',
+        'overhead_bulgarian_split_squat',
+        'overhead_dumbbell_reverse_lunge',
+        'overhead_dumbbell_split_squat',
+        'overhead_lunge_with_rotation',
+        'reverse_barbell_box_lunge',
+        'reverse_box_lunge',
+        'reverse_dumbbell_box_lunge',
+        'reverse_dumbbell_crossover_lunge',
+        'reverse_dumbbell_diagonal_lunge',
+        'reverse_lunge_with_reach_back',
+        'weighted_reverse_lunge_with_reach_back',
+        'reverse_lunge_with_twist_and_overhead_reach',
+        'weighted_reverse_lunge_with_twist_and_overhead_reach',
+        'reverse_sliding_box_lunge',
+        'weighted_reverse_sliding_box_lunge',
+        'reverse_sliding_lunge',
+        'weighted_reverse_sliding_lunge',
+        'runners_lunge_to_balance',
+        'weighted_runners_lunge_to_balance',
+        'shifting_side_lunge',
+        'side_and_crossover_lunge',
+        'weighted_side_and_crossover_lunge',
+        'side_lunge',
+        'weighted_side_lunge',
+        'side_lunge_and_press',
+        'side_lunge_jump_off',
+        'side_lunge_sweep',
+        'weighted_side_lunge_sweep',
+        'side_lunge_to_crossover_tap',
+        'weighted_side_lunge_to_crossover_tap',
+        'side_to_side_lunge_chops',
+        'weighted_side_to_side_lunge_chops',
+        'siff_jump_lunge',
+        'weighted_siff_jump_lunge',
+        'single_arm_reverse_lunge_and_press',
+        'sliding_lateral_lunge',
+        'weighted_sliding_lateral_lunge',
+        'walking_barbell_lunge',
+        'walking_dumbbell_lunge',
+        'walking_lunge',
+        'weighted_walking_lunge',
+        'wide_grip_overhead_barbell_split_squat',
+    ),
+    (  # 18 olympic_lift
+        'barbell_hang_power_clean',
+        'barbell_hang_squat_clean',
+        'barbell_power_clean',
+        'barbell_power_snatch',
+        'barbell_squat_clean',
+        'clean_and_jerk',
+        'barbell_hang_power_snatch',
+        'barbell_hang_pull',
+        'barbell_high_pull',
+        'barbell_snatch',
+        'barbell_split_jerk',
+        'clean',
+        'dumbbell_clean',
+        'dumbbell_hang_pull',
+        'one_hand_dumbbell_split_snatch',
+        'push_jerk',
+        'single_arm_dumbbell_snatch',
+        'single_arm_hang_snatch',
+        'single_arm_kettlebell_snatch',
+        'split_jerk',
+        'squat_clean_and_jerk',
+    ),
+    (  # 19 plank
+        'n45_degree_plank',
+        'weighted_45_degree_plank',
+        'n90_degree_static_hold',
+        'weighted_90_degree_static_hold',
+        'bear_crawl',
+        'weighted_bear_crawl',
+        'cross_body_mountain_climber',
+        'weighted_cross_body_mountain_climber',
+        'elbow_plank_pike_jacks',
+        'weighted_elbow_plank_pike_jacks',
+        'elevated_feet_plank',
+        'weighted_elevated_feet_plank',
+        'elevator_abs',
+        'weighted_elevator_abs',
+        'extended_plank',
+        'weighted_extended_plank',
+        'full_plank_passe_twist',
+        'weighted_full_plank_passe_twist',
+        'inching_elbow_plank',
+        'weighted_inching_elbow_plank',
+        'inchworm_to_side_plank',
+        'weighted_inchworm_to_side_plank',
+        'kneeling_plank',
+        'weighted_kneeling_plank',
+        'kneeling_side_plank_with_leg_lift',
+        'weighted_kneeling_side_plank_with_leg_lift',
+        'lateral_roll',
+        'weighted_lateral_roll',
+        'lying_reverse_plank',
+        'weighted_lying_reverse_plank',
+        'medicine_ball_mountain_climber',
+        'weighted_medicine_ball_mountain_climber',
+        'modified_mountain_climber_and_extension',
+        'weighted_modified_mountain_climber_and_extension',
+        'mountain_climber',
+        'weighted_mountain_climber',
+        'mountain_climber_on_sliding_discs',
+        'weighted_mountain_climber_on_sliding_discs',
+        'mountain_climber_with_feet_on_bosu_ball',
+        'weighted_mountain_climber_with_feet_on_bosu_ball',
+        'mountain_climber_with_hands_on_bench',
+        'mountain_climber_with_hands_on_swiss_ball',
+        'weighted_mountain_climber_with_hands_on_swiss_ball',
+        'plank',
+        'plank_jacks_with_feet_on_sliding_discs',
+        'weighted_plank_jacks_with_feet_on_sliding_discs',
+        'plank_knee_twist',
+        'weighted_plank_knee_twist',
+        'plank_pike_jumps',
+        'weighted_plank_pike_jumps',
+        'plank_pikes',
+        'weighted_plank_pikes',
+        'plank_to_stand_up',
+        'weighted_plank_to_stand_up',
+        'plank_with_arm_raise',
+        'weighted_plank_with_arm_raise',
+        'plank_with_knee_to_elbow',
+        'weighted_plank_with_knee_to_elbow',
+        'plank_with_oblique_crunch',
+        'weighted_plank_with_oblique_crunch',
+        'plyometric_side_plank',
+        'weighted_plyometric_side_plank',
+        'rolling_side_plank',
+        'weighted_rolling_side_plank',
+        'side_kick_plank',
+        'weighted_side_kick_plank',
+        'side_plank',
+        'weighted_side_plank',
+        'side_plank_and_row',
+        'weighted_side_plank_and_row',
+        'side_plank_lift',
+        'weighted_side_plank_lift',
+        'side_plank_with_elbow_on_bosu_ball',
+        'weighted_side_plank_with_elbow_on_bosu_ball',
+        'side_plank_with_feet_on_bench',
+        'weighted_side_plank_with_feet_on_bench',
+        'side_plank_with_knee_circle',
+        'weighted_side_plank_with_knee_circle',
+        'side_plank_with_knee_tuck',
+        'weighted_side_plank_with_knee_tuck',
+        'side_plank_with_leg_lift',
+        'weighted_side_plank_with_leg_lift',
+        'side_plank_with_reach_under',
+        'weighted_side_plank_with_reach_under',
+        'single_leg_elevated_feet_plank',
+        'weighted_single_leg_elevated_feet_plank',
+        'single_leg_flex_and_extend',
+        'weighted_single_leg_flex_and_extend',
+        'single_leg_side_plank',
+        'weighted_single_leg_side_plank',
+        'spiderman_plank',
+        'weighted_spiderman_plank',
+        'straight_arm_plank',
+        'weighted_straight_arm_plank',
+        'straight_arm_plank_with_shoulder_touch',
+        'weighted_straight_arm_plank_with_shoulder_touch',
+        'swiss_ball_plank',
+        'weighted_swiss_ball_plank',
+        'swiss_ball_plank_leg_lift',
+        'weighted_swiss_ball_plank_leg_lift',
+        'swiss_ball_plank_leg_lift_and_hold',
+        'swiss_ball_plank_with_feet_on_bench',
+        'weighted_swiss_ball_plank_with_feet_on_bench',
+        'swiss_ball_prone_jackknife',
+        'weighted_swiss_ball_prone_jackknife',
+        'swiss_ball_side_plank',
+        'weighted_swiss_ball_side_plank',
+        'three_way_plank',
+        'weighted_three_way_plank',
+        'towel_plank_and_knee_in',
+        'weighted_towel_plank_and_knee_in',
+        't_stabilization',
+        'weighted_t_stabilization',
+        'turkish_get_up_to_side_plank',
+        'weighted_turkish_get_up_to_side_plank',
+        'two_point_plank',
+        'weighted_two_point_plank',
+        'weighted_plank',
+        'wide_stance_plank_with_diagonal_arm_lift',
+        'weighted_wide_stance_plank_with_diagonal_arm_lift',
+        'wide_stance_plank_with_diagonal_leg_lift',
+        'weighted_wide_stance_plank_with_diagonal_leg_lift',
+        'wide_stance_plank_with_leg_lift',
+        'weighted_wide_stance_plank_with_leg_lift',
+        'wide_stance_plank_with_opposite_arm_and_leg_lift',
+        'weighted_mountain_climber_with_hands_on_bench',
+        'weighted_swiss_ball_plank_leg_lift_and_hold',
+        'weighted_wide_stance_plank_with_opposite_arm_and_leg_lift',
+        'plank_with_feet_on_swiss_ball',
+        'side_plank_to_plank_with_reach_under',
+        'bridge_with_glute_lower_lift',
+        'bridge_one_leg_bridge',
+        'plank_with_arm_variations',
+        'plank_with_leg_lift',
+        'reverse_plank_with_leg_pull',
+    ),
+    (  # 20 plyo
+        'alternating_jump_lunge',
+        'weighted_alternating_jump_lunge',
+        'barbell_jump_squat',
+        'body_weight_jump_squat',
+        'weighted_jump_squat',
+        'cross_knee_strike',
+        'weighted_cross_knee_strike',
+        'depth_jump',
+        'weighted_depth_jump',
+        'dumbbell_jump_squat',
+        'dumbbell_split_jump',
+        'front_knee_strike',
+        'weighted_front_knee_strike',
+        'high_box_jump',
+        'weighted_high_box_jump',
+        'isometric_explosive_body_weight_jump_squat',
+        'weighted_isometric_explosive_jump_squat',
+        'lateral_leap_and_hop',
+        'weighted_lateral_leap_and_hop',
+        'lateral_plyo_squats',
+        'weighted_lateral_plyo_squats',
+        'lateral_slide',
+        'weighted_lateral_slide',
+        'medicine_ball_overhead_throws',
+        'medicine_ball_side_throw',
+        'medicine_ball_slam',
+        'side_to_side_medicine_ball_throws',
+        'side_to_side_shuffle_jump',
+        'weighted_side_to_side_shuffle_jump',
+        'squat_jump_onto_box',
+        'weighted_squat_jump_onto_box',
+        'squat_jumps_in_and_out',
+        'weighted_squat_jumps_in_and_out',
+    ),
+    (  # 21 pull_up
+        'banded_pull_ups',
+        'n30_degree_lat_pulldown',
+        'band_assisted_chin_up',
+        'close_grip_chin_up',
+        'weighted_close_grip_chin_up',
+        'close_grip_lat_pulldown',
+        'crossover_chin_up',
+        'weighted_crossover_chin_up',
+        'ez_bar_pullover',
+        'hanging_hurdle',
+        'weighted_hanging_hurdle',
+        'kneeling_lat_pulldown',
+        'kneeling_underhand_grip_lat_pulldown',
+        'lat_pulldown',
+        'mixed_grip_chin_up',
+        'weighted_mixed_grip_chin_up',
+        'mixed_grip_pull_up',
+        'weighted_mixed_grip_pull_up',
+        'reverse_grip_pulldown',
+        'standing_cable_pullover',
+        'straight_arm_pulldown',
+        'swiss_ball_ez_bar_pullover',
+        'towel_pull_up',
+        'weighted_towel_pull_up',
+        'weighted_pull_up',
+        'wide_grip_lat_pulldown',
+        'wide_grip_pull_up',
+        'weighted_wide_grip_pull_up',
+        'burpee_pull_up',
+        'weighted_burpee_pull_up',
+        'jumping_pull_ups',
+        'weighted_jumping_pull_ups',
+        'kipping_pull_up',
+        'weighted_kipping_pull_up',
+        'l_pull_up',
+        'weighted_l_pull_up',
+        'suspended_chin_up',
+        'weighted_suspended_chin_up',
+        'pull_up',
+    ),
+    (  # 22 push_up
+        'chest_press_with_band',
+        'alternating_staggered_push_up',
+        'weighted_alternating_staggered_push_up',
+        'alternating_hands_medicine_ball_push_up',
+        'weighted_alternating_hands_medicine_ball_push_up',
+        'bosu_ball_push_up',
+        'weighted_bosu_ball_push_up',
+        'clapping_push_up',
+        'weighted_clapping_push_up',
+        'close_grip_medicine_ball_push_up',
+        'weighted_close_grip_medicine_ball_push_up',
+        'close_hands_push_up',
+        'weighted_close_hands_push_up',
+        'decline_push_up',
+        'weighted_decline_push_up',
+        'diamond_push_up',
+        'weighted_diamond_push_up',
+        'explosive_crossover_push_up',
+        'weighted_explosive_crossover_push_up',
+        'explosive_push_up',
+        'weighted_explosive_push_up',
+        'feet_elevated_side_to_side_push_up',
+        'weighted_feet_elevated_side_to_side_push_up',
+        'hand_release_push_up',
+        'weighted_hand_release_push_up',
+        'handstand_push_up',
+        'weighted_handstand_push_up',
+        'incline_push_up',
+        'weighted_incline_push_up',
+        'isometric_explosive_push_up',
+        'weighted_isometric_explosive_push_up',
+        'judo_push_up',
+        'weighted_judo_push_up',
+        'kneeling_push_up',
+        'weighted_kneeling_push_up',
+        'medicine_ball_chest_pass',
+        'medicine_ball_push_up',
+        'weighted_medicine_ball_push_up',
+        'one_arm_push_up',
+        'weighted_one_arm_push_up',
+        'weighted_push_up',
+        'push_up_and_row',
+        'weighted_push_up_and_row',
+        'push_up_plus',
+        'weighted_push_up_plus',
+        'push_up_with_feet_on_swiss_ball',
+        'weighted_push_up_with_feet_on_swiss_ball',
+        'push_up_with_one_hand_on_medicine_ball',
+        'weighted_push_up_with_one_hand_on_medicine_ball',
+        'shoulder_push_up',
+        'weighted_shoulder_push_up',
+        'single_arm_medicine_ball_push_up',
+        'weighted_single_arm_medicine_ball_push_up',
+        'spiderman_push_up',
+        'weighted_spiderman_push_up',
+        'stacked_feet_push_up',
+        'weighted_stacked_feet_push_up',
+        'staggered_hands_push_up',
+        'weighted_staggered_hands_push_up',
+        'suspended_push_up',
+        'weighted_suspended_push_up',
+        'swiss_ball_push_up',
+        'weighted_swiss_ball_push_up',
+        'swiss_ball_push_up_plus',
+        'weighted_swiss_ball_push_up_plus',
+        't_push_up',
+        'weighted_t_push_up',
+        'triple_stop_push_up',
+        'weighted_triple_stop_push_up',
+        'wide_hands_push_up',
+        'weighted_wide_hands_push_up',
+        'parallette_handstand_push_up',
+        'weighted_parallette_handstand_push_up',
+        'ring_handstand_push_up',
+        'weighted_ring_handstand_push_up',
+        'ring_push_up',
+        'weighted_ring_push_up',
+        'push_up',
+        'pilates_pushup',
+    ),
+    (  # 23 row
+        'barbell_straight_leg_deadlift_to_row',
+        'cable_row_standing',
+        'dumbbell_row',
+        'elevated_feet_inverted_row',
+        'weighted_elevated_feet_inverted_row',
+        'face_pull',
+        'face_pull_with_external_rotation',
+        'inverted_row_with_feet_on_swiss_ball',
+        'weighted_inverted_row_with_feet_on_swiss_ball',
+        'kettlebell_row',
+        'modified_inverted_row',
+        'weighted_modified_inverted_row',
+        'neutral_grip_alternating_dumbbell_row',
+        'one_arm_bent_over_row',
+        'one_legged_dumbbell_row',
+        'renegade_row',
+        'reverse_grip_barbell_row',
+        'rope_handle_cable_row',
+        'seated_cable_row',
+        'seated_dumbbell_row',
+        'single_arm_cable_row',
+        'single_arm_cable_row_and_rotation',
+        'single_arm_inverted_row',
+        'weighted_single_arm_inverted_row',
+        'single_arm_neutral_grip_dumbbell_row',
+        'single_arm_neutral_grip_dumbbell_row_and_rotation',
+        'suspended_inverted_row',
+        'weighted_suspended_inverted_row',
+        't_bar_row',
+        'towel_grip_inverted_row',
+        'weighted_towel_grip_inverted_row',
+        'underhand_grip_cable_row',
+        'v_grip_cable_row',
+        'wide_grip_seated_cable_row',
+    ),
+    (  # 24 shoulder_press
+        'alternating_dumbbell_shoulder_press',
+        'arnold_press',
+        'barbell_front_squat_to_push_press',
+        'barbell_push_press',
+        'barbell_shoulder_press',
+        'dead_curl_press',
+        'dumbbell_alternating_shoulder_press_and_twist',
+        'dumbbell_hammer_curl_to_lunge_to_press',
+        'dumbbell_push_press',
+        'floor_inverted_shoulder_press',
+        'weighted_floor_inverted_shoulder_press',
+        'inverted_shoulder_press',
+        'weighted_inverted_shoulder_press',
+        'one_arm_push_press',
+        'overhead_barbell_press',
+        'overhead_dumbbell_press',
+        'seated_barbell_shoulder_press',
+        'seated_dumbbell_shoulder_press',
+        'single_arm_dumbbell_shoulder_press',
+        'single_arm_step_up_and_press',
+        'smith_machine_overhead_press',
+        'split_stance_hammer_curl_to_press',
+        'swiss_ball_dumbbell_shoulder_press',
+        'weight_plate_front_raise',
+    ),
+    (  # 25 shoulder_stability
+        'n90_degree_cable_external_rotation',
+        'band_external_rotation',
+        'band_internal_rotation',
+        'bent_arm_lateral_raise_and_external_rotation',
+        'cable_external_rotation',
+        'dumbbell_face_pull_with_external_rotation',
+        'floor_i_raise',
+        'weighted_floor_i_raise',
+        'floor_t_raise',
+        'weighted_floor_t_raise',
+        'floor_y_raise',
+        'weighted_floor_y_raise',
+        'incline_i_raise',
+        'weighted_incline_i_raise',
+        'incline_l_raise',
+        'weighted_incline_l_raise',
+        'incline_t_raise',
+        'weighted_incline_t_raise',
+        'incline_w_raise',
+        'weighted_incline_w_raise',
+        'incline_y_raise',
+        'weighted_incline_y_raise',
+        'lying_external_rotation',
+        'seated_dumbbell_external_rotation',
+        'standing_l_raise',
+        'swiss_ball_i_raise',
+        'weighted_swiss_ball_i_raise',
+        'swiss_ball_t_raise',
+        'weighted_swiss_ball_t_raise',
+        'swiss_ball_w_raise',
+        'weighted_swiss_ball_w_raise',
+        'swiss_ball_y_raise',
+        'weighted_swiss_ball_y_raise',
+    ),
+    (  # 26 shrug
+        'barbell_jump_shrug',
+        'barbell_shrug',
+        'barbell_upright_row',
+        'behind_the_back_smith_machine_shrug',
+        'dumbbell_jump_shrug',
+        'dumbbell_shrug',
+        'dumbbell_upright_row',
+        'incline_dumbbell_shrug',
+        'overhead_barbell_shrug',
+        'overhead_dumbbell_shrug',
+        'scaption_and_shrug',
+        'scapular_retraction',
+        'serratus_chair_shrug',
+        'weighted_serratus_chair_shrug',
+        'serratus_shrug',
+        'weighted_serratus_shrug',
+        'wide_grip_jump_shrug',
+    ),
+    (  # 27 sit_up
+        'alternating_sit_up',
+        'weighted_alternating_sit_up',
+        'bent_knee_v_up',
+        'weighted_bent_knee_v_up',
+        'butterfly_sit_up',
+        'weighted_butterfly_situp',
+        'cross_punch_roll_up',
+        'weighted_cross_punch_roll_up',
+        'crossed_arms_sit_up',
+        'weighted_crossed_arms_sit_up',
+        'get_up_sit_up',
+        'weighted_get_up_sit_up',
+        'hovering_sit_up',
+        'weighted_hovering_sit_up',
+        'kettlebell_sit_up',
+        'medicine_ball_alternating_v_up',
+        'medicine_ball_sit_up',
+        'medicine_ball_v_up',
+        'modified_sit_up',
+        'negative_sit_up',
+        'one_arm_full_sit_up',
+        'reclining_circle',
+        'weighted_reclining_circle',
+        'reverse_curl_up',
+        'weighted_reverse_curl_up',
+        'single_leg_swiss_ball_jackknife',
+        'weighted_single_leg_swiss_ball_jackknife',
+        'the_teaser',
+        'the_teaser_weighted',
+        'three_part_roll_down',
+        'weighted_three_part_roll_down',
+        'v_up',
+        'weighted_v_up',
+        'weighted_russian_twist_on_swiss_ball',
+        'weighted_sit_up',
+        'x_abs',
+        'weighted_x_abs',
+        'sit_up',
+    ),
+    (  # 28 squat
+        'leg_press',
+        'back_squat_with_body_bar',
+        'back_squats',
+        'weighted_back_squats',
+        'balancing_squat',
+        'weighted_balancing_squat',
+        'barbell_back_squat',
+        'barbell_box_squat',
+        'barbell_front_squat',
+        'barbell_hack_squat',
+        'barbell_hang_squat_snatch',
+        'barbell_lateral_step_up',
+        'barbell_quarter_squat',
+        'barbell_siff_squat',
+        'barbell_squat_snatch',
+        'barbell_squat_with_heels_raised',
+        'barbell_stepover',
+        'barbell_step_up',
+        'bench_squat_with_rotational_chop',
+        'weighted_bench_squat_with_rotational_chop',
+        'body_weight_wall_squat',
+        'weighted_wall_squat',
+        'box_step_squat',
+        'weighted_box_step_squat',
+        'braced_squat',
+        'crossed_arm_barbell_front_squat',
+        'crossover_dumbbell_step_up',
+        'dumbbell_front_squat',
+        'dumbbell_split_squat',
+        'dumbbell_squat',
+        'dumbbell_squat_clean',
+        'dumbbell_stepover',
+        'dumbbell_step_up',
+        'elevated_single_leg_squat',
+        'weighted_elevated_single_leg_squat',
+        'figure_four_squats',
+        'weighted_figure_four_squats',
+        'goblet_squat',
+        'kettlebell_squat',
+        'kettlebell_swing_overhead',
+        'kettlebell_swing_with_flip_to_squat',
+        'lateral_dumbbell_step_up',
+        'one_legged_squat',
+        'overhead_dumbbell_squat',
+        'overhead_squat',
+        'partial_single_leg_squat',
+        'weighted_partial_single_leg_squat',
+        'pistol_squat',
+        'weighted_pistol_squat',
+        'plie_slides',
+        'weighted_plie_slides',
+        'plie_squat',
+        'weighted_plie_squat',
+        'prisoner_squat',
+        'weighted_prisoner_squat',
+        'single_leg_bench_get_up',
+        'weighted_single_leg_bench_get_up',
+        'single_leg_bench_squat',
+        'weighted_single_leg_bench_squat',
+        'single_leg_squat_on_swiss_ball',
+        'weighted_single_leg_squat_on_swiss_ball',
+        'squat',
+        'weighted_squat',
+        'squats_with_band',
+        'staggered_squat',
+        'weighted_staggered_squat',
+        'step_up',
+        'weighted_step_up',
+        'suitcase_squats',
+        'sumo_squat',
+        'sumo_squat_slide_in',
+        'weighted_sumo_squat_slide_in',
+        'sumo_squat_to_high_pull',
+        'sumo_squat_to_stand',
+        'weighted_sumo_squat_to_stand',
+        'sumo_squat_with_rotation',
+        'weighted_sumo_squat_with_rotation',
+        'swiss_ball_body_weight_wall_squat',
+        'weighted_swiss_ball_wall_squat',
+        'thrusters',
+        'uneven_squat',
+        'weighted_uneven_squat',
+        'waist_slimming_squat',
+        'wall_ball',
+        'wide_stance_barbell_squat',
+        'wide_stance_goblet_squat',
+        'zercher_squat',
+        'kbs_overhead',
+        'squat_and_side_kick',
+        'squat_jumps_in_n_out',
+        'pilates_plie_squats_parallel_turned_out_flat_and_heels',
+        'releve_straight_leg_and_knee_bent_with_one_leg_variation',
+    ),
+    (  # 29 total_body
+        'burpee',
+        'weighted_burpee',
+        'burpee_box_jump',
+        'weighted_burpee_box_jump',
+        'high_pull_burpee',
+        'man_makers',
+        'one_arm_burpee',
+        'squat_thrusts',
+        'weighted_squat_thrusts',
+        'squat_plank_push_up',
+        'weighted_squat_plank_push_up',
+        'standing_t_rotation_balance',
+        'weighted_standing_t_rotation_balance',
+    ),
+    (  # 30 triceps_extension
+        'bench_dip',
+        'weighted_bench_dip',
+        'body_weight_dip',
+        'cable_kickback',
+        'cable_lying_triceps_extension',
+        'cable_overhead_triceps_extension',
+        'dumbbell_kickback',
+        'dumbbell_lying_triceps_extension',
+        'ez_bar_overhead_triceps_extension',
+        'incline_dip',
+        'weighted_incline_dip',
+        'incline_ez_bar_lying_triceps_extension',
+        'lying_dumbbell_pullover_to_extension',
+        'lying_ez_bar_triceps_extension',
+        'lying_triceps_extension_to_close_grip_bench_press',
+        'overhead_dumbbell_triceps_extension',
+        'reclining_triceps_press',
+        'reverse_grip_pressdown',
+        'reverse_grip_triceps_pressdown',
+        'rope_pressdown',
+        'seated_barbell_overhead_triceps_extension',
+        'seated_dumbbell_overhead_triceps_extension',
+        'seated_ez_bar_overhead_triceps_extension',
+        'seated_single_arm_overhead_dumbbell_extension',
+        'single_arm_dumbbell_overhead_triceps_extension',
+        'single_dumbbell_seated_overhead_triceps_extension',
+        'single_leg_bench_dip_and_kick',
+        'weighted_single_leg_bench_dip_and_kick',
+        'single_leg_dip',
+        'weighted_single_leg_dip',
+        'static_lying_triceps_extension',
+        'suspended_dip',
+        'weighted_suspended_dip',
+        'swiss_ball_dumbbell_lying_triceps_extension',
+        'swiss_ball_ez_bar_lying_triceps_extension',
+        'swiss_ball_ez_bar_overhead_triceps_extension',
+        'tabletop_dip',
+        'weighted_tabletop_dip',
+        'triceps_extension_on_floor',
+        'triceps_pressdown',
+        'weighted_dip',
+    ),
+    (  # 31 warm_up
+        'quadruped_rocking',
+        'neck_tilts',
+        'ankle_circles',
+        'ankle_dorsiflexion_with_band',
+        'ankle_internal_rotation',
+        'arm_circles',
+        'bent_over_reach_to_sky',
+        'cat_camel',
+        'elbow_to_foot_lunge',
+        'forward_and_backward_leg_swings',
+        'groiners',
+        'inverted_hamstring_stretch',
+        'lateral_duck_under',
+        'neck_rotations',
+        'opposite_arm_and_leg_balance',
+        'reach_roll_and_lift',
+        'scorpion',
+        'shoulder_circles',
+        'side_to_side_leg_swings',
+        'sleeper_stretch',
+        'slide_out',
+        'swiss_ball_hip_crossover',
+        'swiss_ball_reach_roll_and_lift',
+        'swiss_ball_windshield_wipers',
+        'thoracic_rotation',
+        'walking_high_kicks',
+        'walking_high_knees',
+        'walking_knee_hugs',
+        'walking_leg_cradles',
+        'walkout',
+        'walkout_from_push_up_position',
+    ),
+    (  # 32 run
+        'run',
+        'walk',
+        'jog',
+        'sprint',
+    ),
+)
+
+DISPLAY_ORDER = (
+    (5, 47), (5, 0), (17, 3), (7, 0), (7, 1), (0, 26), (0, 0), (17, 4),
+    (24, 0), (22, 3), (7, 2), (20, 0), (14, 1), (5, 2), (27, 0), (5, 39),
+    (22, 1), (31, 2), (31, 3), (31, 4), (5, 48), (14, 32), (31, 5), (9, 8),
+    (24, 1), (13, 0), (17, 5), (28, 1), (28, 2), (28, 4), (21, 2), (25, 1),
+    (25, 2), (11, 0), (21, 0), (3, 0), (14, 2), (28, 6), (0, 1), (7, 3),
+    (0, 2), (17, 6), (28, 7), (17, 7), (17, 8), (8, 0), (0, 3), (17, 9),
+    (28, 8), (24, 2), (28, 9), (18, 0), (18, 6), (18, 7), (18, 1), (28, 10),
+    (18, 8), (10, 0), (10, 1), (26, 0), (20, 2), (28, 11), (17, 10), (18, 2),
+    (18, 3), (24, 3), (28, 12), (17, 11), (7, 4), (5, 3), (24, 4), (26, 1),
+    (17, 12), (28, 13), (18, 9), (18, 10), (17, 13), (18, 4), (28, 14), (28, 15),
+    (28, 17), (28, 16), (8, 1), (23, 0), (26, 2), (7, 5), (13, 2), (19, 4),
+    (7, 6), (7, 7), (26, 3), (30, 0), (28, 18), (25, 3), (13, 4), (10, 2),
+    (27, 2), (14, 3), (31, 6), (5, 50), (5, 49), (6, 0), (2, 0), (5, 5),
+    (30, 2), (20, 3), (28, 20), (22, 5), (28, 22), (28, 24), (19, 131), (19, 130),
+    (10, 4), (29, 0), (29, 2), (21, 28), (27, 4), (7, 8), (5, 6), (9, 0),
+    (6, 1), (14, 4), (25, 4), (14, 5), (7, 9), (30, 3), (30, 4), (30, 5),
+    (4, 0), (4, 1), (23, 1), (5, 7), (4, 2), (14, 6), (2, 2), (31, 7),
+    (5, 51), (7, 10), (22, 0), (6, 2), (10, 6), (10, 44), (22, 7), (18, 11),
+    (18, 5), (0, 4), (21, 3), (7, 11), (21, 5), (22, 9), (22, 11), (13, 38),
+    (14, 7), (17, 14), (5, 52), (5, 10), (5, 53), (5, 54), (7, 12), (19, 6),
+    (4, 3), (20, 5), (6, 5), (27, 6), (28, 25), (6, 3), (27, 8), (21, 6),
+    (28, 26), (6, 83), (6, 7), (5, 12), (11, 1), (24, 5), (7, 13), (0, 5),
+    (9, 1), (7, 14), (22, 13), (20, 7), (17, 15), (22, 15), (1, 4), (6, 9),
+    (5, 55), (2, 4), (17, 16), (24, 6), (0, 6), (7, 15), (17, 17), (17, 18),
+    (4, 5), (18, 12), (17, 19), (8, 2), (17, 20), (14, 8), (25, 5), (0, 7),
+    (9, 2), (28, 27), (7, 16), (24, 7), (18, 13), (26, 4), (20, 9), (30, 6),
+    (17, 21), (17, 22), (30, 7), (17, 23), (24, 8), (17, 24), (7, 17), (23, 2),
+    (26, 5), (17, 25), (8, 3), (20, 10), (28, 28), (28, 29), (28, 30), (28, 32),
+    (28, 31), (8, 4), (26, 6), (14, 9), (7, 18), (19, 8), (31, 8), (6, 11),
+    (23, 3), (19, 10), (5, 14), (17, 26), (28, 33), (19, 12), (22, 17), (22, 19),
+    (19, 14), (11, 3), (30, 8), (7, 19), (21, 8), (23, 5), (23, 6), (3, 1),
+    (3, 2), (22, 21), (28, 35), (11, 5), (25, 6), (24, 9), (25, 8), (25, 10),
+    (6, 13), (6, 15), (6, 17), (6, 18), (31, 9), (7, 20), (6, 19), (17, 27),
+    (10, 7), (20, 11), (14, 10), (19, 16), (27, 10), (5, 41), (28, 37), (15, 2),
+    (31, 10), (17, 28), (4, 6), (4, 8), (4, 9), (4, 10), (4, 11), (5, 16),
+    (7, 21), (22, 23), (22, 25), (21, 9), (16, 0), (6, 20), (16, 1), (16, 3),
+    (3, 3), (20, 13), (29, 4), (11, 7), (6, 22), (10, 9), (10, 11), (10, 13),
+    (10, 15), (10, 17), (10, 19), (13, 6), (6, 24), (27, 12), (9, 9), (19, 18),
+    (5, 44), (19, 20), (0, 8), (30, 9), (0, 9), (7, 22), (9, 3), (26, 7),
+    (30, 11), (25, 12), (25, 14), (7, 23), (22, 27), (10, 21), (6, 26), (0, 10),
+    (25, 16), (25, 18), (25, 20), (10, 45), (11, 9), (10, 46), (31, 11), (23, 7),
+    (24, 11), (0, 11), (20, 15), (22, 29), (32, 2), (22, 31), (2, 6), (2, 8),
+    (2, 10), (2, 12), (21, 30), (28, 87), (7, 24), (0, 12), (8, 5), (9, 4),
+    (16, 5), (23, 9), (27, 14), (28, 38), (10, 23), (28, 39), (28, 40), (5, 17),
+    (13, 8), (21, 32), (5, 56), (13, 10), (5, 18), (6, 28), (6, 29), (21, 11),
+    (6, 31), (19, 22), (22, 33), (9, 5), (4, 12), (4, 13), (19, 24), (4, 14),
+    (13, 12), (21, 12), (4, 15), (6, 32), (21, 34), (13, 14), (21, 13), (31, 12),
+    (28, 41), (20, 17), (20, 19), (19, 26), (20, 21), (16, 20), (11, 11), (17, 29),
+    (14, 11), (10, 47), (15, 0), (6, 33), (6, 35), (10, 48), (10, 49), (16, 6),
+    (28, 0), (17, 30), (17, 31), (5, 57), (17, 32), (17, 1), (17, 34), (17, 35),
+    (17, 36), (7, 25), (30, 12), (14, 12), (25, 22), (30, 13), (19, 28), (16, 8),
+    (30, 14), (29, 5), (10, 24), (10, 26), (6, 36), (27, 15), (22, 35), (13, 15),
+    (16, 10), (19, 30), (20, 23), (22, 36), (20, 24), (27, 16), (20, 25), (27, 17),
+    (4, 16), (21, 14), (21, 16), (5, 20), (23, 10), (19, 32), (6, 38), (27, 18),
+    (19, 34), (19, 36), (19, 38), (19, 40), (19, 41), (14, 13), (1, 0), (1, 2),
+    (1, 1), (1, 3), (21, 1), (14, 0), (19, 0), (25, 0), (19, 2), (5, 58),
+    (31, 13), (31, 1), (27, 19), (23, 12), (0, 13), (0, 14), (17, 37), (17, 38),
+    (23, 13), (29, 6), (14, 14), (0, 15), (27, 20), (8, 6), (13, 16), (7, 26),
+    (24, 13), (22, 38), (13, 17), (18, 14), (23, 14), (28, 42), (5, 21), (31, 14),
+    (14, 15), (24, 14), (26, 8), (17, 39), (3, 4), (24, 15), (17, 40), (26, 9),
+    (17, 41), (28, 43), (30, 15), (17, 0), (13, 18), (17, 42), (28, 44), (5, 43),
+    (22, 71), (0, 17), (28, 45), (5, 59), (6, 40), (28, 90), (22, 78), (6, 42),
+    (28, 47), (19, 43), (19, 44), (13, 19), (19, 46), (19, 48), (19, 50), (19, 52),
+    (19, 54), (19, 132), (19, 128), (19, 56), (19, 133), (19, 58), (7, 27), (14, 16),
+    (28, 49), (28, 51), (19, 60), (4, 17), (7, 28), (11, 12), (28, 53), (11, 14),
+    (21, 38), (18, 15), (22, 77), (22, 41), (22, 43), (22, 45), (22, 47), (11, 16),
+    (11, 17), (16, 11), (31, 0), (11, 19), (8, 7), (6, 44), (31, 15), (27, 21),
+    (30, 16), (28, 91), (23, 15), (17, 43), (17, 44), (6, 46), (6, 48), (6, 50),
+    (27, 23), (17, 45), (17, 46), (17, 47), (7, 29), (0, 18), (7, 31), (23, 16),
+    (0, 19), (30, 17), (21, 18), (30, 18), (7, 30), (10, 28), (16, 13), (16, 15),
+    (17, 48), (17, 50), (19, 134), (17, 52), (17, 54), (14, 17), (22, 73), (14, 19),
+    (22, 75), (5, 60), (5, 61), (5, 62), (19, 62), (14, 21), (23, 17), (30, 19),
+    (8, 8), (6, 52), (5, 63), (5, 64), (32, 0), (17, 56), (5, 46), (14, 23),
+    (26, 10), (26, 11), (5, 65), (31, 16), (7, 32), (6, 54), (15, 3), (30, 20),
+    (24, 16), (23, 18), (1, 6), (7, 33), (25, 23), (30, 21), (23, 19), (24, 17),
+    (1, 8), (30, 22), (14, 24), (6, 56), (14, 25), (7, 34), (30, 23), (26, 12),
+    (26, 14), (14, 33), (17, 58), (31, 17), (22, 49), (5, 23), (17, 59), (5, 8),
+    (19, 64), (17, 61), (17, 63), (17, 64), (17, 65), (17, 67), (14, 26), (11, 21),
+    (19, 66), (19, 68), (19, 70), (19, 129), (19, 72), (19, 74), (19, 76), (19, 78),
+    (19, 80), (19, 82), (13, 21), (6, 58), (31, 18), (17, 69), (20, 26), (20, 27),
+    (17, 71), (0, 20), (23, 20), (23, 21), (8, 9), (0, 21), (30, 24), (24, 18),
+    (18, 16), (12, 1), (18, 17), (23, 22), (18, 18), (12, 0), (22, 51), (23, 24),
+    (23, 25), (17, 73), (9, 6), (24, 19), (30, 25), (13, 23), (8, 10), (15, 4),
+    (8, 11), (30, 26), (28, 55), (28, 57), (1, 9), (5, 66), (8, 12), (1, 11),
+    (30, 28), (1, 12), (19, 84), (19, 86), (10, 30), (10, 32), (10, 34), (10, 36),
+    (10, 38), (10, 40), (1, 14), (16, 17), (8, 13), (6, 60), (8, 14), (19, 88),
+    (15, 5), (28, 59), (1, 15), (1, 16), (5, 67), (10, 43), (27, 25), (27, 37),
+    (6, 62), (2, 14), (31, 19), (31, 20), (11, 23), (17, 74), (15, 6), (0, 22),
+    (24, 20), (5, 68), (19, 90), (22, 53), (13, 25), (15, 7), (2, 16), (18, 19),
+    (15, 8), (24, 21), (7, 35), (32, 3), (28, 61), (28, 88), (18, 20), (2, 18),
+    (20, 29), (20, 31), (28, 89), (29, 9), (29, 7), (28, 63), (22, 55), (22, 57),
+    (28, 64), (15, 9), (11, 25), (7, 36), (1, 17), (6, 64), (11, 27), (21, 19),
+    (1, 18), (7, 37), (1, 20), (7, 38), (11, 28), (25, 24), (14, 27), (11, 30),
+    (4, 19), (6, 65), (4, 20), (4, 21), (4, 22), (29, 11), (13, 27), (7, 39),
+    (30, 30), (6, 66), (12, 2), (28, 66), (19, 92), (19, 94), (21, 20), (6, 84),
+    (28, 68), (8, 15), (8, 16), (28, 69), (28, 70), (28, 72), (28, 73), (28, 75),
+    (13, 29), (13, 37), (13, 39), (11, 32), (21, 36), (30, 31), (23, 26), (22, 59),
+    (14, 28), (5, 69), (5, 70), (13, 31), (28, 77), (6, 68), (0, 23), (9, 7),
+    (30, 33), (7, 40), (24, 22), (30, 34), (30, 35), (7, 41), (21, 21), (31, 21),
+    (15, 10), (13, 33), (25, 25), (5, 25), (13, 35), (5, 27), (19, 96), (19, 98),
+    (19, 100), (19, 101), (19, 103), (22, 61), (22, 63), (31, 22), (6, 69), (5, 29),
+    (6, 71), (6, 73), (19, 105), (25, 27), (25, 29), (31, 23), (25, 31), (23, 28),
+    (22, 65), (19, 111), (30, 36), (5, 71), (5, 72), (27, 27), (27, 28), (6, 75),
+    (31, 24), (27, 29), (19, 107), (28, 79), (6, 81), (23, 29), (19, 109), (21, 22),
+    (8, 17), (5, 31), (6, 77), (30, 38), (30, 39), (0, 24), (22, 67), (2, 20),
+    (5, 33), (19, 113), (7, 42), (19, 115), (5, 35), (23, 31), (14, 29), (28, 80),
+    (23, 32), (27, 31), (28, 82), (32, 1), (17, 76), (17, 77), (31, 25), (31, 26),
+    (31, 27), (31, 28), (17, 78), (31, 29), (31, 30), (28, 83), (14, 30), (24, 23),
+    (19, 1), (19, 3), (5, 1), (22, 4), (20, 1), (27, 1), (5, 40), (22, 2),
+    (13, 1), (28, 3), (28, 5), (5, 4), (13, 3), (19, 5), (30, 1), (28, 19),
+    (13, 5), (10, 3), (27, 3), (6, 78), (2, 1), (22, 6), (28, 23), (10, 5),
+    (29, 1), (29, 3), (21, 29), (27, 5), (2, 3), (10, 42), (22, 8), (21, 4),
+    (22, 10), (22, 12), (5, 11), (19, 7), (4, 4), (20, 6), (6, 6), (27, 7),
+    (6, 4), (27, 9), (21, 7), (6, 79), (6, 8), (5, 13), (11, 2), (22, 14),
+    (20, 8), (22, 16), (30, 40), (1, 5), (6, 10), (2, 5), (19, 9), (6, 12),
+    (23, 4), (19, 11), (5, 15), (28, 34), (19, 13), (22, 18), (22, 20), (19, 15),
+    (11, 4), (22, 22), (28, 36), (11, 6), (25, 7), (24, 10), (25, 9), (25, 11),
+    (6, 14), (6, 16), (10, 8), (20, 12), (19, 17), (27, 11), (5, 42), (4, 7),
+    (22, 24), (22, 26), (21, 10), (16, 19), (6, 21), (16, 2), (16, 4), (20, 14),
+    (11, 8), (6, 23), (10, 10), (10, 12), (10, 14), (10, 16), (10, 18), (10, 20),
+    (13, 7), (6, 25), (27, 13), (19, 19), (19, 21), (30, 10), (25, 13), (25, 15),
+    (22, 28), (10, 22), (6, 27), (25, 17), (25, 19), (25, 21), (11, 10), (23, 8),
+    (24, 12), (20, 16), (22, 30), (22, 32), (2, 7), (2, 9), (2, 11), (20, 4),
+    (2, 13), (21, 31), (13, 9), (21, 33), (13, 11), (5, 19), (6, 30), (19, 23),
+    (22, 34), (19, 25), (13, 13), (21, 35), (20, 18), (20, 20), (19, 27), (20, 22),
+    (16, 21), (15, 1), (6, 34), (16, 7), (17, 33), (17, 2), (19, 29), (16, 9),
+    (10, 25), (10, 27), (6, 37), (19, 31), (22, 37), (21, 15), (21, 17), (5, 45),
+    (23, 11), (19, 33), (6, 39), (19, 35), (19, 37), (19, 39), (19, 125), (19, 42),
+    (0, 16), (22, 39), (5, 22), (22, 72), (28, 46), (6, 41), (6, 43), (28, 48),
+    (19, 117), (19, 45), (13, 20), (19, 47), (19, 49), (19, 51), (19, 53), (19, 55),
+    (19, 57), (19, 59), (28, 50), (28, 52), (19, 61), (4, 18), (11, 13), (28, 54),
+    (11, 15), (21, 24), (22, 40), (22, 42), (22, 44), (22, 46), (22, 48), (11, 18),
+    (16, 12), (11, 20), (6, 45), (27, 22), (6, 47), (6, 49), (6, 51), (27, 24),
+    (10, 29), (16, 14), (16, 16), (17, 49), (17, 51), (17, 53), (17, 55), (14, 18),
+    (22, 74), (14, 20), (22, 76), (19, 63), (14, 22), (6, 53), (17, 57), (27, 33),
+    (6, 55), (1, 7), (6, 57), (26, 13), (26, 15), (22, 50), (5, 24), (17, 60),
+    (5, 9), (19, 65), (17, 62), (17, 66), (17, 68), (11, 22), (19, 67), (19, 69),
+    (19, 71), (19, 73), (19, 75), (19, 77), (19, 79), (19, 81), (19, 83), (13, 22),
+    (6, 59), (17, 70), (20, 28), (17, 72), (23, 23), (22, 52), (13, 24), (30, 27),
+    (28, 56), (28, 58), (1, 10), (30, 29), (1, 13), (19, 85), (19, 87), (10, 31),
+    (10, 33), (10, 35), (10, 37), (10, 39), (10, 41), (16, 18), (6, 61), (19, 89),
+    (28, 60), (27, 26), (27, 34), (6, 63), (2, 15), (11, 24), (17, 75), (19, 91),
+    (22, 54), (13, 26), (2, 17), (28, 62), (2, 19), (20, 30), (20, 32), (29, 10),
+    (29, 8), (22, 56), (22, 58), (28, 65), (11, 26), (1, 19), (11, 29), (11, 31),
+    (29, 12), (13, 28), (6, 67), (28, 67), (19, 93), (19, 95), (28, 71), (28, 74),
+    (28, 76), (13, 30), (11, 33), (21, 37), (30, 32), (23, 27), (22, 60), (13, 32),
+    (6, 80), (13, 34), (25, 26), (5, 26), (13, 36), (5, 28), (19, 97), (19, 99),
+    (19, 126), (19, 102), (19, 104), (22, 62), (22, 64), (6, 70), (5, 30), (6, 72),
+    (6, 74), (19, 106), (25, 28), (25, 30), (28, 78), (25, 32), (22, 66), (19, 112),
+    (30, 37), (6, 76), (27, 30), (19, 108), (6, 82), (23, 30), (19, 110), (21, 23),
+    (5, 32), (22, 68), (2, 21), (5, 34), (19, 114), (19, 116), (5, 36), (28, 81),
+    (27, 32), (17, 79), (14, 31), (28, 21), (21, 27), (22, 70), (19, 119), (19, 121),
+    (19, 123), (19, 127), (5, 38), (27, 36), (0, 25), (8, 18), (7, 43), (26, 16),
+    (21, 25), (17, 80), (21, 26), (23, 33), (22, 69), (28, 84), (28, 85), (19, 118),
+    (19, 120), (19, 122), (19, 124), (5, 37), (27, 35), (15, 11), (28, 86),
+)
+
+UNKNOWN_CATEGORY = 65534
+NO_EXERCISE_NAME = 0xFFFF
+
+CATEGORY_IDS = {name: category for category, name in enumerate(CATEGORIES)}
+EXERCISE_IDS = {(CATEGORIES[category], name): (category, index)
+                for category, names in enumerate(EXERCISES) for index, name in enumerate(names)}
+
+
+def _display(category, name):
+    title = EXERCISES[category][name].replace("_", " ").title()
+    if EXERCISES[category][name] in _SHARED_NAMES:
+        title += f" ({CATEGORIES[category].replace('_', ' ').title()})"
+    return title
+
+
+_SHARED_NAMES = frozenset({'arm_circles'})
+DISPLAY_NAMES = tuple(_display(category, name) for category, name in DISPLAY_ORDER)
+DISPLAY_IDS = dict(zip(DISPLAY_NAMES, DISPLAY_ORDER))
+_DISPLAY_IDS_LOWER = {display.lower(): ids for display, ids in DISPLAY_IDS.items()}
+
+
+def category_name(category):
+    """FIT name of an exercise category id, or None"""
+    return CATEGORIES[category] if 0 <= category < len(CATEGORIES) else None
+
+
+def exercise_name(category, name):
+    """FIT name of an exercise id within its category, or None"""
+    if not 0 <= category < len(CATEGORIES) or not 0 <= name < len(EXERCISES[category]):
+        return None
+    return EXERCISES[category][name]
+
+
+def is_valid(category, name):
+    """Whether (category, name) are ids the FIT profile defines
+
+    A category on its own (name NO_EXERCISE_NAME) and the unknown category
+    are valid too.
+    """
+    if category == UNKNOWN_CATEGORY:
+        return name == NO_EXERCISE_NAME
+    return 0 <= category < len(CATEGORIES) and (
+        name == NO_EXERCISE_NAME or 0 <= name < len(EXERCISES[category]))
+
+
+def category_mapping(category):
+    """A category-only mapping, or the unknown category if it isn't one"""
+    if category_name(category) is None:
+        category = UNKNOWN_CATEGORY
+    return {"category": category, "name": NO_EXERCISE_NAME}
+
+
+def mapping_for(display_name):
+    """The {"category", "name"} mapping for a display name, or None"""
+    ids = _DISPLAY_IDS_LOWER.get(display_name.strip().lower())
+    return None if ids is None else {"category": ids[0], "name": ids[1]}
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Garmin Connect upload queue for the Hevy to Garmin FIT Merger
+
+Validated output files are added to a persistent queue (a small SQLite
+database next to the app) and uploaded by a few worker threads sharing a
+pool of keep-alive HTTP connections. Each file is streamed as a multipart
+body in fixed-size chunks, so large back-fills never hold whole files in
+memory.
+
+Failed uploads are retried with exponential backoff (honouring Retry-After
+on 429/503); files still in flight when the app exits are picked up again
+on the next run. A 409 (activity already exists) counts as uploaded.
+
+Only the standard library is used. The endpoint and an optional bearer
+token come from the "garmin_upload" section of hevy_garmin_config.json and
+the GARMIN_CONNECT_TOKEN environment variable; upload_stub_server.py is a
+local stand-in for tests and dry runs.
+"""
+
+import http.client
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+UPLOAD_QUEUE_FILENAME = "upload_queue.sqlite3"
+
+DEFAULT_UPLOAD_SETTINGS = {
+    "enabled": False,
+    "base_url": "https://connectapi.garmin.com",
+    "upload_path": "/upload-service/upload/.fit",
+    "max_concurrency": 4,
+    "max_attempts": 5,
+    "backoff_seconds": 2.0,
+    "timeout_seconds": 60,
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    """An upload failed; ``retryable`` tells the queue whether to try again"""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def default_queue_path():
+    """Queue database location next to the application"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), UPLOAD_QUEUE_FILENAME)
+
+
+def upload_settings(config):
+    """Upload settings from the configuration, filled in with defaults"""
+    return dict(DEFAULT_UPLOAD_SETTINGS, **(config or {}).get("garmin_upload", {}))
+
+
+class UploadQueue:
+    """Persistent queue of files to upload (SQLite, safe to share between threads)
+
+    Entries move pending -> uploading -> done, or back to pending with a
+    later ``next_attempt`` after a retryable failure, or to failed once the
+    attempts run out.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_queue_path()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                response TEXT,
+                updated REAL NOT NULL
+            )""")
+        self.recover()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def recover(self):
+        """Return uploads interrupted by a crash or exit to the queue"""
+        with self._lock:
+            cursor = self._db.execute("UPDATE uploads SET status = 'pending', updated = ? WHERE status = 'uploading'",
+                                      (time.time(),))
+            return cursor.rowcount
+
+    def enqueue(self, path):
+        """Queue a file for upload; re-queues it if it was uploaded or failed before"""
+        path = os.path.abspath(path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._db.execute("""
+                INSERT INTO uploads (path, size, updated) VALUES (?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET size = excluded.size, status = 'pending', attempts = 0,
+                    next_attempt = 0, last_error = NULL, updated = excluded.updated""",
+                             (path, size, time.time()))
+
+    def claim(self, limit=1):
+        """Mark up to ``limit`` due uploads as in flight and return (id, path, attempt) tuples"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            rows = self._db.execute("""
+                SELECT id, path, attempts + 1 FROM uploads WHERE status = 'pending' AND next_attempt <= ?
+                ORDER BY next_attempt, id LIMIT ?""", (now, limit)).fetchall()
+            self._db.executemany("UPDATE uploads SET status = 'uploading', attempts = attempts + 1, updated = ? "
+                                 "WHERE id = ?", [(now, row[0]) for row in rows])
+            self._db.execute("COMMIT")
+        return rows
+
+    def mark_done(self, upload_id, response=None):
+        with self._lock:
+            self._db.execute("UPDATE uploads SET status = 'done', last_error = NULL, response = ?, updated = ? "
+                             "WHERE id = ?", (json.dumps(response) if response is not None else None,
+                                              time.time(), upload_id))
+
+    def mark_failed(self, upload_id, error, retry_delay=None, max_attempts=5):
+        """Record a failure; schedule a retry after ``retry_delay`` if attempts remain"""
+        with self._lock:
+            attempts = self._db.execute("SELECT attempts FROM uploads WHERE id = ?", (upload_id,)).fetchone()[0]
+            if retry_delay is None or attempts >= max_attempts:
+                self._db.execute("UPDATE uploads SET status = 'failed', last_error = ?, updated = ? WHERE id = ?",
+                                 (str(error), time.time(), upload_id))
+            else:
+                self._db.execute("UPDATE uploads SET status = 'pending', last_error = ?, next_attempt = ?, "
+                                 "updated = ? WHERE id = ?",
+                                 (str(error), time.time() + retry_delay, time.time(), upload_id))
+
+    def counts(self):
+        """Number of uploads per status"""
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM uploads GROUP BY status").fetchall())
+
+    def next_due(self):
+        """Seconds until the next pending upload is due (None if nothing is pending)"""
+        with self._lock:
+            row = self._db.execute("SELECT MIN(next_attempt) FROM uploads WHERE status = 'pending'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def entries(self, status=None):
+        """All queue entries as dicts (optionally only one status)"""
+        query = "SELECT id, path, status, attempts, last_error FROM uploads"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY id", params).fetchall()
+        return [dict(zip(("id", "path", "status", "attempts", "last_error"), row)) for row in rows]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused across uploads"""
+
+    def __init__(self, base_url, size=4, timeout=60):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, connection, reusable=True):
+        if not reusable:
+            connection.close()
+            return
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def multipart_body(path, field_name="file", boundary=None):
+    """
+    Stream a file as a multipart/form-data body
+
+    Returns:
+        tuple: (content type header, content length, iterator of byte chunks)
+    """
+    return multipart_files([(field_name, path)], boundary)
+
+
+def multipart_files(files, boundary=None):
+    """
+    Stream several files as one multipart/form-data body
+
+    Args:
+        files: (field name, path) pairs, in order
+
+    Returns:
+        tuple: (content type header, content length, iterator of byte chunks)
+    """
+    boundary = boundary or uuid.uuid4().hex
+    heads = []
+    for field_name, path in files:
+        filename = os.path.basename(path).replace('"', "")
+        heads.append((f"--{boundary}\r\n"
+                      f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                      f"Content-Type: application/octet-stream\r\n\r\n").encode("utf-8"))
+    tail = f"--{boundary}--\r\n".encode("utf-8")
+    length = sum(len(head) + os.path.getsize(path) + 2 for head, (_, path) in zip(heads, files)) + len(tail)
+
+    def chunks():
+        for head, (_, path) in zip(heads, files):
+            yield head
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield b"\r\n"
+        yield tail
+
+    return f"multipart/form-data; boundary={boundary}", length, chunks()
+
+
+class GarminUploader:
+    """Uploads FIT files over pooled connections with retries and a concurrency limit"""
+
+    def __init__(self, base_url, upload_path=DEFAULT_UPLOAD_SETTINGS["upload_path"], token=None,
+                 max_concurrency=4, max_attempts=5, backoff_seconds=2.0, timeout_seconds=60):
+        self.upload_path = upload_path
+        self.token = token
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.pool = ConnectionPool(base_url, size=self.max_concurrency, timeout=timeout_seconds)
+
+    @classmethod
+    def from_config(cls, config):
+        settings = upload_settings(config)
+        return cls(settings["base_url"], settings["upload_path"], token=os.environ.get("GARMIN_CONNECT_TOKEN"),
+                   max_concurrency=settings["max_concurrency"], max_attempts=settings["max_attempts"],
+                   backoff_seconds=settings["backoff_seconds"], timeout_seconds=settings["timeout_seconds"])
+
+    def retry_delay(self, attempts, retry_after=None):
+        """Exponential backoff, or the server's Retry-After if it asked for longer"""
+        delay = self.backoff_seconds * (2 ** max(0, attempts - 1))
+        return max(delay, retry_after or 0)
+
+    def upload_file(self, path):
+        """
+        Upload one file (single attempt)
+
+        Returns:
+            dict: decoded JSON response (empty if the server sent none)
+
+        Raises:
+            UploadError: on any failure; ``retryable`` is False for client errors
+        """
+        content_type, length, body = multipart_body(path)
+        headers = {"Content-Type": content_type, "Content-Length": str(length), "NK": "NT",
+                   "Connection": "keep-alive"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        connection = self.pool.acquire()
+        reusable = False
+        try:
+            connection.request("POST", self.pool.base_path + self.upload_path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+            reusable = not response.will_close
+        except (OSError, http.client.HTTPException) as e:
+            raise UploadError(f"connection error: {e}") from e
+        finally:
+            self.pool.release(connection, reusable)
+
+        if response.status == 409:
+            # Garmin Connect already has this activity
+            return {"duplicate": True}
+        if 200 <= response.status < 300:
+            try:
+                return json.loads(payload) if payload else {}
+            except ValueError:
+                return {}
+        retry_after = response.getheader("Retry-After")
+        raise UploadError(f"HTTP {response.status}: {payload[:200].decode('utf-8', 'replace')}",
+                          retryable=response.status in RETRYABLE_STATUSES,
+                          retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+    def process_queue(self, upload_queue, status_callback=None, stop_event=None):
+        """
+        Upload everything in the queue, waiting out backoff delays
+
+        Returns:
+            dict: final counts per status
+        """
+        status_callback = status_callback or (lambda message: None)
+
+        def upload_one(upload_id, path, attempt):
+            try:
+                response = self.upload_file(path)
+                upload_queue.mark_done(upload_id, response)
+                status_callback(f"Uploaded {os.path.basename(path)}")
+            except (UploadError, OSError) as e:
+                retryable = getattr(e, "retryable", False)
+                delay = self.retry_delay(attempt, getattr(e, "retry_after", None)) if retryable else None
+                upload_queue.mark_failed(upload_id, e, retry_delay=delay, max_attempts=self.max_attempts)
+                status_callback(f"Upload of {os.path.basename(path)} failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="garmin-upload") as executor:
+            in_flight = set()
+            while stop_event is None or not stop_event.is_set():
+                in_flight = {future for future in in_flight if not future.done()}
+                free = self.max_concurrency - len(in_flight)
+                claimed = upload_queue.claim(free) if free > 0 else []
+                for upload_id, path, attempt in claimed:
+                    in_flight.add(executor.submit(upload_one, upload_id, path, attempt))
+                if claimed:
+                    continue
+                due = upload_queue.next_due()
+                if due is None and not in_flight:
+                    break
+                # Poll briefly while uploads run, otherwise sleep until the next retry is due
+                time.sleep(0.05 if in_flight else min(due, 1.0))
+        self.pool.close()
+        return upload_queue.counts()
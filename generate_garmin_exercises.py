@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Generate garmin_exercises.py from the FIT profile in fit_tool
+
+The FIT SDK's exercise categories and per-category exercise names are read
+from fit_tool's profile enums and written out as plain tuples indexed by id,
+together with the dropdown display names already in sorted order, so the
+application never walks the enums or sorts the catalogue at runtime.
+
+Re-run after upgrading fit_tool:
+    python generate_garmin_exercises.py [--output garmin_exercises.py]
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+from fit_tool.profile import profile_type
+
+
+HEADER = '''#!/usr/bin/env python3
+# Generated by generate_garmin_exercises.py from the fit_tool {version} FIT profile. Do not edit.
+"""
+Garmin exercise catalogue for the Hevy to Garmin FIT Merger
+
+CATEGORIES[category] is the FIT exercise_category name and
+EXERCISES[category][name] the exercise_name within it. DISPLAY_ORDER lists
+every (category, name) pair in the order of the sorted display names.
+"""
+'''
+
+FOOTER = '''
+
+UNKNOWN_CATEGORY = {unknown}
+NO_EXERCISE_NAME = 0xFFFF
+
+CATEGORY_IDS = {{name: category for category, name in enumerate(CATEGORIES)}}
+EXERCISE_IDS = {{(CATEGORIES[category], name): (category, index)
+                for category, names in enumerate(EXERCISES) for index, name in enumerate(names)}}
+
+
+def _display(category, name):
+    title = EXERCISES[category][name].replace("_", " ").title()
+    if EXERCISES[category][name] in _SHARED_NAMES:
+        title += f" ({{CATEGORIES[category].replace('_', ' ').title()}})"
+    return title
+
+
+_SHARED_NAMES = {shared!r}
+DISPLAY_NAMES = tuple(_display(category, name) for category, name in DISPLAY_ORDER)
+DISPLAY_IDS = dict(zip(DISPLAY_NAMES, DISPLAY_ORDER))
+_DISPLAY_IDS_LOWER = {{display.lower(): ids for display, ids in DISPLAY_IDS.items()}}
+
+
+def category_name(category):
+    """FIT name of an exercise category id, or None"""
+    return CATEGORIES[category] if 0 <= category < len(CATEGORIES) else None
+
+
+def exercise_name(category, name):
+    """FIT name of an exercise id within its category, or None"""
+    if not 0 <= category < len(CATEGORIES) or not 0 <= name < len(EXERCISES[category]):
+        return None
+    return EXERCISES[category][name]
+
+
+def is_valid(category, name):
+    """Whether (category, name) are ids the FIT profile defines
+
+    A category on its own (name NO_EXERCISE_NAME) and the unknown category
+    are valid too.
+    """
+    if category == UNKNOWN_CATEGORY:
+        return name == NO_EXERCISE_NAME
+    return 0 <= category < len(CATEGORIES) and (
+        name == NO_EXERCISE_NAME or 0 <= name < len(EXERCISES[category]))
+
+
+def category_mapping(category):
+    """A category-only mapping, or the unknown category if it isn't one"""
+    if category_name(category) is None:
+        category = UNKNOWN_CATEGORY
+    return {{"category": category, "name": NO_EXERCISE_NAME}}
+
+
+def mapping_for(display_name):
+    """The {{"category", "name"}} mapping for a display name, or None"""
+    ids = _DISPLAY_IDS_LOWER.get(display_name.strip().lower())
+    return None if ids is None else {{"category": ids[0], "name": ids[1]}}
+'''
+
+
+def enum_class_name(category_name):
+    return "".join(word.title() for word in category_name.split("_")) + "ExerciseName"
+
+
+def read_profile():
+    """(categories, exercises, unknown id) from the fit_tool profile enums"""
+    categories = {member.value: member.name.lower() for member in profile_type.ExerciseCategory}
+    unknown = profile_type.ExerciseCategory.UNKNOWN.value
+    del categories[unknown]
+    if sorted(categories) != list(range(len(categories))):
+        raise ValueError("exercise categories are not numbered 0..n-1")
+
+    exercises = []
+    for category in range(len(categories)):
+        members = {member.value: member.name.lower()
+                   for member in getattr(profile_type, enum_class_name(categories[category]))}
+        if sorted(members) != list(range(len(members))):
+            raise ValueError(f"exercise names of {categories[category]} are not numbered 0..n-1")
+        exercises.append(tuple(members[index] for index in range(len(members))))
+    return [categories[index] for index in range(len(categories))], exercises, unknown
+
+
+def render_module(categories, exercises, unknown, version="unknown"):
+    """Source text of garmin_exercises.py"""
+    counts = Counter(name for names in exercises for name in names)
+    shared = sorted(name for name, count in counts.items() if count > 1)
+
+    def display(category, name):
+        title = exercises[category][name].replace("_", " ").title()
+        if exercises[category][name] in shared:
+            title += f" ({categories[category].replace('_', ' ').title()})"
+        return title
+
+    pairs = [(category, name) for category, names in enumerate(exercises) for name in range(len(names))]
+    pairs.sort(key=lambda pair: display(*pair).lower())
+
+    lines = [HEADER.format(version=version), "CATEGORIES = ("]
+    lines += [f"    {name!r},  # {category}" for category, name in enumerate(categories)]
+    lines += [")", "", "EXERCISES = ("]
+    for category, names in enumerate(exercises):
+        lines.append(f"    (  # {category} {categories[category]}")
+        lines += [f"        {name!r}," for name in names]
+        lines.append("    ),")
+    lines += [")", "", "DISPLAY_ORDER = ("]
+    for start in range(0, len(pairs), 8):
+        lines.append("    " + " ".join(f"({category}, {name})," for category, name in pairs[start:start + 8]))
+    lines.append(")")
+    return "\n".join(lines) + FOOTER.format(unknown=unknown, shared=frozenset(shared))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Garmin exercise catalogue module")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "garmin_exercises.py"))
+    args = parser.parse_args()
+
+    try:
+        from importlib.metadata import version
+        fit_tool_version = version("fit_tool")
+    except Exception:
+        fit_tool_version = "unknown"
+
+    categories, exercises, unknown = read_profile()
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(render_module(categories, exercises, unknown, fit_tool_version))
+    print(f"Wrote {len(categories)} categories and {sum(map(len, exercises))} exercises to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Hevy API importer for the Hevy to Garmin FIT Merger
+
+Pulls workouts from Hevy's REST API (v1, needs a Hevy Pro API key) instead
+of a manual CSV export. Workouts are cached locally in SQLite, keyed by
+workout id with their updated_at stamp:
+
+- The first sync pages through /v1/workouts.
+- Later syncs only page through /v1/workouts/events since the last sync,
+  applying updates and deletions.
+- A full re-sync sends the ETag each page had last time, so unchanged
+  pages cost a 304 and no body.
+
+Cached workouts are turned into a DataFrame with the same columns as a
+Hevy CSV export, so they go through parse_hevy_data unchanged.
+
+Usage:
+    HEVY_API_KEY=... python hevy_api.py --output workouts.csv [--since 2025-09-01] [--full]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+import pandas as pd
+
+from garmin_upload import ConnectionPool
+
+
+HEVY_API_URL = "https://api.hevyapp.com"
+HEVY_CACHE_FILENAME = "hevy_workouts.sqlite3"
+
+# Column order of a Hevy CSV export
+HEVY_CSV_COLUMNS = ["title", "start_time", "end_time", "description", "exercise_title", "superset_id",
+                    "exercise_notes", "set_index", "set_type", "weight_kg", "reps", "distance_km",
+                    "duration_seconds", "rpe"]
+
+
+class HevyApiError(Exception):
+    """The Hevy API returned an error or could not be reached"""
+
+
+def default_cache_path():
+    """Cache database location next to the application"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), HEVY_CACHE_FILENAME)
+
+
+class HevyApiClient:
+    """Minimal Hevy API client with keep-alive connections and conditional GETs"""
+
+    def __init__(self, api_key, base_url=HEVY_API_URL, page_size=10, timeout=30):
+        self.api_key = api_key
+        self.page_size = page_size
+        self.pool = ConnectionPool(base_url, size=1, timeout=timeout)
+        self.requests = 0
+
+    def get_json(self, path, params=None, etag=None):
+        """
+        GET a JSON resource
+
+        Returns:
+            tuple: (payload or None if not modified, ETag of the response)
+        """
+        url = self.pool.base_path + path + ("?" + urlencode(params) if params else "")
+        headers = {"api-key": self.api_key, "Accept": "application/json"}
+        if etag:
+            headers["If-None-Match"] = etag
+
+        connection = self.pool.acquire()
+        reusable = False
+        try:
+            connection.request("GET", url, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            reusable = not response.will_close
+        except (OSError, http.client.HTTPException) as e:
+            raise HevyApiError(f"Could not reach the Hevy API: {e}") from e
+        finally:
+            self.pool.release(connection, reusable)
+        self.requests += 1
+
+        if response.status == 304:
+            return None, etag
+        if response.status != 200:
+            raise HevyApiError(f"Hevy API {path} returned HTTP {response.status}: "
+                               f"{body[:200].decode('utf-8', 'replace')}")
+        return json.loads(body), response.getheader("ETag")
+
+    def pages(self, path, params=None, etags=None, page_count=1):
+        """
+        Yield (page number, payload or None if unchanged, etag) for every page
+
+        ``etags`` maps page number -> ETag from an earlier run and
+        ``page_count`` is the page count seen then; unchanged pages (304)
+        keep the earlier count.
+        """
+        etags = etags or {}
+        page = 1
+        while page <= page_count:
+            query = dict(params or {}, page=page, pageSize=self.page_size)
+            payload, etag = self.get_json(path, query, etags.get(page))
+            if payload is not None:
+                page_count = payload.get("page_count", page)
+            yield page, payload, etag
+            page += 1
+
+
+class HevyWorkoutCache:
+    """Local SQLite cache of Hevy workouts keyed by id and updated_at"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_cache_path()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS workouts (
+                id TEXT PRIMARY KEY, updated_at TEXT NOT NULL, start_time TEXT, body TEXT NOT NULL)""")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def close(self):
+        self._db.close()
+
+    def get_meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def upsert(self, workouts):
+        """Store workouts whose updated_at changed; returns how many were written"""
+        written = 0
+        with self._lock, self._db:
+            for workout in workouts:
+                row = self._db.execute("SELECT updated_at FROM workouts WHERE id = ?", (workout["id"],)).fetchone()
+                if row and row[0] == workout.get("updated_at"):
+                    continue
+                self._db.execute("INSERT OR REPLACE INTO workouts (id, updated_at, start_time, body) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 (workout["id"], workout.get("updated_at", ""), workout.get("start_time"),
+                                  json.dumps(workout)))
+                written += 1
+        return written
+
+    def delete(self, workout_ids):
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM workouts WHERE id = ?", [(workout_id,) for workout_id in workout_ids])
+
+    def workouts(self, since=None):
+        """Cached workouts, newest first (optionally only those starting at or after ``since``)"""
+        query, params = "SELECT body FROM workouts", ()
+        if since:
+            query, params = query + " WHERE start_time >= ?", (since,)
+        rows = self._db.execute(query + " ORDER BY start_time DESC", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM workouts").fetchone()[0]
+
+
+def sync_workouts(client, cache, status_callback=None, full=False):
+    """
+    Bring the cache up to date with the Hevy account
+
+    Args:
+        full: page through the whole history again instead of the changes
+            since the last sync (unchanged pages are skipped via ETags)
+
+    Returns:
+        dict: counts of updated and deleted workouts and pages fetched
+    """
+    status_callback = status_callback or (lambda message: None)
+    result = {"updated": 0, "deleted": 0, "pages": 0, "unchanged_pages": 0}
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    last_sync = cache.get_meta("last_sync")
+
+    if last_sync and not full:
+        # Incremental: only the changes since the last sync
+        for _, payload, _ in client.pages("/v1/workouts/events", {"since": last_sync}):
+            result["pages"] += 1
+            events = payload.get("events", [])
+            updated = [event["workout"] for event in events if event.get("type") == "updated"]
+            deleted = [event["id"] for event in events if event.get("type") == "deleted"]
+            result["updated"] += cache.upsert(updated)
+            cache.delete(deleted)
+            result["deleted"] += len(deleted)
+    else:
+        # First or full sync: page through the whole history
+        etags = {int(page): etag for page, etag in cache.get_meta("page_etags", {}).items()}
+        page_count = cache.get_meta("page_count", 1)
+        for page, payload, etag in client.pages("/v1/workouts", etags=etags, page_count=page_count):
+            result["pages"] += 1
+            if payload is None:
+                result["unchanged_pages"] += 1
+            else:
+                result["updated"] += cache.upsert(payload.get("workouts", []))
+                page_count = payload.get("page_count", page_count)
+            if etag:
+                etags[page] = etag
+        cache.set_meta("page_etags", etags)
+        cache.set_meta("page_count", page_count)
+
+    cache.set_meta("last_sync", started)
+    status_callback(f"Hevy sync: {result['updated']} workouts updated, {result['deleted']} deleted "
+                    f"({result['pages']} pages)")
+    return result
+
+
+def _local_time_text(iso_time):
+    """Format an API timestamp like the CSV export does (local wall clock)"""
+    if not iso_time:
+        return ""
+    moment = datetime.fromisoformat(iso_time.replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone()
+    return f"{moment.day} {moment.strftime('%b %Y, %H:%M')}"
+
+
+def workouts_to_dataframe(workouts):
+    """
+    Flatten API workouts into the Hevy CSV export layout (one row per set)
+
+    Returns:
+        pandas.DataFrame: columns as in HEVY_CSV_COLUMNS
+    """
+    rows = []
+    for workout in workouts:
+        start_time = _local_time_text(workout.get("start_time"))
+        end_time = _local_time_text(workout.get("end_time"))
+        for exercise in workout.get("exercises", []):
+            for set_data in exercise.get("sets", []):
+                distance = set_data.get("distance_meters")
+                rows.append({
+                    "title": workout.get("title", ""),
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "description": workout.get("description") or "",
+                    "exercise_title": exercise.get("title", ""),
+                    "superset_id": exercise.get("superset_id"),
+                    "exercise_notes": exercise.get("notes") or "",
+                    "set_index": set_data.get("index", 0),
+                    "set_type": set_data.get("type", "normal"),
+                    "weight_kg": set_data.get("weight_kg"),
+                    "reps": set_data.get("reps"),
+                    "distance_km": distance / 1000.0 if distance is not None else None,
+                    "duration_seconds": set_data.get("duration_seconds"),
+                    "rpe": set_data.get("rpe"),
+                })
+    return pd.DataFrame(rows, columns=HEVY_CSV_COLUMNS)
+
+
+def load_hevy_workouts(api_key, cache_path=None, since=None, base_url=HEVY_API_URL, status_callback=None,
+                       full=False):
+    """
+    Sync with the Hevy API and return cached workouts as a Hevy-export DataFrame
+
+    The result can be passed straight to parse_hevy_data.
+    """
+    cache = HevyWorkoutCache(cache_path)
+    try:
+        sync_workouts(HevyApiClient(api_key, base_url), cache, status_callback, full=full)
+        return workouts_to_dataframe(cache.workouts(since))
+    finally:
+        cache.close()
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Import workouts from the Hevy API into a Hevy-style CSV")
+    parser.add_argument("--api-key", default=os.environ.get("HEVY_API_KEY"), help="Hevy API key (or HEVY_API_KEY)")
+    parser.add_argument("--output", default="hevy_workouts.csv", help="CSV file to write")
+    parser.add_argument("--since", help="Only export workouts starting on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--full", action="store_true", help="Re-check the whole history, not just recent changes")
+    parser.add_argument("--base-url", default=HEVY_API_URL, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("a Hevy API key is required (--api-key or HEVY_API_KEY)")
+
+    try:
+        hevy_df = load_hevy_workouts(args.api_key, since=args.since, base_url=args.base_url, status_callback=print,
+                                     full=args.full)
+    except HevyApiError as e:
+        print(f"Error: {e}")
+        return 1
+    hevy_df.to_csv(args.output, index=False)
+    print(f"Wrote {len(hevy_df)} sets to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Hevy CSV reader for the Hevy to Garmin FIT Merger
+
+A Hevy export repeats the workout's title, times and description on every
+set row, and its full history can run to tens of thousands of rows. This
+reader loads only the columns named in the "hevy_csv_columns" section of
+the configuration, with explicit dtypes: the repeated text columns become
+categoricals, so each distinct string is stored once.
+
+With a filter (exact workout start strings, or a date range on the start
+time) the file is read in chunks and only the matching rows are kept, so
+memory tracks the selected workouts rather than the whole history (the
+whole file is still tokenised, but only the kept rows are converted and
+stored). The pyarrow engine is used for unfiltered reads when it is
+installed.
+
+Hevy times ("1 Sep 2025, 16:42") are wall-clock local time. They are
+converted with the one explicit format, each distinct string once, into
+seconds since the FIT epoch like a FIT local_date_time; subtracting the
+activity's UTC offset (from its activity.local_timestamp) gives FIT
+timestamps.
+"""
+
+import csv
+import importlib.util
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+HEVY_TIME_FORMAT = "%d %b %Y, %H:%M"
+
+# 1989-12-31 00:00, the FIT epoch, as a naive wall-clock datetime
+FIT_EPOCH = datetime(1989, 12, 31)
+FIT_EPOCH_UNIX = 631065600
+
+# Parsed Hevy time strings -> FIT local seconds (None if unparseable)
+TIME_CACHE_SIZE = 4096
+_time_cache = {}
+
+# dtype per logical column (keys of "hevy_csv_columns")
+COLUMN_DTYPES = {
+    "start_time": "category",
+    "end_time": "category",
+    "workout_title": "category",
+    "exercise_name": "category",
+    "workout_note": "category",
+    "set_number": "float64",
+    "reps": "float64",
+    "weight": "float64",
+    "set_note": "object",
+}
+
+# Columns needed to list the workouts in an export
+WORKOUT_COLUMNS = ("start_time", "end_time", "workout_title")
+
+CHUNK_ROWS = 20000
+
+
+def pyarrow_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def read_header(path):
+    """Column names of a CSV file (without starting a full pandas read)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def hevy_columns(header, col_mapping, keys=None):
+    """
+    CSV column -> dtype for the mapped columns present in the file
+
+    Args:
+        header: column names of the CSV
+        col_mapping: the "hevy_csv_columns" configuration section
+        keys: logical columns to load (default: all mapped columns)
+    """
+    present = set(header)
+    columns = {}
+    for key, column in col_mapping.items():
+        if (keys is None or key in keys) and column in present:
+            columns[column] = COLUMN_DTYPES.get(key, "object")
+    return columns
+
+
+def _parse_distinct(strings):
+    """FIT local seconds for distinct Hevy time strings, through the cache"""
+    missing = [string for string in strings if string not in _time_cache]
+    if missing:
+        if len(_time_cache) + len(missing) > TIME_CACHE_SIZE:
+            _time_cache.clear()
+        parsed = pd.to_datetime(pd.Index(missing).str.strip(), format=HEVY_TIME_FORMAT, errors='coerce')
+        seconds = parsed.to_numpy(dtype='datetime64[s]').astype(np.int64) - FIT_EPOCH_UNIX
+        for string, valid, value in zip(missing, ~parsed.isna(), seconds):
+            _time_cache[string] = int(value) if valid else None
+    return [_time_cache[string] for string in strings]
+
+
+def hevy_local_times(values):
+    """
+    Hevy time strings as wall-clock seconds since the FIT epoch
+
+    Each distinct string is parsed once (and cached across calls), so a
+    column where every set repeats its workout's start time costs one
+    parse per workout.
+
+    Returns:
+        pandas Series of nullable Int64 (NA where missing or unparseable)
+    """
+    values = pd.Series(values, copy=False)
+    codes, uniques = pd.factorize(values)
+    strings = [str(value) for value in np.asarray(uniques, dtype=object)]
+    distinct = pd.array(_parse_distinct(strings) + [None], dtype="Int64")
+    # Code -1 (missing value) picks the trailing NA
+    return pd.Series(distinct.take(np.where(codes < 0, len(strings), codes)), index=values.index)
+
+
+def hevy_local_time(value):
+    """One Hevy time string as FIT local seconds, or None"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return _parse_distinct([str(value)])[0]
+
+
+def hevy_fit_timestamps(values, utc_offset_seconds):
+    """Hevy time strings as FIT timestamps (UTC seconds since the FIT epoch)"""
+    return hevy_local_times(values) - int(utc_offset_seconds)
+
+
+def local_seconds(moment):
+    """A naive wall-clock datetime as FIT local seconds"""
+    return int((moment - FIT_EPOCH).total_seconds())
+
+
+def local_datetime(seconds):
+    """FIT local seconds as a naive wall-clock datetime"""
+    return FIT_EPOCH + timedelta(seconds=int(seconds))
+
+
+def read_hevy_csv(path, col_mapping, keys=None, start_times=None, since=None, until=None,
+                  chunksize=None, engine=None):
+    """
+    Read a Hevy export with pruned columns and pinned dtypes
+
+    Args:
+        col_mapping: the "hevy_csv_columns" configuration section
+        keys: logical columns to load (default: all mapped columns)
+        start_times: keep only workouts whose raw start_time string is in
+            this collection
+        since, until: keep only workouts starting in [since, until]
+            (naive local datetimes)
+        chunksize: rows per chunk for a filtered read
+        engine: pandas CSV engine; by default pyarrow when it is installed
+            and no filter is given
+
+    Returns:
+        pandas DataFrame indexed by row number in the file
+    """
+    header = read_header(path)
+    columns = hevy_columns(header, col_mapping, keys)
+    start_col = col_mapping.get("start_time")
+    filtered = start_times is not None or since is not None or until is not None
+    if filtered and start_col not in header:
+        raise ValueError(f"Cannot filter by start time: no '{start_col}' column")
+    if filtered and start_col not in columns:
+        columns[start_col] = COLUMN_DTYPES["start_time"]
+    options = {"usecols": list(columns), "dtype": columns}
+
+    if not filtered:
+        if engine is None and pyarrow_available():
+            engine = "pyarrow"
+        return pd.read_csv(path, engine=engine, **options)
+
+    if start_times is not None:
+        start_times = set(start_times)
+    # Categories are built once over the kept rows, not per chunk
+    categories = [column for column, dtype in columns.items() if dtype == "category"]
+    options["dtype"] = {column: "object" if column in categories else dtype for column, dtype in columns.items()}
+    kept = []
+    with pd.read_csv(path, chunksize=chunksize or CHUNK_ROWS, engine=engine if engine != "pyarrow" else None,
+                     **options) as reader:
+        for chunk in reader:
+            rows = pd.Series(True, index=chunk.index)
+            if start_times is not None:
+                rows &= chunk[start_col].isin(start_times)
+            if since is not None or until is not None:
+                started = hevy_local_times(chunk[start_col])
+                if since is not None:
+                    rows &= (started >= local_seconds(since)).fillna(False)
+                if until is not None:
+                    rows &= (started <= local_seconds(until)).fillna(False)
+            if rows.any():
+                kept.append(chunk[rows])
+
+    hevy_df = pd.concat(kept) if kept else pd.read_csv(path, nrows=0, **options)
+    return hevy_df.astype({column: "category" for column in categories})
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Training history rollups for the Hevy to Garmin FIT Merger
+
+Keeps weekly and monthly totals of a Hevy history in SQLite, so questions
+like "chest volume over the last 12 weeks" are an indexed range read
+instead of a rescan and remap of every exported set:
+
+- Ingesting an export (a Hevy CSV, or hevy_api's cache as a DataFrame)
+  reduces it with pandas to one row per workout and one per workout and
+  exercise. A digest of each workout's rows tells which workouts are new,
+  changed or gone since the last ingest.
+- Only the week and month buckets those workouts fall in are recomputed,
+  by exercise, by muscle group (keywords from muscle_groups.json, matched
+  once per exercise name) and in total.
+
+Totals carry sets, reps, volume and workout count; the overall totals also
+carry workout duration and an estimate of rest time (duration minus sets x
+the configured set duration, as Hevy exports have no per-set times), from
+which rest per set and density (volume per minute) are derived.
+
+Periods are keyed by the local date they start on (weeks start on Monday).
+
+Usage:
+    python history_rollups.py export.csv [--db history.sqlite3] [--period week|month] [--count 12]
+                              [--muscle-group chest | --exercise "bench press (barbell)"] [--until 2025-09-30]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from hevy_csv import FIT_EPOCH_UNIX, hevy_local_times, read_hevy_csv
+from workout_report import exercise_muscle_groups, load_muscle_groups
+
+
+HISTORY_FILENAME = "history_rollups.sqlite3"
+
+PERIODS = ("week", "month")
+DIMENSIONS = ("exercise", "muscle_group", "total")
+
+# Name of the single row per period in the "total" dimension
+TOTAL_NAME = "all"
+
+# Columns needed from a Hevy export
+HISTORY_COLUMNS = ("start_time", "end_time", "workout_title", "exercise_name", "reps", "weight")
+
+FIT_EPOCH_DAYS = FIT_EPOCH_UNIX // 86400
+
+
+def default_history_path():
+    """History database location next to the application"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), HISTORY_FILENAME)
+
+
+def period_starts(local_seconds):
+    """
+    Week (Monday) and month start dates of FIT local timestamps
+
+    Returns:
+        tuple: (week starts, month starts) as arrays of "YYYY-MM-DD" strings
+    """
+    days = (np.asarray(local_seconds, dtype=np.int64) // 86400 + FIT_EPOCH_DAYS).astype('datetime64[D]')
+    # 1970-01-01 was a Thursday: weekday 0 is Monday
+    weekday = (days.astype(np.int64) + 3) % 7
+    weeks = (days - weekday).astype(str)
+    months = days.astype('datetime64[M]').astype('datetime64[D]').astype(str)
+    return weeks, months
+
+
+def workout_facts(hevy_df, col_mapping, set_duration_seconds=30):
+    """
+    Reduce a Hevy export to per-workout and per-exercise totals
+
+    Args:
+        hevy_df: DataFrame with Hevy CSV columns
+        col_mapping: the "hevy_csv_columns" configuration section
+        set_duration_seconds: assumed working time per set, for rest estimates
+
+    Returns:
+        tuple: (workouts DataFrame indexed by start, exercises DataFrame);
+        starts are FIT local seconds
+    """
+    def column(key, default=np.nan):
+        name = col_mapping.get(key)
+        return hevy_df[name] if name in hevy_df.columns else pd.Series(default, index=hevy_df.index)
+
+    frame = pd.DataFrame({
+        'start': hevy_local_times(column("start_time", None)),
+        'end': hevy_local_times(column("end_time", None)),
+        'title': column("workout_title", "").astype(str),
+        'exercise': column("exercise_name", "").astype(str).str.strip().str.lower(),
+        'reps': pd.to_numeric(column("reps"), errors='coerce').fillna(0),
+        'weight': pd.to_numeric(column("weight"), errors='coerce').fillna(0),
+    })
+    frame = frame[frame['start'].notna() & (frame['exercise'] != "") & (frame['exercise'] != "nan")]
+    frame = frame.astype({'start': np.int64})
+    frame['volume'] = frame['weight'] * frame['reps']
+
+    exercises = (frame.groupby(['start', 'exercise'], sort=True)
+                 .agg(sets=('reps', 'size'), reps=('reps', 'sum'), volume=('volume', 'sum'))
+                 .reset_index())
+    workouts = frame.groupby('start', sort=True).agg(
+        end=('end', 'max'), title=('title', 'first'), sets=('reps', 'size'), reps=('reps', 'sum'),
+        volume=('volume', 'sum'))
+    duration = (workouts['end'].astype('Float64') - workouts.index).clip(lower=0).fillna(0)
+    workouts['duration'] = duration.astype(np.int64)
+    workouts['rest'] = (workouts['duration'] - workouts['sets'] * set_duration_seconds).clip(lower=0)
+    workouts['week'], workouts['month'] = period_starts(workouts.index)
+
+    # Order-independent digest of each workout's rows, to spot edits on re-ingest
+    exercise_hashes = pd.util.hash_pandas_object(exercises[['exercise', 'sets', 'reps', 'volume']], index=False)
+    digest = exercise_hashes.groupby(exercises['start']).sum()
+    digest += pd.util.hash_pandas_object(workouts[['title', 'duration']], index=False).to_numpy()
+    workouts['digest'] = digest.to_numpy(dtype=np.uint64).view(np.int64)
+    return workouts, exercises
+
+
+class HistoryRollups:
+    """Weekly and monthly training totals, updated incrementally per ingested export"""
+
+    def __init__(self, db_path=None, muscle_groups=None):
+        self.db_path = db_path or default_history_path()
+        self.muscle_mappings = (muscle_groups or load_muscle_groups()).get("muscle_group_mappings", {})
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db:
+            # start is the workout's local start in FIT-epoch seconds
+            self._db.execute("""CREATE TABLE IF NOT EXISTS workouts (
+                start INTEGER PRIMARY KEY, title TEXT, week TEXT NOT NULL, month TEXT NOT NULL,
+                sets INTEGER, reps INTEGER, volume REAL, duration INTEGER, rest INTEGER, digest INTEGER)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS workouts_week ON workouts (week)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS workouts_month ON workouts (month)")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS workout_exercises (
+                start INTEGER NOT NULL, exercise TEXT NOT NULL, sets INTEGER, reps INTEGER, volume REAL,
+                PRIMARY KEY (start, exercise)) WITHOUT ROWID""")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS exercise_muscles (
+                exercise TEXT NOT NULL, muscle_group TEXT NOT NULL,
+                PRIMARY KEY (exercise, muscle_group)) WITHOUT ROWID""")
+            self._db.execute("CREATE TABLE IF NOT EXISTS mapped_exercises (exercise TEXT PRIMARY KEY)")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT NOT NULL, dimension TEXT NOT NULL, name TEXT NOT NULL, period_start TEXT NOT NULL,
+                sets INTEGER, reps INTEGER, volume REAL, workouts INTEGER, duration INTEGER, rest INTEGER,
+                PRIMARY KEY (period, dimension, name, period_start)) WITHOUT ROWID""")
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM workouts").fetchone()[0]
+
+    def ingest_csv(self, hevy_csv_path, col_mapping, **options):
+        """Ingest a Hevy CSV export (see ingest)"""
+        keys = [key for key in HISTORY_COLUMNS if key in col_mapping]
+        return self.ingest(read_hevy_csv(hevy_csv_path, col_mapping, keys=keys), col_mapping, **options)
+
+    def ingest(self, hevy_df, col_mapping, set_duration_seconds=30, prune=True):
+        """
+        Bring the rollups up to date with a Hevy export
+
+        Args:
+            hevy_df: DataFrame with Hevy CSV columns
+            col_mapping: the "hevy_csv_columns" configuration section
+            prune: drop stored workouts missing from the export (a full
+                history export); pass False for partial exports
+
+        Returns:
+            dict: counts of added, updated, unchanged and removed workouts
+        """
+        workouts, exercises = workout_facts(hevy_df, col_mapping, set_duration_seconds)
+        with self._lock:
+            stored = {start: (digest, week, month)
+                      for start, digest, week, month in self._db.execute("SELECT start, digest, week, month FROM workouts")}
+            changed = [int(start) for start, digest in zip(workouts.index, workouts['digest'])
+                       if stored.get(int(start), (None,))[0] != int(digest)]
+            removed = [start for start in stored if start not in workouts.index] if prune else []
+            result = {'added': sum(start not in stored for start in changed),
+                      'updated': sum(start in stored for start in changed),
+                      'unchanged': len(workouts) - len(changed), 'removed': len(removed)}
+            if not changed and not removed:
+                return result
+
+            changed_workouts = workouts.loc[changed]
+            changed_exercises = exercises[exercises['start'].isin(changed)]
+            # Buckets the workouts fall in now, and fell in before (removed ones)
+            buckets = {("week", week) for week in changed_workouts['week']}
+            buckets.update(("month", month) for month in changed_workouts['month'])
+            for start in changed + removed:
+                if start in stored:
+                    buckets.update({("week", stored[start][1]), ("month", stored[start][2])})
+
+            with self._db:
+                stale = [(start,) for start in changed + removed]
+                self._db.executemany("DELETE FROM workouts WHERE start = ?", stale)
+                self._db.executemany("DELETE FROM workout_exercises WHERE start = ?", stale)
+                self._db.executemany(
+                    "INSERT INTO workouts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    zip(changed_workouts.index.tolist(), changed_workouts['title'], changed_workouts['week'],
+                        changed_workouts['month'], changed_workouts['sets'].tolist(),
+                        changed_workouts['reps'].astype(np.int64).tolist(), changed_workouts['volume'].tolist(),
+                        changed_workouts['duration'].tolist(), changed_workouts['rest'].tolist(),
+                        changed_workouts['digest'].tolist()))
+                self._db.executemany(
+                    "INSERT INTO workout_exercises VALUES (?, ?, ?, ?, ?)",
+                    zip(changed_exercises['start'].tolist(), changed_exercises['exercise'],
+                        changed_exercises['sets'].tolist(), changed_exercises['reps'].astype(np.int64).tolist(),
+                        changed_exercises['volume'].tolist()))
+                self._map_exercises(changed_exercises['exercise'].unique())
+                self._refresh(buckets)
+        return result
+
+    def _map_exercises(self, exercises):
+        """Record the muscle groups of exercise names not seen before"""
+        known = {name for name, in self._db.execute("SELECT exercise FROM mapped_exercises")}
+        new = [exercise for exercise in exercises if exercise not in known]
+        self._db.executemany("INSERT INTO mapped_exercises VALUES (?)", [(exercise,) for exercise in new])
+        self._db.executemany("INSERT INTO exercise_muscles VALUES (?, ?)",
+                             [(exercise, muscle_group) for exercise in new
+                              for muscle_group in exercise_muscle_groups(exercise, self.muscle_mappings)])
+
+    def _refresh(self, buckets):
+        """Recompute the rollups of the given (period, period_start) buckets"""
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS affected (period TEXT, period_start TEXT)")
+        self._db.execute("DELETE FROM affected")
+        self._db.executemany("INSERT INTO affected VALUES (?, ?)", sorted(buckets))
+        for period in PERIODS:
+            # period is one of PERIODS, so it is safe as a column name
+            selected = f"w.{period} IN (SELECT period_start FROM affected WHERE period = '{period}')"
+            self._db.execute("DELETE FROM rollups WHERE period = ? AND period_start IN "
+                             "(SELECT period_start FROM affected WHERE period = ?)", (period, period))
+            self._db.execute(f"""INSERT INTO rollups
+                SELECT '{period}', 'exercise', e.exercise, w.{period}, SUM(e.sets), SUM(e.reps), SUM(e.volume),
+                       COUNT(*), 0, 0
+                FROM workout_exercises e JOIN workouts w ON w.start = e.start
+                WHERE {selected} GROUP BY w.{period}, e.exercise""")
+            self._db.execute(f"""INSERT INTO rollups
+                SELECT '{period}', 'muscle_group', m.muscle_group, w.{period}, SUM(e.sets), SUM(e.reps),
+                       SUM(e.volume), COUNT(DISTINCT e.start), 0, 0
+                FROM workout_exercises e JOIN workouts w ON w.start = e.start
+                     JOIN exercise_muscles m ON m.exercise = e.exercise
+                WHERE {selected} GROUP BY w.{period}, m.muscle_group""")
+            self._db.execute(f"""INSERT INTO rollups
+                SELECT '{period}', 'total', '{TOTAL_NAME}', w.{period}, SUM(w.sets), SUM(w.reps), SUM(w.volume),
+                       COUNT(*), SUM(w.duration), SUM(w.rest)
+                FROM workouts w WHERE {selected} GROUP BY w.{period}""")
+
+    def rebuild(self):
+        """Remap muscle groups and recompute every rollup (after editing muscle_groups.json)"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM mapped_exercises")
+            self._db.execute("DELETE FROM exercise_muscles")
+            self._map_exercises([name for name, in self._db.execute("SELECT DISTINCT exercise FROM workout_exercises")])
+            self._db.execute("DELETE FROM rollups")
+            buckets = {(period, start) for week, month in self._db.execute("SELECT week, month FROM workouts")
+                       for period, start in (("week", week), ("month", month))}
+            self._refresh(buckets)
+
+    def names(self, dimension):
+        """Exercise or muscle group names with any rollups"""
+        return [name for name, in self._db.execute(
+            "SELECT DISTINCT name FROM rollups WHERE period = 'week' AND dimension = ? ORDER BY name", (dimension,))]
+
+    def series(self, dimension="total", name=TOTAL_NAME, period="week", count=12, until=None):
+        """
+        The last ``count`` periods of one rollup, oldest first, zero-filled
+
+        Args:
+            dimension: "exercise", "muscle_group" or "total"
+            name: exercise name, muscle group, or "all" for the totals
+            until: date in the last period (default: today)
+
+        Returns:
+            list: dicts with period_start, sets, reps, volume, workouts,
+            duration, rest, rest_per_set and density (volume per minute)
+        """
+        if period not in PERIODS or dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown rollup {period}/{dimension}")
+        until = np.datetime64(until or date.today(), 'D')
+        if period == "week":
+            last = until - (until.astype(np.int64) + 3) % 7
+            starts = last - 7 * np.arange(count - 1, -1, -1)
+        else:
+            starts = (until.astype('datetime64[M]') - np.arange(count - 1, -1, -1)).astype('datetime64[D]')
+        starts = starts.astype(str).tolist()
+        rows = {row[0]: row[1:] for row in self._db.execute(
+            """SELECT period_start, sets, reps, volume, workouts, duration, rest FROM rollups
+               WHERE period = ? AND dimension = ? AND name = ? AND period_start BETWEEN ? AND ?""",
+            (period, dimension, name.lower() if dimension == "exercise" else name, starts[0], starts[-1]))}
+
+        series = []
+        for start in starts:
+            sets, reps, volume, workouts, duration, rest = rows.get(start, (0, 0, 0.0, 0, 0, 0))
+            working_sets = max(sets - workouts, 1)  # rests happen between sets, not after the last
+            series.append({'period_start': start, 'sets': sets, 'reps': reps, 'volume': volume,
+                           'workouts': workouts, 'duration': duration, 'rest': rest,
+                           'rest_per_set': rest / working_sets if rest else 0.0,
+                           'density': volume / (duration / 60) if duration else 0.0})
+        return series
+
+
+def print_series(series, weight_unit="kg", with_timing=False):
+    """Print one line per period"""
+    header = f"{'Period':<12}{'Workouts':>9}{'Sets':>6}{'Reps':>7}{'Volume':>10}"
+    if with_timing:
+        header += f"{'Minutes':>9}{'Rest/set':>9}{'Density':>9}"
+    print(header)
+    for row in series:
+        line = (f"{row['period_start']:<12}{row['workouts']:>9}{row['sets']:>6}{row['reps']:>7}"
+                f"{row['volume']:>10.0f}")
+        if with_timing:
+            line += f"{row['duration'] / 60:>9.0f}{row['rest_per_set']:>8.0f}s{row['density']:>9.1f}"
+        print(line)
+    if with_timing:
+        print(f"(volume in {weight_unit}, density in {weight_unit}/min)")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Weekly/monthly training volume from a Hevy history")
+    parser.add_argument("hevy_csv", nargs="?", help="Hevy export to ingest first")
+    parser.add_argument("--db", help=f"History database (default: {HISTORY_FILENAME} next to the app)")
+    parser.add_argument("--period", choices=PERIODS, default="week")
+    parser.add_argument("--count", type=int, default=12, help="Number of periods to show (default: 12)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--muscle-group", help="Show one muscle group (e.g. chest)")
+    target.add_argument("--exercise", help="Show one exercise (e.g. \"bench press (barbell)\")")
+    parser.add_argument("--until", type=lambda text: datetime.strptime(text, "%Y-%m-%d").date(),
+                        help="Last date shown, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    from merge_pipeline import HeadlessMerger
+
+    config = HeadlessMerger(status_callback=lambda message: None).config
+    history = HistoryRollups(args.db)
+    try:
+        if args.hevy_csv:
+            result = history.ingest_csv(args.hevy_csv, config.column_map,
+                                        set_duration_seconds=config.settings.get('default_set_duration_seconds', 30))
+            print(f"{len(history)} workouts in history ({result['added']} added, {result['updated']} updated, "
+                  f"{result['unchanged']} unchanged, {result['removed']} removed)")
+        if args.muscle_group:
+            dimension, name = "muscle_group", args.muscle_group.lower()
+        elif args.exercise:
+            dimension, name = "exercise", args.exercise
+        else:
+            dimension, name = "total", TOTAL_NAME
+        print(f"\n{name.title() if dimension != 'total' else 'All training'}, last {args.count} {args.period}s:")
+        print_series(history.series(dimension, name, args.period, args.count, args.until),
+                     config.settings.get('weight_unit', 'kg'), with_timing=dimension == "total")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
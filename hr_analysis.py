@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Heart-rate analysis for the Hevy to Garmin FIT Merger
+
+Computes time in heart-rate zones, training load (Banister TRIMP) and
+per-exercise-block heart rate from the decoded record columns. Everything
+works on NumPy arrays: each sample's heart rate holds until the next
+sample (np.diff of the timestamps, with long recording gaps not counted),
+zones come from np.digitize, and block averages from cumulative sums.
+
+Whole-history figures (see history_heart_rate) concatenate the samples of
+every activity and aggregate them in one pass with bincount, so there is
+no Python loop over records however long the history is.
+"""
+
+import numpy as np
+
+
+# Lower bounds of zones 1-5 as fractions of max heart rate (Garmin's
+# default "% max HR" zones); samples below zone 1 count as zone 0
+ZONE_FRACTIONS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+# A gap between samples longer than this is a pause in recording, not
+# time spent at the last heart rate
+MAX_SAMPLE_GAP_SECONDS = 30
+
+# Used when the FIT file has no zones_target / user_profile values
+DEFAULT_MAX_HR = 190
+DEFAULT_RESTING_HR = 60
+
+# Banister TRIMP weighting: (a, b) in a * exp(b * heart rate reserve)
+TRIMP_WEIGHTS = {"male": (0.64, 1.92), "female": (0.86, 1.67)}
+
+
+def heart_rate_samples(fit_file):
+    """
+    Valid record samples of a decoded FIT file
+
+    Returns:
+        tuple: (seconds since the Unix epoch, heart rate in bpm), as float
+        arrays sorted by time, without samples missing a heart rate
+    """
+    records = fit_file.message(20)  # 20 = record
+    timestamps, heart_rate = records.get('timestamp'), records.get('heart_rate')
+    if timestamps is None or heart_rate is None:
+        return np.zeros(0), np.zeros(0)
+    seconds = np.asarray(timestamps, dtype=np.float64) / 1000
+    heart_rate = np.asarray(heart_rate, dtype=np.float64)
+    valid = ~np.isnan(seconds) & ~np.isnan(heart_rate) & (heart_rate > 0)
+    order = np.argsort(seconds[valid], kind='stable')
+    return seconds[valid][order], heart_rate[valid][order]
+
+
+def athlete_heart_rate(fit_file):
+    """
+    Max and resting heart rate and gender recorded by the watch
+
+    Returns:
+        dict: max_hr, resting_hr (falling back to the defaults) and gender
+        ("male" or "female", None if unknown)
+    """
+    max_hr = fit_file.message(7).first('max_heart_rate')  # 7 = zones_target
+    resting_hr = fit_file.message(3).first('resting_heart_rate')  # 3 = user_profile
+    gender = fit_file.message(3).first('gender')
+    return {
+        'max_hr': int(max_hr) if max_hr else DEFAULT_MAX_HR,
+        'resting_hr': int(resting_hr) if resting_hr else DEFAULT_RESTING_HR,
+        'gender': {0: "female", 1: "male"}.get(gender),
+    }
+
+
+def sample_durations(seconds, max_gap=MAX_SAMPLE_GAP_SECONDS):
+    """Seconds each sample's heart rate holds for (0 for the last sample and before gaps)"""
+    durations = np.diff(seconds, append=seconds[-1:]) if len(seconds) else np.zeros(0)
+    durations[durations > max_gap] = 0
+    return durations
+
+
+def zone_bounds(max_hr, fractions=ZONE_FRACTIONS):
+    """Lower bound in bpm of each zone above zone 0"""
+    return np.round(np.asarray(fractions) * max_hr)
+
+
+def time_in_zones(heart_rate, durations, bounds):
+    """Seconds spent in each zone (index 0 is below zone 1)"""
+    zones = np.digitize(heart_rate, bounds)
+    return np.bincount(zones, weights=durations, minlength=len(bounds) + 1)
+
+
+def trimp(heart_rate, durations, resting_hr, max_hr, gender=None):
+    """
+    Banister training impulse
+
+    Sum over samples of minutes x heart rate reserve x a * exp(b * reserve),
+    with the male weighting when the gender is unknown.
+    """
+    a, b = TRIMP_WEIGHTS.get(gender, TRIMP_WEIGHTS["male"])
+    reserve = np.clip((heart_rate - resting_hr) / max(max_hr - resting_hr, 1), 0, 1)
+    return float(np.sum(durations / 60 * reserve * a * np.exp(b * reserve)))
+
+
+def block_heart_rate(seconds, heart_rate, durations, starts, ends):
+    """
+    Time-weighted average and maximum heart rate in each [start, end) window
+
+    Returns:
+        tuple: (average, maximum) arrays, NaN for windows without samples
+    """
+    starts, ends = np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64)
+    first = np.searchsorted(seconds, starts, side='left')
+    last = np.searchsorted(seconds, ends, side='left')
+    weighted = np.concatenate(([0.0], np.cumsum(heart_rate * durations)))
+    held = np.concatenate(([0.0], np.cumsum(durations)))
+    weight = held[last] - held[first]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.where(weight > 0, (weighted[last] - weighted[first]) / weight, np.nan)
+    maximum = np.full(len(starts), np.nan)
+    present = last > first
+    if present.any():
+        # reduceat over interleaved (first, last) indices: the even results
+        # are the [first, last) maxima; the padding keeps last == len valid
+        padded = np.append(heart_rate, -np.inf)
+        bounds = np.column_stack((first[present], last[present])).ravel()
+        maximum[present] = np.maximum.reduceat(padded, bounds)[::2]
+    return average, maximum
+
+
+def exercise_blocks(garmin_sets, workout_start):
+    """
+    Runs of consecutive sets of the same exercise
+
+    Args:
+        garmin_sets: SetTable with timestamps as offsets from the workout start
+        workout_start: workout start in seconds since the Unix epoch
+
+    Returns:
+        tuple: (exercise names, block start seconds, block end seconds)
+    """
+    rows = garmin_sets.rows
+    if not len(rows):
+        return [], np.zeros(0), np.zeros(0)
+    codes = rows['name_index']
+    first = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    last = np.append(first[1:], len(rows)) - 1
+    set_ends = rows['timestamp'] + rows['duration']
+    # A block runs until the next block starts (rest included), or its last set ends
+    ends = np.append(rows['timestamp'][first[1:]], set_ends[last[-1]])
+    names = [garmin_sets.exercise_names[code] for code in codes[first]]
+    return names, workout_start + rows['timestamp'][first], workout_start + np.maximum(ends, set_ends[last])
+
+
+def analyze_heart_rate(fit_file, garmin_sets=None, workout_start=None, max_hr=None, resting_hr=None):
+    """
+    Zones, training load and per-exercise-block heart rate of one activity
+
+    Args:
+        fit_file: DecodedFit with record messages
+        garmin_sets: optional SetTable for per-block figures
+        workout_start: start the set offsets count from (seconds since the
+            Unix epoch); defaults to the first sample
+        max_hr, resting_hr: override the values recorded by the watch
+
+    Returns:
+        dict: max_hr, resting_hr, zones (list of {zone, low_bpm, seconds}),
+        trimp and blocks (list of {exercise, avg_hr, max_hr}); None if the
+        file has no heart-rate samples
+    """
+    seconds, heart_rate = heart_rate_samples(fit_file)
+    if not len(seconds):
+        return None
+    athlete = athlete_heart_rate(fit_file)
+    max_hr = max_hr or athlete['max_hr']
+    resting_hr = resting_hr or athlete['resting_hr']
+    durations = sample_durations(seconds)
+    bounds = zone_bounds(max_hr)
+    zone_seconds = time_in_zones(heart_rate, durations, bounds)
+
+    analysis = {
+        'max_hr': max_hr,
+        'resting_hr': resting_hr,
+        'zones': [{'zone': zone, 'low_bpm': int(bounds[zone - 1]) if zone else 0, 'seconds': int(round(value))}
+                  for zone, value in enumerate(zone_seconds)],
+        'trimp': round(trimp(heart_rate, durations, resting_hr, max_hr, athlete['gender']), 1),
+        'blocks': [],
+    }
+    if garmin_sets is not None and len(garmin_sets):
+        names, starts, ends = exercise_blocks(garmin_sets, seconds[0] if workout_start is None else workout_start)
+        average, maximum = block_heart_rate(seconds, heart_rate, durations, starts, ends)
+        analysis['blocks'] = [{'exercise': name,
+                               'avg_hr': None if np.isnan(avg) else int(round(avg)),
+                               'max_hr': None if np.isnan(peak) else int(peak)}
+                              for name, avg, peak in zip(names, average, maximum)]
+    return analysis
+
+
+def history_heart_rate(activities, max_hr=DEFAULT_MAX_HR, resting_hr=DEFAULT_RESTING_HR, gender=None):
+    """
+    Time in zones and TRIMP for many activities at once
+
+    The samples of all activities are concatenated and aggregated with one
+    bincount per figure, keyed by activity.
+
+    Args:
+        activities: list of (seconds, heart_rate) array pairs, e.g. from
+            heart_rate_samples()
+
+    Returns:
+        tuple: (zone seconds, shape (activities, zones + 1); TRIMP per activity)
+    """
+    bounds = zone_bounds(max_hr)
+    zone_count = len(bounds) + 1
+    if not activities:
+        return np.zeros((0, zone_count)), np.zeros(0)
+    lengths = np.array([len(seconds) for seconds, _ in activities])
+    activity = np.repeat(np.arange(len(activities)), lengths)
+    seconds = np.concatenate([np.asarray(seconds, dtype=np.float64) for seconds, _ in activities])
+    heart_rate = np.concatenate([np.asarray(rate, dtype=np.float64) for _, rate in activities])
+
+    durations = np.diff(seconds, append=0.0) if len(seconds) else np.zeros(0)
+    # The last sample of each activity holds for nothing
+    durations[np.cumsum(lengths)[lengths > 0] - 1] = 0
+    durations[(durations > MAX_SAMPLE_GAP_SECONDS) | (durations < 0)] = 0
+
+    zones = np.digitize(heart_rate, bounds)
+    zone_seconds = np.bincount(activity * zone_count + zones, weights=durations,
+                               minlength=len(activities) * zone_count).reshape(len(activities), zone_count)
+    a, b = TRIMP_WEIGHTS.get(gender, TRIMP_WEIGHTS["male"])
+    reserve = np.clip((heart_rate - resting_hr) / max(max_hr - resting_hr, 1), 0, 1)
+    load = np.bincount(activity, weights=durations / 60 * reserve * a * np.exp(b * reserve),
+                       minlength=len(activities))
+    return zone_seconds, load
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+User exercise mapping store for the Hevy to Garmin FIT Merger
+
+Mappings the user confirms in the mapping dialog are kept out of the shipped
+hevy_garmin_config.json. They live in an append-only JSONL journal next to
+it; each line records one Hevy exercise and its Garmin mapping (or null to
+drop an override). Saving new mappings appends only those lines, and a
+shipped-config upgrade never overwrites them.
+
+The journal is compacted to one line per exercise once it grows well past
+the number of live entries; compaction writes a temporary file and swaps it
+in with os.replace, so a crash leaves either the old or the new journal.
+A torn last line from an interrupted append is ignored on load.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+
+USER_MAPPINGS_FILENAME = "user_exercise_mappings.jsonl"
+
+
+def default_journal_path():
+    """Journal location next to the shipped configuration"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), USER_MAPPINGS_FILENAME)
+
+
+class MappingStore:
+    """Append-only journal of user exercise mappings with periodic compaction"""
+
+    # Compact once the journal holds this many lines and at least twice the live entries
+    COMPACT_MIN_LINES = 200
+
+    def __init__(self, journal_path=None):
+        self.journal_path = journal_path or default_journal_path()
+        self.mappings = {}
+        self.journal_lines = 0
+        self._needs_newline = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Replay the journal into ``self.mappings``"""
+        self.mappings.clear()
+        self.journal_lines = 0
+        self._needs_newline = False
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                        exercise, mapping = entry["hevy"], entry["mapping"]
+                    except (ValueError, KeyError, TypeError):
+                        # Torn write from an interrupted append, skip it
+                        continue
+                    self.journal_lines += 1
+                    if mapping is None:
+                        self.mappings.pop(exercise, None)
+                    else:
+                        self.mappings[exercise] = mapping
+        except FileNotFoundError:
+            pass
+        return self.mappings
+
+    def add(self, new_mappings):
+        """Record mappings (hevy exercise -> mapping dict, or None to remove)
+
+        Only the new entries are written; the journal is fsynced before
+        returning.
+        """
+        if not new_mappings:
+            return
+        lines = "".join(json.dumps({"hevy": exercise, "mapping": mapping}) + "\n"
+                        for exercise, mapping in new_mappings.items())
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                if self._needs_newline:
+                    f.write("\n")
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._needs_newline = False
+            self.journal_lines += len(new_mappings)
+            for exercise, mapping in new_mappings.items():
+                if mapping is None:
+                    self.mappings.pop(exercise, None)
+                else:
+                    self.mappings[exercise] = mapping
+            if self.journal_lines >= max(self.COMPACT_MIN_LINES, 2 * len(self.mappings)):
+                self._compact_locked()
+
+    def compact(self):
+        """Rewrite the journal with one line per live mapping"""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        directory = os.path.dirname(self.journal_path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".user_mappings_", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for exercise, mapping in self.mappings.items():
+                    f.write(json.dumps({"hevy": exercise, "mapping": mapping}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.journal_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.journal_lines = len(self.mappings)
+        self._needs_newline = False
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Merge fingerprint for the Hevy to Garmin FIT Merger
+
+Every merged file carries a fingerprint of what went into it: the Hevy set
+rows, the exercise mappings and settings used for them, and the merger
+version. It is written as a FIT developer field, in a short block of
+records placed right after the file_id message:
+
+- a developer_data_id message naming this application,
+- a field_description message for the "merge_fingerprint" field,
+- a file_creator message carrying only that 16-byte developer field.
+
+The block is byte-for-byte the same in every merged file apart from the
+fingerprint itself, so probing a file only means memory-mapping it and
+comparing a few dozen bytes after its first records. Batch and watch-folder
+runs use the probe to skip activities that are already merged with the
+same workout and mappings.
+"""
+
+import hashlib
+import itertools
+import json
+import mmap
+import struct
+import uuid
+
+from fit_stream import Definition, FieldDefinition, FitFormatError, FitStream
+
+
+MERGER_VERSION = "1.0.0"
+
+FILE_ID_MESSAGE = 0
+FILE_CREATOR_MESSAGE = 49
+FIELD_DESCRIPTION_MESSAGE = 206
+DEVELOPER_DATA_ID_MESSAGE = 207
+
+# Connect IQ apps number their developer data from 0; the merger uses the
+# top of the range so it does not collide with data already in the file
+DEVELOPER_DATA_INDEX = 0xFE
+APPLICATION_ID = uuid.uuid5(uuid.NAMESPACE_URL, "hevy2garmin/merge-fingerprint").bytes
+FIELD_NAME = "merge_fingerprint"
+FINGERPRINT_SIZE = 16
+
+# Local message type of the block's records; whatever the file had defined
+# there is re-emitted after the block
+FINGERPRINT_LOCAL_TYPE = 14
+
+# Records searched for the block: file_id comes first and the block follows it
+HEAD_RECORDS = 8
+
+UINT8 = 0x02
+STRING = 0x07
+BYTE = 0x0D
+
+
+def merge_fingerprint(parsed_hevy_data, exercise_mappings, settings=None, version=MERGER_VERSION):
+    """
+    Fingerprint of one merge's inputs
+
+    Args:
+        parsed_hevy_data: set rows as returned by parse_hevy_data()
+        exercise_mappings: Hevy exercise name -> Garmin mapping; only the
+            exercises in the rows are part of the fingerprint
+        settings: merge settings (set duration, timing reuse, ...)
+
+    Returns:
+        bytes: FINGERPRINT_SIZE-byte digest
+    """
+    # The row index depends on how much of the export was read, not on the workout
+    rows = [{key: value for key, value in row.items() if key != 'original_row_index'}
+            for row in parsed_hevy_data]
+    exercises = sorted({row['exercise_name'] for row in rows})
+    mappings = {name: dict(exercise_mappings[name]) if name in exercise_mappings else None
+                for name in exercises}
+    payload = json.dumps({'rows': rows, 'mappings': mappings, 'settings': dict(settings or {}),
+                          'version': version}, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=FINGERPRINT_SIZE).digest()
+
+
+def developer_field_records(local_type, developer_data_index, field_number, base_type, field_name):
+    """
+    developer_data_id and field_description records declaring one developer field
+
+    Args:
+        local_type: local message type the records are written with
+        developer_data_index: index the field's data messages refer to
+        field_number: field_definition_number of the field
+        base_type: FIT base type id of the field's values
+        field_name: name shown by FIT tools
+    """
+    name = field_name.encode("ascii") + b"\0"
+    developer_data_id = Definition(local_type, DEVELOPER_DATA_ID_MESSAGE, [
+        FieldDefinition(1, len(APPLICATION_ID), BYTE),      # application_id
+        FieldDefinition(3, 1, UINT8),                       # developer_data_index
+    ])
+    field_description = Definition(local_type, FIELD_DESCRIPTION_MESSAGE, [
+        FieldDefinition(0, 1, UINT8),                       # developer_data_index
+        FieldDefinition(1, 1, UINT8),                       # field_definition_number
+        FieldDefinition(2, 1, UINT8),                       # fit_base_type_id
+        FieldDefinition(3, len(name), STRING),              # field_name
+    ])
+    return b"".join((
+        developer_data_id.to_bytes(), bytes((local_type,)), APPLICATION_ID, bytes((developer_data_index,)),
+        field_description.to_bytes(), bytes((local_type, developer_data_index, field_number, base_type)), name,
+    ))
+
+
+def _block_prefix(local_type):
+    """Bytes of the fingerprint block up to the fingerprint itself"""
+    file_creator = Definition(local_type, FILE_CREATOR_MESSAGE, [],
+                              developer_fields=[(0, FINGERPRINT_SIZE, DEVELOPER_DATA_INDEX)])
+    return b"".join((
+        developer_field_records(local_type, DEVELOPER_DATA_INDEX, 0, BYTE, FIELD_NAME),
+        file_creator.to_bytes(), bytes((local_type,)),
+    ))
+
+
+BLOCK_PREFIX = _block_prefix(FINGERPRINT_LOCAL_TYPE)
+
+
+def fingerprint_block(fingerprint):
+    """The records that embed ``fingerprint``"""
+    if len(fingerprint) != FINGERPRINT_SIZE:
+        raise ValueError(f"Fingerprint must be {FINGERPRINT_SIZE} bytes")
+    return BLOCK_PREFIX + bytes(fingerprint)
+
+
+def find_fingerprint(stream):
+    """
+    Look for the fingerprint block among the first records of a FIT file
+
+    Returns:
+        tuple: (fingerprint bytes, block start offset, block end offset), or
+        None if the file has no fingerprint block
+    """
+    data = stream.data
+    for span, _ in itertools.islice(stream.records(), HEAD_RECORDS):
+        if span.is_definition and span.global_number == DEVELOPER_DATA_ID_MESSAGE:
+            end = span.offset + len(BLOCK_PREFIX) + FINGERPRINT_SIZE
+            if end <= stream.data_end and data[span.offset:end - FINGERPRINT_SIZE] == BLOCK_PREFIX:
+                return bytes(data[end - FINGERPRINT_SIZE:end]), span.offset, end
+    return None
+
+
+def read_merge_fingerprint(path):
+    """
+    Fingerprint embedded in a FIT file, reading only its first records
+
+    Returns:
+        bytes: the fingerprint, or None if the file is missing, not a FIT
+        file, or was not written by the merger
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # missing or empty file
+    view = memoryview(mapped)
+    try:
+        found = find_fingerprint(FitStream(view))
+        return None if found is None else found[0]
+    except (FitFormatError, struct.error, IndexError):
+        return None
+    finally:
+        view.release()
+        mapped.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Merge job primitives for the Hevy to Garmin FIT Merger
+
+A merge job wraps one run of the merge pipeline. It carries a cancellation
+token that the pipeline checks between stages and inside its long loops, and
+it turns stage/loop positions into a single determinate progress fraction
+that both the GUI progress bar and the batch runner can display.
+
+The GUI drives its jobs through TkJobScheduler, an asyncio event loop pumped
+from the Tk main loop with process/thread pools for the heavy stages.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+
+
+# Fraction of the overall progress bar owned by each pipeline stage.
+# Stages are reported in this order by MergePipeline.
+PIPELINE_STAGES = [
+    ("decode", 0.00, 0.35, "Reading Garmin FIT file..."),
+    ("parse", 0.35, 0.45, "Reading workout data..."),
+    ("clean", 0.45, 0.65, "Cleaning Garmin workout data..."),
+    ("map", 0.65, 0.80, "Mapping exercises to Garmin format..."),
+    ("encode", 0.80, 0.95, "Creating enhanced FIT file..."),
+    ("export", 0.95, 1.00, "Writing output file..."),
+]
+
+
+class JobCancelled(BaseException):
+    """Raised inside a merge job once the user has asked it to stop
+
+    Derives from BaseException (like KeyboardInterrupt) so the pipeline's
+    broad ``except Exception`` fallbacks cannot swallow a cancellation.
+    """
+
+
+class CancellationToken:
+    """Thread-safe flag shared between the UI/batch runner and a worker"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """True once cancellation has been requested"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Raise JobCancelled if cancellation has been requested"""
+        if self._event.is_set():
+            raise JobCancelled("Merge cancelled by user")
+
+
+class MergeJob:
+    """One run of the merge pipeline with cancellation and progress reporting
+
+    Progress is reported as a fraction in [0, 1]. The pipeline enters named
+    stages (see PIPELINE_STAGES) and reports item counts within a stage;
+    the job maps those onto the stage's slice of the overall bar.
+
+    ``config`` is the configuration snapshot the job runs with; the pipeline
+    pins the current one when the job starts unless one is given.
+    """
+
+    # Report at most this many progress updates per loop to keep UI traffic low
+    LOOP_UPDATES = 50
+
+    def __init__(self, progress_callback=None, token=None, config=None):
+        self.token = token or CancellationToken()
+        self.progress_callback = progress_callback
+        self.config = config
+        self.progress = 0.0
+        self.message = ""
+        self._stage_bounds = {name: (start, end, text) for name, start, end, text in PIPELINE_STAGES}
+        self._stage_start = 0.0
+        self._stage_end = 1.0
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        """Request cancellation; the worker stops at its next check"""
+        self.token.cancel()
+
+    def check(self):
+        """Cancellation checkpoint - raises JobCancelled if requested"""
+        self.token.raise_if_cancelled()
+
+    def stage(self, name, message=None):
+        """Enter a pipeline stage and report its starting progress"""
+        self.check()
+        start, end, default_text = self._stage_bounds.get(name, (self.progress, self.progress, ""))
+        self._stage_start, self._stage_end = start, end
+        self.report_fraction(start, message or default_text)
+
+    def report(self, done, total, message=None):
+        """Report ``done`` of ``total`` items processed in the current stage"""
+        fraction = (done / total) if total else 1.0
+        span = self._stage_end - self._stage_start
+        self.report_fraction(self._stage_start + span * min(max(fraction, 0.0), 1.0), message)
+
+    def report_fraction(self, fraction, message=None):
+        """Report an absolute progress fraction"""
+        self.progress = min(max(fraction, self.progress), 1.0)
+        if message:
+            self.message = message
+        if self.progress_callback:
+            self.progress_callback(self.progress, self.message)
+
+    def iterate(self, items, total=None, message=None):
+        """Yield items, checking for cancellation and reporting progress as it goes"""
+        if total is None:
+            try:
+                total = len(items)
+            except TypeError:
+                total = 0
+        step = max(1, total // self.LOOP_UPDATES) if total else 1
+        for index, item in enumerate(items):
+            if index % step == 0:
+                self.check()
+                if total:
+                    self.report(index, total, message)
+            yield item
+        self.check()
+        self.report(total, total, message)
+
+    def finish(self, message="Done"):
+        """Mark the job as complete"""
+        self.report_fraction(1.0, message)
+
+
+class TkJobScheduler:
+    """Runs merge coroutines on an asyncio event loop driven by the Tk main loop
+
+    The event loop lives on the Tk thread and is advanced a few times per
+    frame from ``root.after``, so coroutines may touch widgets directly.
+    CPU-bound stages are awaited on a process pool, blocking I/O and
+    stateful pipeline steps on a thread pool. Completion callbacks run as
+    ordinary Tk callbacks, outside the loop, so they may open modal windows.
+    """
+
+    POLL_INTERVAL_MS = 15
+
+    def __init__(self, root, max_processes=2, max_threads=4):
+        self.root = root
+        self.loop = asyncio.new_event_loop()
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="merge-io")
+        self.loop.set_default_executor(self.thread_pool)
+        self.max_processes = max_processes
+        self._process_pool = None
+        self._pumping = False
+        self._closed = False
+        self._after_id = self.root.after(self.POLL_INTERVAL_MS, self._pump)
+
+    def _pump(self):
+        """Run every ready asyncio callback, then reschedule"""
+        # A modal window (wait_window) runs a nested Tk loop from inside a
+        # callback; never re-enter the asyncio loop from there.
+        if not self._pumping and not self._closed:
+            self._pumping = True
+            try:
+                self.loop.call_soon(self.loop.stop)
+                self.loop.run_forever()
+            finally:
+                self._pumping = False
+        if not self._closed:
+            self._after_id = self.root.after(self.POLL_INTERVAL_MS, self._pump)
+
+    @property
+    def process_pool(self):
+        """Process pool for CPU-bound stages, created on first use"""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._process_pool
+
+    def call_threadsafe(self, callback, *args):
+        """Schedule ``callback(*args)`` on the Tk thread from any thread"""
+        if not self._closed:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def threadsafe(self, callback):
+        """Wrap ``callback`` so worker threads can call it safely"""
+        return lambda *args: self.call_threadsafe(callback, *args)
+
+    async def run_cpu(self, func, *args):
+        """Await ``func(*args)`` in a worker process
+
+        ``func`` and its arguments must be picklable. Falls back to a
+        worker thread if the process pool is unavailable.
+        """
+        try:
+            future = self.loop.run_in_executor(self.process_pool, func, *args)
+        except (OSError, NotImplementedError, RuntimeError):
+            # No usable process support (e.g. sandboxed or frozen without freeze_support)
+            return await self.run_io(func, *args)
+        try:
+            return await future
+        except (BrokenProcessPool, PicklingError):
+            self._process_pool = None
+            return await self.run_io(func, *args)
+
+    async def run_io(self, func, *args):
+        """Await ``func(*args)`` in a worker thread"""
+        return await self.loop.run_in_executor(self.thread_pool, func, *args)
+
+    def submit(self, coroutine, on_done=None):
+        """Start a coroutine as a task; ``on_done(task)`` runs as a Tk callback"""
+        task = self.loop.create_task(coroutine)
+        if on_done:
+            task.add_done_callback(lambda done_task: self.root.after_idle(on_done, done_task))
+        return task
+
+    def shutdown(self):
+        """Cancel outstanding tasks and stop the worker pools"""
+        if self._closed:
+            return
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        try:
+            self.loop.run_until_complete(asyncio.sleep(0))
+        except RuntimeError:
+            pass
+        self._closed = True
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        self.loop.close()
@@ -0,0 +1,1055 @@
+#!/usr/bin/env python3
+"""
+Headless merge pipeline for the Hevy to Garmin FIT Merger
+
+Holds the processing steps that turn a Garmin FIT file and a Hevy CSV export
+into an enhanced FIT file. The desktop app (HevyGarminMerger) inherits these
+steps and adds its GUI on top; the batch runner uses HeadlessMerger directly.
+Every long-running step accepts an optional MergeJob so callers can cancel it
+and follow its progress.
+"""
+
+import pandas as pd
+import os
+import json
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import datetime, timedelta, timezone
+
+from fit_decoder import decode_fit
+from fit_encoder import write_enhanced_fit
+from fit_stream import FitStream
+import garmin_exercises
+from hevy_csv import hevy_fit_timestamps, hevy_local_times, read_hevy_csv
+from hr_analysis import analyze_heart_rate
+from mapping_store import MappingStore
+from merge_fingerprint import merge_fingerprint, read_merge_fingerprint
+from config_snapshot import ConfigSnapshot, ConfigStore
+from merge_jobs import MergeJob
+from set_alignment import index_garmin_sets, aligned_set_timings
+from set_table import SetTable
+
+
+# Global FIT message numbers of the strength-training records replaced by the
+# merge: set (225) and exercise_title (264). Everything else is preserved.
+STRENGTH_MESSAGE_NUMBERS = frozenset({225, 264})
+
+# Seconds between the Unix epoch and the FIT epoch (1989-12-31 00:00 UTC)
+FIT_EPOCH_OFFSET = 631065600
+
+
+def decode_garmin_file(garmin_fit_path):
+    """
+    Decode a Garmin FIT file and tabulate its record messages as a DataFrame
+
+    Kept at module level (no GUI or pipeline state) so it can run in a
+    worker process. Decoding uses the column decoder in fit_decoder, which
+    falls back to fit_tool for files it does not handle.
+
+    Returns:
+        tuple: (DecodedFit, garmin DataFrame with one row per record message)
+    """
+    with open(garmin_fit_path, 'rb') as f:
+        fit_file = decode_fit(f.read())
+    garmin_df = fit_file.message(20).to_dataframe()  # 20 = record
+    return fit_file, garmin_df
+
+
+def summarize_fit_session(fit_file):
+    """
+    Extract session start, duration and sport from a decoded FIT file
+
+    Returns:
+        dict: see summarize_session_values(); values are None when the file
+        has no session/activity message
+    """
+    session, activity = fit_file.message(18), fit_file.message(34)  # 18 = session, 34 = activity
+    return summarize_session_values(
+        start_time=session.first('start_time'), total_elapsed_time=session.first('total_elapsed_time'),
+        sport=session.first('sport'), sub_sport=session.first('sub_sport'),
+        timestamp=activity.first('timestamp'), local_timestamp=activity.first('local_timestamp'))
+
+
+def summarize_session_values(start_time=None, total_elapsed_time=None, sport=None, sub_sport=None,
+                             timestamp=None, local_timestamp=None):
+    """
+    Session summary from decoded session and activity field values
+
+    Timestamps are milliseconds since the Unix epoch, as decoded; the
+    activity's local_timestamp is wall-clock seconds since the FIT epoch
+    (no profile scaling).
+
+    Returns:
+        dict: start_time (UTC datetime), duration_seconds, sport, sub_sport,
+        utc_offset_seconds and local_start_time (naive wall-clock datetime)
+    """
+    summary = {'start_time': None, 'duration_seconds': None, 'sport': None, 'sub_sport': None,
+               'utc_offset_seconds': None, 'local_start_time': None}
+    if start_time:
+        summary['start_time'] = datetime.fromtimestamp(start_time / 1000, tz=timezone.utc)
+    if total_elapsed_time:
+        summary['duration_seconds'] = int(round(total_elapsed_time))
+    summary['sport'] = fit_enum_name('Sport', sport)
+    summary['sub_sport'] = fit_enum_name('SubSport', sub_sport)
+    if timestamp and local_timestamp:
+        summary['utc_offset_seconds'] = int(round(local_timestamp + FIT_EPOCH_OFFSET - timestamp / 1000))
+    if summary['start_time'] is not None and summary['utc_offset_seconds'] is not None:
+        summary['local_start_time'] = (summary['start_time'] + timedelta(seconds=summary['utc_offset_seconds'])
+                                       ).replace(tzinfo=None)
+    return summary
+
+
+def fit_enum_name(enum_name, value):
+    """Readable name for a FIT profile enum value (falls back to the raw value)"""
+    if value is None:
+        return None
+    try:
+        from fit_tool.profile import profile_type
+        return getattr(profile_type, enum_name)(int(value)).name.lower()
+    except Exception:
+        return str(value)
+
+
+def inspect_garmin_file(garmin_fit_path):
+    """
+    Decode a Garmin FIT file and summarise its session
+
+    Used to pre-read a file as soon as it is selected; the decoded data is
+    kept for the merge. Module-level so it can run in a worker process.
+
+    Returns:
+        tuple: (DecodedFit, garmin DataFrame, session summary dict)
+    """
+    fit_file, garmin_df = decode_garmin_file(garmin_fit_path)
+    return fit_file, garmin_df, summarize_fit_session(fit_file)
+
+
+class MergePipeline:
+    """Merge processing steps shared by the GUI and headless runners
+
+    Subclasses set ``self.config`` and may override ``update_status``.
+
+    The configuration is an immutable ConfigSnapshot held in a ConfigStore;
+    assigning ``self.config`` (a snapshot or a plain dict) publishes a new
+    snapshot. Each merge job pins the snapshot current when it starts, so
+    mappings confirmed while a merge runs only apply to the next one.
+    """
+
+    def update_status(self, message):
+        """Report a status message (printed when running headless)"""
+        print(message)
+
+    @property
+    def mapping_store(self):
+        """Journal of user-confirmed exercise mappings, opened on first use"""
+        if getattr(self, '_mapping_store', None) is None:
+            self._mapping_store = MappingStore()
+        return self._mapping_store
+
+    @property
+    def config(self):
+        """The current configuration snapshot"""
+        return self.config_store.current
+
+    @config.setter
+    def config(self, config):
+        store = getattr(self, '_config_store', None)
+        if store is None:
+            self._config_store = ConfigStore(config if isinstance(config, ConfigSnapshot) else ConfigSnapshot(config))
+        else:
+            store.replace(config)
+
+    @property
+    def config_store(self):
+        """Publishes configuration snapshots, loading the configuration on first use"""
+        if getattr(self, '_config_store', None) is None:
+            self._config_store = ConfigStore(self.load_config())
+        return self._config_store
+
+    def job_config(self, job):
+        """The snapshot pinned by ``job``, or the current one if it has none"""
+        return (job.config if job is not None else None) or self.config
+    
+    def load_config(self):
+        """Load the Hevy-Garmin configuration file
+        
+        Returns a ConfigSnapshot with the user mappings from the mapping store
+        layered over the shipped exercise mappings rather than merged into them.
+        """
+        try:
+            config_path = os.path.join(os.path.dirname(__file__), "hevy_garmin_config.json")
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            try:
+                user_mappings = self.mapping_store.mappings
+            except OSError as store_err:
+                user_mappings = None
+                self.update_status(f"Warning: Could not load saved exercise mappings: {store_err}")
+            return ConfigSnapshot(config, user_mappings)
+        except Exception as e:
+            # Fallback to basic config if file not found
+            return ConfigSnapshot({
+                "settings": {"weight_unit": "kg", "default_set_duration_seconds": 30},
+                "exercise_mappings": {},
+                "hevy_csv_columns": {
+                    "exercise_name": "Exercise Name",
+                    "set_number": "Set Order", 
+                    "reps": "Reps",
+                    "weight": "Weight",
+                    "set_note": "Notes"
+                }
+            })
+
+    def load_garmin_data(self, garmin_fit_path, job=None):
+        """Decode a Garmin FIT file and tabulate it as a DataFrame
+
+        Returns:
+            tuple: (DecodedFit, garmin DataFrame)
+        """
+        job = job or MergeJob()
+        job.stage("decode")
+        fit_file, garmin_df = decode_garmin_file(garmin_fit_path)
+        job.report(1, 1)
+        self.update_status("Garmin FIT file loaded successfully.")
+        self.update_status(f"Loaded Garmin data: {len(garmin_df)} records")
+        return fit_file, garmin_df
+
+    def apply_user_edits(self, fit_file, edited_garmin_sets, edit_history=None):
+        """Apply user edits to the FIT file
+        
+        Args:
+            edited_garmin_sets: SetTable in its final edited state
+            edit_history: optional EditHistory the edits were made through
+        """
+        try:
+            # The edited sets are encoded when the file is written (write_fit_file)
+            if edit_history is not None and len(edit_history):
+                changes = edit_history.changes()
+                edited_sets = len({index for index, _ in changes})
+                self.update_status(f"{len(edit_history)} edits changed {len(changes)} values in {edited_sets} sets")
+            self.update_status("=== FINAL WORKOUT DATA ===")
+            self.log_exercise_summary(edited_garmin_sets.exercise_summary())
+            
+            return fit_file
+            
+        except Exception as e:
+            self.update_status(f"Error applying edits: {str(e)}")
+            return fit_file
+    
+    def log_exercise_summary(self, exercise_summary):
+        """Write one status line per exercise from SetTable.exercise_summary()"""
+        weight_unit = getattr(self, 'weight_unit', 'kg')
+        for exercise, stats in exercise_summary.items():
+            self.update_status(f"{exercise.title()}: {stats['sets']} sets, "
+                             f"{stats['total_reps']} total reps, "
+                             f"max {stats['max_weight']} {weight_unit}")
+    
+    def extract_workout_statistics(self, garmin_df, fit_file=None, garmin_sets=None):
+        """Extract workout statistics from Garmin data for the preview
+        
+        With the decoded FIT file, 'heart_rate' holds time in zones, TRIMP
+        and per-exercise-block heart rate (see hr_analysis.analyze_heart_rate).
+        """
+        try:
+            stats = {
+                'duration_seconds': 1800,  # Default 30 minutes
+                'avg_hr': 110,
+                'max_hr': 143,
+                'calories': 194,
+                'total_records': len(garmin_df)
+            }
+            
+            # Try to extract actual stats from Garmin data
+            if 'heart_rate' in garmin_df.columns:
+                hr_data = garmin_df['heart_rate'].dropna()
+                if len(hr_data) > 0:
+                    stats['avg_hr'] = int(hr_data.mean())
+                    stats['max_hr'] = int(hr_data.max())
+            
+            # Try to extract duration from timestamps
+            timestamp_cols = [col for col in garmin_df.columns if 'timestamp' in col.lower()]
+            if timestamp_cols and len(garmin_df) > 1:
+                try:
+                    # Estimate duration from number of records
+                    stats['duration_seconds'] = max(1800, len(garmin_df) * 5)  # 5 seconds per record estimate
+                except:
+                    pass
+            
+            if fit_file is not None:
+                # The session message has the recorded duration and calories
+                summary = summarize_fit_session(fit_file)
+                if summary['duration_seconds']:
+                    stats['duration_seconds'] = summary['duration_seconds']
+                calories = fit_file.message(18).first('total_calories')  # 18 = session
+                if calories:
+                    stats['calories'] = int(calories)
+                session_start = summary['start_time']
+                stats['heart_rate'] = analyze_heart_rate(
+                    fit_file, garmin_sets, session_start.timestamp() if session_start else None)
+            
+            return stats
+            
+        except Exception as e:
+            self.update_status(f"Error extracting statistics: {str(e)}")
+            return {'duration_seconds': 1800, 'avg_hr': 110, 'max_hr': 143, 'calories': 194, 'total_records': 0}
+            
+    def integrate_hevy_data(self, garmin_fit_file, hevy_df, job=None, parsed_hevy_data=None):
+        """
+        Integrate Hevy workout data into Garmin FIT file
+        
+        This function:
+        1. Removes existing sets from Garmin data while preserving heart rate/timing
+        2. Maps Hevy exercises to Garmin exercise IDs
+        3. Implements timestamp alignment logic
+        4. Creates proper FIT records for strength training data
+        5. Aggregates set notes into workout notes
+        
+        Args:
+            garmin_fit_file: DecodedFit of the original Garmin recording
+            hevy_df: pandas DataFrame with Hevy workout data
+            job: optional MergeJob used for cancellation and progress
+            parsed_hevy_data: hevy_df already parsed by parse_hevy_data(), if
+                the caller has it, so it is not parsed again
+            
+        Returns:
+            DecodedFit: Enhanced FIT file with integrated workout data
+        """
+        job = job or MergeJob()
+        if job.config is None:
+            job.config = self.config
+        # Sets of an earlier merge must never be written with this activity
+        self.last_processed_sets = SetTable()
+        try:
+            # Step 1: Parse Hevy data using column mappings
+            if parsed_hevy_data is None:
+                self.update_status("Parsing Hevy workout data...")
+                parsed_hevy_data = self.parse_hevy_data(hevy_df, job=job)
+            
+            if not parsed_hevy_data:
+                self.update_status("Warning: No valid Hevy data found")
+                return garmin_fit_file
+            
+            # Optionally keep the timing of the sets the watch recorded
+            set_timings = None
+            if job.config.settings.get("reuse_garmin_set_timing", False):
+                set_timings = self.align_to_garmin_sets(garmin_fit_file, parsed_hevy_data, job=job)
+            
+            # Step 2: Remove existing sets from Garmin data
+            self.update_status("Cleaning Garmin workout data...")
+            cleaned_fit_file = self.remove_garmin_sets(garmin_fit_file, job=job)
+            
+            # Step 3: Get workout timing information
+            workout_timing = self.extract_workout_timing(cleaned_fit_file)
+            self.update_status(f"Garmin workout duration: {workout_timing['duration_seconds']} seconds")
+            
+            # Step 4: Map exercises and create set records
+            self.update_status("Mapping exercises to Garmin format...")
+            garmin_sets = self.map_hevy_to_garmin_sets(parsed_hevy_data, workout_timing, job=job,
+                                                       set_timings=set_timings)
+            
+            # Step 5: Create enhanced FIT file with new sets
+            self.update_status("Creating enhanced FIT file...")
+            enhanced_fit_file = self.create_enhanced_fit_file(cleaned_fit_file, garmin_sets, parsed_hevy_data, job=job)
+            
+            # Store the processed sets for the preview window
+            self.last_processed_sets = garmin_sets
+            
+            self.update_status(f"Successfully integrated {len(garmin_sets)} sets from Hevy data")
+            return enhanced_fit_file
+            
+        except Exception as e:
+            self.update_status(f"Error during integration: {str(e)}")
+            # Return original file if integration fails
+            return garmin_fit_file
+    
+    def parse_hevy_data(self, hevy_df, job=None):
+        """Parse Hevy CSV data using column mappings from config"""
+        job = job or MergeJob()
+        try:
+            job.stage("parse")
+            col_mapping = self.job_config(job)["hevy_csv_columns"]
+            parsed_data = []
+            # Optional auto-detect: if workout title hints pounds, convert to kg
+            # We inspect the workout title column if present and set a flag
+            detected_pounds = False
+            title_col = col_mapping.get("workout_title")
+            if title_col and title_col in hevy_df.columns:
+                try:
+                    title_sample = " ".join(str(t) for t in hevy_df[title_col].dropna().astype(str).head(10))
+                    title_lower = title_sample.lower()
+                    if "lbs" in title_lower or "pound" in title_lower:
+                        detected_pounds = True
+                        self.update_status("Detected 'lbs' in Hevy workout title; converting weights to kg.")
+                except Exception:
+                    pass
+
+            # Start times as FIT local seconds, parsed once per distinct string. Rows are
+            # parsed before the activity is decoded and fingerprinted, so they stay
+            # wall-clock; hevy_start_timestamp() converts with the activity's offset
+            start_col = col_mapping.get("start_time")
+            local_times = None
+            if start_col and start_col in hevy_df.columns:
+                local_times = hevy_local_times(hevy_df[start_col])
+            
+            for idx, row in job.iterate(hevy_df.iterrows(), total=len(hevy_df)):
+                try:
+                    # Extract data using column mappings
+                    exercise_name = str(row.get(col_mapping.get("exercise_name", "Exercise Name"), "")).strip()
+                    if not exercise_name or exercise_name.lower() == 'nan':
+                        continue
+                        
+                    set_data = {
+                        'exercise_name': exercise_name.lower(),
+                        'set_number': int(row.get(col_mapping.get("set_number", "Set Order"), 1)),
+                        'reps': int(row.get(col_mapping.get("reps", "Reps"), 0)),
+                        'weight': float(row.get(col_mapping.get("weight", "Weight"), 0)),
+                        'set_note': str(row.get(col_mapping.get("set_note", "Notes"), "")).strip(),
+                        'original_row_index': idx
+                    }
+
+                    # If detected pounds, convert to kilograms
+                    if detected_pounds and set_data['weight']:
+                        set_data['weight'] = round(set_data['weight'] * 0.45359237, 3)
+                    
+                    # Handle optional columns
+                    if "workout_note" in col_mapping:
+                        set_data['workout_note'] = str(row.get(col_mapping["workout_note"], "")).strip()
+                    if "start_time" in col_mapping:
+                        set_data['start_time'] = str(row.get(col_mapping["start_time"], "")).strip()
+                    if local_times is not None:
+                        local_time = local_times.get(idx)
+                        set_data['local_timestamp'] = None if pd.isna(local_time) else int(local_time)
+                    
+                    parsed_data.append(set_data)
+                    
+                except (ValueError, TypeError) as e:
+                    self.update_status(f"Warning: Skipping invalid row {idx}: {str(e)}")
+                    continue
+            
+            self.update_status(f"Parsed {len(parsed_data)} valid sets from Hevy data")
+            return parsed_data
+            
+        except Exception as e:
+            self.update_status(f"Error parsing Hevy data: {str(e)}")
+            return []
+    
+    def hevy_start_timestamp(self, parsed_hevy_data, utc_offset_seconds):
+        """
+        FIT timestamp (UTC seconds since the FIT epoch) of the earliest Hevy start time
+        
+        Parsed rows keep Hevy's wall-clock start (local_timestamp) so they do
+        not depend on the activity; its UTC offset, from the activity's
+        local_timestamp, places them on the FIT clock here.
+        
+        Returns:
+            int: the timestamp, or None without an offset or a parseable start
+        """
+        if utc_offset_seconds is None:
+            return None
+        starts = hevy_fit_timestamps([set_data.get('start_time') for set_data in parsed_hevy_data],
+                                     utc_offset_seconds).dropna()
+        return int(starts.min()) if len(starts) else None
+    
+    def merge_fingerprint(self, parsed_hevy_data, config=None):
+        """Fingerprint of merging these Hevy rows with the current mappings (see merge_fingerprint)"""
+        config = config or self.config
+        return merge_fingerprint(parsed_hevy_data, config.exercise_mappings, config.settings)
+    
+    def remove_garmin_sets(self, garmin_fit_file, job=None):
+        """Remove existing set records from Garmin FIT file while preserving other data"""
+        job = job or MergeJob()
+        try:
+            job.stage("clean")
+            
+            # Remove strength training set/exercise messages by message number;
+            # preserve everything else (session, lap, heart rate, device
+            # settings, etc.). The encoder leaves their bytes out on export.
+            removed_counts = {number: len(garmin_fit_file.message(number)) for number in STRENGTH_MESSAGE_NUMBERS}
+            removed_sets_count = sum(removed_counts.values())
+            cleaned_fit_file = garmin_fit_file.without(STRENGTH_MESSAGE_NUMBERS)
+            job.report(1, 1)
+            
+            if cleaned_fit_file.messages:
+                self.update_status(f"Removed {removed_sets_count} existing set records "
+                                 f"({removed_counts.get(225, 0)} set, {removed_counts.get(264, 0)} exercise title)")
+                preserved_count = sum(len(columns) for columns in cleaned_fit_file.messages.values())
+                self.update_status(f"Preserved {preserved_count} data records (heart rate, timing, etc.)")
+                return cleaned_fit_file
+            else:
+                self.update_status("Warning: No records to preserve, using original file")
+                return garmin_fit_file
+                
+        except Exception as e:
+            self.update_status(f"Error cleaning Garmin data: {str(e)}")
+            self.update_status("Falling back to preserving all original data")
+            return garmin_fit_file
+    
+    def extract_workout_timing(self, fit_file):
+        """Extract timing information from Garmin FIT file"""
+        try:
+            # Extract basic timing info
+            timing_info = {
+                'start_time': datetime.now(),  # Placeholder
+                'duration_seconds': 3600,  # Default 1 hour
+                'total_records': fit_file.record_count
+            }
+            
+            # Get the actual duration from the record message timestamps
+            timestamps = fit_file.message(20).get('timestamp')  # 20 = record
+            if timestamps is not None and len(timestamps) > 1:
+                first_time, last_time = timestamps[0], timestamps[-1]
+                if pd.notna(first_time) and pd.notna(last_time) and last_time > first_time:
+                    timing_info['duration_seconds'] = (last_time - first_time) / 1000
+            
+            return timing_info
+            
+        except Exception as e:
+            self.update_status(f"Error extracting timing: {str(e)}")
+            return {'start_time': datetime.now(), 'duration_seconds': 3600, 'total_records': 0}
+    
+    def align_to_garmin_sets(self, garmin_fit_file, parsed_hevy_data, job=None):
+        """
+        Align Hevy sets onto the active sets recorded by the watch
+        
+        Returns:
+            list: (offset_seconds, duration) per Hevy set, or None if the
+            activity has no recorded sets to align to
+        """
+        try:
+            recorded_sets = index_garmin_sets(garmin_fit_file)
+            if not recorded_sets:
+                self.update_status("No recorded Garmin sets found, spacing sets evenly")
+                return None
+            
+            summary = summarize_fit_session(garmin_fit_file)
+            session_start = summary['start_time']
+            workout_start = session_start.timestamp() if session_start else recorded_sets[0]['start_time']
+            hevy_start = self.hevy_start_timestamp(parsed_hevy_data, summary['utc_offset_seconds'])
+            if hevy_start is not None:
+                hevy_start += FIT_EPOCH_OFFSET
+            default_duration = self.job_config(job).settings.get('default_set_duration_seconds', 30)
+            set_timings, matched = aligned_set_timings(parsed_hevy_data, recorded_sets, workout_start, default_duration,
+                                                       hevy_start=hevy_start)
+            self.update_status(f"Aligned {matched} of {len(parsed_hevy_data)} Hevy sets to "
+                               f"{len(recorded_sets)} recorded Garmin sets")
+            return set_timings
+        except Exception as e:
+            self.update_status(f"Could not align to recorded Garmin sets: {str(e)}")
+            return None
+    
+    def map_hevy_to_garmin_sets(self, parsed_hevy_data, workout_timing, job=None, set_timings=None):
+        """Map Hevy exercises to Garmin set records with proper timing
+        
+        ``set_timings`` optionally gives (offset_seconds, duration) per set,
+        taken from the watch's recorded sets; otherwise sets are spaced
+        evenly across the workout.
+        """
+        job = job or MergeJob()
+        try:
+            job.stage("map")
+            # Proceed with mapping (unmapped exercises handled earlier in workflow)
+            config = self.job_config(job)
+            exercise_mappings = config.exercise_mappings
+            settings = config.settings
+            
+            # Always operate in kilograms for output
+            selected_weight_unit = "kg"
+            weight_unit_id = 0
+            
+            # Calculate time distribution across sets
+            total_sets = len(parsed_hevy_data)
+            if total_sets == 0:
+                return SetTable()
+            garmin_sets = SetTable.allocate(total_sets)
+            
+            duration_per_set = workout_timing['duration_seconds'] / total_sets
+            current_time_offset = 0
+            
+            set_notes_for_workout = []  # Collect notes for workout note
+            invalid_mappings = set()
+            
+            for i, set_data in enumerate(job.iterate(parsed_hevy_data)):
+                exercise_name = set_data['exercise_name']
+                
+                # Look up exercise mapping (should now include user mappings)
+                exercise_mapping = exercise_mappings.get(exercise_name)
+                if not exercise_mapping:
+                    self.update_status(f"Warning: No mapping found for '{exercise_name}', using default")
+                    exercise_mapping = {"category": 0, "name": 0}  # Default strength training
+                elif not garmin_exercises.is_valid(exercise_mapping['category'], exercise_mapping['name']):
+                    # Keep a known category, drop an exercise id the FIT profile doesn't define
+                    if exercise_name not in invalid_mappings:
+                        self.update_status(f"Warning: Mapping for '{exercise_name}' is not in the FIT exercise "
+                                           f"catalogue, writing the category only")
+                    invalid_mappings.add(exercise_name)
+                    exercise_mapping = garmin_exercises.category_mapping(exercise_mapping['category'])
+                
+                # Detect set type from notes
+                set_type = self.detect_set_type(set_data.get('set_note', ''), config)
+                
+                if set_timings:
+                    set_timestamp, set_duration = set_timings[i]
+                else:
+                    # Calculate timestamp (ensure it stays within workout duration)
+                    set_timestamp = min(current_time_offset, workout_timing['duration_seconds'] - 1)
+                    set_duration = settings.get('default_set_duration_seconds', 30)
+                
+                # Create Garmin set record
+                garmin_sets.put(
+                    i, set_data['exercise_name'],
+                    timestamp=set_timestamp,
+                    exercise_category=exercise_mapping['category'],
+                    exercise_name=exercise_mapping['name'],
+                    weight=set_data['weight'],
+                    weight_unit=weight_unit_id,
+                    repetitions=set_data['reps'],
+                    set_number=set_data['set_number'],
+                    set_type=set_type,
+                    duration=set_duration
+                )
+                
+                # Collect set notes if they exist
+                if set_data.get('set_note') and settings.get('append_set_notes_to_workout_note', True):
+                    note_format = settings.get('set_note_format_string', 
+                                             "\n\n--- SET NOTES ---\n{exercise_name} - Set {set_number}: {note_text}")
+                    formatted_note = note_format.format(
+                        exercise_name=set_data['exercise_name'].title(),
+                        set_number=set_data['set_number'],
+                        note_text=set_data['set_note']
+                    )
+                    set_notes_for_workout.append(formatted_note)
+                
+                # Advance time for next set
+                current_time_offset += duration_per_set
+            
+            # Store aggregated notes for later use
+            self.aggregated_workout_notes = set_notes_for_workout
+            
+            self.update_status(f"Mapped {len(garmin_sets)} sets with {garmin_sets.recognized_count()} recognized exercises")
+            return garmin_sets
+            
+        except Exception as e:
+            self.update_status(f"Error mapping exercises: {str(e)}")
+            return SetTable()
+    
+    def detect_hevy_workouts(self, hevy_df):
+        """
+        Group a Hevy export into individual workouts
+
+        Returns:
+            list: one dict per workout (title, start_time, end_time, sets,
+            exercises) in export order
+        """
+        col_mapping = self.config.get("hevy_csv_columns", {})
+        start_col = col_mapping.get("start_time")
+        if not start_col or start_col not in hevy_df.columns:
+            return []
+        
+        title_col = col_mapping.get("workout_title")
+        end_col = col_mapping.get("end_time")
+        exercise_col = col_mapping.get("exercise_name", "Exercise Name")
+        group_cols = [start_col] + ([title_col] if title_col in hevy_df.columns else [])
+        
+        workouts = []
+        for _, group in hevy_df.groupby(group_cols, sort=False, dropna=False, observed=True):
+            first_row = group.iloc[0]
+            workouts.append({
+                'title': str(first_row[title_col]) if title_col in group.columns else "",
+                'start_time': str(first_row[start_col]),
+                'end_time': str(first_row[end_col]) if end_col in group.columns else "",
+                'sets': len(group),
+                'exercises': int(group[exercise_col].nunique()) if exercise_col in group.columns else 0
+            })
+        return workouts
+    
+    def find_unmapped_exercises(self, parsed_hevy_data):
+        """Find exercises that don't have Garmin mappings"""
+        try:
+            exercise_mappings = self.config.exercise_mappings
+            unmapped_exercises = set()
+            
+            for set_data in parsed_hevy_data:
+                exercise_name = set_data['exercise_name']
+                if exercise_name not in exercise_mappings:
+                    unmapped_exercises.add(exercise_name)
+            
+            return list(unmapped_exercises)
+            
+        except Exception as e:
+            self.update_status(f"Error finding unmapped exercises: {str(e)}")
+            return []
+    
+    def apply_user_mappings(self, user_mappings):
+        """Record user-defined exercise mappings in the mapping store
+        
+        Only the new mappings are appended to the store's journal; the shipped
+        configuration file is never rewritten.
+        """
+        try:
+            exercise_mappings = self.config.exercise_mappings
+            new_mappings = {}
+            
+            for hevy_exercise, garmin_exercise in user_mappings.items():
+                # Find the mapping for the selected Garmin exercise: the FIT
+                # catalogue first, then (for mappings saved by older versions)
+                # an existing Hevy name
+                found_mapping = garmin_exercises.mapping_for(garmin_exercise)
+                if found_mapping is None:
+                    found_mapping = exercise_mappings.get(garmin_exercise.lower())
+                
+                if found_mapping:
+                    # Use the existing mapping
+                    new_mappings[hevy_exercise.lower()] = dict(found_mapping)
+                    self.update_status(f"Mapped '{hevy_exercise}' to '{garmin_exercise}'")
+                else:
+                    # Create generic mapping based on exercise type
+                    generic_mapping = self.create_generic_mapping(garmin_exercise)
+                    new_mappings[hevy_exercise.lower()] = generic_mapping
+                    self.update_status(f"Created generic mapping for '{hevy_exercise}' as '{garmin_exercise}'")
+            
+            try:
+                self.mapping_store.add(new_mappings)
+                self.update_status("Saved updated exercise mappings.")
+            except OSError as save_err:
+                # Keep the mappings for this session even if the journal is not writable
+                self.mapping_store.mappings.update(new_mappings)
+                self.update_status(f"Warning: Could not save mappings to file: {save_err}")
+            # Later merges see the new mappings; running ones keep their snapshot
+            user_mappings = dict(self.mapping_store.mappings)
+            self.config_store.publish(lambda config: config.with_user_mappings(user_mappings))
+            
+        except Exception as e:
+            self.update_status(f"Error applying user mappings: {str(e)}")
+    
+    def create_generic_mapping(self, garmin_exercise_name):
+        """Create a category-only mapping based on exercise type"""
+        exercise_lower = garmin_exercise_name.lower()
+        
+        # Map to appropriate categories based on keywords
+        if any(word in exercise_lower for word in ['chest', 'bench', 'press']):
+            category = "bench_press"
+        elif any(word in exercise_lower for word in ['back', 'pull', 'row']):
+            category = "row"
+        elif any(word in exercise_lower for word in ['shoulder', 'overhead']):
+            category = "shoulder_press"
+        elif any(word in exercise_lower for word in ['leg', 'squat', 'lunge']):
+            category = "squat"
+        elif any(word in exercise_lower for word in ['arm', 'bicep', 'tricep', 'curl']):
+            category = "curl"
+        elif any(word in exercise_lower for word in ['core', 'ab', 'plank']):
+            category = "core"
+        else:
+            # Generic strength training has no FIT category of its own
+            return garmin_exercises.category_mapping(garmin_exercises.UNKNOWN_CATEGORY)
+        return garmin_exercises.category_mapping(garmin_exercises.CATEGORY_IDS[category])
+    
+    def detect_set_type(self, set_note, config=None):
+        """Detect set type from note text using keyword mapping (0 = normal set)"""
+        return (config or self.config).set_type_for(set_note)
+    
+    def create_enhanced_fit_file(self, base_fit_file, garmin_sets, parsed_hevy_data, job=None):
+        """Create enhanced FIT file with integrated Hevy data"""
+        job = job or MergeJob()
+        try:
+            job.stage("encode")
+            
+            # The set messages themselves are encoded byte-for-byte when the
+            # file is written (write_fit_file); here we only report them
+            added_sets = 0
+            
+            for set_data in job.iterate(garmin_sets):
+                self.update_status(f"Adding set: {set_data['original_exercise_name']} - "
+                                 f"{set_data['repetitions']} reps @ {set_data['weight']} "
+                                 f"{getattr(self, 'weight_unit', 'kg')}")
+                added_sets += 1
+            
+            # Create exercise summary
+            exercise_summary = garmin_sets.exercise_summary()
+            totals = garmin_sets.totals()
+            
+            # Log integration summary
+            self.update_status("=== WORKOUT INTEGRATION SUMMARY ===")
+            self.log_exercise_summary(exercise_summary)
+            
+            # Add workout notes summary
+            if hasattr(self, 'aggregated_workout_notes') and self.aggregated_workout_notes:
+                self.update_status(f"Integrated {len(self.aggregated_workout_notes)} set notes")
+                
+                # Create a comprehensive workout note
+                workout_note = "Hevy Workout Integration:\n"
+                workout_note += f"• {len(exercise_summary)} exercises\n"
+                workout_note += f"• {totals['sets']} total sets\n"
+                workout_note += f"• {totals['reps']} total reps\n"
+                
+                # Add individual set notes
+                if self.aggregated_workout_notes:
+                    workout_note += "\nSet Notes:"
+                    for note in self.aggregated_workout_notes:
+                        workout_note += note
+                
+                self.update_status("Created comprehensive workout note with Hevy data")
+            
+            self.update_status(f"Enhanced FIT file with {added_sets} strength training sets")
+            return base_fit_file
+            
+        except Exception as e:
+            self.update_status(f"Error creating enhanced FIT file: {str(e)}")
+            return base_fit_file
+        
+    def write_fit_file(self, fit_file, garmin_sets, output_path, fingerprint=None):
+        """
+        Write the enhanced FIT file with the merged set messages
+        
+        Preserved records are copied from the original file's bytes and only
+        the set messages are encoded (see fit_encoder). Without a session
+        start to place the sets against, the file is written without them.
+        ``fingerprint`` (see merge_fingerprint()) is embedded if given.
+        """
+        session_start = summarize_fit_session(fit_file)['start_time']
+        if session_start is None:
+            self.update_status("Note: No session start found, writing FIT file without set messages")
+            garmin_sets = SetTable()
+            workout_start = 0
+        else:
+            workout_start = int(session_start.timestamp()) - FIT_EPOCH_OFFSET
+        size = write_enhanced_fit(fit_file.source_bytes, garmin_sets, output_path, workout_start,
+                                  STRENGTH_MESSAGE_NUMBERS, fingerprint)
+        self.update_status(f"Wrote {len(garmin_sets)} set messages ({size:,} bytes)")
+    
+    def validate_output(self, output_path):
+        """
+        Comprehensive validation of the output FIT file
+        
+        Args:
+            output_path: Path to the generated FIT file
+            
+        Returns:
+            bool: True if validation passes, False otherwise
+        """
+        try:
+            # Check file existence and size
+            if not os.path.exists(output_path):
+                self.update_status("Validation FAILED: Output file does not exist")
+                return False
+                
+            file_size = os.path.getsize(output_path)
+            if file_size == 0:
+                self.update_status("Validation FAILED: Output file is empty")
+                return False
+                
+            self.update_status(f"Validation: Output file exists ({file_size:,} bytes)")
+            
+            # Try to read and parse the FIT file
+            try:
+                with open(output_path, 'rb') as f:
+                    output_bytes = f.read()
+                if not FitStream(output_bytes).check_crc():
+                    self.update_status("Validation FAILED: File CRC does not match")
+                    return False
+                test_fit = decode_fit(output_bytes)
+                self.update_status("Validation: FIT file structure is valid")
+                
+                # Check if file has records
+                if test_fit.messages:
+                    self.update_status(f"Validation: FIT file contains {test_fit.record_count:,} records")
+                    
+                    # Analyze record types
+                    record_types = test_fit.message_names()
+                    self.update_status("Validation: Found record types: " + ", ".join(record_types))
+                    
+                    # Check for essential workout data
+                    has_session_data = 'session' in record_types
+                    has_timing_data = any(rt in ['record', 'lap'] for rt in record_types)
+                    
+                    if has_session_data:
+                        self.update_status("Validation: ✓ Session data present")
+                    if has_timing_data:
+                        self.update_status("Validation: ✓ Timing data present")
+                        
+                else:
+                    self.update_status("Validation WARNING: FIT file has no records")
+                
+            except Exception as fit_error:
+                self.update_status(f"Validation FAILED: Cannot parse FIT file - {str(fit_error)}")
+                return False
+            
+            # Try to tabulate the record data to verify data integrity
+            try:
+                record_df = test_fit.message(20).to_dataframe()
+                if len(record_df):
+                    self.update_status(f"Validation: ✓ Record data tabulated ({len(record_df):,} rows)")
+                else:
+                    self.update_status("Validation WARNING: FIT file has no record data")
+                    
+            except Exception as table_error:
+                self.update_status(f"Validation WARNING: Record tabulation failed - {str(table_error)}")
+                # This is not a critical failure
+            
+            # Final validation summary
+            self.update_status("=== VALIDATION SUMMARY ===")
+            self.update_status("✓ File exists and has content")
+            self.update_status("✓ FIT file structure is valid")
+            self.update_status(f"✓ File decodes cleanly ({test_fit.decoder} decoder)")
+            self.update_status("✓ Ready for upload to Garmin Connect")
+            
+            return True
+            
+        except Exception as e:
+            self.update_status(f"Validation ERROR: Unexpected error - {str(e)}")
+            return False
+            
+
+
+class HeadlessMerger(MergePipeline):
+    """Runs the merge pipeline without a GUI (batch runner, scripts)
+
+    Exercises without a Garmin mapping fall back to a generic mapping for the
+    duration of the run; nothing is written back to the configuration file.
+    If a ``decode_pool`` (a concurrent.futures executor, ideally a process
+    pool) is given, FIT decoding runs there while the Hevy CSV is parsed.
+    """
+
+    # How often to check for cancellation while waiting on the decode worker
+    DECODE_POLL_SECONDS = 0.1
+
+    def __init__(self, config=None, status_callback=None, decode_pool=None):
+        self.config = config or self.load_config()
+        self.status_callback = status_callback or print
+        self.decode_pool = decode_pool
+        self.weight_unit = "kg"
+
+    def update_status(self, message):
+        """Forward status messages to the configured callback"""
+        self.status_callback(message)
+
+    def merge_files(self, garmin_fit_path, hevy_csv_path, output_path, job=None, skip_merged=False):
+        """
+        Merge one Garmin FIT file with one Hevy CSV export and write the result
+
+        Args:
+            garmin_fit_path: Path to the original Garmin .fit file
+            hevy_csv_path: Path to the Hevy .csv export
+            output_path: Where to write the enhanced .fit file
+            job: optional MergeJob used for cancellation and progress
+            skip_merged: don't merge if the output (or the activity itself)
+                already carries this merge's fingerprint
+
+        Returns:
+            str: output_path once the file has been written and validated, or
+            None if the merge was skipped
+
+        Raises:
+            JobCancelled: if the job was cancelled
+            ValueError: if no sets could be merged or validation fails
+        """
+        job = job or MergeJob()
+        self.update_status(f"Merging {os.path.basename(garmin_fit_path)} + {os.path.basename(hevy_csv_path)}")
+
+        # Start the FIT decode first so it overlaps with the Hevy side
+        fit_future = None
+        if self.decode_pool is not None:
+            job.stage("decode")
+            fit_future = self.decode_pool.submit(decode_garmin_file, garmin_fit_path)
+        try:
+            hevy_df = read_hevy_csv(hevy_csv_path, self.config.column_map)
+            job.check()
+            self.update_status(f"Loaded Hevy data: {len(hevy_df)} exercises")
+            parsed_hevy_data = self.apply_generic_mappings(hevy_df, job=job)
+            fingerprint = self.merge_fingerprint(parsed_hevy_data, self.job_config(job))
+            if skip_merged:
+                merged_path = self.already_merged(fingerprint, output_path, garmin_fit_path)
+                if merged_path is not None:
+                    job.finish(f"Already merged: {os.path.basename(merged_path)}")
+                    return None
+
+            if fit_future is None:
+                fit_file, garmin_df = self.load_garmin_data(garmin_fit_path, job=job)
+            else:
+                fit_file, garmin_df = self.wait_for_decode(fit_future, job)
+        finally:
+            if fit_future is not None and not fit_future.done():
+                fit_future.cancel()
+
+        return self.merge_decoded(fit_file, hevy_df, output_path, job=job,
+                                  parsed_hevy_data=parsed_hevy_data, fingerprint=fingerprint)
+
+    def apply_generic_mappings(self, hevy_df, job=None):
+        """
+        Without a user to ask, give unmapped exercises a generic mapping for this run only
+
+        Returns:
+            list: the parsed Hevy rows
+        """
+        parsed_hevy_data = self.parse_hevy_data(hevy_df, job=job)
+        unmapped_exercises = self.find_unmapped_exercises(parsed_hevy_data)
+        if unmapped_exercises:
+            generic_mappings = {exercise_name: self.create_generic_mapping(exercise_name)
+                                for exercise_name in unmapped_exercises}
+            self.config_store.publish(lambda config: config.with_default_mappings(generic_mappings))
+            self.update_status(f"Using generic mappings for {len(unmapped_exercises)} unmapped exercises")
+        return parsed_hevy_data
+
+    def already_merged(self, fingerprint, *fit_paths):
+        """
+        The first of ``fit_paths`` that already carries ``fingerprint``
+
+        Only the first records of each file are read (see merge_fingerprint).
+
+        Returns:
+            str: that path, or None
+        """
+        for path in fit_paths:
+            if read_merge_fingerprint(path) == fingerprint:
+                self.update_status(f"{os.path.basename(path)} is already merged with this workout, skipping")
+                return path
+        return None
+
+    def merge_decoded(self, fit_file, hevy_df, output_path, job=None, parsed_hevy_data=None, fingerprint=None):
+        """
+        Merge an already decoded FIT file with Hevy rows and write the result
+
+        Args:
+            parsed_hevy_data: hevy_df already parsed by parse_hevy_data(), if
+                the caller has it
+            fingerprint: merge_fingerprint() of those rows, if the caller has
+                already computed it
+
+        Returns:
+            str: output_path once the file has been written and validated
+
+        Raises:
+            JobCancelled: if the job was cancelled
+            ValueError: if no sets could be merged or validation fails
+        """
+        job = job or MergeJob()
+        if job.config is None:
+            job.config = self.config
+        if parsed_hevy_data is None:
+            parsed_hevy_data = self.parse_hevy_data(hevy_df, job=job)
+        if fingerprint is None:
+            fingerprint = self.merge_fingerprint(parsed_hevy_data, job.config)
+        enhanced_fit_file = self.integrate_hevy_data(fit_file, hevy_df, job=job, parsed_hevy_data=parsed_hevy_data)
+        garmin_sets = self.last_processed_sets
+        if not garmin_sets:
+            raise ValueError("No workout data was processed. Please check your files.")
+
+        job.stage("export")
+        final_fit_file = self.apply_user_edits(enhanced_fit_file, garmin_sets)
+        self.write_fit_file(final_fit_file, garmin_sets, output_path, fingerprint)
+        if not self.validate_output(output_path):
+            raise ValueError("Output file validation failed")
+
+        job.finish(f"Wrote {os.path.basename(output_path)}")
+        return output_path
+
+    def wait_for_decode(self, fit_future, job):
+        """Wait for a background FIT decode while staying cancellable"""
+        while True:
+            job.check()
+            try:
+                fit_file, garmin_df = fit_future.result(timeout=self.DECODE_POLL_SECONDS)
+                break
+            except FuturesTimeoutError:
+                continue
+        self.update_status("Garmin FIT file loaded successfully.")
+        self.update_status(f"Loaded Garmin data: {len(garmin_df)} records")
+        return fit_file, garmin_df
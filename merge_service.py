@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+Local HTTP merge service for the Hevy to Garmin FIT Merger
+
+Runs the headless merge pipeline behind a small HTTP API so many athletes'
+files can be merged on one machine:
+
+    POST   /jobs              multipart form with a "fit" and a "csv" file
+                              -> 202 {"id": ..., "state": "queued", ...}
+    GET    /jobs              all jobs
+    GET    /jobs/<id>         state, progress and message of one job
+    GET    /jobs/<id>/events  progress as a text/event-stream until it ends
+    GET    /jobs/<id>/result  the merged .fit file once the job is done
+    DELETE /jobs/<id>         cancel the job and remove its files
+
+Uploads are streamed straight into a per-job temporary workspace, never
+held in memory. Jobs run on a bounded process pool; at most ``max_pending``
+jobs may be queued or running, further uploads get 503 with Retry-After.
+If the CSV holds several workouts, the one overlapping the activity is
+merged (as in watch_folder.py). Finished jobs and their workspaces are
+removed after ``keep_seconds``.
+
+Every job runs with the configuration snapshot loaded when the service
+started. Only the standard library is used for HTTP; benchmark_merge_service.py
+measures throughput with concurrent clients.
+
+Usage:
+    python merge_service.py [--port 8780] [--workers 2] [--max-pending 32] [--work-dir DIR]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import queue
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from garmin_upload import multipart_files
+from hevy_csv import read_hevy_csv
+from merge_jobs import JobCancelled, MergeJob
+from merge_pipeline import HeadlessMerger
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+UPLOAD_PARTS = {"fit": "activity.fit", "csv": "workout.csv"}
+RESULT_FILENAME = "merged.fit"
+CANCEL_FILENAME = "cancelled"
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+
+
+class WorkspaceCancellationToken:
+    """Cancellation flag shared with a worker process through a file in the job workspace"""
+
+    def __init__(self, workspace):
+        self.path = os.path.join(workspace, CANCEL_FILENAME)
+
+    def cancel(self):
+        try:
+            with open(self.path, 'a'):
+                pass
+        except OSError:
+            pass
+
+    @property
+    def cancelled(self):
+        return os.path.exists(self.path)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled("Merge cancelled by user")
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _report_progress(job_id, fraction, message):
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, fraction, message))
+
+
+def run_service_job(job_id, workspace, config, tolerance_seconds=900):
+    """
+    Merge the uploaded pair in ``workspace`` (worker process)
+
+    Returns:
+        dict: the merged workout's title and set count
+
+    Raises:
+        JobCancelled: if the job was cancelled
+        ValueError: if no workout matches the activity or the merge fails
+    """
+    from fit_catalogue import scan_fit_file
+    from watch_folder import hevy_workout_windows, match_workout, workout_rows
+
+    fit_path, csv_path = (os.path.join(workspace, UPLOAD_PARTS[part]) for part in ("fit", "csv"))
+    job = MergeJob(progress_callback=lambda fraction, message: _report_progress(job_id, fraction, message),
+                   token=WorkspaceCancellationToken(workspace), config=config)
+    merger = HeadlessMerger(config=config, status_callback=lambda message: None)
+
+    windows = hevy_workout_windows(csv_path, merger)
+    job.check()
+    title = ""
+    if len(windows) > 1:
+        # Only the rows of the matching workout are loaded
+        match = match_workout(scan_fit_file(fit_path) or {}, [(csv_path, windows)], tolerance_seconds)
+        if match is None:
+            raise ValueError("No workout in the Hevy export overlaps the Garmin activity")
+        title = match[1]['title']
+        hevy_df = read_hevy_csv(csv_path, merger.config.column_map, start_times=[match[1]['start_time']])
+        hevy_df = workout_rows(hevy_df, match[1], merger)
+    else:
+        hevy_df = read_hevy_csv(csv_path, merger.config.column_map)
+
+    merger.apply_generic_mappings(hevy_df, job=job)
+    fit_file, _ = merger.load_garmin_data(fit_path, job=job)
+    merger.merge_decoded(fit_file, hevy_df, os.path.join(workspace, RESULT_FILENAME), job=job)
+    return {'workout': title, 'sets': len(merger.last_processed_sets)}
+
+
+def _content_disposition(headers):
+    """(name, filename) from the headers of one multipart part"""
+    match = re.search(r'^content-disposition:(.*)$', headers, re.IGNORECASE | re.MULTILINE)
+    if not match:
+        return None, None
+    name = re.search(r'\bname="([^"]*)"', match.group(1))
+    filename = re.search(r'\bfilename="([^"]*)"', match.group(1))
+    return name and name.group(1), filename and filename.group(1)
+
+
+def save_multipart(rfile, length, boundary, open_part, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream a multipart/form-data body into files without buffering it whole
+
+    Args:
+        rfile: the request body stream
+        length: Content-Length of the body
+        boundary: the multipart boundary (bytes)
+        open_part: ``open_part(name, filename)`` returns a binary file to
+            write the part to, or None to skip it
+
+    Returns:
+        list: names of the parts written
+
+    Raises:
+        ValueError: if the body is truncated or not valid multipart
+    """
+    delimiter = b"\r\n--" + boundary
+    keep = len(delimiter) - 1
+    # The first boundary has no preceding line break
+    buffer = bytearray(b"\r\n")
+    remaining = length
+
+    def fill():
+        nonlocal remaining
+        if remaining <= 0:
+            return False
+        chunk = rfile.read(min(chunk_size, remaining))
+        if not chunk:
+            raise ValueError("Upload ended early")
+        remaining -= len(chunk)
+        buffer.extend(chunk)
+        return True
+
+    def copy_until_delimiter(target):
+        while True:
+            index = buffer.find(delimiter)
+            if index >= 0:
+                if target is not None:
+                    target.write(buffer[:index])
+                del buffer[:index + len(delimiter)]
+                return
+            if len(buffer) > keep:
+                if target is not None:
+                    target.write(buffer[:-keep])
+                del buffer[:-keep]
+            if not fill():
+                raise ValueError("Multipart body is truncated")
+
+    copy_until_delimiter(None)
+    saved = []
+    while True:
+        while len(buffer) < 2:
+            if not fill():
+                raise ValueError("Multipart body is truncated")
+        if buffer[:2] == b"--":
+            break
+        while (end := buffer.find(b"\r\n\r\n")) < 0:
+            if len(buffer) > MAX_HEADER_BYTES or not fill():
+                raise ValueError("Malformed multipart part headers")
+        name, filename = _content_disposition(bytes(buffer[:end]).decode("utf-8", "replace"))
+        del buffer[:end + 4]
+        target = open_part(name, filename) if name else None
+        try:
+            copy_until_delimiter(target)
+        finally:
+            if target is not None:
+                target.close()
+        if target is not None:
+            saved.append(name)
+
+    # Discard the epilogue so the connection can be reused
+    while fill():
+        buffer.clear()
+    return saved
+
+
+class ServiceJob:
+    """One merge request: its workspace, state and progress"""
+
+    def __init__(self, job_id, workspace):
+        self.id = job_id
+        self.workspace = workspace
+        self.state = "uploading"
+        self.progress = 0.0
+        self.message = "Receiving files..."
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.token = WorkspaceCancellationToken(workspace)
+
+    @property
+    def result_path(self):
+        return os.path.join(self.workspace, RESULT_FILENAME)
+
+    def to_dict(self):
+        return {"id": self.id, "state": self.state, "progress": round(self.progress, 4),
+                "message": self.message, "error": self.error, "result": self.result,
+                "created_at": self.created_at, "finished_at": self.finished_at}
+
+
+class MergeService:
+    """Job table and worker pool behind the HTTP API
+
+    Progress from the worker processes arrives on a multiprocessing queue
+    and is applied by a collector thread; waiters on ``changed`` are woken
+    after every update.
+    """
+
+    def __init__(self, work_dir=None, workers=2, max_pending=32, keep_seconds=3600, config=None,
+                 tolerance_seconds=900):
+        self.owns_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="merge-service-")
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep_seconds = keep_seconds
+        self.tolerance_seconds = tolerance_seconds
+        self.config = config or HeadlessMerger(status_callback=lambda message: None).config
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        context = multiprocessing.get_context()
+        self.progress_queue = context.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                        initializer=_init_worker, initargs=(self.progress_queue,))
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect_progress, name="merge-service-progress",
+                                           daemon=True)
+        self._collector.start()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def pending_count(self):
+        return sum(1 for job in self.jobs.values() if job.state not in FINISHED_STATES)
+
+    def create_job(self):
+        """
+        Reserve a slot and workspace for an upload
+
+        Returns:
+            ServiceJob, or None if the queue is full
+        """
+        with self.lock:
+            self._purge_expired()
+            if self._closed or self.pending_count() >= self.max_pending:
+                return None
+            job_id = secrets.token_hex(8)
+            job = ServiceJob(job_id, tempfile.mkdtemp(prefix=f"job-{job_id}-", dir=self.work_dir))
+            self.jobs[job_id] = job
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def snapshot(self, job_id=None):
+        """Status dict of one job (None if unknown) or a list of all jobs"""
+        with self.lock:
+            if job_id is None:
+                return [job.to_dict() for job in self.jobs.values()]
+            job = self.jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def start(self, job):
+        """Queue an uploaded job on the worker pool"""
+        with self.changed:
+            job.state, job.message = "queued", "Waiting for a worker..."
+            self.changed.notify_all()
+        job.future = self.pool.submit(run_service_job, job.id, job.workspace, self.config, self.tolerance_seconds)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+
+    def abandon(self, job):
+        """Drop a job whose upload failed"""
+        with self.changed:
+            self.jobs.pop(job.id, None)
+            self.changed.notify_all()
+        shutil.rmtree(job.workspace, ignore_errors=True)
+
+    def _finish(self, job, future):
+        with self.changed:
+            if future.cancelled():
+                job.state, job.message = "cancelled", "Cancelled"
+            else:
+                error = future.exception()
+                if error is None:
+                    job.state, job.progress, job.result = "done", 1.0, future.result()
+                    job.message = "Merged"
+                elif isinstance(error, JobCancelled):
+                    job.state, job.message = "cancelled", "Cancelled"
+                else:
+                    job.state, job.error, job.message = "failed", str(error), "Failed"
+            job.finished_at = time.time()
+            self.changed.notify_all()
+
+    def _collect_progress(self):
+        while True:
+            try:
+                update = self.progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            except (EOFError, OSError, ValueError):
+                return
+            if update is None:
+                return
+            job_id, fraction, message = update
+            with self.changed:
+                job = self.jobs.get(job_id)
+                if job is not None and job.state not in FINISHED_STATES:
+                    job.state, job.progress = "running", max(job.progress, fraction)
+                    if message:
+                        job.message = message
+                    self.changed.notify_all()
+
+    def wait_for_change(self, job_id, last_seen, timeout):
+        """
+        Block until the job's status differs from ``last_seen``
+
+        Returns:
+            dict: the current status (None if the job no longer exists)
+        """
+        deadline = time.monotonic() + timeout
+        with self.changed:
+            while True:
+                job = self.jobs.get(job_id)
+                status = job.to_dict() if job else None
+                remaining = deadline - time.monotonic()
+                if status != last_seen or remaining <= 0 or self._closed:
+                    return status
+                self.changed.wait(remaining)
+
+    def cancel(self, job_id):
+        """Cancel a job and delete its files; returns False if it is unknown"""
+        with self.changed:
+            job = self.jobs.pop(job_id, None)
+            self.changed.notify_all()
+        if job is None:
+            return False
+        job.token.cancel()
+        if job.future is None or job.future.cancel() or job.future.done():
+            shutil.rmtree(job.workspace, ignore_errors=True)
+        else:
+            # The worker still has the files open; remove them once it stops
+            job.future.add_done_callback(lambda future: shutil.rmtree(job.workspace, ignore_errors=True))
+        return True
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self.jobs[job_id]
+                shutil.rmtree(job.workspace, ignore_errors=True)
+
+    def close(self):
+        """Cancel outstanding jobs and stop the worker pool"""
+        with self.changed:
+            if self._closed:
+                return
+            self._closed = True
+            jobs = list(self.jobs.values())
+            self.changed.notify_all()
+        for job in jobs:
+            job.token.cancel()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.progress_queue.put(None)
+        self._collector.join(timeout=5)
+        self.progress_queue.close()
+        if self.owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class MergeServiceServer(ThreadingHTTPServer):
+    """Threaded HTTP front end of a MergeService"""
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), service=None, max_upload_bytes=64 * 1024 * 1024):
+        super().__init__(address, MergeServiceHandler)
+        self.service = service or MergeService()
+        self.max_upload_bytes = max_upload_bytes
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread; returns the thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.service.close()
+
+
+class MergeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Seconds between keep-alive comments on an idle event stream
+    EVENT_HEARTBEAT_SECONDS = 15
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self):
+        """(job id, sub-resource) for /jobs/<id>[/<sub>], ("", "") for /jobs, None otherwise"""
+        parts = [part for part in urlsplit(self.path).path.split("/") if part]
+        if not parts or parts[0] != "jobs" or len(parts) > 3:
+            return None
+        return (parts[1] if len(parts) > 1 else ""), (parts[2] if len(parts) > 2 else "")
+
+    def do_POST(self):
+        if self.route() != ("", ""):
+            self.send_json(404, {"error": "not found"})
+            return
+        server = self.server
+        match = re.search(r'boundary="?([^";]+)"?', self.headers.get("Content-Type", ""))
+        length = int(self.headers.get("Content-Length") or 0)
+        if not match or length <= 0:
+            self.close_connection = True
+            self.send_json(400, {"error": "expected a multipart/form-data body with a Content-Length"})
+            return
+        if length > server.max_upload_bytes:
+            self.close_connection = True
+            self.send_json(413, {"error": f"upload larger than {server.max_upload_bytes} bytes"})
+            return
+
+        service = server.service
+        job = service.create_job()
+        if job is None:
+            # Read the upload anyway so the client sees the answer, not a reset connection
+            self.discard_body(length)
+            self.send_json(503, {"error": "merge queue is full"}, {"Retry-After": "5"})
+            return
+
+        def open_part(name, filename):
+            if name not in UPLOAD_PARTS:
+                return None
+            return open(os.path.join(job.workspace, UPLOAD_PARTS[name]), 'wb')
+
+        try:
+            saved = save_multipart(self.rfile, length, match.group(1).encode("utf-8"), open_part)
+        except (OSError, ValueError) as e:
+            service.abandon(job)
+            self.close_connection = True
+            self.send_json(400, {"error": str(e)})
+            return
+        missing = sorted(set(UPLOAD_PARTS) - set(saved))
+        if missing:
+            service.abandon(job)
+            self.send_json(400, {"error": f"missing file part(s): {', '.join(missing)}"})
+            return
+
+        service.start(job)
+        self.send_json(202, service.snapshot(job.id), {"Location": f"/jobs/{job.id}"})
+
+    def discard_body(self, length):
+        while length > 0:
+            chunk = self.rfile.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                self.close_connection = True
+                return
+            length -= len(chunk)
+
+    def do_GET(self):
+        route = self.route()
+        service = self.server.service
+        if route == ("", ""):
+            self.send_json(200, {"jobs": service.snapshot()})
+            return
+        if route is None or route[1] not in ("", "events", "result"):
+            self.send_json(404, {"error": "not found"})
+            return
+        job_id, resource = route
+        status = service.snapshot(job_id)
+        if status is None:
+            self.send_json(404, {"error": f"no job {job_id}"})
+        elif resource == "events":
+            self.stream_events(job_id, status)
+        elif resource == "result":
+            self.send_result(service.get(job_id), status)
+        else:
+            self.send_json(200, status)
+
+    def do_DELETE(self):
+        route = self.route()
+        if route is None or not route[0] or route[1]:
+            self.send_json(404, {"error": "not found"})
+            return
+        if self.server.service.cancel(route[0]):
+            self.send_json(200, {"id": route[0], "state": "cancelled"})
+        else:
+            self.send_json(404, {"error": f"no job {route[0]}"})
+
+    def stream_events(self, job_id, status):
+        """Send each status change as a server-sent event until the job ends"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        service = self.server.service
+        try:
+            while status is not None and not service.closed:
+                self.wfile.write(f"event: status\ndata: {json.dumps(status)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if status["state"] in FINISHED_STATES:
+                    return
+                last_seen = status
+                while status == last_seen and not service.closed:
+                    status = service.wait_for_change(job_id, last_seen, self.EVENT_HEARTBEAT_SECONDS)
+                    if status == last_seen:
+                        self.wfile.write(b": keep-alive\n\n")
+                        self.wfile.flush()
+            if status is None:
+                self.wfile.write(b"event: gone\ndata: {}\n\n")
+        except OSError:
+            pass
+
+    def send_result(self, job, status):
+        if job is None or status["state"] != "done":
+            self.send_json(409, {"error": f"job is {status['state']}", "state": status["state"]})
+            return
+        try:
+            f = open(job.result_path, 'rb')
+        except OSError:
+            self.send_json(410, {"error": "result is no longer available"})
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Content-Disposition", f'attachment; filename="{job.id}_merged.fit"')
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, STREAM_CHUNK_SIZE)
+
+
+class MergeServiceClient:
+    """Minimal client for the merge service (one keep-alive connection per client)"""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Returns:
+            tuple: (status, response headers, body bytes)
+        """
+        try:
+            self.connection.request(method, path, body=body, headers=headers or {})
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            raise
+        if response.will_close:
+            self.connection.close()
+        return response.status, response, payload
+
+    def submit(self, fit_path, csv_path):
+        """Upload a pair; returns the job status dict"""
+        content_type, length, body = multipart_files([("fit", fit_path), ("csv", csv_path)])
+        status, _, payload = self.request("POST", "/jobs", body,
+                                          {"Content-Type": content_type, "Content-Length": str(length)})
+        if status != 202:
+            raise RuntimeError(f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}")
+        return json.loads(payload)
+
+    def status(self, job_id):
+        status, _, payload = self.request("GET", f"/jobs/{job_id}")
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}")
+        return json.loads(payload)
+
+    def wait(self, job_id, poll_seconds=0.05, timeout=300):
+        """Poll until the job has finished; returns its final status"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job["state"] in FINISHED_STATES:
+                return job
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {job['state']}")
+            time.sleep(poll_seconds)
+
+    def download(self, job_id, output_path):
+        status, _, payload = self.request("GET", f"/jobs/{job_id}/result")
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}")
+        with open(output_path, 'wb') as f:
+            f.write(payload)
+        return output_path
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local HTTP service merging Garmin FIT files with Hevy exports")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Merge worker processes")
+    parser.add_argument("--max-pending", type=int, default=32, help="Jobs that may be queued or running")
+    parser.add_argument("--work-dir", help="Folder for job workspaces (a temporary folder by default)")
+    parser.add_argument("--keep-minutes", type=float, default=60, help="How long finished jobs are kept")
+    parser.add_argument("--max-upload-mb", type=float, default=64)
+    args = parser.parse_args(argv)
+
+    service = MergeService(args.work_dir, args.workers, args.max_pending, args.keep_minutes * 60)
+    server = MergeServiceServer((args.host, args.port), service, int(args.max_upload_mb * 1024 * 1024))
+    print(f"Merge service on {server.base_url} ({args.workers} workers, jobs in {service.work_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Session persistence for the Hevy to Garmin FIT Merger
+
+Keeps user_preferences.json (last-used folders, recent files and the last
+session) and a binary snapshot of the merge being previewed, so the app can
+reopen the preview straight away after a restart or crash.
+
+The snapshot is a compressed .npz archive holding:
+
+- the merged sets as they came out of the merge, and with the edits applied
+- the edit history as rows of (stack, step, set, field, old, new)
+- the session and activity messages of the decoded FIT file, which is all
+  the export needs besides the file's bytes
+- a JSON header with the workout statistics, the exercise mappings chosen
+  and a fingerprint (path, size, mtime, SHA-256) of both input files
+
+A snapshot is only resumed if both files are unchanged: matching size and
+modification time, or failing that a matching hash (a file copied back
+with a new mtime).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from edit_history import EditHistory, FieldEdit
+from fit_decoder import DecodedFit, MessageColumns, message_profile
+from set_table import SET_DTYPE, SetTable
+
+
+PREFERENCES_FILENAME = "user_preferences.json"
+SESSION_FILENAME = "last_session.npz"
+SNAPSHOT_VERSION = 1
+RECENT_FILES_LIMIT = 10
+
+DEFAULT_PREFERENCES = {
+    "window_geometry": "800x600",
+    "last_garmin_dir": "~/",
+    "last_hevy_dir": "~/",
+    "last_export_dir": "~/",
+    "recent_garmin_files": [],
+    "recent_hevy_files": [],
+    "last_session": None,
+}
+
+# FIT messages kept in the snapshot: session (18) and activity (34)
+SNAPSHOT_MESSAGES = (18, 34)
+
+# One row per changed field of an edit; stack 0 = undo, 1 = redo
+EDIT_DTYPE = np.dtype([
+    ('stack', np.int8),
+    ('step', np.int32),
+    ('index', np.int32),
+    ('field', 'U32'),
+    ('old', np.float64),
+    ('new', np.float64),
+])
+
+
+def _app_path(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+def default_preferences_path():
+    return _app_path(PREFERENCES_FILENAME)
+
+
+def default_session_path():
+    return _app_path(SESSION_FILENAME)
+
+
+def _replace_atomically(path, data):
+    """Write ``data`` to a temporary file next to ``path`` and move it into place"""
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_user_preferences(path=None):
+    """Read user_preferences.json next to the application (defaults for missing keys)"""
+    preferences = dict(DEFAULT_PREFERENCES)
+    try:
+        with open(path or default_preferences_path(), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if isinstance(stored, dict):
+            preferences.update(stored)
+    except (OSError, ValueError):
+        pass
+    return preferences
+
+
+def save_user_preferences(preferences, path=None):
+    """Write the preferences (atomically, so a crash never leaves half a file)"""
+    _replace_atomically(path or default_preferences_path(),
+                        (json.dumps(preferences, indent=2) + "\n").encode("utf-8"))
+
+
+def remember_file(preferences, side, file_path):
+    """Record a selected file as most recent and its folder as last used"""
+    key = f"recent_{side}_files"
+    file_path = os.path.abspath(file_path)
+    recent = [path for path in preferences.get(key) or [] if path != file_path]
+    preferences[key] = [file_path] + recent[:RECENT_FILES_LIMIT - 1]
+    preferences[f"last_{side}_dir"] = os.path.dirname(file_path)
+
+
+def file_fingerprint(path):
+    """Identity of an input file: path, size, modification time and SHA-256"""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest()}
+
+
+def fingerprint_matches(fingerprint):
+    """True if the file still has the content it had when fingerprinted"""
+    try:
+        stat = os.stat(fingerprint["path"])
+    except OSError:
+        return False
+    if stat.st_size != fingerprint["size"]:
+        return False
+    if stat.st_mtime_ns == fingerprint["mtime_ns"]:
+        return True
+    return file_fingerprint(fingerprint["path"])["sha256"] == fingerprint["sha256"]
+
+
+class SessionSnapshot:
+    """A merge preview restored from disk"""
+
+    def __init__(self, garmin_file, hevy_file, history, fit_file, workout_stats, user_mappings, saved_at):
+        self.garmin_file = garmin_file
+        self.hevy_file = hevy_file
+        self.history = history
+        self.fit_file = fit_file
+        self.workout_stats = workout_stats
+        self.user_mappings = user_mappings
+        self.saved_at = saved_at
+
+
+def _edit_rows(history):
+    undo, redo = history.steps()
+    rows = [(stack, step_number, change.index, change.field, change.old, change.new)
+            for stack, steps in ((0, undo), (1, redo))
+            for step_number, step in enumerate(steps)
+            for change in step]
+    return np.array(rows, dtype=EDIT_DTYPE)
+
+
+def _edit_steps(rows, stack):
+    steps = {}
+    for row in rows[rows['stack'] == stack]:
+        field = str(row['field'])
+        old, new = row['old'].item(), row['new'].item()
+        if SET_DTYPE[field].kind in 'iu':
+            old, new = int(old), int(new)
+        steps.setdefault(int(row['step']), []).append(FieldEdit(int(row['index']), field, old, new))
+    return [tuple(steps[step]) for step in sorted(steps)]
+
+
+def save_session(path, fingerprints, history, fit_file, workout_stats, user_mappings=None):
+    """
+    Write the snapshot of a merge preview
+
+    Args:
+        fingerprints: (garmin, hevy) from file_fingerprint()
+        history: EditHistory of the preview (its base and current tables)
+        fit_file: DecodedFit the sets are merged into
+    """
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "garmin_file": fingerprints[0],
+        "hevy_file": fingerprints[1],
+        "workout_stats": workout_stats,
+        "user_mappings": user_mappings or {},
+        "record_count": fit_file.record_count,
+        "decoder": fit_file.decoder,
+    }
+    arrays = {
+        "header": np.array(json.dumps(header, default=lambda value: value.item() if hasattr(value, 'item')
+                                      else str(value))),
+        "exercise_names": np.array(history.base.exercise_names, dtype=str),
+        "base_rows": history.base.rows,
+        "edits": _edit_rows(history),
+    }
+    if history.table is not history.base:
+        arrays["rows"] = history.table.rows
+    for global_number in SNAPSHOT_MESSAGES:
+        columns = fit_file.message(global_number)
+        for field_name, column in columns.columns.items():
+            if column.dtype != object and column.ndim == 1:
+                arrays[f"message_{global_number}_{field_name}"] = column
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    _replace_atomically(path, buffer.getvalue())
+
+
+def load_session(path):
+    """
+    Read a snapshot written by save_session()
+
+    Returns:
+        SessionSnapshot, or None if there is none, it cannot be read, or an
+        input file has changed since it was saved
+    """
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            header = json.loads(str(archive["header"]))
+            if header.get("version") != SNAPSHOT_VERSION:
+                return None
+            if not (fingerprint_matches(header["garmin_file"]) and fingerprint_matches(header["hevy_file"])):
+                return None
+            exercise_names = [str(name) for name in archive["exercise_names"]]
+            base = SetTable(archive["base_rows"], exercise_names)
+            table = SetTable(archive["rows"], exercise_names) if "rows" in archive.files else base
+            edits = archive["edits"]
+            messages = {}
+            for global_number in SNAPSHOT_MESSAGES:
+                prefix = f"message_{global_number}_"
+                columns = {key[len(prefix):]: archive[key] for key in archive.files if key.startswith(prefix)}
+                if columns:
+                    length = len(next(iter(columns.values())))
+                    messages[global_number] = MessageColumns(global_number, message_profile(global_number)[0],
+                                                             columns, length)
+        with open(header["garmin_file"]["path"], 'rb') as f:
+            source_bytes = f.read()
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    history = EditHistory.restore(base, table, _edit_steps(edits, 0), _edit_steps(edits, 1))
+    fit_file = DecodedFit(source_bytes, messages, header["record_count"], header["decoder"])
+    return SessionSnapshot(header["garmin_file"], header["hevy_file"], history, fit_file,
+                           header["workout_stats"], header["user_mappings"], header["saved_at"])
+
+
+def clear_session(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Garmin set timing alignment for the Hevy to Garmin FIT Merger
+
+Garmin strength activities record a ``set`` message per set with its start
+time, duration and whether it was an active or rest set, but the watch
+rarely knows the exercise or weight. Hevy knows the exercises but not when
+each set happened. This module indexes the watch's active sets and aligns
+the Hevy sets onto them in order, so merged sets keep Garmin's timing.
+
+The alignment is a small edit-distance style dynamic programme: a Hevy set
+either takes the next Garmin set, or one side skips a set (a set the watch
+missed, or a set the user logged on the watch but not in Hevy). Matching
+costs favour similar rep counts and exercise-block boundaries that line up
+(a change of exercise in Hevy against a long rest or category change on
+the watch).
+"""
+
+# FIT set_type values
+ACTIVE_SET = 1
+
+# FIT invalid markers for the set fields used here
+INVALID_UINT16 = 0xFFFF
+UNKNOWN_CATEGORY = 65534
+
+# A rest longer than this on the watch is treated as the start of a new exercise block
+BLOCK_REST_SECONDS = 150
+
+SKIP_COST = 1.0
+BOUNDARY_MISMATCH_COST = 0.5
+UNKNOWN_REPS_COST = 0.25
+
+
+def index_garmin_sets(fit_file):
+    """
+    Collect the active sets recorded by the watch, in recording order
+
+    Args:
+        fit_file: DecodedFit of the Garmin activity
+
+    Returns:
+        list: one dict per active set with start_time (Unix seconds),
+        duration (seconds), repetitions and category (None when the watch
+        did not record them)
+    """
+    sets = fit_file.message(225)  # 225 = set
+    if not len(sets) or 'set_type' not in sets:
+        return []
+
+    garmin_sets = []
+    for index in range(len(sets)):
+        if _value(sets, 'set_type', index) != ACTIVE_SET:
+            continue
+        start_time = _value(sets, 'start_time', index)
+        if start_time is None:
+            start_time = _value(sets, 'timestamp', index)
+        if start_time is None:
+            continue
+        repetitions = _value(sets, 'repetitions', index)
+        category = _value(sets, 'category', index)
+        garmin_sets.append({
+            'start_time': float(start_time) / 1000.0,
+            'duration': float(_value(sets, 'duration', index) or 0),
+            'repetitions': int(repetitions) if repetitions not in (None, INVALID_UINT16) else None,
+            'category': int(category) if category not in (None, UNKNOWN_CATEGORY, INVALID_UINT16) else None,
+        })
+    return garmin_sets
+
+
+def _value(columns, field_name, index):
+    """One value of a decoded column (first element of an array field); None if missing or invalid"""
+    column = columns.get(field_name)
+    if column is None:
+        return None
+    value = column[index]
+    if hasattr(value, '__len__'):
+        value = value[0] if len(value) else None
+    if value is None or value != value:  # NaN marks invalid values
+        return None
+    return value
+
+
+def hevy_block_starts(exercise_names):
+    """Flag the first set of each run of consecutive sets of one exercise"""
+    return [index == 0 or name != exercise_names[index - 1] for index, name in enumerate(exercise_names)]
+
+
+def garmin_block_starts(garmin_sets, rest_seconds=BLOCK_REST_SECONDS):
+    """Flag sets that follow a long rest or a change of recorded category"""
+    starts = []
+    for index, garmin_set in enumerate(garmin_sets):
+        if index == 0:
+            starts.append(True)
+            continue
+        previous = garmin_sets[index - 1]
+        rest = garmin_set['start_time'] - (previous['start_time'] + previous['duration'])
+        category_changed = (garmin_set['category'] is not None and previous['category'] is not None
+                            and garmin_set['category'] != previous['category'])
+        starts.append(rest > rest_seconds or category_changed)
+    return starts
+
+
+def _match_cost(hevy_reps, garmin_reps, hevy_block_start, garmin_block_start):
+    if garmin_reps is None or hevy_reps is None:
+        cost = UNKNOWN_REPS_COST
+    else:
+        cost = abs(hevy_reps - garmin_reps) / max(hevy_reps, garmin_reps, 1)
+    if hevy_block_start != garmin_block_start:
+        cost += BOUNDARY_MISMATCH_COST
+    return cost
+
+
+def align_sets(hevy_sets, garmin_sets):
+    """
+    Align Hevy sets onto recorded Garmin sets, preserving order on both sides
+
+    Args:
+        hevy_sets: parsed Hevy sets (dicts with exercise_name and reps)
+        garmin_sets: output of index_garmin_sets()
+
+    Returns:
+        list: for each Hevy set, the index of its Garmin set or None if the
+        watch has no matching set
+    """
+    n, m = len(hevy_sets), len(garmin_sets)
+    if not n or not m:
+        return [None] * n
+
+    hevy_starts = hevy_block_starts([set_data['exercise_name'] for set_data in hevy_sets])
+    garmin_starts = garmin_block_starts(garmin_sets)
+
+    # cost[i][j]: cheapest alignment of the first i Hevy sets with the first j Garmin sets
+    cost = [[0.0] * (m + 1) for _ in range(n + 1)]
+    move = [[0] * (m + 1) for _ in range(n + 1)]  # 0 match, 1 skip Hevy set, 2 skip Garmin set
+    for i in range(1, n + 1):
+        cost[i][0] = i * SKIP_COST
+        move[i][0] = 1
+    for j in range(1, m + 1):
+        cost[0][j] = j * SKIP_COST
+        move[0][j] = 2
+
+    for i in range(1, n + 1):
+        hevy_reps = hevy_sets[i - 1].get('reps')
+        hevy_start = hevy_starts[i - 1]
+        row, previous_row = cost[i], cost[i - 1]
+        for j in range(1, m + 1):
+            best = previous_row[j - 1] + _match_cost(hevy_reps, garmin_sets[j - 1]['repetitions'],
+                                                     hevy_start, garmin_starts[j - 1])
+            step = 0
+            if previous_row[j] + SKIP_COST < best:
+                best, step = previous_row[j] + SKIP_COST, 1
+            if row[j - 1] + SKIP_COST < best:
+                best, step = row[j - 1] + SKIP_COST, 2
+            row[j] = best
+            move[i][j] = step
+
+    assignment = [None] * n
+    i, j = n, m
+    while i > 0 and j > 0:
+        step = move[i][j]
+        if step == 0:
+            assignment[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    return assignment
+
+
+def aligned_set_timings(hevy_sets, garmin_sets, workout_start, default_duration, hevy_start=None):
+    """
+    Per-set (offset_seconds, duration) taken from the recorded Garmin sets
+
+    Hevy sets the watch did not record are placed right after the previous
+    set with the default duration; those before the first recorded set
+    start when the Hevy workout started, if that is known.
+
+    Args:
+        workout_start: activity start as Unix seconds; offsets are relative to it
+        hevy_start: Hevy workout start as Unix seconds, or None
+
+    Returns:
+        tuple: (list of (offset_seconds, duration) per Hevy set, number of
+        sets that took Garmin's timing)
+    """
+    assignment = align_sets(hevy_sets, garmin_sets)
+    timings = []
+    previous_end = 0.0 if hevy_start is None else max(0.0, float(hevy_start - workout_start))
+    matched = 0
+    for garmin_index in assignment:
+        if garmin_index is None:
+            offset, duration = previous_end, float(default_duration)
+        else:
+            garmin_set = garmin_sets[garmin_index]
+            offset, duration = garmin_set['start_time'] - workout_start, garmin_set['duration']
+            matched += 1
+        timings.append((offset, duration))
+        previous_end = offset + duration
+    return timings, matched
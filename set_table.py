@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Set table for the Hevy to Garmin FIT Merger
+
+Holds the merged strength sets as one structured NumPy array instead of a
+list of per-set dicts. Exercise names are interned once and stored as small
+integer codes, so per-exercise aggregates (sets, reps, max weight, volume)
+are computed with a handful of vectorised bincount passes.
+
+Rows can still be read and edited like the old dicts (``table[i]['weight']``)
+so the preview and summary windows work on the table directly.
+"""
+
+import sys
+
+import numpy as np
+
+
+# One row per set; field names match the keys of the old garmin_sets dicts
+SET_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('exercise_category', np.int32),
+    ('exercise_name', np.int32),
+    ('weight', np.float64),
+    ('weight_unit', np.int8),
+    ('repetitions', np.int32),
+    ('set_number', np.int32),
+    ('set_type', np.int8),
+    ('duration', np.float64),
+    ('name_index', np.int32),
+])
+
+SET_FIELDS = tuple(field for field in SET_DTYPE.names if field != 'name_index')
+
+SET_TYPE_NAMES = {0: "Normal", 2: "Warm-up", 5: "Failure", 6: "Drop set"}
+
+
+class SetRow:
+    """Dict-style view of one row of a SetTable; writes go straight to the table"""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == 'original_exercise_name':
+            return self.table.exercise_names[self.table.rows['name_index'][self.index]]
+        return self.table.rows[key][self.index].item()
+
+    def __setitem__(self, key, value):
+        if key == 'original_exercise_name':
+            self.table.rows['name_index'][self.index] = self.table.intern_name(value)
+        else:
+            self.table.rows[key][self.index] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, ValueError):
+            return default
+
+    def to_dict(self):
+        """Plain dict copy of the row in the old garmin_sets format"""
+        data = {field: self[field] for field in SET_FIELDS}
+        data['original_exercise_name'] = self['original_exercise_name']
+        return data
+
+
+class SetTable:
+    """Merged strength sets stored column-wise in a structured array
+
+    Attributes:
+        rows: structured array with SET_DTYPE, one entry per set
+        exercise_names: interned Hevy exercise names, indexed by rows['name_index']
+    """
+
+    def __init__(self, rows=None, exercise_names=None):
+        self.rows = rows if rows is not None else np.zeros(0, dtype=SET_DTYPE)
+        self.exercise_names = list(exercise_names or [])
+        self._name_codes = {name: code for code, name in enumerate(self.exercise_names)}
+
+    @classmethod
+    def allocate(cls, size):
+        """Create a zero-filled table with room for ``size`` sets"""
+        return cls(np.zeros(size, dtype=SET_DTYPE))
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from dicts in the old garmin_sets format"""
+        table = cls.allocate(len(records))
+        for index, record in enumerate(records):
+            table.put(index, record['original_exercise_name'],
+                      **{field: record.get(field, 0) for field in SET_FIELDS})
+        return table
+
+    def intern_name(self, name):
+        """Return the integer code for an exercise name, adding it if new"""
+        code = self._name_codes.get(name)
+        if code is None:
+            code = len(self.exercise_names)
+            self.exercise_names.append(sys.intern(name))
+            self._name_codes[name] = code
+        return code
+
+    def put(self, index, original_exercise_name, **fields):
+        """Fill row ``index`` from keyword fields"""
+        row = self.rows[index]
+        for field, value in fields.items():
+            row[field] = value
+        row['name_index'] = self.intern_name(original_exercise_name)
+
+    def copy(self):
+        """Independent copy, so edits in the preview do not touch the original"""
+        return SetTable(self.rows.copy(), self.exercise_names)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.rows)
+        if not 0 <= index < len(self.rows):
+            raise IndexError("set index out of range")
+        return SetRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.rows)):
+            yield SetRow(self, index)
+
+    @property
+    def volumes(self):
+        """Weight x reps for every set (bodyweight sets with no weight count as 0)"""
+        return np.nan_to_num(self.rows['weight']) * self.rows['repetitions']
+
+    def totals(self):
+        """
+        Whole-workout aggregates
+
+        Returns:
+            dict: sets, reps, volume and the number of distinct exercises
+        """
+        return {
+            'sets': len(self.rows),
+            'reps': int(self.rows['repetitions'].sum()),
+            'volume': float(self.volumes.sum()),
+            'exercises': int(np.unique(self.rows['name_index']).size),
+        }
+
+    def recognized_count(self):
+        """Number of sets mapped to a non-generic Garmin category"""
+        return int(np.count_nonzero(self.rows['exercise_category']))
+
+    def exercise_summary(self):
+        """
+        Per-exercise aggregates, in order of first appearance
+
+        Returns:
+            dict: exercise name -> {sets, total_reps, max_weight, total_volume, set_types}
+        """
+        if len(self.rows) == 0:
+            return {}
+
+        codes = self.rows['name_index']
+        size = len(self.exercise_names)
+        sets = np.bincount(codes, minlength=size)
+        reps = np.bincount(codes, weights=self.rows['repetitions'], minlength=size)
+        volume = np.bincount(codes, weights=self.volumes, minlength=size)
+        max_weight = np.zeros(size)
+        np.fmax.at(max_weight, codes, self.rows['weight'])
+
+        set_types = {}
+        for set_type, type_name in SET_TYPE_NAMES.items():
+            for code in np.unique(codes[self.rows['set_type'] == set_type]):
+                set_types.setdefault(int(code), []).append(type_name)
+        # Unknown set types count as normal sets, as the windows always showed them
+        unknown = ~np.isin(self.rows['set_type'], list(SET_TYPE_NAMES))
+        for code in np.unique(codes[unknown]):
+            if "Normal" not in set_types.setdefault(int(code), []):
+                set_types[int(code)].append("Normal")
+
+        _, first_seen = np.unique(codes, return_index=True)
+        summary = {}
+        for code in codes[np.sort(first_seen)]:
+            code = int(code)
+            summary[self.exercise_names[code]] = {
+                'sets': int(sets[code]),
+                'total_reps': int(reps[code]),
+                'max_weight': max_weight[code].item(),
+                'total_volume': float(volume[code]),
+                'set_types': set(set_types.get(code, [])),
+            }
+        return summary
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Config Snapshot Test for Hevy to Garmin Integration
+
+Tests immutable configuration snapshots, publishing and per-job pinning.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import threading
+
+from config_snapshot import ConfigSnapshot, ConfigStore
+from mapping_store import MappingStore
+from merge_jobs import MergeJob
+from merge_pipeline import HeadlessMerger
+
+
+CONFIG = {
+    "settings": {"parse_set_type_from_notes": True, "default_set_duration_seconds": 30},
+    "exercise_mappings": {"bench press (barbell)": {"category": 0, "name": 1}},
+    "hevy_csv_columns": {"exercise_name": "Exercise Name", "set_note": "Notes"},
+    "set_type_keyword_mapping": {"Warm": 1, "drop": 2, "warmup": 3, "fail": 4},
+}
+
+
+def old_detect_set_type(set_note, config):
+    """The keyword loop the snapshot matcher replaces"""
+    if not set_note or not config.get("settings", {}).get("parse_set_type_from_notes", True):
+        return 0
+    for keyword, set_type_id in config.get("set_type_keyword_mapping", {}).items():
+        if keyword.lower() in set_note.lower():
+            return set_type_id
+    return 0
+
+
+def test_snapshot_is_immutable():
+    """Test that a snapshot and everything in it are read-only"""
+    print("\n=== Testing Immutability ===")
+
+    data = {key: dict(value) for key, value in CONFIG.items()}
+    snapshot = ConfigSnapshot(data, {"goblet squat": {"category": 28, "name": 6}})
+    data["exercise_mappings"]["bench press (barbell)"] = {"category": 99, "name": 99}
+    assert snapshot["exercise_mappings"]["bench press (barbell)"] == {"category": 0, "name": 1}
+    assert snapshot.exercise_mappings["goblet squat"] == {"category": 28, "name": 6}
+    print("✓ Snapshot is a copy, with user mappings layered in")
+
+    for mutate in (lambda: snapshot.settings.__setitem__("weight_unit", "lb"),
+                   lambda: snapshot.exercise_mappings["goblet squat"].__setitem__("name", 0),
+                   lambda: setattr(snapshot, "version", 5)):
+        try:
+            mutate()
+        except (TypeError, AttributeError):
+            continue
+        raise AssertionError("snapshot was modified")
+    print("✓ Sections, mappings and attributes reject writes")
+
+    restored = pickle.loads(pickle.dumps(snapshot))
+    assert dict(restored.exercise_mappings) == dict(snapshot.exercise_mappings)
+    assert restored.version == snapshot.version
+    print("✓ Snapshot survives pickling (for worker processes)")
+
+
+def test_set_type_matcher():
+    """Test the compiled set-type matcher against the old keyword loop"""
+    print("\n=== Testing Set Type Matcher ===")
+
+    snapshot = ConfigSnapshot(CONFIG)
+    notes = ["", None, "warmup set", "Drop set to failure", "FAILED", "felt good", "warm", "fail then drop"]
+    for note in notes:
+        assert snapshot.set_type_for(note) == old_detect_set_type(note, CONFIG), note
+    assert snapshot.set_type_for("warmup set") == 1, "first keyword in configuration order wins"
+
+    disabled = snapshot.replace(settings={"parse_set_type_from_notes": False})
+    assert disabled.set_type_for("warmup set") == 0 and disabled.version == snapshot.version + 1
+    print(f"✓ {len(notes)} notes classified as before")
+
+
+def test_pinned_job_keeps_its_snapshot():
+    """Test that a running job is unaffected by a mapping published mid-merge"""
+    print("\n=== Testing Per-Job Pinning ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        merger = HeadlessMerger(config=ConfigSnapshot(CONFIG), status_callback=lambda message: None)
+        merger._mapping_store = MappingStore(os.path.join(temp_dir, "mappings.jsonl"))
+        job = MergeJob(config=merger.config)
+        parsed = [{'exercise_name': "bench press (barbell)", 'reps': 5, 'weight': 60.0, 'set_number': 1,
+                   'set_note': "warm up"}]
+
+        merger.apply_user_mappings({"Bench Press (Barbell)": "Squat"})
+        assert merger.config.version == job.config.version + 1
+        assert merger.config.exercise_mappings["bench press (barbell)"] == {"category": 28, "name": 61}
+        print("✓ New mapping published as the next version")
+
+        sets = merger.map_hevy_to_garmin_sets(parsed, {'duration_seconds': 600}, job=job)
+        assert sets[0]['exercise_category'] == 0 and sets[0]['exercise_name'] == 1 and sets[0]['set_type'] == 1
+        sets = merger.map_hevy_to_garmin_sets(parsed, {'duration_seconds': 600}, job=MergeJob())
+        assert sets[0]['exercise_category'] == 28 and sets[0]['exercise_name'] == 61
+        print("✓ Pinned job kept its mapping, a new job sees the published one")
+
+
+def test_concurrent_publish():
+    """Test that concurrent publishers never lose an update"""
+    print("\n=== Testing Concurrent Publish ===")
+
+    store = ConfigStore(ConfigSnapshot(CONFIG))
+
+    def publish(worker):
+        for index in range(25):
+            name = f"exercise {worker}-{index}"
+            store.publish(lambda config: config.with_user_mappings(
+                dict(config.user_mappings, **{name: {"category": 7, "name": index}})))
+
+    threads = [threading.Thread(target=publish, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.current.version == 101
+    assert len(store.current.user_mappings) == 100
+    assert len(store.current.exercise_mappings) == 101
+    print(f"✓ 100 publishes from 4 threads, final version {store.current.version}")
+
+
+def main():
+    """Run all config snapshot tests"""
+    print("🧪 Config Snapshot Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Immutability", test_snapshot_is_immutable),
+        ("Set Type Matcher", test_set_type_matcher),
+        ("Per-Job Pinning", test_pinned_job_keeps_its_snapshot),
+        ("Concurrent Publish", test_concurrent_publish),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Edit History Test for Hevy to Garmin Integration
+
+Tests undo/redo of set edits in the workout preview.
+"""
+
+import sys
+
+from edit_history import EditHistory
+from merge_pipeline import HeadlessMerger
+from set_table import SetTable
+
+
+def make_sets():
+    return SetTable.from_records([
+        {'original_exercise_name': "squat (barbell)", 'weight': 100.0, 'repetitions': 5, 'set_type': 0},
+        {'original_exercise_name': "pull up", 'weight': float("nan"), 'repetitions': 8, 'set_type': 0},
+        {'original_exercise_name': "squat (barbell)", 'weight': 60.0, 'repetitions': 8, 'set_type': 2},
+    ])
+
+
+def test_undo_redo():
+    """Test multi-level undo and redo"""
+    print("\n=== Testing Undo/Redo ===")
+
+    original = make_sets()
+    history = EditHistory(original)
+    assert history.table is original and not history.can_undo
+
+    assert history.edit(0, repetitions=6, weight=102.5, set_type=0)
+    assert history.edit(2, set_type=5)
+    assert history.edit(0, repetitions=7)
+    assert history.table is not original, "edits must not touch the merged sets"
+    assert original[0]['repetitions'] == 5 and original[2]['set_type'] == 2
+    assert history.table[0]['repetitions'] == 7 and len(history) == 3
+    print("✓ Three edits recorded, original sets untouched")
+
+    assert history.edit(1, repetitions=8, weight=float("nan")) is False, "unchanged values are not an edit"
+    assert len(history) == 3
+
+    history.undo()
+    history.undo()
+    assert history.table[0]['repetitions'] == 6 and history.table[2]['set_type'] == 2
+    history.redo()
+    assert history.table[2]['set_type'] == 5
+    print("✓ Undo and redo step through the edits")
+
+    history.edit(1, weight=10.0)
+    assert not history.can_redo, "a new edit discards the redo steps"
+    while history.undo():
+        pass
+    assert history.table[0]['weight'] == 100.0 and history.table[0]['repetitions'] == 5
+    assert history.table[1]['weight'] != history.table[1]['weight'], "bodyweight set back to no weight"
+    assert history.table[2]['set_type'] == 2
+    assert history.changes() == {}
+    print("✓ Undoing everything restores the merged sets")
+
+
+def test_changes_and_final_state():
+    """Test the net changes and that the pipeline uses the edited table"""
+    print("\n=== Testing Net Changes ===")
+
+    history = EditHistory(make_sets(), limit=10)
+    history.edit(0, repetitions=6)
+    history.edit(0, repetitions=5)  # back to the original value
+    history.edit(1, weight=5.0)
+    assert [(key, new) for key, (_, new) in history.changes().items()] == [((1, 'weight'), 5.0)]
+    print("✓ Net changes leave out values edited back to the original")
+
+    # Past the limit the oldest steps are dropped, but not the original values
+    trimmed = EditHistory(make_sets(), limit=2)
+    trimmed.edit(0, repetitions=6)
+    trimmed.edit(2, weight=62.5)
+    trimmed.edit(2, set_type=6)
+    trimmed.edit(2, repetitions=10)
+    assert len(trimmed) == 2
+    assert trimmed.changes() == {(0, 'repetitions'): (5, 6), (2, 'weight'): (60.0, 62.5),
+                                 (2, 'repetitions'): (8, 10), (2, 'set_type'): (2, 6)}
+    print("✓ Edits dropped past the limit keep their original values")
+
+    messages = []
+    merger = HeadlessMerger(status_callback=messages.append)
+    merger.apply_user_edits(None, history.table, history)
+    assert messages[0] == "3 edits changed 1 values in 1 sets", messages[0]
+    assert history.table.exercise_summary()["pull up"]['total_volume'] == 40.0
+    print(f"✓ Final edited sets handed to the pipeline ({messages[0]})")
+
+
+def main():
+    """Run all edit history tests"""
+    print("🧪 Edit History Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Undo/Redo", test_undo_redo),
+        ("Net Changes", test_changes_and_final_state),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Activity Catalogue Test for Hevy to Garmin Integration
+
+Tests reading session summaries without decoding records, and keeping the
+catalogue index up to date incrementally.
+"""
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import fit_catalogue
+from fit_catalogue import ActivityCatalogue, scan_fit_file
+from fit_stream import Definition, FieldDefinition, crc16
+from merge_pipeline import inspect_garmin_file
+
+
+SAMPLE_FIT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "2025-09-01-16-42-38.fit")
+
+START = 1125000000  # FIT-epoch seconds, 2025-08-24 20:00:00 UTC
+
+
+def build_activity_file(records, records_after_session=0):
+    """An activity with ``records`` record messages and the session and activity at the end"""
+    file_id = Definition(0, 0, [FieldDefinition(0, 1, 0x00)])
+    record = Definition(1, 20, [FieldDefinition(253, 4, 0x86), FieldDefinition(3, 1, 0x02)])
+    session = Definition(2, 18, [FieldDefinition(253, 4, 0x86), FieldDefinition(2, 4, 0x86),
+                                 FieldDefinition(7, 4, 0x86), FieldDefinition(5, 1, 0x00),
+                                 FieldDefinition(6, 1, 0x00)])
+    activity = Definition(3, 34, [FieldDefinition(253, 4, 0x86), FieldDefinition(5, 4, 0x86)])
+
+    body = bytearray(file_id.to_bytes() + struct.pack("<BB", 0, 4) + record.to_bytes())
+    for index in range(records):
+        body += struct.pack("<BIB", 1, START + index, 100 + index % 50)
+    body += session.to_bytes() + struct.pack("<BIIIBB", 2, START + records, START, records * 1000, 10, 20)
+    for index in range(records_after_session):
+        body += struct.pack("<BIB", 1, START + records + index, 90)
+    body += activity.to_bytes() + struct.pack("<BII", 3, START + records, START + records + 7200)
+
+    header = bytearray(struct.pack("<BBHI4sH", 14, 0x20, 2132, len(body), b".FIT", 0))
+    struct.pack_into("<H", header, 12, crc16(header[:12]))
+    data = bytes(header + body)
+    return data + struct.pack("<H", crc16(data))
+
+
+def test_scan_summary():
+    """Test that the scanned summary matches a full decode"""
+    print("\n=== Testing Session Scan ===")
+
+    started = time.perf_counter()
+    _, _, decoded = inspect_garmin_file(SAMPLE_FIT_PATH)
+    decode_time = time.perf_counter() - started
+    started = time.perf_counter()
+    summary = scan_fit_file(SAMPLE_FIT_PATH)
+    scan_time = time.perf_counter() - started
+    assert summary == decoded, (summary, decoded)
+    print(f"✓ Sample summary matches the full decode ({scan_time * 1000:.1f} ms vs {decode_time * 1000:.0f} ms)")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "tail.fit")
+        with open(path, 'wb') as f:
+            f.write(build_activity_file(100000))
+        started = time.perf_counter()
+        summary = scan_fit_file(path)
+        elapsed = time.perf_counter() - started
+        assert summary['duration_seconds'] == 100000 and summary['utc_offset_seconds'] == 7200
+        assert summary['local_start_time'] == datetime(2025, 8, 24, 22, 0), summary
+        assert summary['sport'] == "training" and summary['sub_sport'] == "strength_training"
+        print(f"✓ Session found at the tail of a 100,000-record file in {elapsed * 1000:.1f} ms")
+
+        # Session too far from the end for the tail search: full header walk
+        with open(path, 'wb') as f:
+            f.write(build_activity_file(1000, records_after_session=fit_catalogue.TAIL_BYTES))
+        assert scan_fit_file(path)['duration_seconds'] == 1000
+        print("✓ Falls back to walking record headers when the tail has no session")
+
+        with open(path, 'wb') as f:
+            f.write(build_activity_file(10)[:-40])
+        assert scan_fit_file(path) is None
+        print("✓ Truncated file skipped")
+
+
+def test_catalogue_refresh():
+    """Test incremental refresh and matching by local time"""
+    print("\n=== Testing Catalogue Refresh ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        garmin_dir = os.path.join(temp_dir, "garmin", "2025")
+        os.makedirs(garmin_dir)
+        shutil.copy(SAMPLE_FIT_PATH, garmin_dir)
+        synthetic_path = os.path.join(garmin_dir, "synthetic.fit")
+        with open(synthetic_path, 'wb') as f:
+            f.write(build_activity_file(3600))
+        with open(os.path.join(garmin_dir, "synthetic_merged.fit"), 'wb') as f:
+            f.write(build_activity_file(10))
+
+        catalogue = ActivityCatalogue(os.path.join(temp_dir, "catalogue.sqlite3"))
+        directories = [os.path.join(temp_dir, "garmin")]
+        assert catalogue.refresh(directories) == {"scanned": 2, "unchanged": 0, "removed": 0}
+        assert catalogue.refresh(directories) == {"scanned": 0, "unchanged": 2, "removed": 0}
+        print(f"✓ {len(catalogue)} activities catalogued, nothing rescanned on the second refresh")
+
+        matches = catalogue.find(datetime(2025, 9, 1, 16, 45), datetime(2025, 9, 1, 17, 20))
+        assert [os.path.basename(match['path']) for match in matches] == ["2025-09-01-16-42-38.fit"]
+        assert matches[0]['sub_sport'] == "strength_training"
+        assert catalogue.find(datetime(2025, 9, 1, 20, 45), datetime(2025, 9, 1, 21, 20)) == [], \
+            "UTC times must not match a local-time window"
+        print("✓ Workout window matched to its activity in local time")
+
+        with open(synthetic_path, 'wb') as f:
+            f.write(build_activity_file(1800))
+        os.remove(os.path.join(garmin_dir, "2025-09-01-16-42-38.fit"))
+        assert catalogue.refresh(directories) == {"scanned": 1, "unchanged": 0, "removed": 1}
+        [entry] = catalogue.entries()
+        assert entry['duration_seconds'] == 1800
+        print("✓ Changed file rescanned and deleted file removed")
+        catalogue.close()
+
+
+def main():
+    """Run all activity catalogue tests"""
+    print("🧪 Activity Catalogue Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Session Scan", test_scan_summary),
+        ("Catalogue Refresh", test_catalogue_refresh),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
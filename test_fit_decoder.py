@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+FIT Decoder Test for Hevy to Garmin Integration
+
+Tests that the column decoder agrees with fit_tool and handles compressed
+timestamp headers.
+"""
+
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from fit_decoder import decode_fit, decode_fit_native, decode_fit_with_fit_tool
+from fit_stream import Definition, FieldDefinition, crc16
+from merge_pipeline import summarize_fit_session
+
+
+SAMPLE_FIT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "2025-09-01-16-42-38.fit")
+
+START = 1125000000  # FIT-epoch seconds
+
+
+def build_record_file(count, compressed=0):
+    """A FIT file of ``count`` 10 Hz record messages, plus ``compressed`` heart-rate-only records"""
+    record = Definition(0, 20, [FieldDefinition(253, 4, 0x86), FieldDefinition(3, 1, 0x02),
+                                FieldDefinition(2, 2, 0x84), FieldDefinition(5, 4, 0x86)])
+    body = bytearray(record.to_bytes())
+    pack = struct.Struct("<BIBHI").pack
+    for index in range(count):
+        heart_rate = 0xFF if index == 1 else 100 + index % 50  # one invalid sample
+        body += pack(0, START + index // 10, heart_rate, 2500 + index % 100, index * 10)
+    if compressed:
+        body += Definition(1, 20, [FieldDefinition(3, 1, 0x02)]).to_bytes()
+        last = START + (count - 1) // 10
+        for index in range(compressed):
+            last += 20  # each step fits in the five-bit offset
+            body += bytes([0x80 | (1 << 5) | (last & 0x1F), 120 + index])
+    header = bytearray(struct.pack("<BBHI4sH", 14, 0x20, 2132, len(body), b".FIT", 0))
+    struct.pack_into("<H", header, 12, crc16(header[:12]))
+    data = bytes(header + body)
+    return data + struct.pack("<H", crc16(data))
+
+
+def test_matches_fit_tool_on_sample():
+    """Test the native columns against fit_tool's messages for the sample activity"""
+    print("\n=== Testing Decoder Against fit_tool ===")
+
+    with open(SAMPLE_FIT_PATH, 'rb') as f:
+        source = f.read()
+    native = decode_fit_native(source)
+    reference = decode_fit_with_fit_tool(source)
+    assert native.record_count == reference.record_count
+    assert list(native.messages) == list(reference.messages)
+
+    # fit_tool skips fields its profile lacks, so only the native side has extra columns
+    compared = 0
+    for global_number, expected in reference.messages.items():
+        columns = native.messages[global_number]
+        assert len(columns) == len(expected), global_number
+        for field_name, column in expected.columns.items():
+            decoded = columns[field_name]
+            assert column.dtype == decoded.dtype and column.shape == decoded.shape, (global_number, field_name)
+            if column.dtype == object:
+                assert list(column) == list(decoded), (global_number, field_name)
+            else:
+                assert np.allclose(column, decoded, equal_nan=True), (global_number, field_name)
+            compared += 1
+    print(f"✓ {compared} columns in {len(native.messages)} message types identical with both decoders")
+
+    for decoded in (native, reference):
+        session = decoded.message(18)  # 18 = session
+        assert session.first('max_heart_rate') == 167 and session.first('total_calories') == 380
+        assert session.first('total_ascent') is None and session.first('avg_power') is None
+    print("✓ Invalid values are missing (NaN) with either decoder, not 0xFF/0xFFFF markers")
+
+    records = decode_fit_with_fit_tool(build_record_file(5)).message(20)
+    assert np.isnan(records['heart_rate'][1]) and records['heart_rate'][2] == 102
+
+    summary = summarize_fit_session(native)
+    assert summary['sub_sport'] == "strength_training" and summary['duration_seconds'] == 2163
+    assert summary['utc_offset_seconds'] == -4 * 3600
+    print(f"✓ Session summary: {summary['sport']}/{summary['sub_sport']}, {summary['duration_seconds']} s")
+
+
+def test_bulk_decode():
+    """Test decoding a long 10 Hz file, with scale/offset and invalid values"""
+    print("\n=== Testing Bulk Decode ===")
+
+    source = build_record_file(36000)  # one hour at 10 Hz
+    started = time.perf_counter()
+    records = decode_fit(source).message(20)
+    elapsed = time.perf_counter() - started
+    assert len(records) == 36000
+    assert records['timestamp'][15] == (START + 1 + 631065600) * 1000.0
+    assert np.isnan(records['heart_rate'][1]) and records['heart_rate'][2] == 102
+    assert records['altitude'][0] == 2500 / 5 - 500
+    assert records['distance'][100] == 10.0
+    print(f"✓ {len(records):,} records decoded in {elapsed * 1000:.0f} ms")
+
+
+def test_compressed_timestamps():
+    """Test that compressed timestamp headers get full timestamps"""
+    print("\n=== Testing Compressed Timestamps ===")
+
+    decoded = decode_fit(build_record_file(50, compressed=3))
+    assert decoded.decoder == "native"
+    records = decoded.message(20)
+    assert len(records) == 53
+    seconds = records['timestamp'][-4:] / 1000 - 631065600
+    assert list(seconds) == [START + 4, START + 24, START + 44, START + 64], seconds
+    assert list(records['heart_rate'][-3:]) == [120, 121, 122]
+    print("✓ Compressed records expanded from the preceding full timestamp")
+
+
+def main():
+    """Run all FIT decoder tests"""
+    print("🧪 FIT Decoder Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Decoder Against fit_tool", test_matches_fit_tool_on_sample),
+        ("Bulk Decode", test_bulk_decode),
+        ("Compressed Timestamps", test_compressed_timestamps),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+FIT Encoder Test for Hevy to Garmin Integration
+
+Tests that the byte-level encoder keeps preserved records byte-for-byte and
+writes set messages fit_tool can read back.
+"""
+
+import os
+import struct
+import sys
+
+from fit_tool.fit_file import FitFile
+
+from fit_encoder import ENCODER_LOCAL_TYPE, SET_TYPE_FIELD_NAME, encode_enhanced_fit
+from fit_stream import Definition, FieldDefinition, FitStream, crc16
+from merge_pipeline import STRENGTH_MESSAGE_NUMBERS
+from set_table import SetTable
+
+
+SAMPLE_FIT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "2025-09-01-16-42-38.fit")
+
+WORKOUT_START = 1125000000  # FIT-epoch seconds
+
+
+def make_sets():
+    table = SetTable.allocate(3)
+    table.put(0, "squat (barbell)", timestamp=10, exercise_category=28, exercise_name=5, weight=100.0,
+              weight_unit=0, repetitions=5, set_number=1, set_type=0, duration=30)
+    table.put(1, "pull up", timestamp=100, exercise_category=21, exercise_name=3, weight=float("nan"),
+              weight_unit=0, repetitions=8, set_number=1, set_type=2, duration=30)
+    table.put(2, "plank", timestamp=200, exercise_category=19, exercise_name=1, weight=0.0,
+              weight_unit=0, repetitions=0, set_number=1, set_type=0, duration=60)
+    return table
+
+
+def record_bytes(data, keep=lambda span: True):
+    stream = FitStream(data)
+    return [bytes(stream.data[span.offset:span.offset + span.length])
+            for span, _ in stream.records() if keep(span)]
+
+
+def test_encode_sample_file():
+    """Test encoding sets into the sample activity"""
+    print("\n=== Testing Encoding Into Sample Activity ===")
+
+    with open(SAMPLE_FIT_PATH, 'rb') as f:
+        source = f.read()
+    output = bytes(encode_enhanced_fit(source, make_sets(), WORKOUT_START, STRENGTH_MESSAGE_NUMBERS))
+
+    stream = FitStream(output)
+    assert stream.check_crc(), "file CRC should be valid"
+    assert stream.data_size == len(output) - stream.header_size - 2
+    print(f"✓ {len(output):,} byte output with a valid CRC")
+
+    # The set type declaration (developer_data_id, field_description) precedes the sets
+    not_strength = lambda span: span.global_number not in STRENGTH_MESSAGE_NUMBERS | {206, 207}
+    assert record_bytes(output, not_strength) == record_bytes(source, not_strength)
+    print("✓ All other records copied byte-for-byte")
+
+    fit_file = FitFile.from_bytes(output, check_crc=False)
+    sets = [record.message for record in fit_file.records
+            if record.message.global_id == 225 and not record.is_definition]
+    assert [message.repetitions for message in sets] == [5, 8, 0]
+    assert sets[0].weight == 100.0 and sets[0].duration == 30.0
+    assert sets[0].category == [28] and sets[0].category_subtype == [5]
+    assert sets[1].weight is None or sets[1].weight > 4000, "bodyweight set should have no weight"
+    assert [message.message_index for message in sets] == [0, 1, 2]
+    assert sets[0].start_time // 1000 == WORKOUT_START + 10 + 631065600
+    assert sets[0].timestamp - sets[0].start_time == 30000
+    print(f"✓ fit_tool reads back {len(sets)} set messages")
+
+    set_types = [[field.get_value() for field in message.developer_fields if field.name == SET_TYPE_FIELD_NAME]
+                 for message in sets]
+    assert set_types == [[0], [2], [0]], set_types
+    assert [message.set_type for message in sets] == [1, 1, 1]
+    print(f"✓ Edited set types kept in the '{SET_TYPE_FIELD_NAME}' developer field, FIT set_type stays active")
+
+    remerged = bytes(encode_enhanced_fit(output, make_sets(), WORKOUT_START, STRENGTH_MESSAGE_NUMBERS))
+    assert remerged == output
+    print("✓ Re-merging replaces the set type declaration")
+
+
+def test_local_type_restored():
+    """Test that a definition shadowed by the set block is re-emitted after it"""
+    print("\n=== Testing Local Type Restore ===")
+
+    record_definition = Definition(ENCODER_LOCAL_TYPE, 20, [FieldDefinition(254, 4, 0x86), FieldDefinition(3, 1, 0x02)])
+    session_definition = Definition(0, 18, [FieldDefinition(254, 4, 0x86)])
+    body = bytearray()
+    body += record_definition.to_bytes() + struct.pack("<BIB", ENCODER_LOCAL_TYPE, WORKOUT_START, 90)
+    body += session_definition.to_bytes() + struct.pack("<BI", 0, WORKOUT_START + 300)
+    body += struct.pack("<BIB", ENCODER_LOCAL_TYPE, WORKOUT_START + 301, 95)  # record after the session
+    header = bytearray(struct.pack("<BBHI4sH", 14, 0x20, 2132, len(body), b".FIT", 0))
+    struct.pack_into("<H", header, 12, crc16(header[:12]))
+    source = bytes(header + body)
+    source += struct.pack("<H", crc16(source))
+
+    output = bytes(encode_enhanced_fit(source, make_sets(), WORKOUT_START, STRENGTH_MESSAGE_NUMBERS))
+    stream = FitStream(output)
+    assert stream.check_crc()
+    messages = [span.global_number for span, _ in stream.records() if not span.is_definition]
+    assert messages == [20, 207, 206, 225, 225, 225, 18, 20], messages
+    assert record_bytes(output)[-1] == record_bytes(source)[-1]
+    print("✓ Sets inserted before the session, later records still decode")
+
+
+def main():
+    """Run all FIT encoder tests"""
+    print("🧪 FIT Encoder Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Encoding Into Sample Activity", test_encode_sample_file),
+        ("Local Type Restore", test_local_type_restored),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
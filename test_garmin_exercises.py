@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Garmin Exercise Catalogue Test for Hevy to Garmin Integration
+
+Tests the generated exercise catalogue against the fit_tool profile, its
+lookups, and the generic and invalid mappings the merger writes.
+"""
+
+import os
+import sys
+
+from fit_tool.profile import profile_type
+
+import garmin_exercises
+from config_snapshot import ConfigSnapshot
+from generate_garmin_exercises import enum_class_name, read_profile, render_module
+from merge_pipeline import HeadlessMerger
+
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "garmin_exercises.py")
+
+
+def test_catalogue_matches_profile():
+    """Test that the generated module is current and agrees with the enums"""
+    print("\n=== Testing Catalogue Against Profile ===")
+
+    with open(MODULE_PATH, encoding='utf-8') as f:
+        generated = f.read().splitlines()
+    expected = render_module(*read_profile()).splitlines()
+    # Line 2 only records the fit_tool version it was generated from
+    assert generated[:1] + generated[2:] == expected[:1] + expected[2:], \
+        "garmin_exercises.py is stale, re-run generate_garmin_exercises.py"
+    print("✓ garmin_exercises.py is up to date")
+
+    for category in profile_type.ExerciseCategory:
+        if category.value == garmin_exercises.UNKNOWN_CATEGORY:
+            continue
+        assert garmin_exercises.CATEGORY_IDS[category.name.lower()] == category.value
+        for member in getattr(profile_type, enum_class_name(category.name.lower())):
+            assert garmin_exercises.exercise_name(category.value, member.value) == member.name.lower()
+            assert garmin_exercises.EXERCISE_IDS[(category.name.lower(), member.name.lower())] == (
+                category.value, member.value)
+    print(f"✓ {len(garmin_exercises.EXERCISE_IDS)} exercises in {len(garmin_exercises.CATEGORIES)} categories")
+
+
+def test_display_lookups():
+    """Test the pre-sorted display names and their reverse lookup"""
+    print("\n=== Testing Display Names ===")
+
+    names = garmin_exercises.DISPLAY_NAMES
+    assert list(names) == sorted(names, key=str.lower) and len(set(names)) == len(names)
+    assert len(names) == len(garmin_exercises.EXERCISE_IDS)
+    for display, (category, name) in garmin_exercises.DISPLAY_IDS.items():
+        assert garmin_exercises.mapping_for(display) == {"category": category, "name": name}
+    assert garmin_exercises.mapping_for(" barbell back squat ") == {"category": 28, "name": 6}
+    assert garmin_exercises.mapping_for("Arm Circles") is None
+    assert garmin_exercises.mapping_for("Arm Circles (Warm Up)")["category"] == garmin_exercises.CATEGORY_IDS["warm_up"]
+    print(f"✓ {len(names)} unique sorted display names, each resolving to its ids")
+
+    assert garmin_exercises.is_valid(28, 6) and garmin_exercises.is_valid(28, garmin_exercises.NO_EXERCISE_NAME)
+    assert not garmin_exercises.is_valid(0, len(garmin_exercises.EXERCISES[0]))
+    assert not garmin_exercises.is_valid(len(garmin_exercises.CATEGORIES), 0)
+    assert garmin_exercises.is_valid(garmin_exercises.UNKNOWN_CATEGORY, garmin_exercises.NO_EXERCISE_NAME)
+    print("✓ Mapping ids validated by index")
+
+
+def test_merger_mappings():
+    """Test generic mappings and invalid ids in the merger"""
+    print("\n=== Testing Merger Mappings ===")
+
+    merger = HeadlessMerger(config=ConfigSnapshot({"exercise_mappings": {"odd lift": {"category": 0, "name": 9999}}}),
+                            status_callback=lambda message: None)
+    category = garmin_exercises.CATEGORY_IDS
+    no_name = garmin_exercises.NO_EXERCISE_NAME
+    assert merger.create_generic_mapping("Leg Exercise (Generic)") == {"category": category["squat"], "name": no_name}
+    assert merger.create_generic_mapping("Back Exercise (Generic)") == {"category": category["row"], "name": no_name}
+    assert merger.create_generic_mapping("Core Exercise (Generic)") == {"category": category["core"], "name": no_name}
+    assert merger.create_generic_mapping("Strength Training (Generic)")["category"] == garmin_exercises.UNKNOWN_CATEGORY
+    print("✓ Generic mappings use the profile's category ids")
+
+    parsed = [{'exercise_name': "odd lift", 'reps': 5, 'weight': 60.0, 'set_number': 1, 'set_note': ""}]
+    sets = merger.map_hevy_to_garmin_sets(parsed, {'duration_seconds': 600})
+    assert sets[0]['exercise_category'] == 0 and sets[0]['exercise_name'] == no_name
+    print("✓ An exercise id outside the profile is written as its category only")
+
+
+def main():
+    """Run all Garmin exercise catalogue tests"""
+    print("🧪 Garmin Exercise Catalogue Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Catalogue Against Profile", test_catalogue_matches_profile),
+        ("Display Names", test_display_lookups),
+        ("Merger Mappings", test_merger_mappings),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
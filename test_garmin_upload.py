@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Garmin Upload Test for Hevy to Garmin Integration
+
+Tests the persistent upload queue against the local stub upload server.
+"""
+
+import os
+import sys
+import tempfile
+
+from garmin_upload import GarminUploader, UploadQueue, multipart_body
+from upload_stub_server import StubUploadServer, parse_multipart_file
+
+
+def make_files(directory, count, size=200 * 1024):
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"workout_{index}_merged.fit")
+        with open(path, 'wb') as f:
+            f.write(bytes([index]) * size)
+        paths.append(path)
+    return paths
+
+
+def test_multipart_streaming():
+    """Test that the streamed body has the announced length and round-trips"""
+    print("\n=== Testing Multipart Streaming ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = make_files(temp_dir, 1)[0]
+        content_type, length, chunks = multipart_body(path)
+        chunks = list(chunks)
+        body = b"".join(chunks)
+        assert len(body) == length
+        assert len(chunks) > 3, "file should be streamed in several chunks"
+        filename, content = parse_multipart_file(content_type, body)
+        with open(path, 'rb') as f:
+            assert content == f.read()
+        assert filename == os.path.basename(path)
+        print(f"✓ {length} byte body streamed in {len(chunks)} chunks")
+
+
+def test_queue_uploads_with_retries():
+    """Test uploading a batch through transient 503s, with duplicates counted as done"""
+    print("\n=== Testing Upload Queue With Retries ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = StubUploadServer(upload_dir=temp_dir, fail_first=3)
+        server.start()
+        try:
+            upload_queue = UploadQueue(os.path.join(temp_dir, "queue.sqlite3"))
+            paths = make_files(temp_dir, 8)
+            for path in paths:
+                upload_queue.enqueue(path)
+            uploader = GarminUploader(server.base_url, max_concurrency=3, backoff_seconds=0.01)
+
+            counts = uploader.process_queue(upload_queue)
+            assert counts == {"done": 8}, counts
+            assert len(server.received) == 8
+            assert server.requests == 11, "3 failures should have been retried"
+            print(f"✓ 8 files uploaded in {server.requests} requests over {len(server.connections)} connection(s)")
+
+            # Uploading the same file again is a duplicate, which is not an error
+            upload_queue.enqueue(paths[0])
+            assert uploader.process_queue(upload_queue) == {"done": 8}
+            print("✓ Duplicate upload (409) counts as done")
+            upload_queue.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_queue_resume_and_failures():
+    """Test that interrupted uploads resume and hopeless ones are marked failed"""
+    print("\n=== Testing Queue Resume ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "queue.sqlite3")
+        upload_queue = UploadQueue(db_path)
+        paths = make_files(temp_dir, 2, size=10)
+        for path in paths:
+            upload_queue.enqueue(path)
+        claimed = upload_queue.claim(1)
+        assert upload_queue.counts() == {"uploading": 1, "pending": 1}
+        upload_queue.close()  # simulated crash mid-upload
+
+        resumed = UploadQueue(db_path)
+        assert resumed.counts() == {"pending": 2}
+        print("✓ Upload in flight at exit is pending again after restart")
+
+        # Nothing listens on this port: connection errors exhaust the attempts
+        uploader = GarminUploader("http://127.0.0.1:9", max_attempts=2, backoff_seconds=0.01)
+        assert uploader.process_queue(resumed) == {"failed": 2}
+        failed = resumed.entries("failed")
+        assert all(entry["attempts"] == 2 for entry in failed)
+        assert claimed[0][0] in [entry["id"] for entry in failed]
+        print("✓ Unreachable server marks uploads failed after the retry limit")
+        resumed.close()
+
+
+def main():
+    """Run all upload tests"""
+    print("🧪 Garmin Upload Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Multipart Streaming", test_multipart_streaming),
+        ("Upload Queue With Retries", test_queue_uploads_with_retries),
+        ("Queue Resume", test_queue_resume_and_failures),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
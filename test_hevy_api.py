@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Hevy API Importer Test for Hevy to Garmin Integration
+
+Tests syncing workouts from a local stand-in for the Hevy API into the
+SQLite cache and turning them into a Hevy-export DataFrame.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from hevy_api import HevyApiClient, HevyWorkoutCache, sync_workouts, workouts_to_dataframe
+from merge_pipeline import HeadlessMerger
+
+
+def make_workout(index, updated_at="2025-09-01T18:00:00Z"):
+    return {
+        "id": f"w{index}",
+        "title": f"Workout {index}",
+        "description": "",
+        "start_time": f"2025-09-{index + 1:02d}T16:00:00+00:00",
+        "end_time": f"2025-09-{index + 1:02d}T17:00:00+00:00",
+        "updated_at": updated_at,
+        "exercises": [{
+            "title": "Squat (Barbell)",
+            "notes": "",
+            "superset_id": None,
+            "sets": [
+                {"index": 0, "type": "warmup", "weight_kg": 60, "reps": 8},
+                {"index": 1, "type": "normal", "weight_kg": 100, "reps": 5, "rpe": 8},
+            ],
+        }, {
+            "title": "Plank",
+            "notes": "",
+            "superset_id": None,
+            "sets": [{"index": 0, "type": "normal", "duration_seconds": 60}],
+        }],
+    }
+
+
+class FakeHevyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, workouts):
+        super().__init__(("127.0.0.1", 0), FakeHevyHandler)
+        self.workouts = workouts
+        self.events = []
+        self.paths = []
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeHevyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.server.paths.append(url.path)
+        if self.headers.get("api-key") != "secret":
+            return self.send_payload(401, {"error": "unauthorized"})
+
+        page, size = int(query.get("page", 1)), int(query.get("pageSize", 10))
+        if url.path == "/v1/workouts":
+            items, key = self.server.workouts, "workouts"
+        elif url.path == "/v1/workouts/events":
+            items = [event for event in self.server.events if event["at"] > query["since"]]
+            key = "events"
+        else:
+            return self.send_payload(404, {"error": "not found"})
+
+        page_count = max(1, -(-len(items) // size))
+        payload = {"page": page, "page_count": page_count, key: items[(page - 1) * size:page * size]}
+        etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_payload(200, payload, etag)
+
+    def send_payload(self, status, payload, etag=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_sync_full_then_incremental():
+    """Test the first full sync, an incremental sync and an ETag-checked re-sync"""
+    print("\n=== Testing Hevy Sync ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = FakeHevyServer([make_workout(index) for index in range(25)])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            cache = HevyWorkoutCache(os.path.join(temp_dir, "hevy.sqlite3"))
+            client = HevyApiClient("secret", server.base_url, page_size=10)
+
+            result = sync_workouts(client, cache)
+            assert result["updated"] == 25 and result["pages"] == 3, result
+            assert len(cache) == 25
+            print(f"✓ First sync cached {len(cache)} workouts from {result['pages']} pages")
+
+            # One workout edited, one deleted since the last sync
+            cache.set_meta("last_sync", "2025-09-30T00:00:00+00:00")
+            edited = make_workout(3, updated_at="2025-10-01T09:00:00Z")
+            edited["title"] = "Edited"
+            server.events = [
+                {"type": "updated", "at": "2025-10-01T09:00:00+00:00", "workout": edited},
+                {"type": "deleted", "at": "2025-10-01T10:00:00+00:00", "id": "w7"},
+                {"type": "updated", "at": "2025-09-01T10:00:00+00:00", "workout": make_workout(1)},
+            ]
+            server.paths.clear()
+            result = sync_workouts(client, cache)
+            assert server.paths == ["/v1/workouts/events"], server.paths
+            assert result["updated"] == 1 and result["deleted"] == 1, result
+            titles = {workout["id"]: workout["title"] for workout in cache.workouts()}
+            assert titles["w3"] == "Edited" and "w7" not in titles and len(titles) == 24
+            print("✓ Incremental sync applied only the changes since the last sync")
+
+            # Full re-sync of an unchanged history costs only 304s
+            server.workouts = [workout for workout in server.workouts if workout["id"] != "w7"]
+            server.workouts[3] = edited
+            sync_workouts(client, cache, full=True)
+            result = sync_workouts(client, cache, full=True)
+            assert result["pages"] == 3 and result["unchanged_pages"] == 3, result
+            assert result["updated"] == 0
+            print("✓ Full re-sync of unchanged pages answered with 304 Not Modified")
+            cache.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_workouts_to_dataframe():
+    """Test that API workouts parse like a Hevy CSV export"""
+    print("\n=== Testing API Workouts As Hevy Export ===")
+
+    workouts = [make_workout(0), make_workout(1)]
+    hevy_df = workouts_to_dataframe(workouts)
+    assert len(hevy_df) == 6
+    assert hevy_df.loc[2, "exercise_title"] == "Plank" and hevy_df.loc[2, "duration_seconds"] == 60
+    print(f"✓ {len(hevy_df)} set rows in the CSV export layout")
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    workouts_df = merger.detect_hevy_workouts(hevy_df)
+    assert len(workouts_df) == 2
+    parsed = merger.parse_hevy_data(hevy_df[hevy_df["start_time"] == hevy_df.loc[0, "start_time"]])
+    # Timed sets without reps are skipped, as for a CSV export
+    assert [set_data['reps'] for set_data in parsed] == [8, 5], parsed
+    print(f"✓ {len(workouts_df)} workouts detected, {len(parsed)} sets parsed from the first")
+
+
+def main():
+    """Run all Hevy API tests"""
+    print("🧪 Hevy API Importer Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Hevy Sync", test_sync_full_then_incremental),
+        ("API Workouts As Hevy Export", test_workouts_to_dataframe),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Hevy CSV Test for Hevy to Garmin Integration
+
+Tests the column-pruned, dtype-pinned Hevy CSV reader, its workout filter
+and the conversion of Hevy times to FIT epoch seconds.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+import hevy_csv
+from hevy_csv import hevy_fit_timestamps, hevy_local_times, local_datetime, read_hevy_csv
+from merge_pipeline import HeadlessMerger
+
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+
+
+def test_pruned_read_matches_full_read():
+    """Test that the pruned reader feeds the pipeline the same data as pd.read_csv"""
+    print("\n=== Testing Pruned Read ===")
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    full_df = pd.read_csv(SAMPLE_CSV)
+    hevy_df = read_hevy_csv(SAMPLE_CSV, merger.config.column_map)
+
+    assert set(hevy_df.columns) == set(merger.config.column_map.values()) & set(full_df.columns)
+    assert "rpe" not in hevy_df.columns and hevy_df["exercise_title"].dtype == "category"
+    assert repr(merger.parse_hevy_data(hevy_df)) == repr(merger.parse_hevy_data(full_df))
+    assert merger.detect_hevy_workouts(hevy_df) == merger.detect_hevy_workouts(full_df)
+    full_bytes, pruned_bytes = full_df.memory_usage(deep=True).sum(), hevy_df.memory_usage(deep=True).sum()
+    assert pruned_bytes * 3 < full_bytes
+    print(f"✓ Same parsed sets and workouts in {pruned_bytes // 1024} KB instead of {full_bytes // 1024} KB")
+
+
+def test_filtered_chunked_read():
+    """Test that only the selected workouts are materialised"""
+    print("\n=== Testing Filtered Read ===")
+
+    col_mapping = HeadlessMerger(status_callback=lambda message: None).config.column_map
+    by_start = read_hevy_csv(SAMPLE_CSV, col_mapping, start_times=["1 Sep 2025, 16:42"], chunksize=100)
+    assert len(by_start) == 12 and list(by_start.index) == list(range(12))
+    assert list(by_start["start_time"].cat.categories) == ["1 Sep 2025, 16:42"]
+    print(f"✓ {len(by_start)} rows of one workout kept from chunks of 100")
+
+    by_date = read_hevy_csv(SAMPLE_CSV, col_mapping, since=datetime(2025, 8, 1), until=datetime(2025, 8, 31, 23, 59))
+    starts = sorted(set(by_date["start_time"]))
+    assert starts == ["10 Aug 2025, 13:10", "24 Aug 2025, 11:17", "3 Aug 2025, 13:59"], starts
+    print(f"✓ Date range kept {len(starts)} August workouts ({len(by_date)} rows)")
+
+    assert len(read_hevy_csv(SAMPLE_CSV, col_mapping, start_times=["1 Jan 1999, 00:00"])) == 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "no_times.csv")
+        full_df = pd.read_csv(SAMPLE_CSV)
+        full_df.drop(columns=["start_time"]).to_csv(path, index=False)
+        assert len(read_hevy_csv(path, col_mapping)) == len(full_df)
+        try:
+            read_hevy_csv(path, col_mapping, start_times=["1 Sep 2025, 16:42"])
+            raise AssertionError("filter without a start_time column was accepted")
+        except ValueError:
+            print("✓ Missing columns are skipped, filtering without start times is refused")
+
+
+def test_time_conversion():
+    """Test that Hevy times become FIT epoch seconds, each distinct string parsed once"""
+    print("\n=== Testing Time Conversion ===")
+
+    hevy_df = pd.read_csv(SAMPLE_CSV)
+    hevy_csv._time_cache.clear()
+    local_times = hevy_local_times(hevy_df["start_time"])
+    assert len(hevy_csv._time_cache) == hevy_df["start_time"].nunique()
+    for value, seconds in zip(hevy_df["start_time"].head(50), local_times.head(50)):
+        assert local_datetime(seconds) == datetime.strptime(value, hevy_csv.HEVY_TIME_FORMAT), value
+    print(f"✓ {len(hevy_df)} start times from {len(hevy_csv._time_cache)} distinct parses, matching strptime")
+
+    # The sample FIT's session started 20:42:38 UTC with a -4 h offset
+    fit_times = hevy_fit_timestamps(["1 Sep 2025, 16:42", None, "not a time"], -14400)
+    assert fit_times[0] == 1125693720 and fit_times[1:].isna().all()
+    print("✓ Local time and activity offset give the FIT timestamp; bad values are NA")
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    parsed = merger.parse_hevy_data(hevy_df.head(5))
+    assert [data['local_timestamp'] for data in parsed] == [int(seconds) for seconds in local_times.head(5)]
+    print("✓ Parsed sets carry their workout's local timestamp")
+
+    workout = merger.parse_hevy_data(hevy_df[hevy_df["start_time"] == "1 Sep 2025, 16:42"])
+    assert merger.hevy_start_timestamp(workout, -14400) == 1125693720
+    assert merger.hevy_start_timestamp(workout, None) is None
+    print("✓ The activity's offset turns the parsed start into a FIT timestamp")
+
+
+def main():
+    """Run all Hevy CSV tests"""
+    print("🧪 Hevy CSV Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Pruned Read", test_pruned_read_matches_full_read),
+        ("Filtered Read", test_filtered_chunked_read),
+        ("Time Conversion", test_time_conversion),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
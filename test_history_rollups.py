@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+History Rollups Test for Hevy to Garmin Integration
+
+Tests the weekly/monthly rollups against a direct recompute, incremental
+re-ingestion of an edited export, and indexed queries.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from history_rollups import HistoryRollups
+from merge_pipeline import HeadlessMerger
+from workout_report import exercise_muscle_groups, load_muscle_groups
+
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+LAST_WORKOUT = date(2025, 9, 1)
+
+
+def direct_weekly(hevy_df, muscle_group=None):
+    """Weekly volume by looping over rows, the way the rollups replace"""
+    mappings = load_muscle_groups()["muscle_group_mappings"]
+    volumes = {}
+    for _, row in hevy_df.iterrows():
+        if muscle_group and muscle_group not in exercise_muscle_groups(row["exercise_title"], mappings):
+            continue
+        day = datetime.strptime(row["start_time"], "%d %b %Y, %H:%M").date()
+        week = (day - timedelta(days=day.weekday())).isoformat()
+        volume = (0 if pd.isna(row["weight_kg"]) else row["weight_kg"]) * (0 if pd.isna(row["reps"]) else row["reps"])
+        volumes[week] = volumes.get(week, 0) + volume
+    return volumes
+
+
+def test_rollups_match_direct_recompute():
+    """Test weekly totals and muscle-group volume against a row-by-row recompute"""
+    print("\n=== Testing Rollup Totals ===")
+
+    column_map = HeadlessMerger(status_callback=lambda message: None).config.column_map
+    hevy_df = pd.read_csv(SAMPLE_CSV)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history = HistoryRollups(os.path.join(temp_dir, "history.sqlite3"))
+        result = history.ingest_csv(SAMPLE_CSV, column_map)
+        assert result['added'] == hevy_df["start_time"].nunique() == len(history)
+
+        for muscle_group in (None, "chest"):
+            expected = direct_weekly(hevy_df, muscle_group)
+            series = history.series("muscle_group" if muscle_group else "total", muscle_group or "all",
+                                    count=200, until=LAST_WORKOUT)
+            actual = {row['period_start']: row['volume'] for row in series if row['volume']}
+            assert actual.keys() == {week for week, volume in expected.items() if volume}
+            assert all(abs(actual[week] - expected[week]) < 1e-6 for week in actual)
+        print(f"✓ Weekly totals and chest volume match a recompute over {len(hevy_df)} rows")
+
+        months = history.series("exercise", "Goblet Squat", period="month", count=3, until=LAST_WORKOUT)
+        assert [row['period_start'] for row in months] == ["2025-07-01", "2025-08-01", "2025-09-01"]
+        assert months[-1]['sets'] == 3 and months[-1]['reps'] == 32
+        last_week = history.series(count=1, until=LAST_WORKOUT)[0]
+        assert last_week['duration'] == 36 * 60 and last_week['rest'] == 36 * 60 - 12 * 30
+        assert abs(last_week['density'] - last_week['volume'] / 36) < 1e-9
+        print(f"✓ Monthly exercise series and rest/density ({last_week['rest_per_set']:.0f} s rest per set)")
+        history.close()
+
+
+def test_incremental_ingest():
+    """Test that re-ingesting an edited export only touches what changed"""
+    print("\n=== Testing Incremental Ingest ===")
+
+    column_map = HeadlessMerger(status_callback=lambda message: None).config.column_map
+    hevy_df = pd.read_csv(SAMPLE_CSV)
+    edited = hevy_df.copy()
+    first = edited["start_time"] == "1 Sep 2025, 16:42"
+    edited.loc[first & (edited["set_index"] == 0), "weight_kg"] += 5
+    edited = edited[edited["start_time"] != hevy_df["start_time"].iloc[-1]]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history = HistoryRollups(os.path.join(temp_dir, "history.sqlite3"))
+        history.ingest(hevy_df, column_map)
+        assert history.ingest(hevy_df, column_map)['unchanged'] == len(history)
+        result = history.ingest(edited, column_map)
+        assert (result['updated'], result['removed'], result['added']) == (1, 1, 0), result
+        print(f"✓ Re-ingest: {result}")
+
+        fresh = HistoryRollups(os.path.join(temp_dir, "fresh.sqlite3"))
+        fresh.ingest(edited, column_map)
+        query = "SELECT * FROM rollups ORDER BY period, dimension, name, period_start"
+        incremental_rows = history._db.execute(query).fetchall()
+        assert incremental_rows == fresh._db.execute(query).fetchall()
+        print(f"✓ {len(incremental_rows)} rollup rows identical to a fresh build")
+
+        plan = " ".join(str(row) for row in history._db.execute(
+            "EXPLAIN QUERY PLAN SELECT volume FROM rollups WHERE period = 'week' AND dimension = 'muscle_group' "
+            "AND name = 'chest' AND period_start BETWEEN '2025-06-01' AND '2025-09-01'"))
+        assert "SEARCH" in plan and "PRIMARY KEY" in plan, plan
+        print("✓ Series queries are primary-key range searches")
+        history.close()
+        fresh.close()
+
+
+def main():
+    """Run all history rollup tests"""
+    print("🧪 History Rollup Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Rollup Totals", test_rollups_match_direct_recompute),
+        ("Incremental Ingest", test_incremental_ingest),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Heart Rate Analysis Test for Hevy to Garmin Integration
+
+Tests time in zones, TRIMP, per-exercise-block heart rate and the
+whole-history aggregation against straightforward per-sample loops.
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+
+from hr_analysis import (analyze_heart_rate, block_heart_rate, heart_rate_samples, history_heart_rate,
+                         sample_durations, time_in_zones, trimp, zone_bounds)
+from merge_pipeline import HeadlessMerger, decode_garmin_file
+from set_table import SetTable
+
+
+SAMPLE_FIT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "2025-09-01-16-42-38.fit")
+
+
+def loop_zones_and_trimp(seconds, heart_rate, max_hr, resting_hr, max_gap=30):
+    """Reference per-sample loop"""
+    bounds = [round(fraction * max_hr) for fraction in (0.5, 0.6, 0.7, 0.8, 0.9)]
+    zones, load = [0.0] * 6, 0.0
+    for index in range(len(seconds) - 1):
+        held = seconds[index + 1] - seconds[index]
+        if held > max_gap:
+            continue
+        zones[sum(heart_rate[index] >= bound for bound in bounds)] += held
+        reserve = min(max((heart_rate[index] - resting_hr) / (max_hr - resting_hr), 0), 1)
+        load += held / 60 * reserve * 0.64 * math.exp(1.92 * reserve)
+    return zones, load
+
+
+def test_zones_and_trimp():
+    """Test the vectorised zones and TRIMP against a per-sample loop"""
+    print("\n=== Testing Zones and TRIMP ===")
+
+    fit_file, _ = decode_garmin_file(SAMPLE_FIT)
+    seconds, heart_rate = heart_rate_samples(fit_file)
+    durations = sample_durations(seconds)
+    zones = time_in_zones(heart_rate, durations, zone_bounds(197))
+    load = trimp(heart_rate, durations, 60, 197, "male")
+
+    expected_zones, expected_load = loop_zones_and_trimp(seconds.tolist(), heart_rate.tolist(), 197, 60)
+    assert np.allclose(zones, expected_zones) and math.isclose(load, expected_load)
+    print(f"✓ {len(seconds)} samples: zone seconds {zones.astype(int).tolist()}, TRIMP {load:.1f}")
+
+    # A 10-minute gap in recording is not time spent at the last heart rate
+    gapped = sample_durations(np.array([0.0, 1.0, 601.0, 602.0]))
+    assert gapped.tolist() == [1.0, 0.0, 1.0, 0.0]
+    print("✓ Recording gaps are not counted")
+
+
+def test_exercise_blocks():
+    """Test per-exercise-block heart rate from the merged set timings"""
+    print("\n=== Testing Exercise Blocks ===")
+
+    seconds = np.arange(0.0, 100.0)
+    heart_rate = np.where(seconds < 50, 100.0, 150.0)
+    heart_rate[70] = 170.0
+    average, maximum = block_heart_rate(seconds, heart_rate, sample_durations(seconds),
+                                        [0, 50, 200], [50, 100, 300])
+    assert average[0] == 100 and maximum.tolist()[:2] == [100, 170]
+    assert np.isnan(average[2]) and np.isnan(maximum[2])
+    print("✓ Block averages and maxima, NaN for a block without samples")
+
+    fit_file, garmin_df = decode_garmin_file(SAMPLE_FIT)
+    sets = SetTable.from_records([
+        {'original_exercise_name': name, 'timestamp': offset, 'duration': 40, 'repetitions': 8, 'weight': 60}
+        for name, offset in (("squat", 60), ("squat", 240), ("leg press", 600), ("leg press", 780))])
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    stats = merger.extract_workout_statistics(garmin_df, fit_file, sets)
+    blocks = stats['heart_rate']['blocks']
+    assert [block['exercise'] for block in blocks] == ["squat", "leg press"]
+    assert all(block['avg_hr'] <= block['max_hr'] <= stats['max_hr'] for block in blocks)
+    print(f"✓ Workout statistics carry {len(blocks)} exercise blocks: {blocks}")
+
+
+def test_history_matches_single_activities():
+    """Test that the concatenated history equals per-activity analysis"""
+    print("\n=== Testing History Aggregation ===")
+
+    fit_file, _ = decode_garmin_file(SAMPLE_FIT)
+    seconds, heart_rate = heart_rate_samples(fit_file)
+    single = analyze_heart_rate(fit_file, max_hr=197, resting_hr=60)
+    activities = [(seconds, heart_rate), (np.zeros(0), np.zeros(0)), (seconds[:300] + 86400, heart_rate[:300])]
+    zone_seconds, load = history_heart_rate(activities, max_hr=197, resting_hr=60)
+
+    assert zone_seconds.shape == (3, 6)
+    assert [int(round(value)) for value in zone_seconds[0]] == [zone['seconds'] for zone in single['zones']]
+    assert round(load[0], 1) == single['trimp'] and load[1] == 0
+    expected_zones, expected_load = loop_zones_and_trimp(seconds[:300].tolist(), heart_rate[:300].tolist(), 197, 60)
+    assert np.allclose(zone_seconds[2], expected_zones) and math.isclose(load[2], expected_load)
+    print(f"✓ {len(activities)} activities aggregated in one pass, TRIMP {np.round(load, 1).tolist()}")
+
+
+def main():
+    """Run all heart rate analysis tests"""
+    print("🧪 Heart Rate Analysis Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Zones and TRIMP", test_zones_and_trimp),
+        ("Exercise Blocks", test_exercise_blocks),
+        ("History Aggregation", test_history_matches_single_activities),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
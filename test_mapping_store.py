@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Mapping Store Test for Hevy to Garmin Integration
+
+Tests the append-only user mapping journal and its layering over the shipped config.
+"""
+
+import os
+import sys
+import tempfile
+
+from mapping_store import MappingStore
+from merge_pipeline import HeadlessMerger
+
+
+def test_journal_round_trip():
+    """Test that appended mappings survive a reload, including removals and torn writes"""
+    print("\n=== Testing Mapping Journal ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        journal_path = os.path.join(temp_dir, "mappings.jsonl")
+        store = MappingStore(journal_path)
+        store.add({"hip thrust": {"category": 14, "name": 0}})
+        store.add({"cable fly": {"category": 12, "name": 3}, "hip thrust": {"category": 14, "name": 9}})
+        store.add({"cable fly": None})
+
+        reloaded = MappingStore(journal_path)
+        assert reloaded.mappings == {"hip thrust": {"category": 14, "name": 9}}
+        print("✓ Later entries win and null removes a mapping")
+
+        # Simulate a crash in the middle of an append
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"hevy": "face pull", "mapp')
+        torn = MappingStore(journal_path)
+        assert torn.mappings == reloaded.mappings
+        torn.add({"face pull": {"category": 23, "name": 0}})
+        assert MappingStore(journal_path).mappings["face pull"] == {"category": 23, "name": 0}
+        print("✓ Torn last line is skipped and the next append still parses")
+
+
+def test_journal_compaction():
+    """Test that a long journal is compacted to one line per mapping"""
+    print("\n=== Testing Journal Compaction ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        journal_path = os.path.join(temp_dir, "mappings.jsonl")
+        store = MappingStore(journal_path)
+        store.COMPACT_MIN_LINES = 10
+        for index in range(25):
+            store.add({"curl": {"category": 7, "name": index}})
+
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            line_count = len(f.readlines())
+        assert line_count < 10, f"journal not compacted ({line_count} lines)"
+        assert MappingStore(journal_path).mappings == {"curl": {"category": 7, "name": 24}}
+        assert os.listdir(temp_dir) == ["mappings.jsonl"], "temporary file left behind"
+        print(f"✓ 25 appends compacted to {line_count} line(s)")
+
+
+def test_user_mappings_layered_over_config():
+    """Test that confirmed mappings go to the store, not the shipped config"""
+    print("\n=== Testing Layered User Mappings ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        merger = HeadlessMerger(status_callback=lambda message: None)
+        merger._mapping_store = MappingStore(os.path.join(temp_dir, "mappings.jsonl"))
+        shipped = {"barbell squat": {"category": 28, "name": 6}}
+        merger.config = dict(merger.config, exercise_mappings=shipped)
+
+        merger.apply_user_mappings({"Goblet Squat": "Barbell Squat"})
+        assert merger.config["exercise_mappings"]["goblet squat"] == {"category": 28, "name": 6}
+        assert shipped == {"barbell squat": {"category": 28, "name": 6}}, "shipped mappings were modified"
+        assert MappingStore(merger.mapping_store.journal_path).mappings == {"goblet squat": {"category": 28, "name": 6}}
+        print("✓ Mapping saved to the journal and visible through the layered config")
+
+        version = merger.config.version
+        merger.mapping_store.add({"barbell squat": {"category": 28, "name": 0}})
+        merger.config_store.publish(lambda config: config.with_user_mappings(merger.mapping_store.mappings))
+        assert merger.config["exercise_mappings"]["barbell squat"] == {"category": 28, "name": 0}
+        assert merger.config.version == version + 1
+        print("✓ User mappings override shipped defaults in the published snapshot")
+
+
+def main():
+    """Run all mapping store tests"""
+    print("🧪 Mapping Store Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Mapping Journal", test_journal_round_trip),
+        ("Journal Compaction", test_journal_compaction),
+        ("Layered User Mappings", test_user_mappings_layered_over_config),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
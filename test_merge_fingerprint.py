@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Merge Fingerprint Test for Hevy to Garmin Integration
+
+Tests embedding the merge fingerprint, probing it back from the head of a
+file, and skipping already-merged activities in batch and watch-folder runs.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+from fit_tool.fit_file import FitFile
+
+from config_snapshot import ConfigSnapshot
+from fit_encoder import encode_enhanced_fit
+from fit_stream import FitStream
+from merge_fingerprint import FIELD_NAME, find_fingerprint, merge_fingerprint, read_merge_fingerprint
+from merge_pipeline import STRENGTH_MESSAGE_NUMBERS, HeadlessMerger, decode_garmin_file
+from set_table import SetTable
+from watch_folder import hevy_workout_windows, merge_watched_activity
+
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+SAMPLE_FIT = os.path.join(TEST_FILES, "2025-09-01-16-42-38.fit")
+SAMPLE_CSV = os.path.join(TEST_FILES, "workouts-2.csv")
+
+ROWS = [{'exercise_name': "squat (barbell)", 'set_number': 1, 'reps': 5, 'weight': 100.0, 'set_note': "",
+         'original_row_index': 7}]
+MAPPINGS = {"squat (barbell)": {"category": 28, "name": 6}, "bench press (barbell)": {"category": 0, "name": 1}}
+
+
+def test_fingerprint_inputs():
+    """Test what the fingerprint does and does not depend on"""
+    print("\n=== Testing Fingerprint Inputs ===")
+
+    fingerprint = merge_fingerprint(ROWS, MAPPINGS)
+    assert len(fingerprint) == 16
+    assert merge_fingerprint([dict(ROWS[0], original_row_index=0)], MAPPINGS) == fingerprint
+    assert merge_fingerprint(ROWS, {"squat (barbell)": MAPPINGS["squat (barbell)"]}) == fingerprint
+    assert merge_fingerprint([dict(ROWS[0], weight=102.5)], MAPPINGS) != fingerprint
+    assert merge_fingerprint(ROWS, dict(MAPPINGS, **{"squat (barbell)": {"category": 28, "name": 61}})) != fingerprint
+    assert merge_fingerprint(ROWS, MAPPINGS, {"default_set_duration_seconds": 45}) != fingerprint
+    assert merge_fingerprint(ROWS, MAPPINGS, version="0.0.0") != fingerprint
+    print("✓ Rows, used mappings, settings and version change it; row position and unused mappings don't")
+
+
+def test_embed_and_probe():
+    """Test writing the fingerprint block and reading it back"""
+    print("\n=== Testing Embed and Probe ===")
+
+    with open(SAMPLE_FIT, 'rb') as f:
+        source = f.read()
+    sets = SetTable.from_records([{'original_exercise_name': "squat (barbell)", 'timestamp': 60, 'duration': 40,
+                                   'repetitions': 5, 'weight': 100.0, 'exercise_category': 28, 'exercise_name': 6}])
+    fingerprint = merge_fingerprint(ROWS, MAPPINGS)
+    output = bytes(encode_enhanced_fit(source, sets, 1_000_000_000, STRENGTH_MESSAGE_NUMBERS, fingerprint))
+    stream = FitStream(output)
+    assert stream.check_crc() and find_fingerprint(stream)[0] == fingerprint
+    assert find_fingerprint(FitStream(source)) is None
+
+    developer_fields = [field for record in FitFile.from_bytes(output, check_crc=False).records[:10]
+                        for field in getattr(record.message, 'developer_fields', None) or []]
+    assert len(developer_fields) == 1 and developer_fields[0].name == FIELD_NAME
+    print(f"✓ fit_tool reads the '{FIELD_NAME}' developer field")
+
+    # Merging a merged file again replaces the block instead of adding another
+    remerged = bytes(encode_enhanced_fit(output, sets, 1_000_000_000, STRENGTH_MESSAGE_NUMBERS, bytes(16)))
+    assert len(remerged) == len(output) and find_fingerprint(FitStream(remerged))[0] == bytes(16)
+    assert bytes(encode_enhanced_fit(remerged, sets, 1_000_000_000, STRENGTH_MESSAGE_NUMBERS, fingerprint)) == output
+    print("✓ Re-merging replaces the fingerprint block")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "merged.fit")
+        with open(path, 'wb') as f:
+            f.write(output)
+        open(os.path.join(temp_dir, "empty.fit"), 'wb').close()
+        assert read_merge_fingerprint(path) == fingerprint
+        assert read_merge_fingerprint(SAMPLE_FIT) is None
+        assert read_merge_fingerprint(os.path.join(temp_dir, "empty.fit")) is None
+        assert read_merge_fingerprint(os.path.join(temp_dir, "missing.fit")) is None
+    print("✓ Probe reads the fingerprint, None for plain, empty and missing files")
+
+
+def test_skip_already_merged():
+    """Test that batch and watch-folder merges skip already-merged activities"""
+    print("\n=== Testing Skip Already Merged ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hevy_csv = os.path.join(temp_dir, "workouts.csv")
+        shutil.copy(SAMPLE_CSV, hevy_csv)
+        output_path = os.path.join(temp_dir, "merged.fit")
+        merger = HeadlessMerger(status_callback=lambda message: None)
+        assert merger.merge_files(SAMPLE_FIT, hevy_csv, output_path, skip_merged=True) == output_path
+        assert read_merge_fingerprint(output_path) is not None
+        modified = os.stat(output_path).st_mtime_ns
+
+        assert merger.merge_files(SAMPLE_FIT, hevy_csv, output_path, skip_merged=True) is None
+        assert merger.merge_files(output_path, hevy_csv, os.path.join(temp_dir, "again.fit"),
+                                  skip_merged=True) is None
+        assert os.stat(output_path).st_mtime_ns == modified
+        print("✓ Batch merge skips an existing output and an already-merged activity")
+
+        # A reused merger embeds each merge's own fingerprint
+        hevy_df = pd.read_csv(hevy_csv)
+        workout_df = hevy_df[hevy_df["start_time"] == "1 Sep 2025, 16:42"]
+        fit_file, _ = decode_garmin_file(SAMPLE_FIT)
+        workout_path = os.path.join(temp_dir, "workout.fit")
+        merger.merge_decoded(fit_file, workout_df, workout_path)
+        expected = merger.merge_fingerprint(merger.parse_hevy_data(workout_df))
+        assert read_merge_fingerprint(workout_path) == expected != read_merge_fingerprint(output_path)
+        print("✓ Each merge embeds the fingerprint of its own rows")
+
+        config = ConfigSnapshot({**merger.config,
+                                 "settings": dict(merger.config.settings, default_set_duration_seconds=45)})
+        remerger = HeadlessMerger(config=config, status_callback=lambda message: None)
+        assert remerger.merge_files(SAMPLE_FIT, hevy_csv, output_path, skip_merged=True) == output_path
+        print("✓ Changed settings merge again")
+
+        exports = [(hevy_csv, hevy_workout_windows(hevy_csv, merger))]
+        watched_output = os.path.join(temp_dir, "watched.fit")
+        assert merge_watched_activity(SAMPLE_FIT, exports, watched_output)['status'] == 'merged'
+        result = merge_watched_activity(SAMPLE_FIT, exports, watched_output)
+        assert result['status'] == 'unchanged' and result['output'] == watched_output
+        print(f"✓ Watch folder reports '{result['workout']}' as already merged")
+
+
+def main():
+    """Run all merge fingerprint tests"""
+    print("🧪 Merge Fingerprint Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Fingerprint Inputs", test_fingerprint_inputs),
+        ("Embed and Probe", test_embed_and_probe),
+        ("Skip Already Merged", test_skip_already_merged),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
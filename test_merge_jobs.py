@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Merge Job Test for Hevy to Garmin Integration
+
+Tests cancellation, progress reporting and scheduling of merge jobs without GUI dependencies.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+from merge_jobs import MergeJob, JobCancelled, CancellationToken, TkJobScheduler
+from merge_pipeline import HeadlessMerger, decode_garmin_file
+
+
+class FakeTkRoot:
+    """Minimal stand-in for the Tk root's after() scheduling (no display needed)"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay_ms, callback, *args):
+        self.callbacks.append((time.monotonic() + delay_ms / 1000.0, callback, args))
+        return len(self.callbacks)
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run_until(self, predicate, timeout=10.0):
+        """Process due callbacks like mainloop() until predicate() is true"""
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            now = time.monotonic()
+            due = [entry for entry in self.callbacks if entry[0] <= now]
+            self.callbacks = [entry for entry in self.callbacks if entry[0] > now]
+            for _, callback, args in due:
+                callback(*args)
+            time.sleep(0.001)
+        return predicate()
+
+
+def square(value):
+    """Picklable CPU-bound helper for the process pool test"""
+    return value * value
+
+
+def test_cancellation_token():
+    """Test that a cancelled token raises at the next checkpoint"""
+    print("\n=== Testing Cancellation Token ===")
+
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    print("✓ Fresh token does not raise")
+
+    token.cancel()
+    try:
+        token.raise_if_cancelled()
+        raise AssertionError("cancelled token did not raise")
+    except JobCancelled:
+        print("✓ Cancelled token raises JobCancelled")
+
+    # JobCancelled must escape the pipeline's broad "except Exception" handlers
+    assert not issubclass(JobCancelled, Exception)
+    print("✓ JobCancelled is not swallowed by 'except Exception'")
+
+
+def test_progress_reporting():
+    """Test that progress is determinate and monotonic across stages"""
+    print("\n=== Testing Progress Reporting ===")
+
+    updates = []
+    job = MergeJob(progress_callback=lambda fraction, message: updates.append(fraction))
+
+    job.stage("decode")
+    job.report(1, 2)
+    job.stage("clean")
+    for _ in job.iterate(range(1000)):
+        pass
+    job.finish()
+
+    assert updates, "no progress reported"
+    assert updates == sorted(updates), "progress went backwards"
+    assert updates[-1] == 1.0
+    assert len(updates) < 100, "loop progress should be throttled"
+    print(f"✓ {len(updates)} monotonic progress updates ending at 100%")
+
+
+def test_cancel_inside_loop():
+    """Test that a long loop stops promptly when cancelled from another thread"""
+    print("\n=== Testing Cancellation Inside Loops ===")
+
+    job = MergeJob()
+    job.stage("clean")
+    processed = 0
+    cancel_at = threading.Event()
+
+    try:
+        for _ in job.iterate(range(100000)):
+            processed += 1
+            if processed == 5000 and not cancel_at.is_set():
+                cancel_at.set()
+                threading.Thread(target=job.cancel).start()
+                threading.Event().wait(0.05)
+        raise AssertionError("loop was not cancelled")
+    except JobCancelled:
+        print(f"✓ Loop cancelled after {processed} of 100000 items")
+
+    assert processed < 100000
+
+
+def test_pipeline_parse_cancellation():
+    """Test that Hevy parsing honours a cancelled job"""
+    print("\n=== Testing Pipeline Cancellation ===")
+
+    sample_csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+    hevy_df = pd.read_csv(sample_csv_path)
+    merger = HeadlessMerger(status_callback=lambda message: None)
+
+    parsed = merger.parse_hevy_data(hevy_df, job=MergeJob())
+    assert len(parsed) > 0
+    print(f"✓ Parsed {len(parsed)} sets with a live job")
+
+    job = MergeJob()
+    job.cancel()
+    try:
+        merger.parse_hevy_data(hevy_df, job=job)
+        raise AssertionError("cancelled parse did not raise")
+    except JobCancelled:
+        print("✓ Cancelled job stops parse_hevy_data")
+
+
+def test_detect_hevy_workouts():
+    """Test that a multi-workout Hevy export is split into workouts for the selection summary"""
+    print("\n=== Testing Hevy Workout Detection ===")
+
+    sample_csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+    hevy_df = pd.read_csv(sample_csv_path)
+    merger = HeadlessMerger(status_callback=lambda message: None)
+
+    workouts = merger.detect_hevy_workouts(hevy_df)
+    assert len(workouts) > 1
+    assert sum(workout['sets'] for workout in workouts) == len(hevy_df)
+    latest = workouts[0]
+    assert latest['start_time'] == hevy_df.iloc[0]['start_time']
+    assert latest['exercises'] > 0
+    print(f"✓ Detected {len(workouts)} workouts; latest '{latest['title']}' with {latest['sets']} sets")
+
+
+def test_remove_garmin_sets_by_message_number():
+    """Test that only set/exercise title messages are removed, not device settings"""
+    print("\n=== Testing Garmin Set Removal ===")
+
+    from fit_decoder import DecodedFit, MessageColumns
+
+    def message(global_id, name, count):
+        return MessageColumns(global_id, name, {"timestamp": np.zeros(count)}, count)
+
+    messages = {0: message(0, "file_id", 1), 2: message(2, "device_settings", 1), 225: message(225, "set", 2),
+                264: message(264, "exercise_title", 1), 18: message(18, "session", 1)}
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    cleaned = merger.remove_garmin_sets(DecodedFit(b"", messages, record_count=11))
+
+    kept = cleaned.message_names()
+    assert kept == ["file_id", "device_settings", "session"], kept
+    assert cleaned.record_count == 8
+    print("✓ Set and exercise title messages removed, device settings kept")
+
+
+def test_background_decode_wait_is_cancellable():
+    """Test that waiting on a background FIT decode stays cancellable"""
+    print("\n=== Testing Background Decode Wait ===")
+
+    from concurrent.futures import Future
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    done_future = Future()
+    done_future.set_result(("fit", pd.DataFrame({"heart_rate": [100, 110]})))
+    fit_file, garmin_df = merger.wait_for_decode(done_future, MergeJob())
+    assert fit_file == "fit" and len(garmin_df) == 2
+    print("✓ Finished decode result is returned")
+
+    pending_future = Future()
+    job = MergeJob()
+    threading.Timer(0.2, job.cancel).start()
+    try:
+        merger.wait_for_decode(pending_future, job)
+        raise AssertionError("wait was not cancelled")
+    except JobCancelled:
+        print("✓ Cancelling the job stops waiting on a slow decode")
+
+
+def test_merger_reuse_between_pairs():
+    """Test that a merger reused for the next pair never writes the previous pair's sets"""
+    print("\n=== Testing Merger Reuse ===")
+
+    test_files = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+    fit_file, _ = decode_garmin_file(os.path.join(test_files, "2025-09-01-16-42-38.fit"))
+    hevy_df = pd.read_csv(os.path.join(test_files, "workouts-2.csv"))
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        merger.merge_decoded(fit_file, hevy_df, os.path.join(temp_dir, "first.fit"))
+        assert len(merger.last_processed_sets) > 0
+
+        empty_path = os.path.join(temp_dir, "empty.fit")
+        try:
+            merger.merge_decoded(fit_file, hevy_df.iloc[0:0], empty_path)
+            raise AssertionError("merged an empty workout")
+        except ValueError:
+            pass
+        assert len(merger.last_processed_sets) == 0 and not os.path.exists(empty_path)
+    print("✓ An empty workout fails instead of reusing the previous pair's sets")
+
+    # Rows already parsed by the pre-read are not parsed again
+    parsed = merger.parse_hevy_data(hevy_df)
+    merger.parse_hevy_data = None
+    merger.integrate_hevy_data(fit_file, hevy_df, parsed_hevy_data=parsed)
+    assert len(merger.last_processed_sets) == len(parsed)
+    print("✓ Pre-parsed Hevy rows are integrated without a second parse")
+
+
+def test_tk_scheduler():
+    """Test coroutines awaiting process and thread work through the Tk-driven loop"""
+    print("\n=== Testing Tk Job Scheduler ===")
+
+    root = FakeTkRoot()
+    scheduler = TkJobScheduler(root, max_processes=1)
+    finished = []
+    main_thread = threading.main_thread()
+
+    async def workflow():
+        cpu_result = await scheduler.run_cpu(square, 7)
+        io_thread = await scheduler.run_io(lambda: threading.current_thread())
+        # The coroutine itself always resumes on the Tk (main) thread
+        return cpu_result, io_thread is not main_thread, threading.current_thread() is main_thread
+
+    try:
+        scheduler.submit(workflow(), on_done=lambda task: finished.append(task.result()))
+        assert root.run_until(lambda: finished), "workflow did not finish"
+        assert finished[0] == (49, True, True)
+        print("✓ CPU stage ran in a worker, I/O in a thread, coroutine on the Tk thread")
+
+        # Cancelling the task stops it while it is awaiting a worker
+        started = threading.Event()
+        outcome = []
+
+        def slow_io():
+            started.set()
+            time.sleep(0.5)
+
+        task = scheduler.submit(scheduler.run_io(slow_io), on_done=lambda t: outcome.append(t.cancelled()))
+        assert root.run_until(started.is_set)
+        task.cancel()
+        assert root.run_until(lambda: outcome)
+        assert outcome == [True]
+        print("✓ Cancelled task reports completion without waiting for the worker")
+    finally:
+        scheduler.shutdown()
+
+
+def main():
+    """Run all merge job tests"""
+    print("🧪 Merge Job Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Cancellation Token", test_cancellation_token),
+        ("Progress Reporting", test_progress_reporting),
+        ("Cancellation Inside Loops", test_cancel_inside_loop),
+        ("Pipeline Cancellation", test_pipeline_parse_cancellation),
+        ("Hevy Workout Detection", test_detect_hevy_workouts),
+        ("Garmin Set Removal", test_remove_garmin_sets_by_message_number),
+        ("Background Decode Wait", test_background_decode_wait_is_cancellable),
+        ("Merger Reuse", test_merger_reuse_between_pairs),
+        ("Tk Job Scheduler", test_tk_scheduler),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Merge Service Test for Hevy to Garmin Integration
+
+Tests the streaming upload parser and the HTTP merge service end to end.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+
+from fit_decoder import decode_fit_file
+from garmin_upload import multipart_files
+from merge_service import MergeService, MergeServiceClient, MergeServiceServer, save_multipart
+
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+SAMPLE_FIT = os.path.join(SAMPLE_DIR, "2025-09-01-16-42-38.fit")
+SAMPLE_CSV = os.path.join(SAMPLE_DIR, "workouts-2.csv")
+
+
+def test_streaming_multipart():
+    """Test that uploads are split into files correctly whatever the read size"""
+    print("\n=== Testing Streaming Multipart Parser ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # A part containing a near-boundary must not end early
+        tricky_path = os.path.join(temp_dir, "tricky.csv")
+        with open(tricky_path, 'wb') as f:
+            f.write(b"a,b\r\n--boundar\r\n--" + bytes(range(256)) * 40)
+        content_type, length, chunks = multipart_files([("fit", SAMPLE_FIT), ("csv", tricky_path)],
+                                                       boundary="boundary")
+        body = b"".join(chunks)
+        assert len(body) == length
+
+        for chunk_size in (1, 7, 4096, 1 << 20):
+            def open_part(name, filename):
+                return open(os.path.join(temp_dir, f"{name}.out"), 'wb')
+            saved = save_multipart(io.BytesIO(body), length, b"boundary", open_part, chunk_size=chunk_size)
+            assert saved == ["fit", "csv"], saved
+            for name, source in (("fit", SAMPLE_FIT), ("csv", tricky_path)):
+                with open(os.path.join(temp_dir, f"{name}.out"), 'rb') as out, open(source, 'rb') as original:
+                    assert out.read() == original.read(), f"{name} differs at chunk size {chunk_size}"
+        print("✓ Both files reproduced exactly for read sizes 1 B to 1 MB")
+
+        try:
+            save_multipart(io.BytesIO(body[:length // 2]), length, b"boundary", lambda name, filename: None)
+            raise AssertionError("truncated upload was accepted")
+        except ValueError:
+            print("✓ Truncated upload rejected")
+
+
+def test_service_end_to_end():
+    """Test submitting a pair, streaming its progress and downloading the result"""
+    print("\n=== Testing Merge Service ===")
+
+    server = MergeServiceServer(service=MergeService(workers=1, max_pending=2))
+    server.start()
+    client = MergeServiceClient(server.base_url)
+    try:
+        job = client.submit(SAMPLE_FIT, SAMPLE_CSV)
+        assert job["state"] == "queued"
+        workspace = server.service.get(job["id"]).workspace
+        assert sorted(os.listdir(workspace)) == ["activity.fit", "workout.csv"]
+        print(f"✓ Upload streamed into the job workspace ({job['id']})")
+
+        status, response, payload = client.request("GET", f"/jobs/{job['id']}/events")
+        assert status == 200 and response.getheader("Content-Type") == "text/event-stream"
+        events = [json.loads(line[len("data: "):]) for line in payload.decode("utf-8").splitlines()
+                  if line.startswith("data: ")]
+        assert events[-1]["state"] == "done", events[-1]
+        progress = [event["progress"] for event in events]
+        assert progress == sorted(progress) and progress[-1] == 1.0
+        print(f"✓ {len(events)} progress events, ending with '{events[-1]['result']['workout']}'")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = client.download(job["id"], os.path.join(temp_dir, "merged.fit"))
+            merged = decode_fit_file(output_path)
+        assert merged.message(225).length == events[-1]["result"]["sets"]
+        print(f"✓ Downloaded merged file with {merged.message(225).length} sets")
+
+        status, _, _ = client.request("DELETE", f"/jobs/{job['id']}")
+        assert status == 200 and not os.path.exists(workspace)
+        assert client.request("GET", f"/jobs/{job['id']}")[0] == 404
+        print("✓ Deleting a job removes its workspace")
+    finally:
+        client.close()
+        server.close()
+
+
+def test_bad_requests_and_full_queue():
+    """Test rejected uploads and the pending-job limit"""
+    print("\n=== Testing Rejected Requests ===")
+
+    service = MergeService(workers=1, max_pending=1)
+    server = MergeServiceServer(service=service, max_upload_bytes=1 << 20)
+    server.start()
+    client = MergeServiceClient(server.base_url)
+    try:
+        content_type, length, chunks = multipart_files([("fit", SAMPLE_FIT)])
+        status, _, payload = client.request("POST", "/jobs", b"".join(chunks),
+                                            {"Content-Type": content_type, "Content-Length": str(length)})
+        assert status == 400 and b"csv" in payload, payload
+        assert service.snapshot() == [], "rejected upload left a job behind"
+        print("✓ Upload without a CSV rejected")
+
+        held = service.create_job()
+        try:
+            client.submit(SAMPLE_FIT, SAMPLE_CSV)
+            raise AssertionError("full queue accepted a job")
+        except RuntimeError as e:
+            assert "503" in str(e)
+        service.abandon(held)
+        print("✓ Full queue answers 503")
+
+        assert client.request("GET", "/jobs/unknown/result")[0] == 404
+        assert client.request("GET", "/elsewhere")[0] == 404
+        print("✓ Unknown jobs and paths answer 404")
+    finally:
+        client.close()
+        server.close()
+
+
+def main():
+    """Run all merge service tests"""
+    print("🧪 Merge Service Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Streaming Multipart Parser", test_streaming_multipart),
+        ("Merge Service", test_service_end_to_end),
+        ("Rejected Requests", test_bad_requests_and_full_queue),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
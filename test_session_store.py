@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Session Store Test for Hevy to Garmin Integration
+
+Tests saved preferences and resuming a merge preview from its snapshot.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+from edit_history import EditHistory
+from merge_pipeline import HeadlessMerger, decode_garmin_file
+from session_store import (file_fingerprint, load_session, load_user_preferences, remember_file, save_session,
+                           save_user_preferences)
+
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+
+
+def test_preferences():
+    """Test recent files and last-used folders in the preferences file"""
+    print("\n=== Testing Preferences ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "user_preferences.json")
+        preferences = load_user_preferences(path)
+        assert preferences["recent_garmin_files"] == [] and preferences["last_session"] is None
+
+        for name in ("a.fit", "b.fit", "a.fit"):
+            remember_file(preferences, "garmin", os.path.join(temp_dir, name))
+        save_user_preferences(preferences, path)
+        stored = load_user_preferences(path)
+        assert [os.path.basename(p) for p in stored["recent_garmin_files"]] == ["a.fit", "b.fit"]
+        assert stored["last_garmin_dir"] == temp_dir
+        assert os.listdir(temp_dir) == ["user_preferences.json"], "no temporary files left behind"
+        print("✓ Recent files and last folder saved")
+
+
+def test_resume_session():
+    """Test that a saved preview resumes with its edits and exports the same file"""
+    print("\n=== Testing Session Resume ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        garmin_path = shutil.copy(os.path.join(TEST_FILES, "2025-09-01-16-42-38.fit"), temp_dir)
+        hevy_path = shutil.copy(os.path.join(TEST_FILES, "workouts-2.csv"), temp_dir)
+        merger = HeadlessMerger(status_callback=lambda message: None)
+        fit_file, _ = decode_garmin_file(garmin_path)
+        hevy_df = pd.read_csv(hevy_path)
+        workout_df = hevy_df[hevy_df["start_time"] == hevy_df["start_time"][0]]
+        enhanced_fit_file = merger.integrate_hevy_data(fit_file, workout_df)
+
+        history = EditHistory(merger.last_processed_sets)
+        history.edit(0, repetitions=11, weight=42.5)
+        history.edit(1, set_type=5)
+        history.undo()
+        snapshot_path = os.path.join(temp_dir, "last_session.npz")
+        fingerprints = (file_fingerprint(garmin_path), file_fingerprint(hevy_path))
+        save_session(snapshot_path, fingerprints, history, enhanced_fit_file, {"avg_hr": 110}, {"Foo": "Squat"})
+        print(f"✓ Snapshot written ({os.path.getsize(snapshot_path):,} bytes)")
+
+        snapshot = load_session(snapshot_path)
+        assert snapshot is not None
+        assert snapshot.history.table[0]['repetitions'] == 11 and snapshot.history.table[0]['weight'] == 42.5
+        assert snapshot.history.base[0]['repetitions'] == history.base[0]['repetitions']
+        assert snapshot.history.steps() == history.steps()
+        snapshot.history.redo()
+        assert snapshot.history.table[1]['set_type'] == 5
+        snapshot.history.undo()
+        assert snapshot.workout_stats == {"avg_hr": 110} and snapshot.user_mappings == {"Foo": "Squat"}
+        print("✓ Sets, edits and redo steps restored")
+
+        resumed_path, original_path = os.path.join(temp_dir, "resumed.fit"), os.path.join(temp_dir, "original.fit")
+        merger.write_fit_file(snapshot.fit_file, snapshot.history.table, resumed_path)
+        merger.write_fit_file(enhanced_fit_file, history.table, original_path)
+        with open(resumed_path, 'rb') as resumed, open(original_path, 'rb') as original:
+            assert resumed.read() == original.read()
+        print("✓ Resumed session exports the same file without decoding again")
+
+        os.utime(hevy_path, ns=(0, 0))
+        assert load_session(snapshot_path) is not None, "same content with a new mtime is still valid"
+        with open(hevy_path, 'a', encoding='utf-8') as f:
+            f.write("\n")
+        assert load_session(snapshot_path) is None
+        print("✓ Snapshot invalidated once an input file changes")
+
+
+def main():
+    """Run all session store tests"""
+    print("🧪 Session Store Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Preferences", test_preferences),
+        ("Session Resume", test_resume_session),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Set Alignment Test for Hevy to Garmin Integration
+
+Tests aligning Hevy sets onto the set timings recorded by a Garmin watch.
+"""
+
+import sys
+
+from set_alignment import align_sets, aligned_set_timings
+
+
+def hevy_set(exercise_name, reps):
+    return {'exercise_name': exercise_name, 'reps': reps}
+
+
+def garmin_set(start_time, reps, duration=40.0, category=None):
+    return {'start_time': float(start_time), 'duration': duration, 'repetitions': reps, 'category': category}
+
+
+def test_aligns_matching_sets_in_order():
+    """Test that equal set counts align one to one"""
+    print("\n=== Testing One-to-One Alignment ===")
+
+    hevy = [hevy_set("squat", 8), hevy_set("squat", 8), hevy_set("bench press", 10)]
+    garmin = [garmin_set(1000, 8), garmin_set(1100, 8), garmin_set(1400, 10)]
+    assert align_sets(hevy, garmin) == [0, 1, 2]
+
+    timings, matched = aligned_set_timings(hevy, garmin, workout_start=900, default_duration=30)
+    assert matched == 3
+    assert timings == [(100.0, 40.0), (200.0, 40.0), (500.0, 40.0)]
+    print("✓ Every Hevy set takes the recorded Garmin start time and duration")
+
+
+def test_handles_count_mismatches():
+    """Test that missed or extra sets on the watch are skipped, not shifted"""
+    print("\n=== Testing Count Mismatches ===")
+
+    # The watch missed the second squat set
+    hevy = [hevy_set("squat", 5), hevy_set("squat", 5), hevy_set("squat", 5),
+            hevy_set("curl", 12), hevy_set("curl", 12)]
+    garmin = [garmin_set(0, 5), garmin_set(120, 5),
+              garmin_set(600, 12), garmin_set(700, 12)]
+    assignment = align_sets(hevy, garmin)
+    assert assignment[3:] == [2, 3], "curl sets should land on the curl block after the long rest"
+    assert assignment.count(None) == 1
+    print(f"✓ Missing watch set skipped: {assignment}")
+
+    timings, matched = aligned_set_timings(hevy, garmin, workout_start=0, default_duration=30)
+    assert matched == 4
+    missing = assignment.index(None)
+    previous_offset, previous_duration = timings[missing - 1]
+    assert timings[missing] == (previous_offset + previous_duration, 30.0)
+    print("✓ Unmatched Hevy set placed after the previous set")
+
+    # Sets logged before the watch's first recorded set start with the Hevy workout
+    timings, _ = aligned_set_timings([hevy_set("curl", 12)] + hevy, garmin, workout_start=0, default_duration=30,
+                                     hevy_start=-60)
+    assert timings[0] == (0.0, 30.0)
+    timings, _ = aligned_set_timings([hevy_set("press", 3)], [], workout_start=1000, default_duration=30,
+                                     hevy_start=1120)
+    assert timings == [(120.0, 30.0)]
+    print("✓ Leading unmatched sets start at the Hevy workout start, not before the activity")
+
+    # The watch recorded an extra set the user did not log
+    hevy = [hevy_set("row", 10), hevy_set("row", 10)]
+    garmin = [garmin_set(0, 10), garmin_set(90, 3), garmin_set(180, 10)]
+    assert align_sets(hevy, garmin) == [0, 2]
+    print("✓ Extra watch set with a different rep count is skipped")
+
+
+def test_empty_inputs():
+    """Test alignment with nothing recorded"""
+    print("\n=== Testing Empty Inputs ===")
+
+    assert align_sets([hevy_set("squat", 5)], []) == [None]
+    assert align_sets([], [garmin_set(0, 5)]) == []
+    print("✓ No recorded sets leaves every Hevy set unmatched")
+
+
+def main():
+    """Run all set alignment tests"""
+    print("🧪 Set Alignment Tests")
+    print("=" * 50)
+
+    tests = [
+        ("One-to-One Alignment", test_aligns_matching_sets_in_order),
+        ("Count Mismatches", test_handles_count_mismatches),
+        ("Empty Inputs", test_empty_inputs),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Set Table Test for Hevy to Garmin Integration
+
+Checks that the array-backed set table matches the per-set dict loops it replaced.
+"""
+
+import os
+import sys
+import pandas as pd
+
+from merge_pipeline import HeadlessMerger
+from set_table import SetTable
+
+
+def sample_sets():
+    """Map the sample Hevy export to a set table"""
+    sample_csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    parsed = merger.parse_hevy_data(pd.read_csv(sample_csv_path))
+    return merger.map_hevy_to_garmin_sets(parsed, {'duration_seconds': 3600})
+
+
+def loop_summary(records):
+    """Reference per-exercise summary computed the old way, one dict per set"""
+    summary = {}
+    for set_data in records:
+        stats = summary.setdefault(set_data['original_exercise_name'],
+                                   {'sets': 0, 'total_reps': 0, 'max_weight': 0, 'total_volume': 0})
+        stats['sets'] += 1
+        stats['total_reps'] += set_data['repetitions']
+        stats['max_weight'] = max(stats['max_weight'], set_data['weight'])
+        if set_data['weight'] == set_data['weight']:  # bodyweight sets have NaN weight
+            stats['total_volume'] += set_data['weight'] * set_data['repetitions']
+    return summary
+
+
+def test_set_table_aggregates():
+    """Test vectorised aggregates against the dict loop they replace"""
+    print("\n=== Testing Set Table Aggregates ===")
+
+    table = sample_sets()
+    assert isinstance(table, SetTable) and len(table) > 0
+    records = [row.to_dict() for row in table]
+    expected = loop_summary(records)
+    summary = table.exercise_summary()
+
+    assert list(summary) == list(expected), "exercise order should follow first appearance"
+    for exercise, stats in expected.items():
+        for key in ('sets', 'total_reps', 'max_weight'):
+            assert summary[exercise][key] == stats[key], (exercise, key)
+        assert abs(summary[exercise]['total_volume'] - stats['total_volume']) < 1e-6
+    print(f"✓ {len(summary)} exercise summaries match the per-set loop")
+
+    totals = table.totals()
+    assert totals['sets'] == len(records)
+    assert totals['reps'] == sum(record['repetitions'] for record in records)
+    assert totals['exercises'] == len(expected)
+    print(f"✓ Totals: {totals['sets']} sets, {totals['reps']} reps, {totals['volume']:.0f} volume")
+
+    # Exercise names are stored once, not per set
+    assert len(table.exercise_names) == len(expected)
+    print("✓ Exercise names interned once per exercise")
+
+
+def test_set_table_editing():
+    """Test that row edits go to the copy only and show up in the aggregates"""
+    print("\n=== Testing Set Table Editing ===")
+
+    table = sample_sets()
+    edited = table.copy()
+    first = edited[0]
+    exercise = first['original_exercise_name']
+    first['repetitions'] = first['repetitions'] + 100
+    first['weight'] = 999.5
+    first['set_type'] = 5
+
+    assert edited[0]['repetitions'] == table[0]['repetitions'] + 100
+    assert table[0]['weight'] != 999.5, "editing the copy changed the original"
+    stats = edited.exercise_summary()[exercise]
+    assert stats['max_weight'] == 999.5
+    assert "Failure" in stats['set_types']
+    print("✓ Edits apply to the copy and update the summary")
+
+    rebuilt = SetTable.from_records([row.to_dict() for row in edited])
+    assert rebuilt.exercise_summary() == edited.exercise_summary()
+    assert rebuilt.rows.tobytes() == edited.rows.tobytes()
+    print("✓ Round trip through old-style dict records")
+
+
+def main():
+    """Run all set table tests"""
+    print("🧪 Set Table Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Set Table Aggregates", test_set_table_aggregates),
+        ("Set Table Editing", test_set_table_editing),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Watch Folder Test for Hevy to Garmin Integration
+
+Tests file debouncing, folder watching and matching activities to Hevy workouts by time.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from merge_pipeline import HeadlessMerger
+from batch_merge import output_path_for
+from watch_folder import (FolderWatcher, SettleTracker, PollingWatcher, create_watcher, hevy_workout_windows,
+                          match_workout, is_garmin_file)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_settle_tracker():
+    """Test that a file is only ready once it stops changing"""
+    print("\n=== Testing Settle Tracker ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "activity.fit")
+        with open(path, 'wb') as f:
+            f.write(b"partial")
+
+        clock = FakeClock()
+        tracker = SettleTracker(settle_seconds=3.0, clock=clock)
+        tracker.touch(path)
+        assert tracker.ready() == []
+
+        clock.now = 2.0
+        with open(path, 'ab') as f:
+            f.write(b" more data")
+        assert tracker.ready() == [], "file still growing"
+
+        clock.now = 4.0
+        assert tracker.ready() == [], "not settled long enough since the last write"
+        clock.now = 5.5
+        assert tracker.ready() == [path]
+        assert len(tracker) == 0
+        print("✓ Growing file held back until unchanged for the settle time")
+
+
+def test_folder_watchers():
+    """Test that new files are reported by the polling and native watchers"""
+    print("\n=== Testing Folder Watchers ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for watcher in (PollingWatcher([temp_dir], interval=0.05), create_watcher([temp_dir])):
+            path = os.path.join(temp_dir, f"{type(watcher).__name__}.csv")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("title\n")
+            seen = set()
+            for _ in range(20):
+                seen.update(watcher.wait(0.1))
+                if path in seen:
+                    break
+            watcher.close()
+            assert path in seen, f"{type(watcher).__name__} missed the new file"
+            print(f"✓ {type(watcher).__name__} reported the new file")
+
+    assert is_garmin_file("ride.FIT") and not is_garmin_file("ride_merged.fit")
+    print("✓ Merged outputs are not picked up as new activities")
+
+
+def test_match_by_time_overlap():
+    """Test matching a Garmin activity to the overlapping Hevy workout"""
+    print("\n=== Testing Workout Matching ===")
+
+    sample_csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "workouts-2.csv")
+    windows = hevy_workout_windows(sample_csv_path, HeadlessMerger(status_callback=lambda message: None))
+    assert len(windows) == 73
+    print(f"✓ {len(windows)} workout windows read from the sample export")
+
+    # The sample activity: 20:42 UTC, 16:42 local time (UTC-4), 36 minutes
+    summary = {'start_time': datetime(2025, 9, 1, 20, 42, 38, tzinfo=timezone.utc), 'utc_offset_seconds': -14400,
+               'duration_seconds': 2163}
+    match = match_workout(summary, [(sample_csv_path, windows)])
+    assert match is not None
+    hevy_csv_path, window = match
+    assert window['start_time'] == "1 Sep 2025, 16:42" and window['title'] == "Lower Body A"
+    print(f"✓ Activity matched to '{window['title']}' ({window['start_time']})")
+
+    # The same instant recorded in UTC is 20:42 on the wall clock, when no workout was logged
+    assert match_workout(dict(summary, utc_offset_seconds=0), [(sample_csv_path, windows)]) is None
+    print("✓ Workout times are compared in UTC using the activity's offset")
+
+    summary = {'start_time': datetime(2020, 1, 1, 9, 0, tzinfo=timezone.utc), 'utc_offset_seconds': 0,
+               'duration_seconds': 3600}
+    assert match_workout(summary, [(sample_csv_path, windows)]) is None
+    assert match_workout(dict(summary, utc_offset_seconds=None), [(sample_csv_path, windows)]) is None
+    print("✓ Activities without an overlapping workout or a UTC offset stay unmatched")
+
+
+def test_new_export_rechecks_merged_activity():
+    """Test that a newer Hevy export re-queues an activity that already has an output"""
+    print("\n=== Testing Re-check on New Export ===")
+
+    test_files = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        garmin_dir, hevy_dir, output_dir = (os.path.join(temp_dir, name) for name in ("garmin", "hevy", "out"))
+        for directory in (garmin_dir, hevy_dir, output_dir):
+            os.makedirs(directory)
+        activity = os.path.join(garmin_dir, "activity.fit")
+        export = os.path.join(hevy_dir, "workouts.csv")
+        shutil.copy(os.path.join(test_files, "2025-09-01-16-42-38.fit"), activity)
+        shutil.copy(os.path.join(test_files, "workouts-2.csv"), export)
+        output = output_path_for(activity, output_dir)
+        open(output, 'wb').close()
+
+        now = time.time()
+        os.utime(activity, (now - 300, now - 300))
+        os.utime(output, (now - 200, now - 200))
+        watcher = FolderWatcher(garmin_dir, hevy_dir, output_dir, log=lambda message: None)
+        assert not watcher.needs_merge(activity)
+        print("✓ An output newer than the activity is up to date")
+
+        os.utime(export, (now - 100, now - 100))
+        watcher.add_hevy_export(export)
+        assert watcher.needs_merge(activity) and watcher.pending == [activity]
+        print("✓ A newer Hevy export queues the merged activity again")
+
+        watcher.checked[activity] = now
+        assert not watcher.needs_merge(activity)
+        print("✓ Once found unchanged it is not re-queued for the same export")
+
+
+def main():
+    """Run all watch folder tests"""
+    print("🧪 Watch Folder Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Settle Tracker", test_settle_tracker),
+        ("Folder Watchers", test_folder_watchers),
+        ("Workout Matching", test_match_by_time_overlap),
+        ("Re-check on New Export", test_new_export_rechecks_merged_activity),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
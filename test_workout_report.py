@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Workout Report Test for Hevy to Garmin Integration
+
+Tests building a workout report and rendering it to HTML in a worker process.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from hr_analysis import heart_rate_samples
+from merge_pipeline import HeadlessMerger, decode_garmin_file
+from set_table import SetTable
+from workout_report import (body_diagram_text, build_report, load_muscle_groups, matplotlib_available,
+                            muscle_group_volumes, write_report)
+
+
+SAMPLE_FIT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test Files", "2025-09-01-16-42-38.fit")
+
+SETS = [("bench press (barbell)", 60, 80.0), ("bench press (barbell)", 240, 80.0),
+        ("squat (barbell)", 600, 100.0), ("bicep curl (dumbbell)", 900, 12.5)]
+
+
+def sample_sets():
+    return SetTable.from_records([{'original_exercise_name': name, 'timestamp': offset, 'duration': 40,
+                                   'repetitions': 8, 'weight': weight, 'set_number': index}
+                                  for index, (name, offset, weight) in enumerate(SETS)])
+
+
+def test_report_content():
+    """Test that the report carries the summary window's figures"""
+    print("\n=== Testing Report Content ===")
+
+    fit_file, _ = decode_garmin_file(SAMPLE_FIT)
+    sets = sample_sets()
+    muscle_groups = load_muscle_groups()
+    report = build_report(fit_file, sets, title="Leg Day <1>", muscle_groups=muscle_groups)
+    pickle.dumps(report)
+
+    volumes = muscle_group_volumes(sets.exercise_summary(), muscle_groups["muscle_group_mappings"])
+    assert volumes["chest"]['total_volume'] == 1280 and volumes["chest"]['sets'] == 2
+    assert [group['muscle_group'] for group in report['muscle_groups']] == [
+        group for group, volume in volumes.items() if volume['total_volume'] > 0]
+    assert "🫀 Chest" in report['body_diagram'] and "⚪ Calves" in body_diagram_text(volumes)
+    assert report['totals'] == sets.totals() and len(report['chart']['sets']) == len(SETS)
+    assert report['stats']['heart_rate']['blocks'][0]['exercise'] == "bench press (barbell)"
+    print(f"✓ {len(report['exercises'])} exercises, {len(report['muscle_groups'])} muscle groups, "
+          f"{len(report['chart']['offsets'])} chart points")
+
+
+def test_gui_report_stats():
+    """Test that a report saved from the summary window has the session's own figures"""
+    print("\n=== Testing GUI Report Statistics ===")
+
+    fit_file, garmin_df = decode_garmin_file(SAMPLE_FIT)
+    sets = sample_sets()
+    session = fit_file.message(18)  # 18 = session
+    duration, calories = int(round(session.first('total_elapsed_time'))), session.first('total_calories')
+    seconds, heart_rate = heart_rate_samples(fit_file)
+
+    # The windows show extract_workout_statistics(); save_report lets build_report() compute its own
+    window_stats = HeadlessMerger(status_callback=lambda message: None).extract_workout_statistics(
+        garmin_df, fit_file, sets)
+    report = build_report(fit_file, sets, None, title="Workout", weight_unit="kg")
+    for stats in (window_stats, report['stats']):
+        assert stats['duration_seconds'] == duration and stats['calories'] == calories
+        assert stats['avg_hr'] == int(heart_rate.mean()) and stats['max_hr'] == int(heart_rate.max())
+        assert stats['heart_rate']['trimp'] is not None
+    print(f"✓ {duration // 60} min, {int(calories)} kcal, {int(heart_rate.mean())}/{int(heart_rate.max())} bpm "
+          f"in both the windows and the report")
+
+
+def test_html_written_in_worker():
+    """Test rendering a self-contained HTML report in a worker process"""
+    print("\n=== Testing HTML Report ===")
+
+    fit_file, _ = decode_garmin_file(SAMPLE_FIT)
+    report = build_report(fit_file, sample_sets(), title="Leg Day <1>")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "report.html")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(write_report, report, path).result() == path
+        with open(path, encoding='utf-8') as f:
+            page = f.read()
+        assert sorted(os.listdir(temp_dir)) == ["report.html"]
+
+    assert "Leg Day &lt;1&gt;" in page and "<script" not in page and "http" not in page.replace(
+        'xmlns="http://www.w3.org/2000/svg"', "")
+    assert page.count("<rect") == len(SETS) and "<polyline" in page
+    assert "Bench Press (Barbell)" in page and "Training Load (TRIMP)" in page
+    print(f"✓ {len(page) // 1024} KB self-contained page with the HR chart and {len(SETS)} set markers")
+
+    if not matplotlib_available():
+        try:
+            write_report(report, os.path.join(tempfile.gettempdir(), "report.png"))
+            raise AssertionError("PNG written without matplotlib")
+        except RuntimeError as e:
+            assert "matplotlib" in str(e)
+        print("✓ PNG output explains that it needs matplotlib")
+
+
+def main():
+    """Run all workout report tests"""
+    print("🧪 Workout Report Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Report Content", test_report_content),
+        ("GUI Report Statistics", test_gui_report_stats),
+        ("HTML Report", test_html_written_in_worker),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ PASS {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAIL {test_name}: {e}")
+
+    print(f"\nResults: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Garmin Connect upload endpoint
+
+Accepts multipart FIT uploads on any POST path, stores them in a folder and
+answers with a Garmin-style JSON import result. It can be told to fail the
+first N requests (503 with Retry-After) to exercise the upload queue's
+retries, and answers 409 for a file it has already received, like Garmin
+Connect does for a duplicate activity.
+
+Usage:
+    python upload_stub_server.py [--port 8765] [--upload-dir uploads] [--fail-first 0]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubUploadServer(ThreadingHTTPServer):
+    """Threaded HTTP server recording every upload it receives"""
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), upload_dir=None, fail_first=0):
+        super().__init__(address, StubUploadHandler)
+        self.upload_dir = upload_dir
+        self.fail_remaining = fail_first
+        self.lock = threading.Lock()
+        self.received = {}      # sha256 -> filename
+        self.requests = 0
+        self.connections = set()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread; returns the thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class StubUploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            fail = server.fail_remaining > 0
+            if fail:
+                server.fail_remaining -= 1
+        if fail:
+            self.send_json(503, {"error": "try again"}, {"Retry-After": "0"})
+            return
+
+        filename, content = parse_multipart_file(self.headers.get("Content-Type", ""), body)
+        if content is None:
+            self.send_json(400, {"error": "no file part"})
+            return
+
+        digest = hashlib.sha256(content).hexdigest()
+        with server.lock:
+            duplicate = digest in server.received
+            if not duplicate:
+                server.received[digest] = filename
+                upload_id = len(server.received)
+        if duplicate:
+            self.send_json(409, {"detailedImportResult": {"failures": [{"messages": ["Duplicate Activity."]}]}})
+            return
+        if server.upload_dir:
+            with open(os.path.join(server.upload_dir, f"{upload_id}_{filename}"), 'wb') as f:
+                f.write(content)
+        self.send_json(201, {"detailedImportResult": {"uploadId": upload_id, "fileName": filename,
+                                                      "successes": [], "failures": []}})
+
+
+def parse_multipart_file(content_type, body):
+    """Extract (filename, bytes) of the first file part of a multipart body"""
+    if "boundary=" not in content_type:
+        return None, None
+    boundary = content_type.split("boundary=", 1)[1].strip().strip('"').encode("utf-8")
+    for part in body.split(b"--" + boundary):
+        header_block, separator, content = part.partition(b"\r\n\r\n")
+        if not separator or b"filename=" not in header_block:
+            continue
+        filename = header_block.split(b'filename="', 1)[1].split(b'"', 1)[0].decode("utf-8", "replace")
+        return os.path.basename(filename) or "upload.fit", content[:-2] if content.endswith(b"\r\n") else content
+    return None, None
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Garmin Connect upload endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--upload-dir", default="stub_uploads", help="Folder to store received files")
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests with 503")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.upload_dir, exist_ok=True)
+    server = StubUploadServer(("127.0.0.1", args.port), args.upload_dir, args.fail_first)
+    print(f"Stub upload server on {server.base_url} (files -> {args.upload_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
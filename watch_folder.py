@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Watch-folder runner for the Hevy to Garmin FIT Merger
+
+Watches the Garmin and Hevy export folders and merges automatically: when a
+Garmin .fit activity arrives it is matched to the Hevy workout whose start
+and end times overlap it, merged with the headless pipeline and written to
+the output folder as <activity>_merged.fit.
+
+Linux uses inotify (through ctypes, no extra packages); other platforms
+poll the folders. Files are only picked up once their size and modification
+time have stopped changing for a few seconds, so half-copied exports are
+not read. Merges run on a small process pool; activities with no matching
+Hevy workout yet are kept and retried whenever a new Hevy export appears.
+Activities whose output already carries the fingerprint of the same
+workout and mappings (see merge_fingerprint) are not merged again.
+
+Folders default to the last-used ones in user_preferences.json.
+
+Usage:
+    python watch_folder.py [--garmin-dir DIR] [--hevy-dir DIR] [--output-dir DIR]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from batch_merge import output_path_for
+from hevy_csv import FIT_EPOCH_UNIX, WORKOUT_COLUMNS, hevy_local_times, local_datetime, read_hevy_csv
+from merge_pipeline import HeadlessMerger, decode_garmin_file, inspect_garmin_file
+from session_store import load_user_preferences
+
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def is_garmin_file(path):
+    return path.lower().endswith(".fit") and not path.lower().endswith("_merged.fit")
+
+
+def is_hevy_file(path):
+    return path.lower().endswith(".csv")
+
+
+def list_files(directories):
+    """All regular files directly inside the given directories"""
+    paths = []
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                paths.extend(entry.path for entry in entries if entry.is_file())
+        except OSError:
+            continue
+    return paths
+
+
+class InotifyWatcher:
+    """Reports files created, written or moved into the watched directories (Linux)"""
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        for directory in self.directories:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"inotify_add_watch failed for {directory}")
+            self._watches[wd] = directory
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds and return the paths that changed"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; fall back to a full rescan
+                return list_files(self.directories)
+            if name and wd in self._watches:
+                paths.append(os.path.join(self._watches[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Portable fallback: rescans the directories and reports new or changed files"""
+
+    def __init__(self, directories, interval=2.0):
+        self.directories = list(directories)
+        self.interval = interval
+        self._seen = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in list_files(self.directories):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._snapshot()
+        changed = [path for path, signature in current.items() if self._seen.get(path) != signature]
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(directories, force_polling=False):
+    """inotify on Linux, polling everywhere else (or if inotify is unavailable)"""
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories)
+
+
+class SettleTracker:
+    """Debounces files that are still being written
+
+    A file is ready once its size and modification time have not changed for
+    ``settle_seconds``.
+    """
+
+    def __init__(self, settle_seconds=3.0, clock=time.monotonic):
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self._pending = {}
+
+    def touch(self, path):
+        """Start (or restart) the settle timer for a file"""
+        self._pending[path] = (None, self.clock())
+
+    def __len__(self):
+        return len(self._pending)
+
+    def ready(self):
+        """Return the files that have settled and stop tracking them"""
+        now = self.clock()
+        settled = []
+        for path, (signature, changed_at) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (current, now)
+            elif now - changed_at >= self.settle_seconds and stat.st_size > 0:
+                del self._pending[path]
+                settled.append(path)
+        return settled
+
+
+def hevy_workout_windows(hevy_csv_path, merger):
+    """
+    Time windows of the workouts in a Hevy export
+
+    Returns:
+        list: dicts with the workout's title, raw start_time string, start/end
+        as FIT local seconds (local_start, local_end) and as naive datetimes
+        (workouts without a parseable start are skipped)
+    """
+    hevy_df = read_hevy_csv(hevy_csv_path, merger.config.column_map, keys=WORKOUT_COLUMNS)
+    workouts = merger.detect_hevy_workouts(hevy_df)
+    starts = hevy_local_times([workout['start_time'] for workout in workouts])
+    ends = hevy_local_times([workout['end_time'] or None for workout in workouts])
+    windows = []
+    for workout, start, end in zip(workouts, starts, ends):
+        if pd.isna(start):
+            continue
+        end = end if not pd.isna(end) and end > start else start
+        windows.append({'title': workout['title'], 'start_time': workout['start_time'],
+                        'local_start': int(start), 'local_end': int(end),
+                        'start': local_datetime(start), 'end': local_datetime(end)})
+    return windows
+
+
+def match_workout(summary, exports, tolerance_seconds=900):
+    """
+    Find the Hevy workout that overlaps a Garmin activity in time
+
+    Args:
+        summary: session summary from summarize_fit_session()
+        exports: list of (hevy_csv_path, windows), newest export first
+        tolerance_seconds: slack added around the Hevy workout, whose times
+            only have minute resolution and are logged by hand
+
+    Returns:
+        tuple: (hevy_csv_path, window) with the largest overlap, or None
+    """
+    if summary.get('start_time') is None or summary.get('utc_offset_seconds') is None:
+        return None
+    # Compared as FIT timestamps (UTC): the windows are Hevy wall-clock time,
+    # shifted by the activity's UTC offset from its activity.local_timestamp
+    utc_offset = summary['utc_offset_seconds']
+    activity_start = int(summary['start_time'].timestamp()) - FIT_EPOCH_UNIX
+    activity_end = activity_start + (summary.get('duration_seconds') or 0)
+
+    best, best_overlap = None, None
+    for hevy_csv_path, windows in exports:
+        for window in windows:
+            overlap = (min(activity_end, window['local_end'] - utc_offset + tolerance_seconds)
+                       - max(activity_start, window['local_start'] - utc_offset - tolerance_seconds))
+            if overlap >= 0 and (best_overlap is None or overlap > best_overlap):
+                best, best_overlap = (hevy_csv_path, window), overlap
+    return best
+
+
+def workout_rows(hevy_df, window, merger):
+    """The rows of one workout (a window from hevy_workout_windows()) in a Hevy export"""
+    col_mapping = merger.config.get("hevy_csv_columns", {})
+    start_col, title_col = col_mapping.get("start_time"), col_mapping.get("workout_title")
+    rows = hevy_df[start_col].astype(str) == window['start_time']
+    if title_col in hevy_df.columns:
+        rows &= hevy_df[title_col].astype(str) == window['title']
+    return hevy_df[rows].reset_index(drop=True)
+
+
+def merge_watched_activity(garmin_fit_path, exports, output_path, tolerance_seconds=900):
+    """
+    Match one activity to a Hevy workout and merge it (worker process)
+
+    Returns:
+        dict: status 'merged' (with output, hevy_csv and workout title),
+        'unchanged' (already merged with the same workout and mappings, with
+        output and workout title) or 'unmatched' (with the session summary
+        so it can be re-matched later)
+    """
+    from fit_catalogue import scan_fit_file
+
+    # Match on the session alone; the activity is only decoded once it has a workout
+    summary = scan_fit_file(garmin_fit_path)
+    if summary is None:
+        _, _, summary = inspect_garmin_file(garmin_fit_path)
+    match = match_workout(summary, exports, tolerance_seconds)
+    if match is None:
+        return {'status': 'unmatched', 'summary': summary}
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    hevy_csv_path, window = match
+    hevy_df = read_hevy_csv(hevy_csv_path, merger.config.column_map, start_times=[window['start_time']])
+    workout_df = workout_rows(hevy_df, window, merger)
+
+    parsed_hevy_data = merger.apply_generic_mappings(workout_df)
+    fingerprint = merger.merge_fingerprint(parsed_hevy_data)
+    merged_path = merger.already_merged(fingerprint, output_path, garmin_fit_path)
+    if merged_path is not None:
+        return {'status': 'unchanged', 'output': merged_path, 'workout': window['title']}
+
+    fit_file, _ = decode_garmin_file(garmin_fit_path)
+    merger.merge_decoded(fit_file, workout_df, output_path, parsed_hevy_data=parsed_hevy_data,
+                         fingerprint=fingerprint)
+    return {'status': 'merged', 'output': output_path, 'hevy_csv': hevy_csv_path, 'workout': window['title']}
+
+
+class FolderWatcher:
+    """Long-running loop that merges new Garmin activities as they arrive"""
+
+    def __init__(self, garmin_dir, hevy_dir, output_dir, workers=2, settle_seconds=3.0,
+                 tolerance_minutes=15, force_polling=False, log=print):
+        self.garmin_dir = garmin_dir
+        self.hevy_dir = hevy_dir
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.tolerance_seconds = tolerance_minutes * 60
+        self.log = log
+        self.force_polling = force_polling
+        self.tracker = SettleTracker(settle_seconds)
+        self.merger = HeadlessMerger(status_callback=lambda message: None)
+        self.exports = {}          # hevy csv path -> workout windows
+        self.pending = []          # activities waiting for a free worker
+        self.unmatched = {}        # activity path -> session summary
+        self.in_flight = {}        # future -> activity path
+        self.submitted_at = {}     # activity path -> when its merge was last submitted
+        self.checked = {}          # activity path -> when it was last found already merged
+        self.merged = []
+
+    def watched_directories(self):
+        return sorted({os.path.abspath(self.garmin_dir), os.path.abspath(self.hevy_dir)})
+
+    def run(self, stop_event=None, poll_seconds=0.5):
+        """Watch until interrupted (Ctrl+C) or ``stop_event`` is set"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        watcher = create_watcher(self.watched_directories(), self.force_polling)
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.log(f"Watching {', '.join(self.watched_directories())} "
+                 f"({type(watcher).__name__.replace('Watcher', '').lower()}) -> {self.output_dir}")
+        try:
+            # Files already present are handled as if they had just arrived
+            for path in list_files(self.watched_directories()):
+                self.file_changed(path)
+            while stop_event is None or not stop_event.is_set():
+                for path in watcher.wait(poll_seconds):
+                    self.file_changed(path)
+                self.process_ready_files()
+                self.collect_results()
+                self.submit_pending(pool)
+        except KeyboardInterrupt:
+            self.log("Stopping watch folder.")
+        finally:
+            watcher.close()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return self.merged
+
+    def file_changed(self, path):
+        if is_garmin_file(path) or is_hevy_file(path):
+            self.tracker.touch(path)
+
+    def process_ready_files(self):
+        for path in self.tracker.ready():
+            if is_hevy_file(path):
+                self.add_hevy_export(path)
+            elif is_garmin_file(path) and self.needs_merge(path):
+                self.unmatched.pop(path, None)
+                self.queue(path)
+
+    def needs_merge(self, garmin_fit_path):
+        """
+        False if the merged output is newer than the activity and every Hevy export
+
+        A newer export may hold an edited workout, so the activity is merged
+        again; the worker skips it if its fingerprint is unchanged.
+        """
+        output_path = output_path_for(garmin_fit_path, self.output_dir)
+        try:
+            merged_at = os.stat(output_path).st_mtime
+        except OSError:
+            merged_at = 0
+        merged_at = max(merged_at, self.checked.get(garmin_fit_path, 0))
+        try:
+            changed_at = os.stat(garmin_fit_path).st_mtime
+        except OSError:
+            return True
+        for hevy_csv_path in self.exports:
+            try:
+                changed_at = max(changed_at, os.stat(hevy_csv_path).st_mtime)
+            except OSError:
+                continue
+        return merged_at < changed_at
+
+    def queue(self, garmin_fit_path):
+        if garmin_fit_path not in self.pending and garmin_fit_path not in self.in_flight.values():
+            self.pending.append(garmin_fit_path)
+
+    def add_hevy_export(self, hevy_csv_path):
+        try:
+            windows = hevy_workout_windows(hevy_csv_path, self.merger)
+        except Exception as e:
+            self.log(f"Skipping {os.path.basename(hevy_csv_path)}: {e}")
+            return
+        self.exports[hevy_csv_path] = windows
+        self.log(f"Hevy export {os.path.basename(hevy_csv_path)}: {len(windows)} workouts")
+
+        # Activities waiting for a workout are retried if this export covers them
+        for garmin_fit_path, summary in list(self.unmatched.items()):
+            if match_workout(summary, [(hevy_csv_path, windows)], self.tolerance_seconds):
+                del self.unmatched[garmin_fit_path]
+                self.queue(garmin_fit_path)
+
+        # Merged activities are checked against the new export in case a workout was edited
+        for garmin_fit_path in list_files([os.path.abspath(self.garmin_dir)]):
+            if (is_garmin_file(garmin_fit_path) and garmin_fit_path not in self.unmatched
+                    and self.needs_merge(garmin_fit_path)):
+                self.queue(garmin_fit_path)
+
+    def export_list(self):
+        """Known exports, newest first, so a fresh export wins ties"""
+        def modified(path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return 0
+        return sorted(self.exports.items(), key=lambda item: modified(item[0]), reverse=True)
+
+    def submit_pending(self, pool):
+        while self.pending and len(self.in_flight) < self.workers:
+            garmin_fit_path = self.pending.pop(0)
+            future = pool.submit(merge_watched_activity, garmin_fit_path, self.export_list(),
+                                 output_path_for(garmin_fit_path, self.output_dir), self.tolerance_seconds)
+            self.submitted_at[garmin_fit_path] = time.time()
+            self.in_flight[future] = garmin_fit_path
+
+    def collect_results(self):
+        for future in [future for future in self.in_flight if future.done()]:
+            garmin_fit_path = self.in_flight.pop(future)
+            name = os.path.basename(garmin_fit_path)
+            try:
+                result = future.result()
+            except Exception as e:
+                self.log(f"Failed to merge {name}: {e}")
+                continue
+            if result['status'] == 'merged':
+                self.merged.append(result['output'])
+                self.log(f"Merged {name} with '{result['workout']}' -> {result['output']}")
+            elif result['status'] == 'unchanged':
+                self.checked[garmin_fit_path] = self.submitted_at[garmin_fit_path]
+                self.log(f"{name} is already merged with '{result['workout']}' ({result['output']})")
+            else:
+                self.unmatched[garmin_fit_path] = result['summary']
+                self.log(f"No Hevy workout overlaps {name} yet; waiting for a new export")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    preferences = load_user_preferences()
+
+    def preferred(key):
+        return os.path.expanduser(preferences.get(key) or "~/")
+
+    parser = argparse.ArgumentParser(description="Merge Garmin activities automatically as exports arrive")
+    parser.add_argument("--garmin-dir", default=preferred("last_garmin_dir"), help="Folder receiving Garmin .fit files")
+    parser.add_argument("--hevy-dir", default=preferred("last_hevy_dir"), help="Folder receiving Hevy .csv exports")
+    parser.add_argument("--output-dir", default=preferred("last_export_dir"), help="Folder for merged .fit files")
+    parser.add_argument("--workers", type=int, default=2, help="Maximum merges running at once")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds a file must stay unchanged before it is read")
+    parser.add_argument("--tolerance", type=int, default=15, help="Minutes of slack when matching workout times")
+    parser.add_argument("--poll", action="store_true", help="Poll the folders instead of using inotify")
+    args = parser.parse_args(argv)
+
+    watcher = FolderWatcher(args.garmin_dir, args.hevy_dir, args.output_dir, workers=args.workers,
+                            settle_seconds=args.settle, tolerance_minutes=args.tolerance,
+                            force_polling=args.poll)
+    watcher.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Offline workout reports for the Hevy to Garmin FIT Merger
+
+Renders the content of the summary window (workout statistics, muscle-group
+volumes, the text body diagram and the exercise breakdown) plus a
+heart-rate-over-time chart with the sets marked on it, as one
+self-contained HTML file. PNG output is available when matplotlib is
+installed.
+
+A report is first collected into a plain dict (build_report), which is
+cheap and picklable; rendering and writing it (write_report) runs in a
+worker process, so the GUI stays responsive and batch runs can write one
+report per session while the next pair merges.
+
+Usage:
+    python workout_report.py ACTIVITY.fit WORKOUT.csv [--output report.html]
+"""
+
+import argparse
+import html
+import importlib.util
+import json
+import os
+import sys
+
+import numpy as np
+
+from hr_analysis import analyze_heart_rate, heart_rate_samples
+from merge_pipeline import summarize_fit_session
+
+
+MUSCLE_GROUPS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "muscle_groups.json")
+
+# Used when muscle_groups.json cannot be read
+FALLBACK_MUSCLE_GROUPS = {
+    "muscle_group_mappings": {
+        "chest": {"exercises": ["bench", "press"], "color": "#FF6B6B"},
+        "back": {"exercises": ["deadlift", "row"], "color": "#4ECDC4"},
+        "legs": {"exercises": ["squat", "lunge"], "color": "#DDA0DD"}
+    }
+}
+
+# Most points drawn in the heart-rate chart; longer recordings are strided
+CHART_MAX_POINTS = 1500
+
+SET_COLORS = ("#4ECDC4", "#FFB347")
+
+
+def matplotlib_available():
+    return importlib.util.find_spec("matplotlib") is not None
+
+
+def load_muscle_groups(path=MUSCLE_GROUPS_PATH):
+    """Load the muscle group mapping data (falls back to a minimal mapping)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return FALLBACK_MUSCLE_GROUPS
+
+
+def exercise_muscle_groups(exercise, muscle_mappings):
+    """Muscle groups whose keywords appear in an exercise name"""
+    exercise_name = exercise.lower()
+    return [muscle_group for muscle_group, group_data in muscle_mappings.items()
+            if any(keyword in exercise_name for keyword in group_data.get('exercises', []))]
+
+
+def muscle_group_volumes(exercise_summary, muscle_mappings):
+    """
+    Volume, sets and reps per muscle group
+
+    Args:
+        exercise_summary: SetTable.exercise_summary()
+        muscle_mappings: the "muscle_group_mappings" section of muscle_groups.json
+
+    Returns:
+        dict: muscle group -> {total_volume, sets, reps, exercises}
+    """
+    muscle_volumes = {muscle_group: {'total_volume': 0, 'sets': 0, 'reps': 0, 'exercises': set()}
+                      for muscle_group in muscle_mappings}
+
+    # Keyword matching runs once per exercise, not per set
+    for exercise, stats in exercise_summary.items():
+        for muscle_group in exercise_muscle_groups(exercise, muscle_mappings):
+            muscle_volumes[muscle_group]['total_volume'] += stats['total_volume']
+            muscle_volumes[muscle_group]['sets'] += stats['sets']
+            muscle_volumes[muscle_group]['reps'] += stats['total_reps']
+            muscle_volumes[muscle_group]['exercises'].add(exercise)
+    return muscle_volumes
+
+
+def body_diagram_text(muscle_volumes):
+    """Text body diagram marking the trained muscle groups"""
+    def region(muscle_group, trained, untrained):
+        return trained if muscle_volumes.get(muscle_group, {}).get('total_volume', 0) > 0 else untrained
+
+    diagram_text = "\n🧍 FRONT VIEW:\n"
+    diagram_text += region('shoulders', "   💪 Shoulders\n", "   ⚪ Shoulders\n")
+    diagram_text += region('chest', "  🫀 Chest\n", "  ⚪ Chest\n")
+    diagram_text += region('biceps', " 💪 Biceps   💪 Biceps\n", " ⚪ Biceps   ⚪ Biceps\n")
+    diagram_text += region('core', "   🟡 Core\n", "   ⚪ Core\n")
+    diagram_text += region('quadriceps', "  🦵 Quadriceps\n", "  ⚪ Quadriceps\n")
+    diagram_text += region('calves', "   🦵 Calves\n", "   ⚪ Calves\n")
+
+    diagram_text += "\n🧍 BACK VIEW:\n"
+    diagram_text += region('shoulders', "   💪 Shoulders\n", "   ⚪ Shoulders\n")
+    diagram_text += region('back', "  🔙 Upper Back\n", "  ⚪ Upper Back\n")
+    diagram_text += region('triceps', " 💪 Triceps  💪 Triceps\n", " ⚪ Triceps  ⚪ Triceps\n")
+    diagram_text += region('back', "  🔙 Lower Back\n", "  ⚪ Lower Back\n")
+    diagram_text += region('glutes', "  🍑 Glutes\n", "  ⚪ Glutes\n")
+    diagram_text += region('hamstrings', "  🦵 Hamstrings\n", "  ⚪ Hamstrings\n")
+    diagram_text += region('calves', "   🦵 Calves\n", "   ⚪ Calves\n")
+
+    diagram_text += "\n💪 = Trained   ⚪ = Not Trained"
+    return diagram_text
+
+
+def workout_statistics(fit_file, garmin_sets=None):
+    """
+    Garmin statistics of a session straight from the decoded FIT file
+
+    Returns:
+        dict: the keys of MergePipeline.extract_workout_statistics(), with
+        None where the file has no value
+    """
+    summary = summarize_fit_session(fit_file)
+    seconds, heart_rate = heart_rate_samples(fit_file)
+    calories = fit_file.message(18).first('total_calories')  # 18 = session
+    session_start = summary['start_time']
+    return {
+        'duration_seconds': summary['duration_seconds'],
+        'avg_hr': int(heart_rate.mean()) if len(heart_rate) else None,
+        'max_hr': int(heart_rate.max()) if len(heart_rate) else None,
+        'calories': int(calories) if calories else None,
+        'total_records': len(fit_file.message(20)),
+        'heart_rate': analyze_heart_rate(fit_file, garmin_sets,
+                                         session_start.timestamp() if session_start else None),
+    }
+
+
+def build_report(fit_file, garmin_sets, workout_stats=None, title="Workout", weight_unit="kg",
+                 muscle_groups=None):
+    """
+    Collect everything a report shows into a plain, picklable dict
+
+    Args:
+        fit_file: DecodedFit of the activity (for the heart-rate chart)
+        garmin_sets: SetTable of the merged sets (timestamps are offsets
+            from the session start)
+        workout_stats: statistics as shown in the windows; computed from the
+            FIT file when not given
+        muscle_groups: muscle_groups.json data (loaded when not given)
+    """
+    workout_stats = workout_stats or workout_statistics(fit_file, garmin_sets)
+    muscle_groups = muscle_groups or load_muscle_groups()
+    exercise_summary = garmin_sets.exercise_summary()
+    muscle_volumes = muscle_group_volumes(exercise_summary, muscle_groups.get("muscle_group_mappings", {}))
+
+    session_start = summarize_fit_session(fit_file)['start_time']
+    seconds, heart_rate = heart_rate_samples(fit_file)
+    origin = session_start.timestamp() if session_start else (seconds[0] if len(seconds) else 0)
+    stride = max(1, -(-len(seconds) // CHART_MAX_POINTS))
+    rows = garmin_sets.rows
+
+    return {
+        'title': title,
+        'started': session_start.strftime("%d %b %Y, %H:%M UTC") if session_start else None,
+        'weight_unit': weight_unit,
+        'stats': workout_stats,
+        'totals': garmin_sets.totals(),
+        'exercises': [dict(stats, exercise=exercise, set_types=sorted(stats['set_types']))
+                      for exercise, stats in exercise_summary.items()],
+        'muscle_groups': [{'muscle_group': muscle_group, 'total_volume': volume['total_volume'],
+                           'sets': volume['sets'], 'reps': volume['reps'],
+                           'color': muscle_groups["muscle_group_mappings"][muscle_group].get('color', "#999999")}
+                          for muscle_group, volume in muscle_volumes.items() if volume['total_volume'] > 0],
+        'body_diagram': body_diagram_text(muscle_volumes),
+        'chart': {
+            'offsets': (seconds[::stride] - origin).round(1).tolist(),
+            'heart_rate': heart_rate[::stride].tolist(),
+            'sets': [{'start': float(start), 'duration': float(duration), 'exercise': garmin_sets.exercise_names[code]}
+                     for start, duration, code in zip(rows['timestamp'], rows['duration'], rows['name_index'])],
+        },
+    }
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "–"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def heart_rate_chart_svg(chart, width=800, height=240):
+    """Inline SVG of heart rate over time, with each set as a shaded band"""
+    offsets, heart_rate = np.asarray(chart['offsets']), np.asarray(chart['heart_rate'])
+    if not len(offsets):
+        return '<p class="muted">No heart-rate data recorded.</p>'
+    margin = 36
+    end = max(offsets[-1], max((band['start'] + band['duration'] for band in chart['sets']), default=0), 1)
+    low, high = np.floor(heart_rate.min() / 10) * 10 - 10, np.ceil(heart_rate.max() / 10) * 10 + 10
+    x = margin + offsets / end * (width - 2 * margin)
+    y = height - margin - (heart_rate - low) / (high - low) * (height - 2 * margin)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" class="chart">']
+    for index, band in enumerate(chart['sets']):
+        left = margin + band['start'] / end * (width - 2 * margin)
+        band_width = max(band['duration'] / end * (width - 2 * margin), 1)
+        parts.append(f'<rect x="{left:.1f}" y="{margin}" width="{band_width:.1f}" height="{height - 2 * margin}" '
+                     f'fill="{SET_COLORS[index % len(SET_COLORS)]}" opacity="0.3">'
+                     f'<title>{html.escape(band["exercise"].title())}</title></rect>')
+    for bpm in np.arange(low, high + 1, 20):
+        level = height - margin - (bpm - low) / (high - low) * (height - 2 * margin)
+        parts.append(f'<line x1="{margin}" x2="{width - margin}" y1="{level:.1f}" y2="{level:.1f}" class="grid"/>'
+                     f'<text x="{margin - 4}" y="{level + 4:.1f}" text-anchor="end">{bpm:.0f}</text>')
+    for minute in range(0, int(end // 60) + 1, max(1, int(end // 60) // 6 or 1)):
+        left = margin + minute * 60 / end * (width - 2 * margin)
+        parts.append(f'<text x="{left:.1f}" y="{height - margin + 16}" text-anchor="middle">{minute} min</text>')
+    points = " ".join(f"{px:.1f},{py:.1f}" for px, py in zip(x, y))
+    parts.append(f'<polyline points="{points}" fill="none" stroke="#E74C3C" stroke-width="1.5"/>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def render_html(report):
+    """The report as a self-contained HTML document"""
+    escape = html.escape
+    stats, totals, unit = report['stats'], report['totals'], escape(report['weight_unit'])
+
+    def value(number, suffix=""):
+        return "–" if number is None else f"{number}{suffix}"
+
+    garmin_rows = [("Duration", format_duration(stats.get('duration_seconds'))),
+                   ("Avg HR", value(stats.get('avg_hr'), " bpm")),
+                   ("Max HR", value(stats.get('max_hr'), " bpm")),
+                   ("Calories", value(stats.get('calories')))]
+    heart_rate = stats.get('heart_rate')
+    if heart_rate:
+        garmin_rows.append(("Training Load (TRIMP)", f"{heart_rate['trimp']:.0f}"))
+        for zone in heart_rate['zones']:
+            label = f"Zone {zone['zone']} (≥{zone['low_bpm']} bpm)" if zone['zone'] else "Below zone 1"
+            garmin_rows.append((label, format_duration(zone['seconds'])))
+    hevy_rows = [("Total Sets", totals['sets']), ("Total Reps", totals['reps']),
+                 ("Total Volume", f"{totals['volume']:.0f} {unit}")]
+
+    def table(rows):
+        return "<table>" + "".join(f"<tr><th>{escape(str(label))}</th><td>{escape(str(cell))}</td></tr>"
+                                   for label, cell in rows) + "</table>"
+
+    muscles = "".join(
+        f'<li><span class="swatch" style="background:{escape(group["color"])}"></span>'
+        f'<b>{escape(group["muscle_group"].title())}</b>: {group["total_volume"]:.0f} {unit} '
+        f'({group["sets"]} sets, {group["reps"]} reps)</li>' for group in report['muscle_groups'])
+    blocks = {block['exercise']: block for block in (heart_rate or {}).get('blocks', [])}
+    exercises = []
+    for stats_row in report['exercises']:
+        block = blocks.get(stats_row['exercise'])
+        hr_text = (f" • HR avg {block['avg_hr']}, max {block['max_hr']} bpm"
+                   if block and block['avg_hr'] is not None else "")
+        types = f"<br>Types: {escape(', '.join(stats_row['set_types']))}" if len(stats_row['set_types']) > 1 else ""
+        exercises.append(f"<li><b>{escape(stats_row['exercise'].title())}</b><br>"
+                         f"{stats_row['sets']} sets × {stats_row['total_reps']} reps<br>"
+                         f"Max: {stats_row['max_weight']} {unit} • Volume: {stats_row['total_volume']:.0f} {unit}"
+                         f"{escape(hr_text)}{types}</li>")
+
+    subtitle = (f"{escape(report['started'])} • " if report['started'] else "") + (
+        f"{totals['exercises']} Exercises • {totals['sets']} Sets • {totals['reps']} Total Reps")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{escape(report['title'])}</title>
+<style>
+body {{ font-family: -apple-system, Helvetica, Arial, sans-serif; margin: 2em; color: #222; }}
+h1 {{ margin-bottom: 0.2em; }}
+.muted {{ color: #777; }}
+.columns {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 1.5em; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th {{ text-align: left; font-weight: normal; color: #555; padding: 2px 8px 2px 0; }}
+td {{ text-align: right; padding: 2px 0; }}
+ul {{ list-style: none; padding: 0; }}
+li {{ margin-bottom: 0.6em; }}
+.swatch {{ display: inline-block; width: 0.8em; height: 0.8em; margin-right: 0.4em; border-radius: 2px; }}
+pre {{ font-family: Monaco, Menlo, monospace; }}
+.chart {{ width: 100%; height: auto; font-size: 10px; fill: #555; }}
+.chart .grid {{ stroke: #ddd; stroke-width: 1; }}
+</style>
+</head>
+<body>
+<h1>🏁 {escape(report['title'])}</h1>
+<p class="muted">{subtitle}</p>
+<h2>❤️ Heart Rate</h2>
+{heart_rate_chart_svg(report['chart'])}
+<div class="columns">
+<section><h2>📊 Workout Statistics</h2><h3>⌚ Garmin Data</h3>{table(garmin_rows)}<h3>🏋️ Hevy Data</h3>{table(hevy_rows)}</section>
+<section><h2>💪 Muscle Groups Trained</h2><ul>{muscles}</ul><h3>🧍 Body Diagram</h3><pre>{escape(report['body_diagram'])}</pre></section>
+<section><h2>🏋️ Exercise Breakdown</h2><ul>{"".join(exercises)}</ul></section>
+</div>
+</body>
+</html>
+"""
+
+
+def render_png(report, path):
+    """Write the chart and summary figures as a PNG (needs matplotlib)"""
+    if not matplotlib_available():
+        raise RuntimeError("PNG reports need matplotlib (pip install matplotlib); use .html instead")
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot
+
+    figure, (chart_axes, text_axes) = pyplot.subplots(2, 1, figsize=(10, 10), gridspec_kw={'height_ratios': [1, 2]})
+    chart = report['chart']
+    for index, band in enumerate(chart['sets']):
+        chart_axes.axvspan(band['start'] / 60, (band['start'] + band['duration']) / 60,
+                           color=SET_COLORS[index % len(SET_COLORS)], alpha=0.3)
+    chart_axes.plot(np.asarray(chart['offsets']) / 60, chart['heart_rate'], color="#E74C3C", linewidth=1)
+    chart_axes.set_xlabel("min")
+    chart_axes.set_ylabel("bpm")
+    chart_axes.set_title(report['title'])
+
+    unit = report['weight_unit']
+    lines = [f"{row['exercise'].title()}: {row['sets']} sets × {row['total_reps']} reps, "
+             f"max {row['max_weight']} {unit}, volume {row['total_volume']:.0f} {unit}" for row in report['exercises']]
+    lines += [""] + [f"{group['muscle_group'].title()}: {group['total_volume']:.0f} {unit}"
+                     for group in report['muscle_groups']]
+    text_axes.axis("off")
+    text_axes.text(0, 1, "\n".join(lines), va="top", family="monospace", fontsize=9)
+    figure.tight_layout()
+    figure.savefig(path, dpi=120)
+    pyplot.close(figure)
+
+
+def write_report(report, path):
+    """
+    Render a report to ``path`` (.html, or .png with matplotlib)
+
+    Module-level and free of GUI state so it can run in a worker process.
+
+    Returns:
+        str: path once written
+    """
+    if os.path.splitext(path)[1].lower() == ".png":
+        render_png(report, path)
+        return path
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        f.write(render_html(report))
+    os.replace(temporary_path, path)
+    return path
+
+
+def write_session_report(garmin_fit_path, garmin_sets, path, title=None, weight_unit="kg"):
+    """Decode a FIT file, build its report with the merged sets and write it (for batch workers)"""
+    from merge_pipeline import decode_garmin_file
+
+    fit_file, _ = decode_garmin_file(garmin_fit_path)
+    title = title or os.path.splitext(os.path.basename(garmin_fit_path))[0]
+    return write_report(build_report(fit_file, garmin_sets, title=title, weight_unit=weight_unit), path)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Write an HTML/PNG report of a merged workout")
+    parser.add_argument("fit", help="Garmin .fit file")
+    parser.add_argument("csv", help="Hevy .csv export")
+    parser.add_argument("--output", help="Report path (.html or .png); default next to the FIT file")
+    args = parser.parse_args(argv)
+
+    from merge_pipeline import HeadlessMerger
+    from hevy_csv import read_hevy_csv
+    from watch_folder import hevy_workout_windows, match_workout, workout_rows
+
+    merger = HeadlessMerger(status_callback=lambda message: None)
+    fit_file, _ = merger.load_garmin_data(args.fit)
+    hevy_df = read_hevy_csv(args.csv, merger.config.column_map)
+    # Report only the Hevy workout recorded with this activity, if one matches
+    match = match_workout(summarize_fit_session(fit_file), [(args.csv, hevy_workout_windows(args.csv, merger))])
+    if match is not None:
+        hevy_df = workout_rows(hevy_df, match[1], merger)
+    merger.apply_generic_mappings(hevy_df)
+    merger.integrate_hevy_data(fit_file, hevy_df)
+    garmin_sets = getattr(merger, 'last_processed_sets', None)
+    if not garmin_sets:
+        print("No workout data was processed. Please check your files.")
+        return 1
+    output_path = args.output or f"{os.path.splitext(args.fit)[0]}_report.html"
+    title = os.path.splitext(os.path.basename(args.fit))[0]
+    print(write_report(build_report(fit_file, garmin_sets, title=title), output_path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())